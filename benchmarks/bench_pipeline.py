@@ -0,0 +1,172 @@
+"""
+Pipeline Benchmark Suite
+Times parse, validate, compile, reverse-compile and the full round trip on
+generated programs of growing size, records throughput and peak memory, and
+compares both against a stored baseline.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--max-instructions 1000000] [--stages parse,compile]
+        [--baseline benchmarks/baseline.json] [--tolerance 0.25] [--output results.json]
+        [--save-baseline benchmarks/baseline.json] [--no-memory]
+
+Programs come from `src/program_generator.py` (seeded, so every run measures
+the same code). Throughput is IR instructions per second; peak memory is the
+tracemalloc high-water mark of a separate run, so tracing does not skew the
+timings. With --baseline the exit status is 1 when a stage got slower or
+hungrier than the tolerance allows, which lets nightly builds fail on it.
+Baselines are machine specific: record one on the machine that compares.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ll_parser import parse_ladder_ir
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+from src.program_generator import generate_ladder
+from src.reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll
+from src.validator_ir_transform import validate_ir
+
+STAGES = ("parse", "validate", "compile", "reverse", "roundtrip")
+
+
+def _roundtrip(source):
+    ir_data = parse_ladder_ir(source)
+    validate_ir(ir_data)
+    return reverse_compile_plutus_to_ll(compile_ir_to_plutus_haskell_enhanced(ir_data))
+
+
+def prepare(size, seed):
+    """
+    Returns {stage: (function, input)} for a generated program of `size` instructions.
+    """
+    source = generate_ladder(size, seed)
+    ir_data = parse_ladder_ir(source)
+    plutus = compile_ir_to_plutus_haskell_enhanced(ir_data)
+    return {
+        "parse": (parse_ladder_ir, source),
+        "validate": (validate_ir, ir_data),
+        "compile": (compile_ir_to_plutus_haskell_enhanced, ir_data),
+        "reverse": (reverse_compile_plutus_to_ll, plutus),
+        "roundtrip": (_roundtrip, source),
+    }
+
+
+def measure(function, argument, repeat, memory):
+    """
+    Returns (best seconds over `repeat` runs, peak traced MiB or None).
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function(argument)
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def compare(result, baseline, tolerance):
+    """
+    Returns (notes, regressed) for one result against its baseline entry.
+    """
+    if not baseline:
+        return "", False
+    notes = []
+    regressed = False
+    speed = result["instructions_per_s"] / baseline["instructions_per_s"]
+    notes.append(f"speed x{speed:.2f}")
+    if speed < 1 - tolerance:
+        regressed = True
+    if result.get("peak_mib") is not None and baseline.get("peak_mib"):
+        growth = result["peak_mib"] / baseline["peak_mib"]
+        notes.append(f"memory x{growth:.2f}")
+        if growth > 1 + tolerance:
+            regressed = True
+    if regressed:
+        notes.append("REGRESSION")
+    return " ".join(notes), regressed
+
+
+def run(max_instructions, stages, seed, repeat, memory, baseline, tolerance):
+    """
+    Runs the suite for 1k, 10k, ... instructions up to `max_instructions`.
+    Returns (results, regressions).
+    """
+    results = {stage: {} for stage in stages}
+    regressions = []
+    baseline_results = (baseline or {}).get("results", {})
+    print(f"{'stage':<10} {'instructions':>12} {'seconds':>10} {'instr/s':>12} {'peak MiB':>9}  vs baseline")
+    size = 1000
+    while size <= max_instructions:
+        workload = prepare(size, seed)
+        for stage in stages:
+            function, argument = workload[stage]
+            seconds, peak = measure(function, argument, repeat, memory)
+            result = {"seconds": seconds, "instructions_per_s": size / seconds, "peak_mib": peak}
+            results[stage][str(size)] = result
+            notes, regressed = compare(result, baseline_results.get(stage, {}).get(str(size)), tolerance)
+            if regressed:
+                regressions.append((stage, size))
+            peak_text = f"{peak:>9.1f}" if peak is not None else f"{'-':>9}"
+            print(f"{stage:<10} {size:>12} {seconds:>10.3f} {size / seconds:>12.0f} {peak_text}  {notes}")
+        del workload
+        size *= 10
+    return results, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-instructions", type=int, default=1000000)
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of " + ", ".join(STAGES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement; the best is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory runs")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown or memory growth")
+    parser.add_argument("--output", help="write the results as JSON here")
+    parser.add_argument("--save-baseline", help="write the results as a new baseline here")
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results, regressions = run(
+        args.max_instructions, stages, args.seed, args.repeat, not args.no_memory, baseline, args.tolerance
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+    if regressions:
+        print("Regressions: " + ", ".join(f"{stage}@{size}" for stage, size in regressions))
+        sys.exit(1)
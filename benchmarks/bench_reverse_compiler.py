@@ -0,0 +1,69 @@
+"""
+Reverse Compiler Scaling Benchmark
+Times parse_plutus_script on synthetic validator bundles of growing size and
+reports throughput, so linear scaling (constant lines/s) can be checked.
+
+Usage:
+    python benchmarks/bench_reverse_compiler.py [--max-lines 1000000]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.reverse_compiler.reverse_compiler import parse_plutus_script
+
+BUNDLE_TEMPLATE = (
+    'traceIfFalse "Condition {i} failed: and" (X{i} && X{j}) &&',
+    'traceIfFalse "Condition {i} failed: or" ((Y{i} || Y{j}) &&',
+    '    Z{i})',
+    "let state{i} = state{i} + 1",
+    "let shift{i} = C{i} SHL 2",
+    "if balance{i} >= 100",
+    "timer Timer{i} 5000ms",
+    "JMP LABEL{i}",
+    "mustValidateIn (from slot{i}) -- Timer Timer{i} enforced",
+    "-- Verifiable Hash: {i:064x}",
+)
+
+
+def build_bundle(line_count):
+    """
+    Builds a Plutus validator bundle with roughly `line_count` lines.
+    """
+    lines = []
+    i = 0
+    while len(lines) < line_count:
+        j = i + 1
+        lines.extend(template.format(i=i, j=j) for template in BUNDLE_TEMPLATE)
+        i += 1
+    return "\n".join(lines[:line_count])
+
+
+def run(max_lines):
+    """
+    Runs the benchmark for 1k, 10k, ... lines up to `max_lines`.
+    """
+    size = 1000
+    baseline_rate = None
+    print(f"{'lines':>10} {'seconds':>10} {'lines/s':>12} {'relative':>9}")
+    while size <= max_lines:
+        bundle = build_bundle(size)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            parse_plutus_script(bundle)
+            elapsed = time.perf_counter() - start
+        rate = size / elapsed
+        baseline_rate = baseline_rate or rate
+        print(f"{size:>10} {elapsed:>10.3f} {rate:>12.0f} {rate / baseline_rate:>9.2f}")
+        size *= 10
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-lines", type=int, default=1000000)
+    run(parser.parse_args().max_lines)
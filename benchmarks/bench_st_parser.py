@@ -0,0 +1,69 @@
+"""
+Structured Text Parser Scaling Benchmark
+Times parse_structured_text on synthetic programs of growing size and reports
+throughput, so linear scaling (constant lines/s) can be checked.
+
+Usage:
+    python benchmarks/bench_st_parser.py [--max-lines 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.st_parser import parse_structured_text
+
+PROGRAM_TEMPLATE = (
+    "(* Station {i} *)",
+    "Run{i} := (Start{i} OR Run{i}) AND NOT Stop{i};",
+    "IF Level{i} > 100 AND Run{i} THEN",
+    "    Pump{i} := TRUE;",
+    "    Speed{i} := (Level{i} - 100) * 2 + Offset{i} MOD 7;",
+    "ELSIF Level{i} < 20 THEN",
+    "    Pump{i} := FALSE;",
+    "END_IF;",
+    "Timer{i}(IN := Pump{i}, PT := T#5S);",
+    "Alarm{i} := Timer{i}.Q XOR Fault{i};",
+)
+
+
+def build_program(line_count):
+    """
+    Builds a Structured Text program with roughly `line_count` lines.
+    """
+    lines = []
+    declarations = []
+    i = 0
+    while len(lines) < line_count:
+        declarations.append(f"    Timer{i} : TON;")
+        lines.extend(template.format(i=i) for template in PROGRAM_TEMPLATE)
+        i += 1
+    return "\n".join(["PROGRAM Main", "VAR"] + declarations + ["END_VAR"] + lines + ["END_PROGRAM"])
+
+
+def run(max_lines):
+    """
+    Runs the benchmark for 1k, 10k, ... lines up to `max_lines`.
+    """
+    size = 1000
+    baseline_rate = None
+    print(f"{'lines':>10} {'seconds':>10} {'lines/s':>12} {'relative':>9}")
+    while size <= max_lines:
+        program = build_program(size)
+        lines = program.count("\n") + 1
+        start = time.perf_counter()
+        parse_structured_text(program)
+        elapsed = time.perf_counter() - start
+        rate = lines / elapsed
+        baseline_rate = baseline_rate or rate
+        print(f"{lines:>10} {elapsed:>10.3f} {rate:>12.0f} {rate / baseline_rate:>9.2f}")
+        size *= 10
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-lines", type=int, default=1000000)
+    run(parser.parse_args().max_lines)
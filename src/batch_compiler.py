@@ -0,0 +1,272 @@
+"""
+Batch Compiler
+Runs parse → validate → compile (and reverse compilation) over whole project trees in a process pool.
+
+Overview:
+- Accepts directories (walked recursively) and glob patterns of .ll, .st, .ir and .plutus files.
+- .ll and .st files are parsed, validated and compiled; .ir files are validated and compiled;
+  .plutus files are reverse compiled back into Ladder Logic.
+- Results are written under an output directory that mirrors the input layout.
+- A content-hash build manifest records per-file status and stage timings, and
+  unchanged inputs are skipped on the next run.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from src.ll_parser import parse_ladder_ir
+    from src.st_parser import parse_structured_text
+    from src.validator_ir_transform import validate_ir_structure
+    from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+    from src.reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll
+    from src.compile_cache import CompileCache
+except ImportError:  # Run as a script: python src/batch_compiler.py
+    from ll_parser import parse_ladder_ir
+    from st_parser import parse_structured_text
+    from validator_ir_transform import validate_ir_structure
+    from plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+    from reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll
+    from compile_cache import CompileCache
+
+SOURCE_EXTENSIONS = (".ll", ".st", ".ir", ".plutus")
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def collect_sources(inputs, exclude_dir=None):
+    """
+    Expands directories and glob patterns into a sorted list of source files.
+    """
+    exclude_dir = os.path.abspath(exclude_dir) if exclude_dir else None
+    found = set()
+    for pattern in inputs:
+        candidates = [pattern] if os.path.isdir(pattern) else glob.glob(pattern, recursive=True)
+        for candidate in candidates:
+            if os.path.isdir(candidate):
+                for root, dirs, files in os.walk(candidate):
+                    if exclude_dir and os.path.abspath(root) == exclude_dir:
+                        dirs[:] = []
+                        continue
+                    for name in files:
+                        if name.endswith(SOURCE_EXTENSIONS):
+                            found.add(os.path.join(root, name))
+            elif candidate.endswith(SOURCE_EXTENSIONS):
+                found.add(candidate)
+    return sorted(found)
+
+
+def content_hash(data):
+    """
+    Returns the blake2b digest used to detect unchanged inputs.
+    """
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+def _inside(path, root):
+    try:
+        return os.path.commonpath([root, path]) == root
+    except ValueError:  # Different drives
+        return False
+
+
+def _relative(source, root):
+    """
+    Returns `source` relative to `root`. Raises ValueError when it lies outside `root`.
+    """
+    path = os.path.abspath(source)
+    if not _inside(path, root):
+        raise ValueError(f"Source {source} is outside the root directory {root}")
+    return os.path.relpath(path, root)
+
+
+def source_root(sources, root=None):
+    """
+    Returns the absolute directory outputs and manifest keys are relative to.
+    An explicit `root` must contain every source; by default the current
+    directory is used, or the sources' common directory when some lie outside it.
+    """
+    paths = [os.path.abspath(source) for source in sources]
+    if root is not None:
+        root = os.path.abspath(root)
+        for source, path in zip(sources, paths):
+            if not _inside(path, root):
+                raise ValueError(f"Source {source} is outside the root directory {root}")
+        return root
+    root = os.getcwd()
+    if paths and not all(_inside(path, root) for path in paths):
+        root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    return root
+
+
+def _output_base(source, root, out_dir):
+    return os.path.join(out_dir, os.path.splitext(_relative(source, root))[0])
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def compile_file(source, root, out_dir, cache=None):
+    """
+    Compiles a single source file. Runs inside a worker process.
+
+    Returns a manifest entry with status, outputs and per-stage timings.
+    """
+    timings = {}
+    outputs = []
+    entry = {"status": "ok", "outputs": outputs, "timings": timings}
+    start = time.perf_counter()
+    base = _output_base(source, root, out_dir)
+    extension = os.path.splitext(source)[1]
+
+    try:
+        with open(source, "r", encoding="utf-8") as f:
+            if extension == ".plutus":
+                plutus_code = f.read()
+                stage = time.perf_counter()
+                ladder_logic = reverse_compile_plutus_to_ll(plutus_code)
+                timings["reverse"] = time.perf_counter() - stage
+                _write(base + ".reversed.ll", ladder_logic)
+                outputs.append(base + ".reversed.ll")
+                return entry
+
+            stage = time.perf_counter()
+            if extension in (".ll", ".st"):
+                ir_data = parse_ladder_ir(f) if extension == ".ll" else parse_structured_text(f)
+                timings["parse"] = time.perf_counter() - stage
+                _write(base + ".ir", json.dumps(ir_data, indent=2))
+                outputs.append(base + ".ir")
+            else:
+                ir_data = json.load(f)
+                timings["load"] = time.perf_counter() - stage
+
+        stage = time.perf_counter()
+        valid, message = validate_ir_structure(ir_data)
+        timings["validate"] = time.perf_counter() - stage
+        if not valid:
+            entry["status"] = "invalid"
+            entry["error"] = message
+            return entry
+
+        stage = time.perf_counter()
+        plutus_code = compile_ir_to_plutus_haskell_enhanced(ir_data, cache=cache)
+        timings["compile"] = time.perf_counter() - stage
+        _write(base + ".plutus", plutus_code)
+        outputs.append(base + ".plutus")
+    except Exception as e:  # One bad file must not abort the batch
+        entry["status"] = "error"
+        entry["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        timings["total"] = time.perf_counter() - start
+    return entry
+
+
+_worker_caches = {}
+
+
+def _compile_job(job):
+    source, digest, root, out_dir, cache_dir = job
+    cache = None
+    if cache_dir:
+        cache = _worker_caches.get(cache_dir)
+        if cache is None:
+            cache = _worker_caches[cache_dir] = CompileCache(disk_dir=cache_dir)
+    entry = compile_file(source, root, out_dir, cache=cache)
+    entry["hash"] = digest
+    return source, entry
+
+
+def load_manifest(out_dir):
+    """
+    Loads the previous build manifest, or an empty one.
+    """
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "files": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "files": {}}
+    return manifest
+
+
+def batch_compile(inputs, out_dir="build", jobs=None, force=False, root=None, cache_dir=None):
+    """
+    Compiles every matching source under `inputs` in parallel and writes the manifest.
+    With `cache_dir`, compiled scripts are shared across files and runs through
+    the on-disk tier of `compile_cache.CompileCache`.
+
+    Returns the manifest dict. Files whose content hash matches a previous
+    successful build (with outputs still present) are reported as "cached".
+    Raises ValueError when an explicit `root` does not contain every source.
+    """
+    start = time.perf_counter()
+    sources = collect_sources(inputs, exclude_dir=out_dir)
+    root = source_root(sources, root)
+    previous = {} if force else load_manifest(out_dir)["files"]
+    files = {}
+    pending = []
+
+    for source in sources:
+        key = _relative(source, root)
+        with open(source, "rb") as f:
+            digest = content_hash(f.read())
+        old = previous.get(key)
+        if (old and old.get("hash") == digest and old.get("status") in ("ok", "cached")
+                and all(os.path.exists(path) for path in old.get("outputs", []))):
+            files[key] = dict(old, status="cached", timings={})
+            continue
+        pending.append((source, digest, root, out_dir, cache_dir))
+
+    if jobs == 1 or len(pending) <= 1:
+        results = list(map(_compile_job, pending))
+    else:
+        chunksize = max(1, len(pending) // ((jobs or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_compile_job, pending, chunksize=chunksize))
+    for source, entry in results:
+        files[_relative(source, root)] = entry
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "files": dict(sorted(files.items())),
+        "summary": {
+            "total": len(files),
+            "compiled": len(pending),
+            "cached": len(files) - len(pending),
+            "failed": sum(1 for entry in files.values() if entry["status"] in ("error", "invalid")),
+            "seconds": time.perf_counter() - start
+        }
+    }
+    _write(os.path.join(out_dir, MANIFEST_FILENAME), json.dumps(manifest, indent=2))
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch compile .ll/.ir/.plutus files in parallel.")
+    parser.add_argument("inputs", nargs="+", help="Directories or glob patterns")
+    parser.add_argument("--out", default="build", help="Output directory (default: build)")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Ignore the previous manifest and rebuild everything")
+    parser.add_argument("--cache-dir", default=None, help="Share compiled IR across files and runs via an on-disk cache")
+    parser.add_argument("--root", default=None,
+                        help="Directory the output layout mirrors (default: current directory, or the inputs' common directory)")
+    args = parser.parse_args()
+
+    manifest = batch_compile(args.inputs, out_dir=args.out, jobs=args.jobs, force=args.force, root=args.root,
+                             cache_dir=args.cache_dir)
+    summary = manifest["summary"]
+    print(
+        f"{summary['total']} files: {summary['compiled']} compiled, {summary['cached']} cached, "
+        f"{summary['failed']} failed in {summary['seconds']:.2f}s"
+    )
+    sys.exit(1 if summary["failed"] else 0)
@@ -0,0 +1,302 @@
+"""
+Batch Scan-Cycle Simulator
+Runs a LadderCore IR program over many input scenarios at once with NumPy.
+
+Overview:
+- Every tag is a row of an (tags × scenarios) int64 matrix, so each
+  instruction is one vectorized operation across the whole batch.
+- Timer (TON/TOF/TP) and counter (CTU/CTD) state is vectorized the same way.
+- Inputs are given per tag as arrays of shape (N,) (constant over the run) or
+  (N, M) (one value per scan cycle); the result records chosen tags for every
+  scenario and cycle.
+- Execution semantics are those of `scan_semantics`. Forward jumps are run
+  with per-scenario block masks; subroutine calls and backward jumps are
+  rejected (use `fast_interpreter` for those programs).
+
+NumPy is an optional dependency, required only for this module.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for batch simulation
+    np = None
+
+try:
+    from src.scan_semantics import (
+        lower_program, LOAD, LOAD_NOT, AND, AND_NOT, OR, OR_NOT, XOR, XOR_NOT, NOT,
+        STORE, STORE_NOT, SET, RESET, ADD, SUB, MUL, DIV, MOD, GT, GE, EQ, NE, LE, LT,
+    )
+except ImportError:  # Run as a script from inside src/
+    from scan_semantics import (
+        lower_program, LOAD, LOAD_NOT, AND, AND_NOT, OR, OR_NOT, XOR, XOR_NOT, NOT,
+        STORE, STORE_NOT, SET, RESET, ADD, SUB, MUL, DIV, MOD, GT, GE, EQ, NE, LE, LT,
+    )
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("batch_simulator requires NumPy: pip install numpy")
+
+
+def _truncating_divide(left, right):
+    safe = np.where(right == 0, 1, right)
+    quotient = np.abs(left) // np.abs(safe) * np.sign(left) * np.sign(safe)
+    return np.where(right == 0, 0, quotient)
+
+
+def _truncating_mod(left, right):
+    safe = np.where(right == 0, 1, right)
+    return np.where(right == 0, 0, np.fmod(left, safe))
+
+
+class SimulationResult:
+    """
+    Recorded tag traces, each an (N, M) array, plus the final tag values.
+    """
+
+    def __init__(self, traces, final_state, tags, slots):
+        self.traces = traces
+        self._final_state = final_state
+        self._tags = tags
+        self._slots = slots
+
+    def __getitem__(self, tag):
+        return self.traces[tag]
+
+    def final(self, tag):
+        """
+        Returns the (N,) values of `tag` after the last scan.
+        """
+        return self._final_state[self._slots[tag]]
+
+
+class BatchSimulator:
+    """
+    Vectorized scan-cycle simulator for one IR program.
+    """
+
+    def __init__(self, ir_data, scan_time_ms=10):
+        _require_numpy()
+        self.program = lower_program(ir_data)
+        self.scan_time_ms = scan_time_ms
+        for block in self.program.blocks or ():
+            if not block.reachable:
+                continue
+            if block.terminator in ("CALL", "RET", "RETC", "RETCN") or (
+                    block.target is not None and block.target <= block.index):
+                raise ValueError(
+                    "Batch simulation supports forward jumps only; use fast_interpreter for "
+                    "subroutines and backward jumps"
+                )
+
+    @property
+    def tags(self):
+        return list(self.program.slots)
+
+    def _operand(self, values, operand):
+        is_literal, value = operand
+        return value if is_literal else values[value]
+
+    def _execute(self, values, acc, batch):
+        blocks = self.program.blocks
+        if blocks is None:
+            return self._run_ops(values, acc, batch, self.program.ops, None)
+
+        # Forward-only control flow: every scenario carries an "arrived" mask
+        # down the blocks in program order, so one pass covers all paths.
+        arrived = [None] * len(blocks)
+        arrived[0] = np.ones(batch, dtype=bool)
+        for block in blocks:
+            mask = arrived[block.index]
+            if mask is None or not mask.any():
+                continue
+            result = self._run_ops(values, acc, batch, block.ops, mask)
+            acc = np.where(mask, result, acc)
+            taken = mask
+            if block.terminator == "JMPC":
+                taken = mask & (acc != 0)
+            elif block.terminator == "JMPCN":
+                taken = mask & (acc == 0)
+            elif block.terminator is None:
+                taken = None
+            follow = mask if taken is None else mask & ~taken
+            for successor, flow in ((block.target, taken), (block.fallthrough, follow)):
+                if successor is not None and flow is not None and flow.any():
+                    arrived[successor] = flow if arrived[successor] is None else arrived[successor] | flow
+        return acc
+
+    def _run_ops(self, values, acc, batch, ops, mask):
+        operand = self._operand
+        for lowered in ops:
+            op = lowered.op
+            operands = lowered.operands
+
+            if op == LOAD or op == LOAD_NOT:
+                if len(operands) == 1:
+                    acc = np.array(operand(values, operands[0]), dtype=np.int64)
+                else:
+                    acc = np.ones(batch, dtype=np.int64)
+                    for item in operands:
+                        acc &= operand(values, item) != 0
+                if op == LOAD_NOT:
+                    acc = acc == 0
+            elif op == AND:
+                acc = acc != 0
+                for item in operands:
+                    acc = acc & (operand(values, item) != 0)
+            elif op == AND_NOT:
+                acc = acc != 0
+                for item in operands:
+                    acc = acc & (operand(values, item) == 0)
+            elif op == OR:
+                acc = acc != 0
+                for item in operands:
+                    acc = acc | (operand(values, item) != 0)
+            elif op == OR_NOT:
+                acc = acc != 0
+                for item in operands:
+                    acc = acc | (operand(values, item) == 0)
+            elif op == XOR:
+                acc = acc != 0
+                for item in operands:
+                    acc = acc ^ (operand(values, item) != 0)
+            elif op == XOR_NOT:
+                acc = acc != 0
+                for item in operands:
+                    acc = acc ^ (operand(values, item) == 0)
+            elif op == NOT:
+                acc = (acc == 0)
+            elif op == STORE or op == STORE_NOT:
+                stored = acc if op == STORE else acc == 0
+                for _, slot in operands:
+                    values[slot] = stored if mask is None else np.where(mask, stored, values[slot])
+            elif op == SET or op == RESET:
+                active = acc != 0 if mask is None else (acc != 0) & mask
+                for _, slot in operands:
+                    values[slot] = np.where(active, 1 if op == SET else 0, values[slot])
+            else:
+                for item in operands:
+                    right = operand(values, item)
+                    if op == ADD:
+                        acc = acc + right
+                    elif op == SUB:
+                        acc = acc - right
+                    elif op == MUL:
+                        acc = acc * right
+                    elif op == DIV:
+                        acc = _truncating_divide(acc, right)
+                    elif op == MOD:
+                        acc = _truncating_mod(acc, right)
+                    elif op == GT:
+                        acc = acc > right
+                    elif op == GE:
+                        acc = acc >= right
+                    elif op == EQ:
+                        acc = acc == right
+                    elif op == NE:
+                        acc = acc != right
+                    elif op == LE:
+                        acc = acc <= right
+                    elif op == LT:
+                        acc = acc < right
+            acc = np.asarray(acc, dtype=np.int64)
+            if acc.shape != (batch,):
+                acc = np.broadcast_to(acc, (batch,)).copy()
+        return acc
+
+    def _update_timers(self, values, running, previous_in):
+        dt = self.scan_time_ms
+        for index, timer in enumerate(self.program.timers):
+            enabled = values[timer.in_slot] != 0
+            elapsed = values[timer.et_slot]
+            preset = timer.preset_ms
+            if timer.kind == "TOF":
+                elapsed = np.where(enabled, 0, np.minimum(elapsed + dt, preset))
+                done = enabled | (elapsed < preset)
+            elif timer.kind == "TP":
+                start = enabled & ~previous_in[index] & ~running[index]
+                active = running[index] | start
+                elapsed = np.where(active, np.where(start, 0, elapsed) + dt, np.where(enabled, elapsed, 0))
+                elapsed = np.minimum(elapsed, preset)
+                running[index] = active & (elapsed < preset)
+                done = running[index] | start
+            else:
+                elapsed = np.where(enabled, np.minimum(elapsed + dt, preset), 0)
+                done = enabled & (elapsed >= preset)
+            previous_in[index] = enabled
+            values[timer.et_slot] = elapsed
+            values[timer.q_slot] = done
+
+    def _update_counters(self, values, previous_count):
+        for index, counter in enumerate(self.program.counters):
+            pulse = values[counter.count_slot] != 0
+            edge = pulse & ~previous_count[index]
+            previous_count[index] = pulse
+            reset = values[counter.reset_slot] != 0
+            current = values[counter.cv_slot]
+            if counter.kind == "CTD":
+                current = np.where(reset, counter.preset, current - edge)
+                values[counter.q_slot] = current <= 0
+            else:
+                current = np.where(reset, 0, current + edge)
+                values[counter.q_slot] = current >= counter.preset
+            values[counter.cv_slot] = current
+
+    def run(self, inputs, cycles=None, record=None):
+        """
+        Simulates every scenario for `cycles` scans.
+
+        `inputs` maps tag names to arrays of shape (N,) or (N, M). `cycles`
+        defaults to M (or 1 for constant inputs). `record` lists the tags to
+        trace; by default every stored tag and timer/counter output is traced.
+        """
+        arrays = {tag: np.asarray(value, dtype=np.int64) for tag, value in inputs.items()}
+        if not arrays:
+            raise ValueError("At least one input tag is required to size the batch")
+        batch = next(iter(arrays.values())).shape[0]
+        if cycles is None:
+            cycles = max((array.shape[1] for array in arrays.values() if array.ndim == 2), default=1)
+
+        program = self.program
+        slots = program.slots
+        for tag, array in arrays.items():
+            if tag not in slots:
+                raise KeyError(f"Unknown input tag: {tag}")
+            if array.shape[0] != batch or (array.ndim == 2 and array.shape[1] < cycles):
+                raise ValueError(f"Input {tag} has shape {array.shape}, expected ({batch},) or ({batch}, {cycles})")
+
+        if record is None:
+            record = [program.tags[slot] for lowered in program.ops for slot in lowered.writes()]
+            record += [program.tags[timer.q_slot] for timer in program.timers]
+            record += [program.tags[counter.q_slot] for counter in program.counters]
+            record = list(dict.fromkeys(record))
+        record_slots = [slots[tag] for tag in record]
+
+        values = np.zeros((len(program.tags), batch), dtype=np.int64)
+        for slot, value in program.initial.items():
+            values[slot] = value
+        for counter in program.counters:
+            if counter.kind == "CTD":
+                values[counter.cv_slot] = counter.preset
+        for timer in program.timers:
+            if timer.kind == "TOF":
+                values[timer.et_slot] = timer.preset_ms
+
+        running = np.zeros((len(program.timers), batch), dtype=bool)
+        previous_in = np.zeros((len(program.timers), batch), dtype=bool)
+        previous_count = np.zeros((len(program.counters), batch), dtype=bool)
+        traces = np.zeros((len(record_slots), batch, cycles), dtype=np.int64)
+        input_slots = [(slots[tag], array) for tag, array in arrays.items()]
+        acc = np.zeros(batch, dtype=np.int64)
+
+        for cycle in range(cycles):
+            for slot, array in input_slots:
+                values[slot] = array[:, cycle] if array.ndim == 2 else array
+            acc = self._execute(values, acc, batch)
+            self._update_timers(values, running, previous_in)
+            self._update_counters(values, previous_count)
+            traces[:, :, cycle] = values[record_slots]
+
+        return SimulationResult(
+            {tag: traces[index] for index, tag in enumerate(record)}, values, program.tags, slots
+        )
@@ -0,0 +1,197 @@
+"""
+Compile Cache
+Content-addressed memoization for the PlutusLadder compiler.
+
+Overview:
+- Keys are blake2b digests of a canonical encoding of the normalized IR.
+- The key also covers a fingerprint of the compiler source and the mapping
+  files, so entries are invalidated when either changes.
+- A bounded in-memory LRU tier sits in front of an optional on-disk tier.
+- Hit/miss statistics are kept per cache instance.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+
+try:
+    from src.mapping_registry import get_registry
+except ImportError:  # Run as a script from inside src/
+    from mapping_registry import get_registry
+
+
+def canonical_ir(ir_data):
+    """
+    Normalizes IR into a JSON-encodable structure that is independent of
+    incidental key order but keeps every ordering the compiler depends on.
+
+    Top-level keys and the fields of each entry are sorted; the order of the
+    instruction list and of named sections (timers, counters, ...) is kept
+    because it determines the order of the generated checks.
+    """
+    normalized = []
+    for key in sorted(ir_data):
+        value = ir_data[key]
+        if isinstance(value, dict):
+            value = [
+                [name, sorted(entry.items()) if isinstance(entry, dict) else entry]
+                for name, entry in value.items()
+            ]
+        elif isinstance(value, list):
+            value = [sorted(item.items()) if isinstance(item, dict) else item for item in value]
+        normalized.append([key, value])
+    return normalized
+
+
+def ir_digest(ir_data, salt=b""):
+    """
+    Returns the hex blake2b digest of the canonical IR encoding.
+    """
+    encoded = json.dumps(canonical_ir(ir_data), separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(salt + encoded.encode("utf-8"), digest_size=32).hexdigest()
+
+
+def _compiler_sources(compile_fn):
+    """
+    Returns the compiler's source file and those of the helper modules from
+    the same directory that it uses, directly or through other helpers.
+    """
+    source = os.path.abspath(compile_fn.__code__.co_filename)
+    directory = os.path.dirname(source)
+    paths = {source}
+    pending = [compile_fn.__globals__]
+    while pending:
+        for value in pending.pop().values():
+            module = sys.modules.get(getattr(value, "__module__", None) or "")
+            path = getattr(module, "__file__", None)
+            if not path:
+                continue
+            path = os.path.abspath(path)
+            if path not in paths and os.path.dirname(path) == directory:
+                paths.add(path)
+                pending.append(vars(module))
+    return tuple(sorted(paths))
+
+
+class CompileCache:
+    """
+    Two-tier (memory LRU + optional disk) cache of compiled Plutus scripts.
+    """
+
+    def __init__(self, maxsize=1024, disk_dir=None):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self._memory = OrderedDict()
+        self._fingerprint_stamp = None
+        self._fingerprint = b""
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _compiler_fingerprint(self, compile_fn):
+        """
+        Hashes the compiler source (and the sibling modules it uses) plus the
+        mapping files; recomputed only when their mtimes change.
+        """
+        registry = get_registry()
+        paths = _compiler_sources(compile_fn) + registry.paths
+        stamp = tuple(os.stat(path).st_mtime_ns for path in paths)
+        if stamp != self._fingerprint_stamp:
+            digest = hashlib.blake2b(digest_size=16)
+            for path in paths:
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            self._fingerprint = digest.digest()
+            self._fingerprint_stamp = stamp
+        return self._fingerprint
+
+    def key(self, ir_data, compile_fn):
+        """
+        Returns the cache key for an IR program compiled by `compile_fn`.
+
+        The function name is part of the salt, so compiler variants sharing a
+        module (such as the optimizing entry point) never share entries.
+        """
+        salt = self._compiler_fingerprint(compile_fn) + compile_fn.__qualname__.encode("utf-8")
+        return ir_digest(ir_data, salt=salt)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".plutus")
+
+    def get(self, key):
+        """
+        Returns the cached script for `key`, or None.
+        """
+        script = self._memory.get(key)
+        if script is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return script
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    script = f.read()
+            except OSError:
+                script = None
+            if script is not None:
+                self.disk_hits += 1
+                self._remember(key, script)
+                return script
+        self.misses += 1
+        return None
+
+    def _remember(self, key, script):
+        self._memory[key] = script
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, key, script):
+        """
+        Stores a compiled script in both tiers.
+        """
+        self._remember(key, script)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(script)
+            os.replace(tmp_path, path)
+
+    def get_or_compile(self, ir_data, compile_fn):
+        """
+        Returns the cached script for `ir_data`, compiling and storing it on a miss.
+        """
+        if not isinstance(ir_data, dict):
+            return compile_fn(ir_data)
+        key = self.key(ir_data, compile_fn)
+        script = self.get(key)
+        if script is None:
+            script = compile_fn(ir_data)
+            self.put(key, script)
+        return script
+
+    def clear(self):
+        """
+        Drops the in-memory tier. The disk tier is left in place.
+        """
+        self._memory.clear()
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the current memory tier size.
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._memory),
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
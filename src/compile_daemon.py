@@ -0,0 +1,312 @@
+"""
+Compile Daemon
+Long-running asyncio server that answers parse/validate/compile/reverse requests as JSON lines.
+
+Overview:
+- Requests arrive one JSON object per line on stdin (`--stdio`, the default)
+  or from any number of clients on a local Unix socket (`--socket PATH`);
+  each response is one JSON line carrying the request's `id`, so responses
+  to concurrent requests may arrive out of order.
+- CPU-bound work runs in a process pool whose workers are warmed once:
+  modules imported, mapping indexes and the IR validator loaded, and a
+  `compile_cache.CompileCache` kept per worker (optionally backed by a shared
+  `--cache-dir`). Workers discard stdout so debug output cannot corrupt the
+  protocol.
+- At most `max_pending` requests are admitted at a time; further lines are
+  not read until a slot frees up, which applies backpressure to clients.
+- Request lines longer than `max_request_bytes` (`--max-request-bytes`,
+  64 MiB by default) are discarded and answered with an error; the client
+  stays connected.
+
+Protocol:
+    {"id": 1, "op": "parse", "source": "LD X1\\nST Y1", "language": "ll"}
+    {"id": 2, "op": "validate", "ir": {...}}
+    {"id": 3, "op": "compile", "ir": {...}, "optimize": false}   (or "source"/"language")
+    {"id": 4, "op": "reverse", "plutus": "traceIfFalse ..."}
+    {"id": 5, "op": "ping"}  /  {"id": 6, "op": "stats"}
+Responses: {"id": 1, "ok": true, "result": ..., "timings": {"queue": s, "run": s, "total": s}}
+or {"id": 1, "ok": false, "error": "ValueError: ...", "timings": {...}}.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from src.compile_cache import CompileCache
+    from src.ll_parser import parse_ladder_ir
+    from src.mapping_registry import get_registry
+    from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+    from src.reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll
+    from src.st_parser import parse_structured_text
+    from src.validator_ir_transform import InvalidIRError, check_ir, get_validator, validate_ir
+except ImportError:  # Run as a script: python src/compile_daemon.py
+    from compile_cache import CompileCache
+    from ll_parser import parse_ladder_ir
+    from mapping_registry import get_registry
+    from plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+    from reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll
+    from st_parser import parse_structured_text
+    from validator_ir_transform import InvalidIRError, check_ir, get_validator, validate_ir
+
+PARSERS = {"ll": parse_ladder_ir, "st": parse_structured_text}
+# Longest request line accepted (a compile of a large program is several MB of JSON)
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+_worker_cache = None
+
+
+def _warm_worker(cache_dir):
+    """
+    Pool initializer: silences stdout and loads everything a request needs.
+    """
+    global _worker_cache
+    sys.stdout = open(os.devnull, "w")
+    get_registry().indexes
+    get_validator()
+    _worker_cache = CompileCache(disk_dir=cache_dir)
+
+
+def _request_ir(request):
+    if "ir" in request:
+        return request["ir"]
+    language = request.get("language", "ll")
+    if language not in PARSERS:
+        raise ValueError(f"Unknown language: {language!r}")
+    return PARSERS[language](request["source"])
+
+
+def _parse(request):
+    return _request_ir(request)
+
+
+def _validate(request):
+    issues = validate_ir(_request_ir(request))
+    return {"valid": not issues, "issues": [issue.to_dict() for issue in issues]}
+
+
+def _compile(request):
+    ir_data = _request_ir(request)
+    check_ir(ir_data)
+    return {"plutus": compile_ir_to_plutus_haskell_enhanced(
+        ir_data, cache=_worker_cache, optimize=bool(request.get("optimize"))
+    )}
+
+
+def _reverse(request):
+    return {"ll": reverse_compile_plutus_to_ll(request["plutus"])}
+
+
+HANDLERS = {"parse": _parse, "validate": _validate, "compile": _compile, "reverse": _reverse}
+
+
+def run_request(request):
+    """
+    Executes one request in a worker. Returns (response fields, run seconds).
+    """
+    start = time.perf_counter()
+    try:
+        response = {"ok": True, "result": HANDLERS[request["op"]](request)}
+    except InvalidIRError as e:
+        response = {"ok": False, "error": f"{type(e).__name__}: {e}", "issues": [issue.to_dict() for issue in e.issues]}
+    except Exception as e:  # A malformed request must still get an answer
+        response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return response, time.perf_counter() - start
+
+
+class CompileDaemon:
+    """
+    Dispatches JSON-lines requests from any number of streams to a warm worker pool.
+    """
+
+    def __init__(self, jobs=None, max_pending=None, cache_dir=None, max_request_bytes=MAX_REQUEST_BYTES):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_pending = max_pending or self.jobs * 4
+        self.max_request_bytes = max_request_bytes
+        self.cache_dir = cache_dir
+        self.executor = None
+        self.stats = {"requests": 0, "errors": 0, "clients": 0, "ops": {}}
+        self._slots = None
+        self._started = time.time()
+
+    async def start(self):
+        """
+        Starts the worker pool and waits until every worker is warm.
+        """
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=_warm_worker, initargs=(self.cache_dir,))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.jobs)))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    async def handle(self, request, received):
+        """
+        Answers one decoded request; `received` is its arrival time (perf_counter).
+        """
+        op = request.get("op") if isinstance(request, dict) else None
+        response = {"id": request.get("id") if isinstance(request, dict) else None}
+        run = 0.0
+        if not isinstance(op, str):
+            response.update(ok=False, error=f"Invalid op: {op!r}")
+            op = None
+        elif op == "ping":
+            response.update(ok=True, result="pong")
+        elif op == "stats":
+            response.update(ok=True, result=dict(self.stats, jobs=self.jobs, uptime=time.time() - self._started))
+        elif op in HANDLERS:
+            loop = asyncio.get_running_loop()
+            try:
+                fields, run = await loop.run_in_executor(self.executor, run_request, request)
+            except Exception as e:  # e.g. a request that cannot be pickled, or a broken pool
+                fields = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            response.update(fields)
+        else:
+            response.update(ok=False, error=f"Unknown op: {op!r}")
+        total = time.perf_counter() - received
+        response["timings"] = {"queue": max(total - run, 0.0), "run": run, "total": total}
+
+        self.stats["requests"] += 1
+        self.stats["errors"] += not response["ok"]
+        if op is not None:
+            self.stats["ops"][op] = self.stats["ops"].get(op, 0) + 1
+        return response
+
+    async def serve_stream(self, readline, write):
+        """
+        Serves one client: `readline` is a coroutine returning the next line
+        (b"" or "" at EOF) and `write` an async callable taking one response line.
+        """
+        self.stats["clients"] += 1
+        tasks = set()
+
+        async def respond(line, received):
+            try:
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"id": None, "ok": False, "error": f"Invalid JSON: {e}"}
+                else:
+                    response = await self.handle(request, received)
+                await write(json.dumps(response) + "\n")
+            finally:
+                self._slots.release()
+
+        while True:
+            try:
+                line = await readline()
+            except (ValueError, asyncio.LimitOverrunError) as e:  # Oversized line, already discarded
+                line = None
+                error = f"Request too large: {e}"
+            else:
+                if not line:
+                    break
+                error = f"Request too large: line exceeds {self.max_request_bytes} bytes"
+            if line is None or len(line) > self.max_request_bytes:
+                self.stats["requests"] += 1
+                self.stats["errors"] += 1
+                await write(json.dumps({"id": None, "ok": False, "error": error}) + "\n")
+                continue
+            if not line.strip():
+                continue
+            received = time.perf_counter()
+            await self._slots.acquire()
+            task = asyncio.ensure_future(respond(line, received))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def serve_stdio(self, stdin=None, stdout=None):
+        """
+        Serves requests from stdin until EOF.
+        """
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        loop = asyncio.get_running_loop()
+
+        async def readline():
+            return await loop.run_in_executor(None, stdin.readline)
+
+        async def write(text):
+            stdout.write(text)
+            stdout.flush()
+
+        await self.serve_stream(readline, write)
+
+    async def serve_unix(self, path):
+        """
+        Serves clients on a Unix socket until cancelled.
+        """
+        limit = self.max_request_bytes
+
+        async def client(reader, writer):
+            async def readline():
+                try:
+                    return await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:  # Last line without a newline, or EOF
+                    return e.partial
+                except asyncio.LimitOverrunError:
+                    pass
+                # Discard the rest of the oversized line so the next request starts cleanly
+                while True:
+                    try:
+                        await reader.readuntil(b"\n")
+                        break
+                    except asyncio.IncompleteReadError:
+                        break
+                    except asyncio.LimitOverrunError as e:
+                        await reader.readexactly(e.consumed)
+                raise ValueError(f"line exceeds {limit} bytes")
+
+            async def write(text):
+                writer.write(text.encode("utf-8"))
+                await writer.drain()
+            try:
+                await self.serve_stream(readline, write)
+            finally:
+                writer.close()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(client, path=path, limit=limit)
+        async with server:
+            await server.serve_forever()
+
+
+async def _main(args):
+    daemon = CompileDaemon(jobs=args.jobs, max_pending=args.max_pending, cache_dir=args.cache_dir,
+                           max_request_bytes=args.max_request_bytes)
+    await daemon.start()
+    try:
+        if args.socket:
+            print(f"Compile daemon listening on {args.socket}", file=sys.stderr)
+            await daemon.serve_unix(args.socket)
+        else:
+            await daemon.serve_stdio()
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve parse/validate/compile/reverse requests as JSON lines.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stdio", action="store_true", help="Read requests from stdin (default)")
+    mode.add_argument("--socket", default=None, help="Listen on this Unix socket path instead")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None, help="Requests admitted at once (default: 4 per worker)")
+    parser.add_argument("--cache-dir", default=None, help="Share compiled scripts across workers and runs via an on-disk cache")
+    parser.add_argument("--max-request-bytes", type=int, default=MAX_REQUEST_BYTES,
+                        help="Longest request line accepted (default: 64 MiB)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
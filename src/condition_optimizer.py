@@ -0,0 +1,563 @@
+"""
+Rung Condition Optimizer
+Minimizes rung conditions with a reduced ordered BDD before Plutus emission.
+
+Overview:
+- Each rung's accumulator logic (LD/AND/OR/XOR, their N forms, NOT, S/R/ST)
+  is evaluated symbolically into a hash-consed ROBDD over the rung's atoms
+  (tags, and comparisons such as `Level > 80`).
+- A rung requires its condition at every store together with the stored
+  coil (`ST Y` -> condition && Y, `STN`/`R` -> condition && not Y), which
+  matches the per-instruction conditions for plain contact chains.
+- Tautologies, duplicate rungs and rungs implied by another rung are dropped;
+  BDD nodes used by more than one condition become shared `let` bindings.
+- Rungs storing arithmetic results or using instructions outside that subset
+  keep the compiler's per-instruction conditions.
+- The result is not equivalent to the unoptimized validator: that one joins
+  every instruction's operands with `&&` (an `OR` contact is required to hold
+  too), while optimized rungs use real OR/XOR/NOT, so the two validators
+  accept different transactions.
+- Implied rungs are found among at most `MAX_IMPLICATION_CANDIDATES` rungs
+  per rung, so the check stays linear in program size.
+- `OptimizedConditions.report` gives the size before and after.
+- `optimize_programs` runs several programs over one BDD so that rungs and
+  subterms they have in common are bound once (see `validator_bundle`).
+"""
+
+import json
+import random
+import sys
+
+try:
+    from src.ir_cfg import build_cfg, is_control
+    from src.ll_parser import rung_starts
+    from src.scan_semantics import parse_literal
+except ImportError:  # Run as a script from inside src/
+    from ir_cfg import build_cfg, is_control
+    from ll_parser import rung_starts
+    from scan_semantics import parse_literal
+
+FALSE = 0
+TRUE = 1
+
+LOADS = frozenset(["INPUT", "LD", "LDN"])
+COMBINERS = frozenset(["AND", "ANDN", "OR", "ORN", "XOR", "XORN"])
+STORES = frozenset(["OUTPUT", "ST", "STN", "S", "R"])
+COMPARISONS = {"GT": ">", "GE": ">=", "EQ": "==", "NE": "/=", "LE": "<=", "LT": "<"}
+ARITHMETIC = {"ADD": "+", "SUB": "-", "MUL": "*", "DIV": "`div`", "MOD": "`mod`"}
+# Rungs tried as the implying side for each rung (keeps the check linear in program size)
+MAX_IMPLICATION_CANDIDATES = 64
+
+
+class BDD:
+    """
+    Reduced ordered BDD with a unique table (hash-consing) and a memoized ITE.
+
+    Nodes are integers; 0 and 1 are the terminals. Variables are ordered by
+    first use.
+    """
+
+    def __init__(self):
+        self.nodes = [(None, None, None), (None, None, None)]
+        self.unique = {}
+        self.names = []
+        self.ids = {}
+        self._ite_cache = {}
+
+    def var(self, name):
+        index = self.ids.get(name)
+        if index is None:
+            index = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.mk(index, FALSE, TRUE)
+
+    def mk(self, index, low, high):
+        if low == high:
+            return low
+        key = (index, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = self.unique[key] = len(self.nodes)
+            self.nodes.append(key)
+        return node
+
+    def ite(self, f, g, h):
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        key = (f, g, h)
+        result = self._ite_cache.get(key)
+        if result is not None:
+            return result
+        nodes = self.nodes
+        top = min(nodes[n][0] for n in (f, g, h) if n > TRUE)
+        f0, f1 = self._cofactors(f, top)
+        g0, g1 = self._cofactors(g, top)
+        h0, h1 = self._cofactors(h, top)
+        result = self.mk(top, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self._ite_cache[key] = result
+        return result
+
+    def _cofactors(self, node, index):
+        if node <= TRUE:
+            return node, node
+        var, low, high = self.nodes[node]
+        return (low, high) if var == index else (node, node)
+
+    def neg(self, f):
+        return self.ite(f, FALSE, TRUE)
+
+    def conj(self, f, g):
+        return self.ite(f, g, FALSE)
+
+    def disj(self, f, g):
+        return self.ite(f, TRUE, g)
+
+    def xor(self, f, g):
+        return self.ite(f, self.neg(g), g)
+
+    def implies(self, f, g, _memo=None):
+        """
+        Returns True when f -> g, without building any nodes.
+        """
+        if f == FALSE or g == TRUE or f == g:
+            return True
+        if f == TRUE or g == FALSE:
+            return False
+        memo = {} if _memo is None else _memo
+        key = (f, g)
+        result = memo.get(key)
+        if result is None:
+            top = min(self.nodes[f][0], self.nodes[g][0])
+            f0, f1 = self._cofactors(f, top)
+            g0, g1 = self._cofactors(g, top)
+            result = memo[key] = self.implies(f0, g0, memo) and self.implies(f1, g1, memo)
+        return result
+
+    def signatures(self, width=256, seed=0):
+        """
+        Evaluates every node under `width` random assignments at once, as bit
+        masks; f -> g is impossible unless `sig[f] & ~sig[g] == 0`.
+        """
+        rng = random.Random(seed)
+        full = (1 << width) - 1
+        assignments = [rng.getrandbits(width) for _ in self.names]
+        signature = [0, full]
+        # Children are always created before their parents
+        for var, low, high in self.nodes[2:]:
+            bits = assignments[var]
+            signature.append((bits & signature[high]) | (~bits & full & signature[low]))
+        return signature
+
+    def forced_literals(self):
+        """
+        Returns, per node, the (variable, value) pairs every satisfying
+        assignment shares; f -> g is impossible unless `forced[g] <= forced[f]`.
+        FALSE forces everything and is given None.
+        """
+        forced = [None, frozenset()]
+        for var, low, high in self.nodes[2:]:
+            if low == FALSE:
+                forced.append(forced[high] | {(var, True)})
+            elif high == FALSE:
+                forced.append(forced[low] | {(var, False)})
+            else:
+                forced.append(forced[low] & forced[high])
+        return forced
+
+
+class _Unsupported(Exception):
+    pass
+
+
+class OptimizedConditions:
+    """
+    Emission-ready conditions: `conditions` are `traceIfFalse` terms for the
+    validator body and `bindings` are (name, expression) pairs for its `let`.
+    """
+
+    def __init__(self, conditions, bindings, report):
+        self.conditions = conditions
+        self.bindings = bindings
+        self.report = report
+
+
+def _atom(text):
+    return f"({text})" if " " in text else text
+
+
+class _RungEvaluator:
+    """
+    Symbolic accumulator for one rung. The accumulator is either a BDD node or,
+    before any boolean operation, a value expression ("value", text, numeric).
+    """
+
+    def __init__(self, bdd):
+        self.bdd = bdd
+        self.acc = None
+        self.requirement = TRUE
+        self.pending = False
+
+    def _operand(self, arg):
+        literal = parse_literal(arg)
+        if literal is not None:
+            return TRUE if literal else FALSE
+        return self.bdd.var(arg)
+
+    def _boolean(self):
+        acc = self.acc
+        if acc is None:
+            return None
+        if isinstance(acc, tuple):
+            if acc[2]:
+                raise _Unsupported()
+            return self._operand(acc[1])
+        return acc
+
+    def step(self, instruction_type, args):
+        bdd = self.bdd
+        if instruction_type in LOADS:
+            if instruction_type != "LDN" and len(args) == 1:
+                self.acc = ("value", args[0], False)
+            else:
+                node = TRUE
+                for arg in args:
+                    node = bdd.conj(node, self._operand(arg))
+                self.acc = bdd.neg(node) if instruction_type == "LDN" else node
+            self.pending = True
+
+        elif instruction_type in COMBINERS:
+            base = instruction_type.rstrip("N") if instruction_type != "ORN" else "OR"
+            negate = instruction_type.endswith("N")
+            acc = self._boolean()
+            for arg in args:
+                operand = self._operand(arg)
+                if negate:
+                    operand = bdd.neg(operand)
+                if acc is None:
+                    acc = operand
+                elif base == "AND":
+                    acc = bdd.conj(acc, operand)
+                elif base == "OR":
+                    acc = bdd.disj(acc, operand)
+                else:
+                    acc = bdd.xor(acc, operand)
+            self.acc = acc
+            self.pending = True
+
+        elif instruction_type == "NOT":
+            acc = self._boolean()
+            if acc is None:
+                raise _Unsupported()
+            for arg in args:
+                acc = bdd.conj(acc, bdd.neg(self._operand(arg)))
+            self.acc = acc if args else bdd.neg(acc)
+            self.pending = True
+
+        elif instruction_type in COMPARISONS or instruction_type in ARITHMETIC:
+            acc = self.acc
+            if not isinstance(acc, tuple) or len(args) != 1:
+                raise _Unsupported()
+            if instruction_type in COMPARISONS:
+                self.acc = bdd.var(f"{_atom(acc[1])} {COMPARISONS[instruction_type]} {args[0]}")
+            else:
+                self.acc = ("value", f"{_atom(acc[1])} {ARITHMETIC[instruction_type]} {args[0]}", True)
+            self.pending = True
+
+        elif instruction_type in STORES:
+            acc = self.acc
+            for target in args:
+                if isinstance(acc, tuple) and acc[2]:
+                    term = bdd.var(f"{target} == {_atom(acc[1])}")
+                else:
+                    condition = self._boolean()
+                    if condition is None:
+                        raise _Unsupported()
+                    coil = bdd.var(target)
+                    if instruction_type in ("STN", "R"):
+                        coil = bdd.neg(coil)
+                    term = bdd.conj(condition, coil)
+                self.requirement = bdd.conj(self.requirement, term)
+            self.pending = False
+
+        else:
+            raise _Unsupported()
+
+    def finish(self):
+        if self.pending:
+            acc = self._boolean()
+            if acc is not None:
+                self.requirement = self.bdd.conj(self.requirement, acc)
+        return self.requirement
+
+
+def _fallback_condition(index, instr):
+    inst_type = instr["type"].lower()
+    args = " && ".join(instr["args"])
+    return f'traceIfFalse "Condition {index} failed: {inst_type}" ({args})'
+
+
+def _literal_node(bdd, node):
+    _, low, high = bdd.nodes[node]
+    return low <= TRUE and high <= TRUE
+
+
+class _Emitter:
+    """
+    Turns BDD roots into Haskell expressions, naming nodes shared between conditions.
+    """
+
+    def __init__(self, bdd, roots):
+        self.bdd = bdd
+        self.names = {}
+        self.bindings = []
+        self._expressions = {}
+        parents = {}
+        # A root listed more than once (used by several programs) counts as shared
+        for root in roots:
+            parents[root] = parents.get(root, 0) + 1
+        stack = list(dict.fromkeys(roots))
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node <= TRUE or node in seen:
+                continue
+            seen.add(node)
+            _, low, high = bdd.nodes[node]
+            for child in {low, high}:
+                if child > TRUE:
+                    parents[child] = parents.get(child, 0) + 1
+                    stack.append(child)
+        self._shared = {
+            node for node, count in parents.items()
+            if count > 1 and not _literal_node(bdd, node)
+        }
+
+    def reference(self, node):
+        """
+        Returns a name or parenthesized expression usable as an operand.
+        """
+        if node in self._shared:
+            name = self.names.get(node)
+            if name is None:
+                expression = self.expression(node)
+                name = self.names[node] = f"shared{len(self.bindings)}"
+                self.bindings.append((name, expression))
+            return name
+        expression = self.expression(node)
+        if node <= TRUE or _literal_node(self.bdd, node):
+            return expression
+        return f"({expression})"
+
+    def expression(self, node):
+        if node == TRUE:
+            return "True"
+        if node == FALSE:
+            return "False"
+        cached = self._expressions.get(node)
+        if cached is not None:
+            return cached
+        var, low, high = self.bdd.nodes[node]
+        atom = _atom(self.bdd.names[var])
+        if low == FALSE and high == TRUE:
+            expression = atom
+        elif low == TRUE and high == FALSE:
+            expression = f"not {atom}"
+        elif low == FALSE:
+            expression = f"{atom} && {self.reference(high)}"
+        elif high == FALSE:
+            expression = f"not {atom} && {self.reference(low)}"
+        elif high == TRUE:
+            expression = f"{atom} || {self.reference(low)}"
+        elif low == TRUE:
+            expression = f"not {atom} || {self.reference(high)}"
+        elif self.bdd.neg(low) == high:
+            expression = f"{atom} /= {self.reference(low)}"
+        else:
+            expression = f"({atom} && {self.reference(high)}) || (not {atom} && {self.reference(low)})"
+        self._expressions[node] = expression
+        return expression
+
+    def root(self, node):
+        """
+        Returns the top-level expression of a condition.
+        """
+        return self.names.get(node) or (self.reference(node) if node in self._shared else self.expression(node))
+
+
+def _count_terms(expression):
+    """
+    Counts atom occurrences (tags and literals) in an emitted expression.
+    """
+    return sum(1 for token in expression.replace("(", " ").replace(")", " ").split()
+               if token not in ("&&", "||", "not", "/=", "True", "False"))
+
+
+class RungAnalysis:
+    """
+    One program's rungs as BDD roots, before emission. `entries` holds
+    (rung, root) for optimized rungs and (rung, [conditions]) for fallbacks,
+    in program order; `implied` holds the roots implied by another rung.
+    """
+    __slots__ = ("entries", "fallbacks", "implied", "report")
+
+    def __init__(self, entries, fallbacks, implied, report):
+        self.entries = entries
+        self.fallbacks = fallbacks
+        self.implied = implied
+        self.report = report
+
+    def kept(self):
+        return [value for _, value in self.entries if isinstance(value, int) and value not in self.implied]
+
+    def conditions(self, emitter):
+        """
+        Returns the program's `traceIfFalse` conditions and their atom count.
+        """
+        conditions = []
+        terms = 0
+        for rung, value in self.entries:
+            if isinstance(value, list):
+                conditions.extend(value)
+                terms += sum(len(instr["args"]) for _, instr in self.fallbacks[rung])
+            elif value not in self.implied:
+                expression = emitter.root(value)
+                terms += _count_terms(expression)
+                conditions.append(f'traceIfFalse "Rung {rung} failed" ({expression})')
+        return conditions, terms
+
+
+def analyze_rungs(instructions, bdd):
+    """
+    Evaluates the rungs of `instructions`, a list of (index, instruction)
+    pairs, into roots of `bdd` and drops tautologies, duplicates and implied rungs.
+    """
+    types = [instr["type"].upper() for _, instr in instructions]
+    starts = rung_starts(types) + [len(instructions)]
+    report = {
+        "rungs": len(starts) - 1, "optimized_rungs": 0, "fallback_rungs": 0,
+        "tautologies": 0, "duplicates": 0, "implied": 0, "shared_subterms": 0,
+        "conditions_before": 2 * len(instructions), "conditions_after": 0,
+        "terms_before": 2 * sum(len(instr["args"]) for _, instr in instructions), "terms_after": 0,
+        "bdd_nodes": 0, "unsatisfiable": False,
+    }
+
+    entries = []
+    fallbacks = {}
+    seen_roots = set()
+    for rung in range(len(starts) - 1):
+        members = instructions[starts[rung]:starts[rung + 1]]
+        evaluator = _RungEvaluator(bdd)
+        # Ordering a rung's coils before its contacts keeps `coil && (...)` compact
+        for _, instr in members:
+            if instr["type"].upper() in STORES:
+                for target in instr["args"]:
+                    if parse_literal(target) is None:
+                        bdd.var(target)
+        try:
+            for _, instr in members:
+                evaluator.step(instr["type"].upper(), instr["args"])
+            root = evaluator.finish()
+        except _Unsupported:
+            report["fallback_rungs"] += 1
+            fallbacks[rung] = members
+            entries.append((rung, [_fallback_condition(index, instr) for index, instr in members]))
+            continue
+        report["optimized_rungs"] += 1
+        if root == TRUE:
+            report["tautologies"] += 1
+        elif root in seen_roots:
+            report["duplicates"] += 1
+        else:
+            seen_roots.add(root)
+            entries.append((rung, root))
+
+    # A rung implied by another rung adds nothing to the conjunction. Only
+    # rungs that force every literal it forces (usually the same coil) and
+    # hold under no more random assignments can imply it; of those, the
+    # MAX_IMPLICATION_CANDIDATES lightest (the most restrictive, so the likeliest
+    # to imply) get the signature filter and then the exact check.
+    roots = [entry[1] for entry in entries if isinstance(entry[1], int)]
+    signature = bdd.signatures()
+    forced = bdd.forced_literals()
+    weight = {root: bin(signature[root]).count("1") for root in roots}
+    ordered = sorted(roots, key=weight.get)
+    forcing = {}
+    for root in ordered:
+        for literal in forced[root] or ():
+            forcing.setdefault(literal, []).append(root)
+    memo = {}
+    implied = set()
+    for root in roots:
+        if root != FALSE and FALSE in seen_roots:
+            implied.add(root)  # An unsatisfiable rung implies every other one
+            continue
+        inverse = ~signature[root]
+        bucket = min((forcing[literal] for literal in forced[root] or ()), key=len, default=ordered)
+        for other in bucket[:MAX_IMPLICATION_CANDIDATES + 1]:
+            if weight[other] > weight[root]:
+                break
+            if (other != root and other not in implied and not signature[other] & inverse
+                    and bdd.implies(other, root, memo)):
+                implied.add(root)
+                break
+    report["implied"] = len(implied)
+    if FALSE in seen_roots:
+        report["unsatisfiable"] = True
+    return RungAnalysis(entries, fallbacks, implied, report)
+
+
+def optimize_conditions(instructions):
+    """
+    Optimizes the conditions of `instructions`, a list of (index, instruction)
+    pairs (typically the compiler's live, non-control instructions).
+    """
+    bdd = BDD()
+    analysis = analyze_rungs(instructions, bdd)
+    emitter = _Emitter(bdd, analysis.kept())
+    conditions, terms = analysis.conditions(emitter)
+
+    report = analysis.report
+    report["shared_subterms"] = len(emitter.bindings)
+    report["conditions_after"] = len(conditions)
+    report["terms_after"] = terms + sum(_count_terms(expression) for _, expression in emitter.bindings)
+    report["bdd_nodes"] = len(bdd.nodes) - 2
+    return OptimizedConditions(conditions, emitter.bindings, report)
+
+
+def optimize_programs(programs):
+    """
+    Optimizes several programs (lists of (index, instruction) pairs) over one
+    BDD, so rungs and subterms that are structurally identical across programs
+    become the same nodes. Returns the per-program condition lists and the
+    bindings they share; a node is bound when more than one rung uses it.
+    """
+    bdd = BDD()
+    analyses = [analyze_rungs(instructions, bdd) for instructions in programs]
+    emitter = _Emitter(bdd, [root for analysis in analyses for root in analysis.kept()])
+    conditions = [analysis.conditions(emitter)[0] for analysis in analyses]
+    return conditions, emitter.bindings
+
+
+def optimize_ir(ir_data):
+    """
+    Runs the optimizer over the live, non-control instructions of an IR dict.
+    """
+    live = [
+        (index, instr) for index, instr in build_cfg(ir_data.get("instructions", [])).live_instructions()
+        if not is_control(instr["type"])
+    ]
+    return optimize_conditions(live)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python src/condition_optimizer.py program.ir")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        print(json.dumps(optimize_ir(json.load(f)).report, indent=2))
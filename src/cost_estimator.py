@@ -0,0 +1,333 @@
+"""
+Validator Cost Estimator
+Static, offline estimate of script size and worst-case execution units for generated validators.
+
+Overview:
+- Reads the Haskell emitted by `plutusladder_compiler` and prices every
+  `traceIfFalse` condition, `mustValidateIn` constraint and `let` binding
+  from a cost-model table (CPU steps, memory units and script bytes per
+  term kind). The defaults approximate the Plutus V2 builtin costs; a JSON
+  file can override any entry.
+- Worst case is a successful validation: the condition chain only short
+  circuits on failure, so every term of every condition is charged.
+- Costs are broken down per rung (using the IR for condition indexes), with
+  timer, counter and time-constraint checks reported separately.
+- `check_budget` raises `BudgetExceededError` when an estimate exceeds a
+  budget; the CLI exits 1 so CI can catch budget blowups before a build.
+"""
+
+import argparse
+import copy
+import json
+import re
+import sys
+
+try:
+    from src.ir_cfg import build_cfg, is_control
+    from src.ll_parser import rung_starts
+    from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+except ImportError:  # Run as a script from inside src/
+    from ir_cfg import build_cfg, is_control
+    from ll_parser import rung_starts
+    from plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+RESOURCES = ("cpu", "mem", "bytes")
+
+# Per-occurrence cost of each term kind
+DEFAULT_COST_MODEL = {
+    "script": {"cpu": 4000000, "mem": 12000, "bytes": 620},       # validator wrapper, context decoding
+    "condition": {"cpu": 1150000, "mem": 3300, "bytes": 22},      # traceIfFalse + ifThenElse
+    "message_byte": {"cpu": 0, "mem": 0, "bytes": 1},             # trace message text
+    "variable": {"cpu": 920000, "mem": 2600, "bytes": 9},         # tag lookup in the datum
+    "binding": {"cpu": 16000, "mem": 100, "bytes": 2},            # reference to a `let` binding
+    "literal": {"cpu": 16000, "mem": 100, "bytes": 3},
+    "boolean": {"cpu": 230000, "mem": 900, "bytes": 4},           # && / || / /= on Bool
+    "not": {"cpu": 180000, "mem": 700, "bytes": 3},
+    "comparison": {"cpu": 510000, "mem": 1100, "bytes": 5},
+    "arithmetic": {"cpu": 560000, "mem": 1300, "bytes": 5},
+    "validity_interval": {"cpu": 3200000, "mem": 9800, "bytes": 96},  # mustValidateIn over txInfoValidRange
+    "let": {"cpu": 32000, "mem": 200, "bytes": 4},                # one `let` binding
+}
+
+# Cardano per-transaction limits (mainnet protocol parameters)
+DEFAULT_BUDGET = {"cpu": 10000000000, "mem": 14000000, "bytes": 16384}
+
+# Numbers (decimal, exponent, based), names (including `%IX0.1` addresses and
+# `T#5S` literals), then any other run of characters, priced as a variable
+TOKEN = re.compile(
+    r"\s*(`div`|`mod`|&&|\|\||/=|==|>=|<=|[<>+*-]|[()]"
+    r"|\d+(?:#\w+|(?:\.\d+)?(?:[eE][+-]?\d+)?)"
+    r"|[%A-Za-z_][\w.'#%]*"
+    r"|[^\s()][^\s()&|<>=+*/-]*)"
+)
+CONDITION = re.compile(r'traceIfFalse "([^"]*)" \((.*)\)')
+CONDITION_INDEX = re.compile(r"Condition (\d+) failed")
+RUNG_INDEX = re.compile(r"Rung (\d+) failed")
+BINDING = re.compile(r"^\s+([a-z]\w*) = (.*)$")
+TOKEN_KINDS = {
+    "&&": "boolean", "||": "boolean", "/=": "boolean", "not": "not",
+    "==": "comparison", ">=": "comparison", "<=": "comparison", ">": "comparison", "<": "comparison",
+    "+": "arithmetic", "-": "arithmetic", "*": "arithmetic", "`div`": "arithmetic", "`mod`": "arithmetic",
+    "True": "literal", "False": "literal", "(": None, ")": None,
+}
+
+
+class BudgetExceededError(ValueError):
+    """
+    Raised when an estimate exceeds its budget; `violations` maps resource to (estimate, limit).
+    """
+
+    def __init__(self, violations):
+        self.violations = violations
+        details = ", ".join(f"{resource} {used:,} > {limit:,}" for resource, (used, limit) in violations.items())
+        super().__init__(f"Validator budget exceeded: {details}")
+
+
+def load_cost_model(path=None):
+    """
+    Returns the default cost model, with entries from the JSON file at `path` merged over it.
+    """
+    model = copy.deepcopy(DEFAULT_COST_MODEL)
+    if path is None:
+        return model
+    with open(path, "r", encoding="utf-8") as f:
+        overrides = json.load(f)
+    for kind, costs in overrides.items():
+        if kind not in model:
+            raise ValueError(f"Unknown cost model entry: {kind}")
+        for resource, value in costs.items():
+            if resource not in RESOURCES:
+                raise ValueError(f"Unknown resource in cost model entry {kind}: {resource}")
+            model[kind][resource] = int(value)
+    return model
+
+
+def _zero():
+    return dict.fromkeys(RESOURCES, 0)
+
+
+def _charge(total, costs, times=1):
+    for resource in RESOURCES:
+        total[resource] += costs.get(resource, 0) * times
+
+
+class CostEstimate:
+    """
+    Itemized estimate. `items` holds one dict per priced line (kind, group,
+    label, cpu, mem, bytes); `totals` and `groups` aggregate them.
+    """
+
+    def __init__(self, items, source_bytes):
+        self.items = items
+        self.source_bytes = source_bytes
+        self.totals = _zero()
+        self.groups = {}
+        for item in items:
+            group = self.groups.setdefault(item["group"], dict(_zero(), items=0))
+            group["items"] += 1
+            for resource in RESOURCES:
+                self.totals[resource] += item[resource]
+                group[resource] += item[resource]
+
+    def violations(self, budget):
+        """
+        Returns {resource: (estimate, limit)} for every resource over `budget`.
+        """
+        return {
+            resource: (self.totals[resource], limit)
+            for resource, limit in budget.items() if limit is not None and self.totals[resource] > limit
+        }
+
+    def to_dict(self):
+        return {"totals": self.totals, "groups": self.groups, "items": self.items, "source_bytes": self.source_bytes}
+
+    def format_table(self, budget=None):
+        """
+        Returns a plain-text report with one row per rung or check group.
+        """
+        rows = [f"{'Group':<16} {'Items':>6} {'CPU':>16} {'Mem':>12} {'Bytes':>8}"]
+        for name, group in self.groups.items():
+            rows.append(f"{name:<16} {group['items']:>6} {group['cpu']:>16,} {group['mem']:>12,} {group['bytes']:>8,}")
+        totals = self.totals
+        rows.append(f"{'total':<16} {len(self.items):>6} {totals['cpu']:>16,} {totals['mem']:>12,} {totals['bytes']:>8,}")
+        if budget:
+            rows.append(
+                f"{'budget':<16} {'':>6} {budget.get('cpu') or 0:>16,} {budget.get('mem') or 0:>12,} "
+                f"{budget.get('bytes') or 0:>8,}"
+            )
+        return "\n".join(rows)
+
+
+def _rung_lookup(ir_data):
+    """
+    Maps original instruction indexes to rung numbers, counted over live
+    non-control instructions as `condition_optimizer` numbers them.
+    """
+    if not ir_data:
+        return {}
+    live = [
+        index for index, instr in build_cfg(ir_data.get("instructions", [])).live_instructions()
+        if not is_control(instr["type"])
+    ]
+    instructions = ir_data["instructions"]
+    starts = rung_starts([instructions[index]["type"] for index in live])
+    lookup = {}
+    rung = -1
+    boundaries = set(starts)
+    for position, index in enumerate(live):
+        if position in boundaries:
+            rung += 1
+        lookup[index] = max(rung, 0)
+    return lookup
+
+
+def _price_expression(expression, model, bindings, total):
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN.match(expression, position)
+        if match is None:
+            raise ValueError(f"Cannot price expression term at: {expression[position:]!r}")
+        position = match.end()
+        token = match.group(1)
+        kind = TOKEN_KINDS.get(token, "missing")
+        if kind == "missing":
+            if token[0].isdigit() or "#" in token:
+                kind = "literal"
+            elif token in bindings:
+                kind = "binding"
+            else:
+                kind = "variable"
+        if kind is not None:
+            _charge(total, model[kind])
+
+
+def estimate_script(haskell, ir_data=None, cost_model=None):
+    """
+    Estimates the cost of a generated validator. Pass the IR it was compiled
+    from to attribute `Condition i` lines to rungs.
+    """
+    model = cost_model or DEFAULT_COST_MODEL
+    rung_of = _rung_lookup(ir_data)
+    items = []
+
+    script = _zero()
+    _charge(script, model["script"])
+    items.append(dict(script, kind="script", group="overhead", label="validator wrapper"))
+
+    lines = haskell.splitlines()
+    bindings = {}
+    in_let = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("let txInfo"):
+            in_let = True
+            continue
+        if in_let:
+            match = BINDING.match(line)
+            if match and not stripped.startswith("in "):
+                bindings[match.group(1)] = match.group(2)
+                continue
+            in_let = False
+
+    for name, expression in bindings.items():
+        cost = _zero()
+        _charge(cost, model["let"])
+        _price_expression(expression, model, bindings, cost)
+        items.append(dict(cost, kind="binding", group="bindings", label=name))
+
+    # Generated scripts repeat each instruction condition as a top-level trace
+    # line; only the copy in the validator body (after `in`) is evaluated
+    has_body = any(line.strip().startswith("in ") for line in lines)
+    in_body = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("--"):
+            continue
+        if stripped.startswith("in "):
+            in_body = True
+        if "mustValidateIn" in stripped:
+            code, _, comment = stripped.partition("--")
+            cost = _zero()
+            _charge(cost, model["validity_interval"])
+            is_timer = "Timer" in comment
+            items.append(dict(cost, kind="timer" if is_timer else "time_constraint",
+                              group="timers" if is_timer else "time", label=code.strip()))
+            continue
+        match = CONDITION.search(stripped.rstrip(" &"))
+        if not match:
+            continue
+        message, expression = match.groups()
+        is_check = message.startswith("Timer") or message.startswith("Counter")
+        if has_body and not in_body and not is_check:
+            continue
+        cost = _zero()
+        _charge(cost, model["condition"])
+        _charge(cost, model["message_byte"], len(message))
+        _price_expression(expression, model, bindings, cost)
+        if message.startswith("Timer"):
+            kind, group = "timer", "timers"
+        elif message.startswith("Counter"):
+            kind, group = "counter", "counters"
+        else:
+            kind, group = "condition", "conditions"
+            index = CONDITION_INDEX.match(message)
+            rung = RUNG_INDEX.match(message)
+            if rung:
+                group = f"rung {rung.group(1)}"
+            elif index and int(index.group(1)) in rung_of:
+                group = f"rung {rung_of[int(index.group(1))]}"
+        items.append(dict(cost, kind=kind, group=group, label=message))
+
+    return CostEstimate(items, len(haskell.encode("utf-8")))
+
+
+def estimate_ir(ir_data, cost_model=None, optimize=False):
+    """
+    Compiles an IR dict and estimates the resulting validator.
+    """
+    haskell = compile_ir_to_plutus_haskell_enhanced(ir_data, optimize=optimize)
+    return estimate_script(haskell, ir_data, cost_model)
+
+
+def check_budget(estimate, budget=None):
+    """
+    Raises BudgetExceededError if `estimate` exceeds `budget` (default: the per-transaction limits).
+    """
+    violations = estimate.violations(budget or DEFAULT_BUDGET)
+    if violations:
+        raise BudgetExceededError(violations)
+    return estimate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate script size and execution units of a compiled IR program.")
+    parser.add_argument("program", help="IR file (.ir/.json), or a generated .plutus/.hs script")
+    parser.add_argument("--ir", default=None, help="IR the script was compiled from (for per-rung attribution)")
+    parser.add_argument("--cost-model", default=None, help="JSON file overriding cost-model entries")
+    parser.add_argument("--optimize", action="store_true", help="Compile with the condition optimizer")
+    parser.add_argument("--max-cpu", type=int, default=DEFAULT_BUDGET["cpu"], help="CPU step budget")
+    parser.add_argument("--max-mem", type=int, default=DEFAULT_BUDGET["mem"], help="Memory unit budget")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_BUDGET["bytes"], help="Script size budget")
+    parser.add_argument("--json", action="store_true", help="Print the full itemized estimate as JSON")
+    args = parser.parse_args()
+
+    model = load_cost_model(args.cost_model)
+    budget = {"cpu": args.max_cpu, "mem": args.max_mem, "bytes": args.max_bytes}
+    if args.program.endswith((".plutus", ".hs")):
+        ir_data = None
+        if args.ir:
+            with open(args.ir, "r", encoding="utf-8") as f:
+                ir_data = json.load(f)
+        with open(args.program, "r", encoding="utf-8") as f:
+            estimate = estimate_script(f.read(), ir_data, model)
+    else:
+        with open(args.program, "r", encoding="utf-8") as f:
+            estimate = estimate_ir(json.load(f), model, optimize=args.optimize)
+
+    print(json.dumps(estimate.to_dict(), indent=2) if args.json else estimate.format_table(budget))
+    try:
+        check_budget(estimate, budget)
+    except BudgetExceededError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,524 @@
+"""
+Event-Driven Simulator
+Runs a LadderCore IR program scan by scan, re-evaluating only the rungs whose inputs changed.
+
+Overview:
+- The lowered program (see `scan_semantics`) is cut into units: one per rung,
+  plus one per jump region (the blocks a jump can skip or repeat, merged when
+  they overlap), then the timers and the counters. Units run in scan order,
+  which is a topological order of the rung graph: a change feeds units later
+  in the scan at once and earlier units (feedback edges) on the next scan.
+- A tag → dependent-unit index (readers and other writers of each tag)
+  decides what a change schedules. The accumulator handed from one rung to
+  the next is a hidden tag of its own, so rungs that do not start with a
+  load depend on their predecessor like on any other input.
+- Rungs are generated as straight-line Python with `fast_interpreter`'s
+  emitter and report which of their outputs changed.
+- Running timers are not polled: a timer sleeps until the scan in which its
+  output flips and its elapsed time is caught up when it wakes or is read.
+  Timers whose `.ET` the program reads still run every scan while timing.
+- Counters only run in scans in which their count or reset input changed.
+- Results match `FastInterpreter` scan for scan. Write inputs with
+  `sim[tag] = value`; poking `values` directly bypasses change tracking.
+  Subroutine calls and returns are rejected (use `fast_interpreter`).
+"""
+
+import heapq
+import json
+import sys
+import time
+from bisect import bisect_right
+
+try:
+    from src.fast_interpreter import MAX_BLOCK_STEPS, _SourceBuilder, _div, _emit_block, _emit_ops, _mod
+    from src.scan_semantics import LOAD, LOAD_NOT, LoweredBlock, lower_program
+except ImportError:  # Run as a script from inside src/
+    from fast_interpreter import MAX_BLOCK_STEPS, _SourceBuilder, _div, _emit_block, _emit_ops, _mod
+    from scan_semantics import LOAD, LOAD_NOT, LoweredBlock, lower_program
+
+JUMP_TERMINATORS = frozenset(["JMP", "JMPC", "JMPCN"])
+
+
+class _RungUnit:
+    """
+    A rung or jump region, run by generated code that returns the slots it changed.
+    """
+    __slots__ = ("name", "position", "reads", "writes", "run")
+
+    def __init__(self, name, reads, writes):
+        self.name = name
+        self.position = None
+        self.reads = reads
+        self.writes = writes
+        self.run = None
+
+
+class _TimerUnit:
+    """
+    One TON/TOF/TP timer. While `sleeping` its ET slot lags behind and is
+    caught up from `last`, the scan of its last evaluation.
+    """
+    __slots__ = ("name", "position", "reads", "writes", "timer", "dt", "observed",
+                 "running", "previous", "sleeping", "last", "wake_at")
+
+    def __init__(self, timer, dt):
+        self.name = f"timer {timer.name}"
+        self.position = None
+        self.timer = timer
+        self.dt = dt
+        self.reads = frozenset([timer.in_slot, timer.q_slot, timer.et_slot])
+        self.writes = (timer.q_slot, timer.et_slot)
+        self.observed = False
+        self.reset()
+
+    def reset(self):
+        self.running = False
+        self.previous = False
+        self.sleeping = False
+        self.last = 0
+        self.wake_at = None
+
+    def elapsed(self, values, scans):
+        """
+        Returns the ET value after `scans` scans, catching up a sleeping timer.
+        """
+        timer = self.timer
+        et = values[timer.et_slot]
+        if self.sleeping and scans > self.last:
+            et = min(et + (scans - self.last) * self.dt, timer.preset_ms)
+        return et
+
+
+class _CounterUnit:
+    """
+    One CTU/CTD counter.
+    """
+    __slots__ = ("name", "position", "reads", "writes", "counter", "previous")
+
+    def __init__(self, counter):
+        self.name = f"counter {counter.name}"
+        self.position = None
+        self.counter = counter
+        self.reads = frozenset([counter.count_slot, counter.reset_slot, counter.q_slot, counter.cv_slot])
+        self.writes = (counter.q_slot, counter.cv_slot)
+        self.previous = False
+
+
+def _first_op_loads(ops):
+    return bool(ops) and ops[0].op in (LOAD, LOAD_NOT)
+
+
+def _dedupe(slots):
+    return tuple(dict.fromkeys(slots))
+
+
+def _regions(blocks):
+    """
+    Returns merged [lo, hi] block ranges that jumps can skip or repeat, with the jump targets inside each.
+    """
+    last = len(blocks) - 1
+    intervals = []
+    for block in blocks:
+        if not block.reachable or block.terminator is None:
+            continue
+        if block.terminator not in JUMP_TERMINATORS:
+            raise ValueError(
+                f"Event-driven simulation does not support {block.terminator}; use fast_interpreter"
+            )
+        target = block.target
+        if target is None:
+            intervals.append((block.index, last, None))
+        elif target > block.index:
+            intervals.append((block.index, target - 1, target))
+        else:
+            intervals.append((target, block.index, target))
+
+    merged = []
+    for lo, hi, target in sorted(intervals):
+        if merged and lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+            merged[-1][2].add(target)
+        else:
+            merged.append([lo, hi, {target}])
+    return merged
+
+
+def _build_units(program):
+    """
+    Splits the lowered program into units in scan order: a list of ops per
+    rung, or a (lo, hi, blocks) tuple per jump region.
+    """
+    starts = program.rung_starts
+    units = []
+
+    def add_rungs(ops):
+        rung = None
+        current = []
+        for lowered in ops:
+            index = bisect_right(starts, lowered.index) - 1
+            if current and index != rung:
+                units.append(current)
+                current = []
+            rung = index
+            current.append(lowered)
+        if current:
+            units.append(current)
+
+    if program.blocks is None:
+        add_rungs(program.ops)
+        return units
+
+    blocks = program.blocks
+    position = 0
+    for lo, hi, targets in _regions(blocks):
+        for block in blocks[position:lo]:
+            add_rungs(block.ops)
+        first = blocks[lo]
+        ops = first.ops
+        if lo not in targets and ops:
+            # Rungs ahead of the jump's own rung run unconditionally
+            split = bisect_right(starts, ops[-1].index) - 1
+            head = [lowered for lowered in ops if lowered.index < starts[split]]
+            add_rungs(head)
+            ops = ops[len(head):]
+        region = [LoweredBlock(lo, ops, first.terminator, first.target, first.fallthrough, first.reachable)]
+        region.extend(blocks[lo + 1:hi + 1])
+        units.append((lo, hi, region))
+        position = hi + 1
+    for block in blocks[position:]:
+        add_rungs(block.ops)
+    return units
+
+
+def generate_source(program, units, acc_base):
+    """
+    Generates `unit_N(v, n)` for every rung or region unit; unit N keeps its
+    outgoing accumulator in slot `acc_base + N`. Returns (source, rung units).
+    """
+    lines = []
+    rung_units = []
+    count = len(units)
+    reads_acc = []
+    for body in units:
+        ops = body if isinstance(body, list) else [op for block in body[2] for op in block.ops]
+        reads_acc.append(isinstance(body, tuple) or not _first_op_loads(ops))
+
+    for position, body in enumerate(units):
+        acc_in = acc_base + (position - 1) % count
+        acc_out = acc_base + position
+        is_region = isinstance(body, tuple)
+        ops = [op for block in body[2] for op in block.ops] if is_region else body
+        reads = set()
+        writes = []
+        for lowered in ops:
+            reads.update(lowered.reads())
+            writes.extend(lowered.writes())
+        if reads_acc[position]:
+            reads.add(acc_in)
+        if reads_acc[(position + 1) % count]:
+            writes.append(acc_out)
+        writes = _dedupe(writes)
+        if is_region:
+            name = f"blocks {body[0]}-{body[1]}"
+        else:
+            name = f"rung {bisect_right(program.rung_starts, ops[0].index) - 1}"
+        unit = _RungUnit(name, frozenset(reads), writes)
+        rung_units.append(unit)
+
+        if is_region:
+            lo, hi, region = body
+            for block in region:
+                if block.reachable:
+                    _emit_block(lines, block, acc_out)
+            names = ", ".join(f"{block.index}: block_{block.index}" for block in region if block.reachable)
+            lines.append(f"region_{position} = {{{names}}}")
+            lines.append("")
+
+        builder = _SourceBuilder(indent=4)
+        builder.lines = lines
+        emit = builder.emit
+        lines.append(f"def unit_{position}(v, n):")
+        for number, slot in enumerate(writes):
+            emit(f"w{number} = v[{slot}]")
+        if is_region:
+            emit(f"v[{acc_out}] = v[{acc_in}]")
+            emit(f"block = {lo}")
+            emit("steps = 0")
+            emit(f"while {lo} <= block <= {hi}:")
+            emit("steps += 1", 4)
+            emit(f"if steps > {MAX_BLOCK_STEPS}:", 4)
+            emit("raise RuntimeError(\"Scan watchdog: too many jumps in one scan\")", 8)
+            emit(f"block = region_{position}[block](v, None)", 4)
+        else:
+            if reads_acc[position]:
+                emit(f"acc = v[{acc_in}]")
+            _emit_ops(builder, ops)
+            if acc_out in writes:
+                emit(f"v[{acc_out}] = acc")
+        emit("c = []")
+        for number, slot in enumerate(writes):
+            emit(f"if v[{slot}] != w{number}: c.append({slot})")
+        emit("return c")
+        lines.append("")
+    return "\n".join(lines), rung_units
+
+
+class EventDrivenSimulator:
+    """
+    Executes one IR program instance, evaluating only units affected by changes.
+    """
+
+    def __init__(self, ir_data, scan_time_ms=10):
+        self.program = program = lower_program(ir_data)
+        self.scan_time_ms = scan_time_ms
+        bodies = _build_units(program)
+        acc_base = len(program.tags)
+        self.source, rung_units = generate_source(program, bodies, acc_base)
+        namespace = {"_div": _div, "_mod": _mod}
+        exec(compile(self.source, "<event-driven ladder>", "exec"), namespace)
+        for position, unit in enumerate(rung_units):
+            unit.run = namespace[f"unit_{position}"]
+
+        timers = [_TimerUnit(timer, scan_time_ms) for timer in program.timers]
+        counters = [_CounterUnit(counter) for counter in program.counters]
+        self.units = rung_units + timers + counters
+        self._timer_by_slot = {}
+        for timer in timers:
+            for slot in timer.writes:
+                self._timer_by_slot[slot] = timer
+
+        slot_count = acc_base + len(rung_units)
+        self.values = [0] * slot_count
+        self._dependents = [[] for _ in range(slot_count)]
+        self._self_reads = []
+        for position, unit in enumerate(self.units):
+            unit.position = position
+            for slot in unit.reads.union(unit.writes):
+                self._dependents[slot].append(position)
+            self._self_reads.append(unit.reads if isinstance(unit, _RungUnit) else frozenset())
+        for timer in timers:
+            et_slot = timer.timer.et_slot
+            timer.observed = any(position != timer.position for position in self._dependents[et_slot]
+                                 if et_slot in self.units[position].reads)
+
+        self.scans = 0
+        self.evaluations = 0
+        self.scans_per_second = None
+        self._pending = set()
+        self._wakeups = []
+        self.reset()
+
+    def reset(self):
+        """
+        Restores initial tag values and timer/counter state; the next scan evaluates everything.
+        """
+        values = self.values
+        for index in range(len(values)):
+            values[index] = 0
+        program = self.program
+        for slot, value in program.initial.items():
+            values[slot] = value
+        for counter in program.counters:
+            if counter.kind == "CTD":
+                values[counter.cv_slot] = counter.preset
+        for timer in program.timers:
+            if timer.kind == "TOF":
+                values[timer.et_slot] = timer.preset_ms
+        for unit in self.units:
+            if isinstance(unit, _TimerUnit):
+                unit.reset()
+            elif isinstance(unit, _CounterUnit):
+                unit.previous = False
+        self.scans = 0
+        self.evaluations = 0
+        self._wakeups = []
+        self._pending = set(range(len(self.units)))
+
+    def slot(self, tag):
+        """
+        Returns the fixed slot of a tag.
+        """
+        return self.program.slots[tag]
+
+    def dependents(self, tag):
+        """
+        Returns the names of the units that a change of `tag` schedules.
+        """
+        return [self.units[position].name for position in self._dependents[self.program.slots[tag]]]
+
+    def __setitem__(self, tag, value):
+        slot = self.program.slots[tag]
+        timer = self._timer_by_slot.get(slot)
+        if timer is not None:
+            self._catch_up(timer)
+        if self.values[slot] != value:
+            self.values[slot] = value
+            self._pending.update(self._dependents[slot])
+
+    def __getitem__(self, tag):
+        slot = self.program.slots[tag]
+        timer = self._timer_by_slot.get(slot)
+        if timer is not None and slot == timer.timer.et_slot:
+            return int(timer.elapsed(self.values, self.scans))
+        return int(self.values[slot])
+
+    def sync(self):
+        """
+        Writes the caught-up elapsed time of sleeping timers into `values`.
+        """
+        for timer in self._timer_by_slot.values():
+            self._catch_up(timer)
+
+    def _catch_up(self, timer):
+        if timer.sleeping:
+            self.values[timer.timer.et_slot] = timer.elapsed(self.values, self.scans)
+            timer.last = self.scans
+
+    @property
+    def full_scan_evaluations(self):
+        """
+        Unit evaluations a full-scan interpreter would have made over the same scans.
+        """
+        return self.scans * len(self.units)
+
+    def scan(self, scans=1):
+        """
+        Runs `scans` scan cycles and records the achieved scans per second.
+        """
+        start = time.perf_counter()
+        for _ in range(scans):
+            self._scan()
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            self.scans_per_second = scans / elapsed
+        return self.scans_per_second
+
+    def _scan(self):
+        self.scans = n = self.scans + 1
+        values = self.values
+        units = self.units
+        dependents = self._dependents
+        self_reads = self._self_reads
+        wakeups = self._wakeups
+        while wakeups and wakeups[0][0] <= n:
+            _, position = heapq.heappop(wakeups)
+            if units[position].wake_at == n:
+                self._pending.add(position)
+
+        queue = list(self._pending)
+        heapq.heapify(queue)
+        queued = set(queue)
+        following = self._pending = set()
+        evaluations = 0
+        while queue:
+            position = heapq.heappop(queue)
+            unit = units[position]
+            evaluations += 1
+            if isinstance(unit, _RungUnit):
+                changed = unit.run(values, n)
+            elif isinstance(unit, _TimerUnit):
+                changed = self._run_timer(unit, n)
+            else:
+                changed = self._run_counter(unit)
+            for slot in changed:
+                for dependent in dependents[slot]:
+                    if dependent > position:
+                        if dependent not in queued:
+                            queued.add(dependent)
+                            heapq.heappush(queue, dependent)
+                    elif dependent < position or slot in self_reads[position]:
+                        following.add(dependent)
+        self.evaluations += evaluations
+
+    def _run_timer(self, unit, n):
+        """
+        Advances one timer to scan `n` and schedules its next wake-up.
+        """
+        values = self.values
+        timer = unit.timer
+        q_slot, et_slot = timer.q_slot, timer.et_slot
+        old_q, old_et = values[q_slot], values[et_slot]
+        et = unit.elapsed(values, n - 1)
+        preset, dt = timer.preset_ms, self.scan_time_ms
+        enabled = True if values[timer.in_slot] else False
+
+        if timer.kind == "TOF":
+            if enabled:
+                et, q = 0, True
+            else:
+                et = min(et + dt, preset)
+                q = et < preset
+            active = not enabled and et < preset
+        elif timer.kind == "TP":
+            start = enabled and not unit.previous and not unit.running
+            if unit.running or start:
+                et = min((0 if start else et) + dt, preset)
+                unit.running = et < preset
+            else:
+                et = et if enabled else 0
+                unit.running = False
+            q = unit.running or start
+            unit.previous = enabled
+            # A pulse that ends on its start scan still drops Q on the next one,
+            # and a finished pulse with IN low clears ET on the next scan
+            active = unit.running or start or (not enabled and et != 0)
+        else:
+            if enabled:
+                et = min(et + dt, preset)
+                q = et >= preset
+            else:
+                et, q = 0, False
+            active = enabled and et < preset
+
+        values[q_slot], values[et_slot] = q, et
+        unit.last = n
+        unit.sleeping = False
+        unit.wake_at = None
+        if active and dt > 0:
+            if unit.observed:
+                self._pending.add(unit.position)
+            else:
+                # Sleep until the scan in which the elapsed time reaches the preset
+                unit.sleeping = True
+                unit.wake_at = n + max(-(-(preset - et) // dt), 1)
+                heapq.heappush(self._wakeups, (unit.wake_at, unit.position))
+        changed = []
+        if q != old_q:
+            changed.append(q_slot)
+        if et != old_et:
+            changed.append(et_slot)
+        return changed
+
+    def _run_counter(self, unit):
+        values = self.values
+        counter = unit.counter
+        q_slot, cv_slot = counter.q_slot, counter.cv_slot
+        old_q, old_cv = values[q_slot], values[cv_slot]
+        pulse = True if values[counter.count_slot] else False
+        edge = 1 if pulse and not unit.previous else 0
+        if counter.kind == "CTD":
+            cv = counter.preset if values[counter.reset_slot] else old_cv - edge
+            q = cv <= 0
+        else:
+            cv = 0 if values[counter.reset_slot] else old_cv + edge
+            q = cv >= counter.preset
+        values[q_slot], values[cv_slot] = q, cv
+        unit.previous = pulse
+        changed = []
+        if q != old_q:
+            changed.append(q_slot)
+        if cv != old_cv:
+            changed.append(cv_slot)
+        return changed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python src/event_simulator.py program.ir [scans]")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        simulator = EventDrivenSimulator(json.load(f))
+    scans = int(sys.argv[2]) if len(sys.argv) == 3 else 100000
+    rate = simulator.scan(scans)
+    print(f"{rate:,.0f} scans/s over {scans} scans; "
+          f"{simulator.evaluations:,} of {simulator.full_scan_evaluations:,} unit evaluations")
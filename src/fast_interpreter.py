@@ -0,0 +1,393 @@
+"""
+Fast IR Interpreter
+Low-latency single-program executor for digital-twin and soft-PLC use.
+
+Overview:
+- The IR is lowered with `scan_semantics` and turned into straight-line Python
+  source: one fused expression per rung, tags resolved to fixed list slots.
+- The generated function runs a whole batch of scans per call, so a scan does
+  no dict lookups and no string dispatch on instruction types.
+- Programs with jumps are dispatched per basic block (see `ir_cfg`);
+  unreachable blocks are never generated.
+- Compiled programs are cached by IR content digest and scan time.
+- Semantics match `batch_simulator` exactly; booleans read back as 0/1.
+"""
+
+import json
+import sys
+import time
+from collections import OrderedDict
+
+try:
+    from src.compile_cache import ir_digest
+    from src.scan_semantics import (
+        lower_program, LOAD, LOAD_NOT, AND, AND_NOT, OR, OR_NOT, XOR, XOR_NOT, NOT,
+        STORE, STORE_NOT, SET, RESET, ADD, SUB, MUL, DIV, MOD, GT, GE, EQ, NE, LE, LT,
+    )
+except ImportError:  # Run as a script from inside src/
+    from compile_cache import ir_digest
+    from scan_semantics import (
+        lower_program, LOAD, LOAD_NOT, AND, AND_NOT, OR, OR_NOT, XOR, XOR_NOT, NOT,
+        STORE, STORE_NOT, SET, RESET, ADD, SUB, MUL, DIV, MOD, GT, GE, EQ, NE, LE, LT,
+    )
+
+# Expression kinds while fusing a rung: a plain value (tag, literal or
+# arithmetic result), a strict bool, or a truthy and/or chain that must be
+# normalized to a bool before it is stored.
+VALUE = 0
+STRICT = 1
+TRUTHY = 2
+
+ARITHMETIC = {ADD: "+", SUB: "-", MUL: "*"}
+LOGIC_OPS = (AND, AND_NOT, OR, OR_NOT, XOR, XOR_NOT)
+COMPARISON = {GT: ">", GE: ">=", EQ: "==", NE: "!=", LE: "<=", LT: "<"}
+
+# Deeply nested expressions are split to stay well under the parser's limits.
+MAX_FUSED_OPS = 24
+# Block dispatches allowed per scan before a backward-jump loop is reported.
+MAX_BLOCK_STEPS = 100000
+CACHE_SIZE = 128
+
+_compiled = OrderedDict()
+
+
+def _div(left, right):
+    if right == 0:
+        return 0
+    quotient = abs(left) // abs(right)
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+def _mod(left, right):
+    if right == 0:
+        return 0
+    return left - right * _div(left, right)
+
+
+def _operand(item):
+    is_literal, value = item
+    return repr(value) if is_literal else f"v[{value}]"
+
+
+class _SourceBuilder:
+    def __init__(self, indent):
+        self.lines = []
+        self.indent = indent
+        self.expr = "acc"
+        self.kind = VALUE
+        self.fused = 0
+
+    def emit(self, line, extra_indent=0):
+        self.lines.append(" " * (self.indent + extra_indent) + line)
+
+    def normalized(self):
+        return f"(True if {self.expr} else False)" if self.kind == TRUTHY else self.expr
+
+    def materialize(self):
+        if self.expr != "acc":
+            self.emit(f"acc = {self.normalized()}")
+            self.kind = STRICT if self.kind == TRUTHY else self.kind
+        self.expr = "acc"
+        self.fused = 0
+
+    def set(self, expr, kind):
+        self.expr = expr
+        self.kind = kind
+        self.fused += 1
+        if self.fused >= MAX_FUSED_OPS:
+            self.materialize()
+
+
+def _emit_ops(builder, ops):
+    """
+    Appends fused accumulator code for `ops`, leaving the accumulator in `acc`.
+    """
+    emit = builder.emit
+    for lowered in ops:
+        op = lowered.op
+        operands = [_operand(item) for item in lowered.operands]
+
+        if op == LOAD:
+            if len(operands) == 1:
+                builder.expr, builder.kind, builder.fused = operands[0], VALUE, 0
+            else:
+                builder.expr, builder.kind, builder.fused = f"({' and '.join(operands) or 'True'})", TRUTHY, 0
+        elif op == LOAD_NOT:
+            builder.expr, builder.kind, builder.fused = f"(not ({' and '.join(operands) or 'True'}))", STRICT, 0
+        elif not operands and op in LOGIC_OPS:
+            # Like batch_simulator: a contact without operands only makes the accumulator boolean
+            builder.set(f"({builder.expr} != 0)", STRICT)
+        elif op == AND:
+            builder.set(f"({builder.expr} and {' and '.join(operands)})", TRUTHY)
+        elif op == AND_NOT:
+            builder.set(f"({builder.expr} and {' and '.join('not ' + o for o in operands)})", TRUTHY)
+        elif op == OR:
+            builder.set(f"({builder.expr} or {' or '.join(operands)})", TRUTHY)
+        elif op == OR_NOT:
+            builder.set(f"({builder.expr} or {' or '.join('not ' + o for o in operands)})", TRUTHY)
+        elif op == XOR or op == XOR_NOT:
+            compare = "!=" if op == XOR else "=="
+            expr = builder.expr
+            for item in operands:
+                expr = f"((not {expr}) {compare} (not {item}))"
+            builder.set(expr, STRICT)
+        elif op == NOT:
+            builder.set(f"(not {builder.expr})", STRICT)
+        elif op in (STORE, STORE_NOT, SET, RESET):
+            builder.materialize()
+            for _, slot in lowered.operands:
+                if op == STORE:
+                    emit(f"v[{slot}] = acc")
+                elif op == STORE_NOT:
+                    emit(f"v[{slot}] = not acc")
+                elif op == SET:
+                    emit(f"if acc: v[{slot}] = True")
+                else:
+                    emit(f"if acc: v[{slot}] = False")
+        else:
+            expr = builder.normalized()
+            for item in operands:
+                if op in ARITHMETIC:
+                    expr = f"({expr} {ARITHMETIC[op]} {item})"
+                elif op == DIV:
+                    expr = f"_div({expr}, {item})"
+                elif op == MOD:
+                    expr = f"_mod({expr}, {item})"
+                else:
+                    expr = f"({expr} {COMPARISON[op]} {item})"
+            builder.set(expr, STRICT if op in COMPARISON else VALUE)
+    builder.materialize()
+
+
+def _emit_timers_and_counters(builder, program, scan_time_ms, hidden):
+    """
+    Appends the timer and counter updates. Returns the next free hidden slot.
+    """
+    emit = builder.emit
+    dt = scan_time_ms
+    for timer in program.timers:
+        enabled, q, et, preset = f"v[{timer.in_slot}]", f"v[{timer.q_slot}]", f"v[{timer.et_slot}]", timer.preset_ms
+        if timer.kind == "TOF":
+            emit(f"if {enabled}:")
+            emit(f"{et} = 0", 4)
+            emit(f"{q} = True", 4)
+            emit("else:")
+            emit(f"e = {et} + {dt}", 4)
+            emit(f"{et} = e if e < {preset} else {preset}", 4)
+            emit(f"{q} = {et} < {preset}", 4)
+        elif timer.kind == "TP":
+            running, previous = f"v[{hidden}]", f"v[{hidden + 1}]"
+            hidden += 2
+            emit(f"en = True if {enabled} else False")
+            emit(f"start = en and not {previous} and not {running}")
+            emit(f"if {running} or start:")
+            emit(f"e = (0 if start else {et}) + {dt}", 4)
+            emit(f"e = e if e < {preset} else {preset}", 4)
+            emit(f"{et} = e", 4)
+            emit(f"{running} = e < {preset}", 4)
+            emit("else:")
+            emit(f"{et} = {et} if en else 0", 4)
+            emit(f"{running} = False", 4)
+            emit(f"{q} = {running} or start")
+            emit(f"{previous} = en")
+        else:
+            emit(f"if {enabled}:")
+            emit(f"e = {et} + {dt}", 4)
+            emit(f"{et} = e if e < {preset} else {preset}", 4)
+            emit(f"{q} = {et} >= {preset}", 4)
+            emit("else:")
+            emit(f"{et} = 0", 4)
+            emit(f"{q} = False", 4)
+
+    for counter in program.counters:
+        previous = f"v[{hidden}]"
+        hidden += 1
+        pulse, reset, q, cv = (f"v[{counter.count_slot}]", f"v[{counter.reset_slot}]",
+                               f"v[{counter.q_slot}]", f"v[{counter.cv_slot}]")
+        emit(f"p = True if {pulse} else False")
+        if counter.kind == "CTD":
+            emit(f"c = {counter.preset} if {reset} else {cv} - (1 if p and not {previous} else 0)")
+            emit(f"{q} = c <= 0")
+        else:
+            emit(f"c = 0 if {reset} else {cv} + (1 if p and not {previous} else 0)")
+            emit(f"{q} = c >= {counter.preset}")
+        emit(f"{cv} = c")
+        emit(f"{previous} = p")
+
+    return hidden
+
+
+def _emit_block(lines, block, acc_slot):
+    """
+    Appends `block_N(v, stack)`, which runs one basic block and returns the next block (-1 ends the scan).
+    """
+    builder = _SourceBuilder(indent=4)
+    builder.lines = lines
+    emit = builder.emit
+    lines.append(f"def block_{block.index}(v, stack):")
+    emit(f"acc = v[{acc_slot}]")
+    _emit_ops(builder, block.ops)
+    emit(f"v[{acc_slot}] = acc")
+
+    terminator = block.terminator
+    target = -1 if block.target is None else block.target
+    fallthrough = -1 if block.fallthrough is None else block.fallthrough
+    if terminator == "JMP":
+        emit(f"return {target}")
+    elif terminator == "JMPC":
+        emit(f"return {target} if acc else {fallthrough}")
+    elif terminator == "JMPCN":
+        emit(f"return {fallthrough} if acc else {target}")
+    elif terminator == "CALL":
+        if target >= 0:
+            emit(f"stack.append({fallthrough})")
+        emit(f"return {target}")
+    elif terminator in ("RET", "RETC", "RETCN"):
+        if terminator != "RET":
+            emit("if acc:" if terminator == "RETC" else "if not acc:")
+        emit("return stack.pop() if stack else -1", 4 if terminator != "RET" else 0)
+        if terminator != "RET":
+            emit(f"return {fallthrough}")
+    else:
+        emit(f"return {fallthrough}")
+    lines.append("")
+
+
+def generate_source(program, scan_time_ms):
+    """
+    Generates the Python source of `scan(v, scans)` for a lowered program.
+
+    Straight-line programs become one loop body; programs with jumps get one
+    function per reachable basic block and a dispatch loop over block indexes.
+    Returns (source, slot_count); slots past the program's tags hold the
+    accumulator and internal timer/counter edge state.
+    """
+    hidden = len(program.tags)
+    acc_slot = hidden
+    hidden += 1
+
+    if program.blocks is None:
+        builder = _SourceBuilder(indent=8)
+        _emit_ops(builder, program.ops)
+        hidden = _emit_timers_and_counters(builder, program, scan_time_ms, hidden)
+        body = builder.lines or [" " * 8 + "pass"]
+        source = "\n".join(
+            ["def scan(v, scans):", f"    acc = v[{acc_slot}]", "    for _ in range(scans):"]
+            + body
+            + [f"    v[{acc_slot}] = acc", ""]
+        )
+        return source, hidden
+
+    lines = []
+    for block in program.blocks:
+        if block.reachable:
+            _emit_block(lines, block, acc_slot)
+    names = ", ".join(f"block_{block.index}" if block.reachable else "None" for block in program.blocks)
+    builder = _SourceBuilder(indent=8)
+    builder.lines = lines
+    lines.extend([
+        f"blocks = [{names}]",
+        "",
+        "def scan(v, scans):",
+        "    for _ in range(scans):",
+        "        block = 0",
+        "        stack = []",
+        "        steps = 0",
+        "        while block >= 0:",
+        "            steps += 1",
+        f"            if steps > {MAX_BLOCK_STEPS}:",
+        "                raise RuntimeError(\"Scan watchdog: too many jumps in one scan\")",
+        "            block = blocks[block](v, stack)",
+    ])
+    hidden = _emit_timers_and_counters(builder, program, scan_time_ms, hidden)
+    lines.append("")
+    return "\n".join(lines), hidden
+
+
+def compile_program(ir_data, scan_time_ms=10):
+    """
+    Lowers and compiles an IR program, reusing a cached build for identical IR.
+
+    Returns (lowered program, scan function, slot count, source).
+    """
+    key = (ir_digest(ir_data), scan_time_ms)
+    compiled = _compiled.get(key)
+    if compiled is not None:
+        _compiled.move_to_end(key)
+        return compiled
+    program = lower_program(ir_data)
+    source, slot_count = generate_source(program, scan_time_ms)
+    namespace = {"_div": _div, "_mod": _mod}
+    exec(compile(source, f"<ladder scan {key[0][:12]}>", "exec"), namespace)
+    compiled = _compiled[key] = (program, namespace["scan"], slot_count, source)
+    while len(_compiled) > CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
+
+
+class FastInterpreter:
+    """
+    Executes one IR program instance scan by scan.
+    """
+
+    def __init__(self, ir_data, scan_time_ms=10):
+        self.program, self._scan, slot_count, self.source = compile_program(ir_data, scan_time_ms)
+        self.scan_time_ms = scan_time_ms
+        self.values = [0] * slot_count
+        self.scans_per_second = None
+        self.reset()
+
+    def reset(self):
+        """
+        Restores initial tag values and clears timer/counter state.
+        """
+        values = self.values
+        for index in range(len(values)):
+            values[index] = 0
+        for slot, value in self.program.initial.items():
+            values[slot] = value
+        for counter in self.program.counters:
+            if counter.kind == "CTD":
+                values[counter.cv_slot] = counter.preset
+        for timer in self.program.timers:
+            if timer.kind == "TOF":
+                values[timer.et_slot] = timer.preset_ms
+
+    def slot(self, tag):
+        """
+        Returns the fixed slot of a tag, for callers that poke `values` directly.
+        """
+        return self.program.slots[tag]
+
+    def __setitem__(self, tag, value):
+        self.values[self.program.slots[tag]] = value
+
+    def __getitem__(self, tag):
+        return int(self.values[self.program.slots[tag]])
+
+    def scan(self, scans=1):
+        """
+        Runs `scans` scan cycles and records the achieved scans per second.
+        """
+        start = time.perf_counter()
+        self._scan(self.values, scans)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            self.scans_per_second = scans / elapsed
+        return self.scans_per_second
+
+    def benchmark(self, scans=100000):
+        """
+        Measures scans per second over `scans` cycles from the current state.
+        """
+        return self.scan(scans)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python src/fast_interpreter.py program.ir [scans]")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        interpreter = FastInterpreter(json.load(f))
+    scans = int(sys.argv[2]) if len(sys.argv) == 3 else 100000
+    print(f"{interpreter.benchmark(scans):,.0f} scans/s over {scans} scans")
@@ -0,0 +1,47 @@
+"""
+IEC 61131-3 Time Literals
+Parses timer durations as they appear in LadderCore IR into milliseconds.
+
+Accepted forms: bare millisecond counts ("5000"), IEC literals ("T#5S",
+"TIME#1m30s", "t#250ms", "T#1d_2h") and the same without the prefix ("5S").
+"""
+
+import re
+
+UNIT_MS = {"d": 86400000, "h": 3600000, "m": 60000, "s": 1000, "ms": 1}
+PREFIX_PATTERN = re.compile(r"^(?:T|TIME|LT|LTIME)#", re.IGNORECASE)
+COMPONENT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|d|h|m|s)", re.IGNORECASE)
+
+
+def parse_duration_ms(value):
+    """
+    Converts a duration (int, numeric string or IEC time literal) into integer milliseconds.
+
+    Raises ValueError for malformed or negative durations.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid duration: {value!r}")
+    if isinstance(value, (int, float)):
+        if value < 0:
+            raise ValueError(f"Invalid duration: {value!r}")
+        return int(value)
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid duration: {value!r}")
+
+    text = value.strip()
+    if text.isdigit():
+        return int(text)
+
+    text = PREFIX_PATTERN.sub("", text).replace("_", "")
+    if not text:
+        raise ValueError(f"Invalid duration: {value!r}")
+    total = 0.0
+    position = 0
+    for match in COMPONENT_PATTERN.finditer(text):
+        if match.start() != position:
+            raise ValueError(f"Invalid duration: {value!r}")
+        total += float(match.group(1)) * UNIT_MS[match.group(2).lower()]
+        position = match.end()
+    if position != len(text):
+        raise ValueError(f"Invalid duration: {value!r}")
+    return int(round(total))
@@ -0,0 +1,422 @@
+"""
+Incremental Compiler
+Rung-level incremental recompilation of Ladder Logic (.ll) sources into Plutus Haskell.
+
+Overview:
+- The source is split into segments, one per rung: a segment starts at a
+  line that opens a new rung while the parser is outside comments and VAR
+  blocks, so each segment parses on its own to exactly the IR the full parse
+  gives it. Segments are fingerprinted by their source lines.
+- Given the next version of the source, the changed line window is found by
+  comparing common prefix and suffix lines; only the segments it touches are
+  reparsed (growing the window while it ends inside a comment or VAR block).
+- A dependency graph links declared variables, timers and counters to the
+  segments that call them (`CAL Timer1(...)`); when a declaration changes,
+  only those dependent segments are reparsed.
+- Each segment keeps its rendered trace lines and validator conditions. A
+  fragment is re-rendered only when its instruction offset or reachability
+  changes, and the output is spliced from the fragments, byte-identical to
+  compiling the whole file with `compile_ir_to_plutus_haskell_enhanced`.
+- Programs with jumps recompute reachability over the merged program on each
+  update; `optimize=True` re-runs the condition optimizer on the merged IR.
+"""
+
+import argparse
+import io
+import sys
+import time
+from bisect import bisect_right
+from collections import ChainMap
+from itertools import accumulate
+
+try:
+    from src.ir_cfg import build_cfg, is_control
+    from src.ll_parser import LOAD_OPCODES, LadderLogicParser, new_ir, record_jump
+    from src.plutus_emitter import (
+        CONDITION, CONDITION_INDENT, CONDITION_SEPARATOR, EMPTY_BODY, TRACE_LINE,
+        VALIDATOR_BODY, VALIDATOR_FOOTER, VALIDATOR_HEADER, emit_checks, emit_plutus_haskell,
+    )
+except ImportError:  # Run as a script from inside src/
+    from ir_cfg import build_cfg, is_control
+    from ll_parser import LOAD_OPCODES, LadderLogicParser, new_ir, record_jump
+    from plutus_emitter import (
+        CONDITION, CONDITION_INDENT, CONDITION_SEPARATOR, EMPTY_BODY, TRACE_LINE,
+        VALIDATOR_BODY, VALIDATOR_FOOTER, VALIDATOR_HEADER, emit_checks, emit_plutus_haskell,
+    )
+
+# IR sections merged from the segments, in `new_ir` order; jump_instructions
+# are merged with `record_jump` so a later label keeps an earlier jump
+SECTIONS = ("timers", "counters", "math_operations", "comparators", "set_reset_latches",
+            "function_blocks", "variables")
+CHECK_SECTIONS = ("timers", "counters")
+
+
+class _SegmentParser(LadderLogicParser):
+    """
+    Parser for one segment: variables declared by earlier segments are visible
+    through a ChainMap, and the instances it calls are recorded.
+    """
+
+    def __init__(self, inherited_variables):
+        super().__init__()
+        self.ir["variables"] = ChainMap({}, inherited_variables)
+        self.calls = set()
+
+    def _call(self, instance, params):
+        self.calls.add(instance)
+        super()._call(instance, params)
+
+    @property
+    def clean(self):
+        return not self._in_comment and not self._in_var_block
+
+
+class RungSegment:
+    """
+    The source lines of one rung and the IR and Plutus fragments they produce.
+    """
+    __slots__ = ("lines", "ir", "calls", "has_control", "fragment_key", "trace", "conditions")
+
+    def __init__(self, lines, ir, calls):
+        self.lines = lines
+        self.ir = ir
+        self.calls = calls
+        self.has_control = any(is_control(instr["type"]) for instr in ir["instructions"])
+        self.fragment_key = None
+        self.trace = ""
+        self.conditions = ""
+
+    def defines(self, section):
+        return bool(self.ir[section])
+
+    def render(self, offset, live):
+        """
+        Renders the segment's trace lines and conditions for instructions
+        starting at global index `offset`; `live` is the set of reachable
+        indexes, or None when the program has no control flow.
+        """
+        key = (offset, None if live is None else tuple(
+            i for i in range(offset, offset + len(self.ir["instructions"])) if i in live
+        ))
+        if key == self.fragment_key:
+            return False
+        trace = []
+        conditions = []
+        for i, instr in enumerate(self.ir["instructions"], offset):
+            if live is not None and (i not in live or is_control(instr["type"])):
+                continue
+            op_type = instr["type"].lower()
+            args = instr["args"]
+            conjunction = " && ".join(args)
+            trace.append(TRACE_LINE(i, op_type, conjunction if op_type == "and" else " || ".join(args)))
+            conditions.append(CONDITION(i, op_type, conjunction))
+        self.trace = "".join(trace)
+        self.conditions = CONDITION_SEPARATOR.join(conditions)
+        self.fragment_key = key
+        return True
+
+
+def _opens_rung(line):
+    """
+    True when a source line starts with a load or a label, i.e. opens a new rung
+    after a store. Lines starting with a comment never count (conservative).
+    """
+    tokens = line.split(None, 1)
+    if not tokens:
+        return False
+    head = tokens[0].upper()
+    return head in LOAD_OPCODES or (head.endswith(":") and head != ":")
+
+
+def _parse_segments(lines, inherited_variables):
+    """
+    Splits `lines` into parsed `RungSegment`s.
+
+    Returns (segments, clean): `clean` is False when the last segment ends
+    inside a comment or VAR block, so the following line cannot start a segment.
+    """
+    segments = []
+    inherited = ChainMap({}, inherited_variables)
+    parser = _SegmentParser(inherited)
+    start = 0
+    for index, line in enumerate(lines):
+        if index > start and parser.clean and parser._rung_stored and _opens_rung(line):
+            segments.append(_finish_segment(parser, lines[start:index]))
+            inherited.maps[0].update(segments[-1].ir["variables"])
+            parser = _SegmentParser(inherited)
+            start = index
+        parser.feed(line)
+    if start < len(lines) or not segments:
+        segments.append(_finish_segment(parser, lines[start:]))
+    return segments, parser.clean
+
+
+def _finish_segment(parser, lines):
+    parser.close()
+    ir = parser.ir
+    ir["variables"] = ir["variables"].maps[0]
+    return RungSegment(lines, ir, parser.calls)
+
+
+def _inherited_variables(segments):
+    """
+    Merges the variables declared by `segments`, in order.
+    """
+    merged = {}
+    for segment in segments:
+        if segment.ir["variables"]:
+            merged.update(segment.ir["variables"])
+    return merged
+
+
+def _changed_declarations(old_segments, new_segments):
+    """
+    Returns the variable names whose declarations differ between two runs of segments.
+    """
+    old = _inherited_variables(old_segments)
+    new = _inherited_variables(new_segments)
+    return {name for name in old.keys() | new.keys() if old.get(name) != new.get(name)}
+
+
+def _common_prefix(a, b, limit):
+    """
+    Returns the number of equal leading lines, comparing in blocks first.
+    """
+    prefix = 0
+    block = 4096
+    while block:
+        while prefix + block <= limit and a[prefix:prefix + block] == b[prefix:prefix + block]:
+            prefix += block
+        block //= 8
+    return prefix
+
+
+def _common_suffix(a, b, limit):
+    """
+    Returns the number of equal trailing lines (at most `limit`).
+    """
+    suffix = 0
+    block = 4096
+    end_a, end_b = len(a), len(b)
+    while block:
+        while (suffix + block <= limit
+               and a[end_a - suffix - block:end_a - suffix] == b[end_b - suffix - block:end_b - suffix]):
+            suffix += block
+        block //= 8
+    return suffix
+
+
+class IncrementalCompiler:
+    """
+    Compiles successive versions of one Ladder Logic source, reparsing and
+    re-rendering only what each edit affects. `last_update` reports the work done.
+    """
+
+    def __init__(self, optimize=False):
+        self.optimize = optimize
+        self.segments = []
+        self.last_update = {}
+        self._lines = None
+        self._line_counts = []
+        self._instruction_counts = []
+        self._traces = []
+        self._conditions = []
+        self._control_segments = 0
+        self._rendered_live = False
+        self._dirty = None
+        self._checks = None
+        self._ir = None
+        self._output = None
+
+    def compile(self, source):
+        """
+        Returns the Plutus Haskell script for `source` (a string), updating incrementally
+        from the previous call.
+        """
+        start = time.perf_counter()
+        lines = source.splitlines()
+        if self._lines is None:
+            segments, _ = _parse_segments(lines, {})
+            self._splice(0, 0, segments)
+            stats = {"full": True, "reparsed": len(segments), "dependents": 0}
+            checks_changed = True
+        elif lines == self._lines:
+            if self._output is not None:
+                self.last_update = {"full": False, "segments": len(self.segments), "reparsed": 0,
+                                    "dependents": 0, "rendered": 0, "seconds": time.perf_counter() - start}
+                return self._output
+            stats, checks_changed = {"full": False, "reparsed": 0, "dependents": 0}, False
+        else:
+            stats, checks_changed = self._update(lines)
+        self._lines = lines
+        self._ir = None
+        self._output = None
+        if checks_changed:
+            self._checks = None
+
+        output, rendered = self._render()
+        self._output = output
+        stats.update(segments=len(self.segments), rendered=rendered, seconds=time.perf_counter() - start)
+        self.last_update = stats
+        return output
+
+    @property
+    def ir(self):
+        """
+        The merged LadderCore IR of the current source (same as `parse_ladder_ir`).
+        """
+        if self._ir is None:
+            ir = new_ir()
+            for segment in self.segments:
+                ir["instructions"].extend(segment.ir["instructions"])
+                ir["scan_cycle"].extend(segment.ir["scan_cycle"])
+                for section in SECTIONS:
+                    if segment.ir[section]:
+                        ir[section].update(segment.ir[section])
+                for target, jump in segment.ir["jump_instructions"].items():
+                    record_jump(ir["jump_instructions"], target, jump["jump_type"])
+            self._ir = ir
+        return self._ir
+
+    def _splice(self, first, stop, segments):
+        """
+        Replaces segments[first:stop] and marks the new ones for rendering.
+        """
+        self._control_segments += (sum(segment.has_control for segment in segments)
+                                   - sum(segment.has_control for segment in self.segments[first:stop]))
+        old_instructions = sum(self._instruction_counts[first:stop])
+        new_instructions = sum(len(segment.ir["instructions"]) for segment in segments)
+        self.segments[first:stop] = segments
+        self._line_counts[first:stop] = [len(segment.lines) for segment in segments]
+        self._instruction_counts[first:stop] = [len(segment.ir["instructions"]) for segment in segments]
+        self._traces[first:stop] = [""] * len(segments)
+        self._conditions[first:stop] = [""] * len(segments)
+        # Fragments after a change in instruction count shift their indexes
+        dirty_end = len(self.segments) if new_instructions != old_instructions else first + len(segments)
+        if self._dirty is None:
+            self._dirty = [first, dirty_end]
+        else:
+            shift = len(segments) - (stop - first)
+            self._dirty = [min(self._dirty[0], first),
+                           max(self._dirty[1] + shift if self._dirty[1] > first else self._dirty[1], dirty_end)]
+
+    def _update(self, lines):
+        old_lines = self._lines
+        limit = min(len(lines), len(old_lines))
+        prefix = _common_prefix(lines, old_lines, limit)
+        suffix = _common_suffix(lines, old_lines, limit - prefix)
+
+        starts = list(accumulate(self._line_counts, initial=0))
+        first = max(bisect_right(starts, prefix) - 1, 0)
+        first = min(first, len(self.segments) - 1)
+        last = min(max(bisect_right(starts, max(len(old_lines) - suffix - 1, prefix)) - 1, first),
+                   len(self.segments) - 1)
+        delta = len(lines) - len(old_lines)
+
+        # Reparse the touched segments, growing the region while it ends unclean
+        inherited = _inherited_variables(self.segments[:first])
+        while True:
+            replacement, clean = _parse_segments(lines[starts[first]:starts[last + 1] + delta], inherited)
+            if clean or last == len(self.segments) - 1:
+                break
+            last += 1
+        old_region = self.segments[first:last + 1]
+        checks_changed = any(segment.defines(section) for segment in old_region + replacement
+                             for section in CHECK_SECTIONS)
+        changed = _changed_declarations(old_region, replacement)
+        self._splice(first, last + 1, replacement)
+
+        # Reparse later segments whose calls depend on a changed declaration
+        dependents = 0
+        if changed:
+            inherited = _inherited_variables(self.segments[:first + len(replacement)])
+            for index in range(first + len(replacement), len(self.segments)):
+                segment = self.segments[index]
+                if segment.calls & changed:
+                    (reparsed,), _ = _parse_segments(segment.lines, inherited)
+                    changed |= _changed_declarations([segment], [reparsed])
+                    checks_changed = checks_changed or any(
+                        s.defines(section) for s in (segment, reparsed) for section in CHECK_SECTIONS
+                    )
+                    self._splice(index, index + 1, [reparsed])
+                    segment = reparsed
+                    dependents += 1
+                if segment.ir["variables"]:
+                    inherited.update(segment.ir["variables"])
+
+        return {"full": False, "reparsed": len(replacement), "dependents": dependents}, checks_changed
+
+    def _render(self):
+        """
+        Re-renders stale fragments and splices the script together.
+        Returns (script, number of fragments rendered).
+        """
+        if self.optimize:
+            self._dirty = None
+            stream = io.StringIO()
+            emit_plutus_haskell(self.ir, stream, optimize=True)
+            return stream.getvalue(), len(self.segments)
+
+        # With control flow any edit can change reachability, so every fragment is checked;
+        # so is every fragment after the last jump is removed, since they were filtered by `live`
+        live = None
+        dirty = self._dirty or [0, 0]
+        if self._control_segments:
+            live = {i for i, _ in build_cfg(self.ir["instructions"]).live_instructions()}
+        if live is not None or self._rendered_live:
+            dirty = [0, len(self.segments)]
+        self._rendered_live = live is not None
+        self._dirty = None
+
+        rendered = 0
+        offsets = list(accumulate(self._instruction_counts[:dirty[0]], initial=0))
+        offset = offsets[-1]
+        for index in range(dirty[0], dirty[1]):
+            segment = self.segments[index]
+            if segment.render(offset, live):
+                self._traces[index] = segment.trace
+                self._conditions[index] = segment.conditions
+                rendered += 1
+            offset += self._instruction_counts[index]
+
+        if self._checks is None:
+            sections = {section: {} for section in CHECK_SECTIONS}
+            for segment in self.segments:
+                for section in CHECK_SECTIONS:
+                    if segment.ir[section]:
+                        sections[section].update(segment.ir[section])
+            checks = io.StringIO()
+            check_count = emit_checks(sections, checks.write)
+            self._checks = (checks.getvalue(), check_count)
+        checks, check_count = self._checks
+        trace = "".join(self._traces)
+        if not trace and not check_count:
+            raise ValueError("Invalid IR format: No valid logic generated")
+
+        parts = [trace, checks, VALIDATOR_HEADER, VALIDATOR_BODY]
+        conditions = CONDITION_SEPARATOR.join(filter(None, self._conditions))
+        if conditions:
+            parts += [CONDITION_INDENT, conditions, VALIDATOR_FOOTER]
+        else:
+            parts.append(EMPTY_BODY)
+        return "".join(parts), rendered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile an edited .ll file incrementally against its previous version.")
+    parser.add_argument("previous", help="previous version of the program (.ll)")
+    parser.add_argument("current", help="edited version of the program (.ll)")
+    args = parser.parse_args()
+
+    compiler = IncrementalCompiler()
+    with open(args.previous, "r", encoding="utf-8") as f:
+        compiler.compile(f.read())
+    with open(args.current, "r", encoding="utf-8") as f:
+        plutus_code = compiler.compile(f.read())
+    sys.stdout.write(plutus_code)
+    update = compiler.last_update
+    print(
+        f"{update['segments']} rungs: {update['reparsed']} reparsed, {update['dependents']} dependents, "
+        f"{update['rendered']} re-rendered in {update['seconds'] * 1000:.1f}ms",
+        file=sys.stderr
+    )
@@ -0,0 +1,196 @@
+"""
+Pipeline Instrumentation
+Per-stage timers, counters, optional cProfile capture and a machine-readable metrics dump.
+
+Overview:
+- Pipeline modules wrap their entry points in `stage("ll_parser.parse")` and
+  report totals with `count("ll_parser.lines", n)`. While instrumentation is
+  off, `stage` returns a shared no-op context and `count` returns at once.
+- `enable(profile=True)` also runs every outermost stage under one shared
+  `cProfile.Profile`; `dump_profile(path)` writes the pstats file.
+- `snapshot()` returns {"stages": {name: {"calls", "seconds", "max"}}, "counters": {...}};
+  `dump_metrics(path)` writes it as JSON.
+- Debug tracing goes through `logging`; modules test
+  `logger.isEnabledFor(logging.DEBUG)` once per call, so it costs nothing when off.
+- Without touching code: set `MORLEY_METRICS=metrics.json` (and optionally
+  `MORLEY_PROFILE=run.prof`) to dump at exit ("{pid}" is replaced per process),
+  or run a script through `python src/instrumentation.py --metrics m.json -- src/ll_parser.py in.ll`.
+"""
+
+import argparse
+import atexit
+import cProfile
+import json
+import os
+import runpy
+import sys
+import time
+
+_enabled = False
+_profiler = None
+_depth = 0
+_stages = {}
+_counters = {}
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        global _depth
+        if _profiler is not None and _depth == 0:
+            _profiler.enable()
+        _depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _depth
+        elapsed = time.perf_counter() - self.start
+        _depth -= 1
+        if _profiler is not None and _depth == 0:
+            _profiler.disable()
+        entry = _stages.get(self.name)
+        if entry is None:
+            _stages[self.name] = {"calls": 1, "seconds": elapsed, "max": elapsed}
+        else:
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+            if elapsed > entry["max"]:
+                entry["max"] = elapsed
+        return False
+
+
+def enabled():
+    return _enabled
+
+
+def enable(profile=False):
+    """
+    Turns instrumentation on; with `profile=True` stages also run under cProfile.
+    """
+    global _enabled, _profiler
+    _enabled = True
+    if profile and _profiler is None:
+        _profiler = cProfile.Profile()
+
+
+def disable():
+    """
+    Turns instrumentation (and profiling) off; collected metrics are kept until `reset`.
+    """
+    global _enabled, _profiler
+    _enabled = False
+    _profiler = None
+
+
+def reset():
+    """
+    Discards collected stage timings, counters and profile data.
+    """
+    global _profiler
+    _stages.clear()
+    _counters.clear()
+    if _profiler is not None:
+        _profiler = cProfile.Profile()
+
+
+def stage(name):
+    """
+    Returns a context manager timing the named stage (a no-op while disabled).
+    """
+    return _Stage(name) if _enabled else NULL_STAGE
+
+
+def count(name, value=1):
+    """
+    Adds `value` to the named counter while instrumentation is enabled.
+    """
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def snapshot():
+    """
+    Returns a JSON-serializable copy of the collected metrics.
+    """
+    return {
+        "stages": {name: dict(entry) for name, entry in sorted(_stages.items())},
+        "counters": dict(sorted(_counters.items())),
+    }
+
+
+def dump_metrics(path):
+    """
+    Writes `snapshot()` as JSON to `path` ("-" for stdout; "{pid}" is replaced).
+    """
+    metrics = json.dumps(snapshot(), indent=2)
+    if path == "-":
+        print(metrics)
+        return
+    with open(path.replace("{pid}", str(os.getpid())), "w", encoding="utf-8") as f:
+        f.write(metrics + "\n")
+
+
+def dump_profile(path):
+    """
+    Writes the captured cProfile statistics to `path` ("{pid}" is replaced).
+    Returns False when profiling was not enabled.
+    """
+    if _profiler is None:
+        return False
+    _profiler.dump_stats(path.replace("{pid}", str(os.getpid())))
+    return True
+
+
+def _configure_from_environment():
+    metrics_path = os.environ.get("MORLEY_METRICS")
+    profile_path = os.environ.get("MORLEY_PROFILE")
+    if not metrics_path and not profile_path:
+        return
+    enable(profile=bool(profile_path))
+    if metrics_path:
+        atexit.register(dump_metrics, metrics_path)
+    if profile_path:
+        atexit.register(dump_profile, profile_path)
+
+
+_configure_from_environment()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a pipeline script with instrumentation enabled.")
+    parser.add_argument("--metrics", default="-", help="Metrics JSON output (default: stdout)")
+    parser.add_argument("--profile", default=None, help="Write cProfile statistics of the instrumented stages here")
+    parser.add_argument("script", help="Script to run, e.g. src/ll_parser.py")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER, help="Arguments passed to the script")
+    args = parser.parse_args()
+
+    # Share this module with the script, whichever way it imports it
+    sys.modules.setdefault("instrumentation", sys.modules[__name__])
+    sys.modules.setdefault("src.instrumentation", sys.modules[__name__])
+    enable(profile=bool(args.profile))
+    sys.argv = [args.script] + [arg for arg in args.script_args if arg != "--"]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    try:
+        runpy.run_path(args.script, run_name="__main__")
+    finally:
+        dump_metrics(args.metrics)
+        if args.profile:
+            dump_profile(args.profile)
@@ -0,0 +1,387 @@
+"""
+Binary IR Container
+A compact, versioned binary format for LadderCore IR with a memory-mapped reader.
+
+Layout (little-endian):
+- Header: magic "MIRB", format version (u16), reserved (u16), section count (u32).
+- Directory: one (name: 24 bytes, offset: u64, length: u64) record per section.
+- "strings":      string count (u32), offsets (u32 × count+1), UTF-8 blob.
+                  Ids below the program's symbol count are its tag symbols.
+- "opcode_names": string ids (u32) of the file-local opcode table.
+- "opcodes":      file-local opcode per instruction (u16).
+- "arg_offsets":  argument offsets (u32 × instructions+1).
+- "args":         argument string ids (u32).
+- "rungs":        first instruction index of every rung (u32).
+- "scan_cycle":   file-local opcode per scan cycle entry (u16).
+- "sec:<name>":   entry count (u32), name ids (u32 × count), record offsets
+                  (u32 × count+1), compact-JSON records.
+- "meta":         JSON with top-level key order, scalar keys and instruction extras.
+
+Every section starts on a 4-byte boundary, so the reader can view the arrays
+in place through `memoryview.cast` without copying.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+try:
+    from src.ir_model import IRProgram, opcode_name
+    from src.ll_parser import rung_starts
+except ImportError:  # Run as a script from inside src/
+    from ir_model import IRProgram, opcode_name
+    from ll_parser import rung_starts
+
+MAGIC = b"MIRB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+DIRECTORY_ENTRY = struct.Struct("<24sQQ")
+SECTION_PREFIX = "sec:"
+
+
+class IRFormatError(ValueError):
+    """
+    Raised when a file is not a readable binary IR container.
+    """
+
+
+def _little_endian(values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pad(blob):
+    return blob + b"\0" * (-len(blob) % 4)
+
+
+def dumps(ir_data):
+    """
+    Serializes an IR dict (or `IRProgram`) into the binary container format.
+    """
+    program = ir_data if isinstance(ir_data, IRProgram) else IRProgram.from_dict(ir_data)
+
+    strings = []
+    string_ids = {}
+    json_symbols = []
+
+    def intern(text):
+        string_id = string_ids.get(text)
+        if string_id is None:
+            string_id = string_ids[text] = len(strings)
+            strings.append(text)
+        return string_id
+
+    # Symbol ids double as string ids so the args column needs no remapping.
+    for symbol, name in enumerate(program.symbols.names):
+        if not isinstance(name, str):
+            json_symbols.append(symbol)
+            name = json.dumps(name)
+        strings.append(name)
+        string_ids.setdefault(name, symbol)
+
+    local_opcodes = {}
+    opcode_names = array("I")
+
+    def local_opcode(code):
+        local = local_opcodes.get(code)
+        if local is None:
+            local = local_opcodes[code] = len(opcode_names)
+            opcode_names.append(intern(opcode_name(code)))
+        return local
+
+    opcodes = array("H", (local_opcode(code) for code in program.opcodes))
+    rungs = array("I", rung_starts(opcode_name(code) for code in program.opcodes))
+    scan_cycle = None
+    if program.scan_cycle is not None:
+        scan_cycle = array("H", (local_opcode(code) for code in program.scan_cycle))
+
+    sections = [
+        ("opcode_names", _little_endian(opcode_names)),
+        ("opcodes", _little_endian(opcodes)),
+        ("arg_offsets", _little_endian(program.arg_offsets)),
+        ("args", _little_endian(program.args)),
+        ("rungs", _little_endian(rungs)),
+    ]
+    if scan_cycle is not None:
+        sections.append(("scan_cycle", _little_endian(scan_cycle)))
+
+    for section_name, entries in program.sections.items():
+        name_ids = array("I")
+        offsets = array("I", [0])
+        records = bytearray()
+        for name, entry in entries.items():
+            name_ids.append(intern(name))
+            records += json.dumps(entry.to_dict(), separators=(",", ":")).encode("utf-8")
+            offsets.append(len(records))
+        blob = struct.pack("<I", len(name_ids)) + _little_endian(name_ids) + _little_endian(offsets) + bytes(records)
+        sections.append((SECTION_PREFIX + section_name, blob))
+
+    meta = {
+        "key_order": list(program.key_order),
+        "meta": program.meta,
+        "symbol_count": len(program.symbols),
+        "json_symbols": json_symbols,
+        "instruction_extra": {str(index): extra for index, extra in program.instruction_extra.items()},
+    }
+    sections.append(("meta", json.dumps(meta, separators=(",", ":")).encode("utf-8")))
+
+    encoded = [text.encode("utf-8") for text in strings]
+    string_offsets = array("I", [0])
+    for blob in encoded:
+        string_offsets.append(string_offsets[-1] + len(blob))
+    string_section = struct.pack("<I", len(encoded)) + _little_endian(string_offsets) + b"".join(encoded)
+    sections.insert(0, ("strings", string_section))
+
+    header_size = HEADER.size + DIRECTORY_ENTRY.size * len(sections)
+    directory = []
+    body = []
+    offset = header_size + (-header_size % 4)
+    for name, blob in sections:
+        directory.append(DIRECTORY_ENTRY.pack(name.encode("ascii"), offset, len(blob)))
+        padded = _pad(blob)
+        body.append(padded)
+        offset += len(padded)
+
+    head = HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(sections)) + b"".join(directory)
+    return _pad(head) + b"".join(body)
+
+
+def write_ir(ir_data, path):
+    """
+    Writes an IR dict (or `IRProgram`) to a binary container file.
+    """
+    with open(path, "wb") as f:
+        f.write(dumps(ir_data))
+
+
+class IRBinaryReader:
+    """
+    Random-access reader over a memory-mapped binary IR container.
+
+    Nothing beyond the header and directory is decoded until it is asked for.
+    Use as a context manager, or call `close()` when done.
+    """
+
+    def __init__(self, source):
+        self._file = None
+        if isinstance(source, (bytes, bytearray)):
+            self._buffer = bytes(source)
+        else:
+            self._file = open(source, "rb")
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._buffer)
+        self._views = [self._view]
+        self._strings = {}
+
+        try:
+            magic, version, _, count = HEADER.unpack_from(self._buffer, 0)
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            self.close()
+            raise IRFormatError("Not a binary IR container")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise IRFormatError(f"Unsupported binary IR version: {version}")
+
+        self._directory = {}
+        for index in range(count):
+            raw_name, offset, length = DIRECTORY_ENTRY.unpack_from(self._buffer, HEADER.size + index * DIRECTORY_ENTRY.size)
+            self._directory[raw_name.rstrip(b"\0").decode("ascii")] = (offset, length)
+
+        strings_offset, _ = self._directory["strings"]
+        string_count = struct.unpack_from("<I", self._buffer, strings_offset)[0]
+        self._string_offsets = self._array(strings_offset + 4, string_count + 1, "I")
+        self._string_base = strings_offset + 4 + 4 * (string_count + 1)
+
+        self.opcode_names = [self.string(i) for i in self._section_array("opcode_names", "I")]
+        self._opcodes = self._section_array("opcodes", "H")
+        self._arg_offsets = self._section_array("arg_offsets", "I")
+        self._args = self._section_array("args", "I")
+        self._rungs = self._section_array("rungs", "I")
+        self._meta = None
+        self._sections = {}
+
+    def _array(self, offset, count, typecode):
+        size = struct.calcsize(typecode)
+        view = self._view[offset:offset + count * size]
+        if sys.byteorder == "little":
+            view = view.cast(typecode)
+            self._views.append(view)
+            return view
+        values = array(typecode, view)
+        values.byteswap()
+        return values
+
+    def _section_array(self, name, typecode):
+        if name not in self._directory:
+            return ()
+        offset, length = self._directory[name]
+        return self._array(offset, length // struct.calcsize(typecode), typecode)
+
+    def close(self):
+        """
+        Releases the memory views and unmaps the file.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._file is not None:
+            self._buffer.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def string(self, string_id):
+        """
+        Decodes string `string_id` from the string table, caching the result.
+        """
+        text = self._strings.get(string_id)
+        if text is None:
+            start = self._string_base + self._string_offsets[string_id]
+            end = self._string_base + self._string_offsets[string_id + 1]
+            text = self._strings[string_id] = bytes(self._view[start:end]).decode("utf-8")
+        return text
+
+    @property
+    def meta(self):
+        if self._meta is None:
+            offset, length = self._directory["meta"]
+            self._meta = json.loads(bytes(self._view[offset:offset + length]))
+            self._meta["json_symbols"] = set(self._meta["json_symbols"])
+        return self._meta
+
+    def _symbol(self, symbol):
+        text = self.string(symbol)
+        return json.loads(text) if symbol in self.meta["json_symbols"] else text
+
+    def __len__(self):
+        return len(self._opcodes)
+
+    def opcode(self, index):
+        """
+        Returns the instruction name of instruction `index`.
+        """
+        return self.opcode_names[self._opcodes[index]]
+
+    def instruction(self, index):
+        """
+        Decodes instruction `index` into IR dict form.
+        """
+        args = self._args[self._arg_offsets[index]:self._arg_offsets[index + 1]]
+        instr = {"type": self.opcode(index), "args": [self._symbol(symbol) for symbol in args]}
+        extra = self.meta["instruction_extra"].get(str(index))
+        if extra:
+            if extra.get("__no_args__"):
+                del instr["args"]
+            order = extra.get("__order__")
+            instr.update((k, v) for k, v in extra.items() if k not in ("__order__", "__no_args__"))
+            if order is not None:
+                instr = {k: instr[k] for k in order}
+        return instr
+
+    @property
+    def rung_count(self):
+        return len(self._rungs)
+
+    def rung(self, index):
+        """
+        Decodes the instructions of rung `index`.
+        """
+        start = self._rungs[index]
+        end = self._rungs[index + 1] if index + 1 < len(self._rungs) else len(self)
+        return [self.instruction(i) for i in range(start, end)]
+
+    def section_names(self):
+        """
+        Returns the names of the category sections present in the file.
+        """
+        return [name[len(SECTION_PREFIX):] for name in self._directory if name.startswith(SECTION_PREFIX)]
+
+    def _section(self, section):
+        cached = self._sections.get(section)
+        if cached is None:
+            offset, _ = self._directory[SECTION_PREFIX + section]
+            count = struct.unpack_from("<I", self._buffer, offset)[0]
+            name_ids = self._array(offset + 4, count, "I")
+            record_offsets = self._array(offset + 4 + 4 * count, count + 1, "I")
+            base = offset + 4 + 8 * count + 4
+            cached = self._sections[section] = (name_ids, record_offsets, base)
+        return cached
+
+    def section_size(self, section):
+        return len(self._section(section)[0])
+
+    def section_entry(self, section, key):
+        """
+        Decodes one entry of a category section by position or by name.
+
+        Returns (name, entry dict); raises KeyError for unknown names.
+        """
+        name_ids, record_offsets, base = self._section(section)
+        if isinstance(key, int):
+            index = key
+        else:
+            for index, name_id in enumerate(name_ids):
+                if self.string(name_id) == key:
+                    break
+            else:
+                raise KeyError(key)
+        start, end = base + record_offsets[index], base + record_offsets[index + 1]
+        return self.string(name_ids[index]), json.loads(bytes(self._view[start:end]))
+
+    def iter_section(self, section):
+        """
+        Yields (name, entry dict) pairs of a category section in order.
+        """
+        for index in range(self.section_size(section)):
+            yield self.section_entry(section, index)
+
+    def scan_cycle(self):
+        return [self.opcode_names[code] for code in self._section_array("scan_cycle", "H")]
+
+    def to_dict(self):
+        """
+        Materializes the whole container back into an IR dict.
+        """
+        meta = self.meta
+        sections = set(self.section_names())
+        ir_data = {}
+        for key in meta["key_order"]:
+            if key == "instructions":
+                ir_data[key] = [self.instruction(index) for index in range(len(self))]
+            elif key == "scan_cycle" and "scan_cycle" in self._directory:
+                ir_data[key] = self.scan_cycle()
+            elif key in sections:
+                ir_data[key] = dict(self.iter_section(key))
+            else:
+                ir_data[key] = meta["meta"][key]
+        return ir_data
+
+
+def read_ir(path):
+    """
+    Reads a binary IR container fully back into an IR dict.
+    """
+    with IRBinaryReader(path) as reader:
+        return reader.to_dict()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "pack":
+        with open(sys.argv[2], "r", encoding="utf-8") as f:
+            write_ir(json.load(f), sys.argv[3])
+    elif len(sys.argv) == 3 and sys.argv[1] == "unpack":
+        print(json.dumps(read_ir(sys.argv[2]), indent=2))
+    else:
+        print("Usage: python src/ir_binary.py pack input.ir output.irb | unpack input.irb")
+        sys.exit(1)
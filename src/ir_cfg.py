@@ -0,0 +1,195 @@
+"""
+IR Control-Flow Graph
+Splits the LadderCore instruction stream into basic blocks and resolves jumps, labels and subroutine calls.
+
+Overview:
+- `LBL` pseudo-instructions (emitted by the parsers for `NAME:`) start blocks;
+  `JMP`/`JMPC`/`JMPCN`, `CALL` and `RET`/`RETC`/`RETCN` end them.
+- Every block lists its successors: jump targets, the fall-through block and,
+  for `CALL`, the return site. Calls to a label mark it as a subroutine entry.
+- Reachability runs from the first block; the compiler and the interpreters
+  use it to drop unreachable blocks before emission or execution.
+- Jumps to undefined labels are recorded in `unresolved` and end the scan.
+"""
+
+import json
+import sys
+
+LABEL = "LBL"
+JUMP_OPCODES = frozenset(["JMP", "JMPC", "JMPCN"])
+CALL_OPCODES = frozenset(["CALL"])
+RETURN_OPCODES = frozenset(["RET", "RETC", "RETCN"])
+CONDITIONAL_OPCODES = frozenset(["JMPC", "JMPCN", "RETC", "RETCN"])
+TRANSFER_OPCODES = JUMP_OPCODES | CALL_OPCODES | RETURN_OPCODES
+CONTROL_OPCODES = TRANSFER_OPCODES | {LABEL}
+
+
+def is_control(instruction_type):
+    """
+    Returns True for labels and control transfers, which carry no rung logic.
+    """
+    return instruction_type.upper() in CONTROL_OPCODES
+
+
+class BasicBlock:
+    """
+    Instructions [start, end) with at most one control transfer, as the last instruction.
+    """
+    __slots__ = ("index", "start", "end", "labels", "terminator", "target", "fallthrough", "successors", "reachable")
+
+    def __init__(self, index, start, end):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.labels = []
+        self.terminator = None
+        self.target = None
+        self.fallthrough = None
+        self.successors = []
+        self.reachable = False
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, [{self.start}, {self.end}), {self.terminator}, -> {self.successors})"
+
+
+class ControlFlowGraph:
+    """
+    Basic blocks of one instruction stream, with label resolution and reachability.
+    """
+
+    def __init__(self, instructions, blocks, labels, subroutines, unresolved):
+        self.instructions = instructions
+        self.blocks = blocks
+        self.labels = labels
+        self.subroutines = subroutines
+        self.unresolved = unresolved
+
+    @property
+    def has_control_flow(self):
+        return any(block.terminator for block in self.blocks)
+
+    def reachable_blocks(self):
+        return [block for block in self.blocks if block.reachable]
+
+    def unreachable_blocks(self):
+        return [block for block in self.blocks if not block.reachable]
+
+    def live_instructions(self):
+        """
+        Yields (index, instruction) for every instruction in a reachable block.
+        """
+        instructions = self.instructions
+        for block in self.blocks:
+            if block.reachable:
+                for index in range(block.start, block.end):
+                    yield index, instructions[index]
+
+    def summary(self):
+        """
+        Returns a JSON-serializable description of the graph.
+        """
+        return {
+            "blocks": [
+                {
+                    "index": block.index, "start": block.start, "end": block.end,
+                    "labels": block.labels, "terminator": block.terminator,
+                    "successors": block.successors, "reachable": block.reachable
+                }
+                for block in self.blocks
+            ],
+            "subroutines": sorted(self.subroutines),
+            "unresolved": sorted(self.unresolved),
+            "unreachable_instructions": sum(block.end - block.start for block in self.unreachable_blocks())
+        }
+
+
+def build_cfg(instructions):
+    """
+    Builds the control-flow graph of an IR instruction list.
+    """
+    count = len(instructions)
+    leaders = {0} if count else set()
+    for index, instr in enumerate(instructions):
+        instruction_type = instr["type"].upper()
+        if instruction_type == LABEL:
+            leaders.add(index)
+        elif instruction_type in TRANSFER_OPCODES and index + 1 < count:
+            leaders.add(index + 1)
+    starts = sorted(leaders)
+
+    blocks = [
+        BasicBlock(number, start, starts[number + 1] if number + 1 < len(starts) else count)
+        for number, start in enumerate(starts)
+    ]
+    labels = {}
+    for block in blocks:
+        for index in range(block.start, block.end):
+            instr = instructions[index]
+            if instr["type"].upper() == LABEL and instr.get("args"):
+                name = instr["args"][0]
+                labels.setdefault(name, block.index)
+                block.labels.append(name)
+
+    subroutines = set()
+    unresolved = set()
+    for block in blocks:
+        fallthrough = block.index + 1 if block.index + 1 < len(blocks) else None
+        block.fallthrough = fallthrough
+        last = instructions[block.end - 1]
+        terminator = last["type"].upper()
+        if terminator not in TRANSFER_OPCODES:
+            block.successors = [fallthrough] if fallthrough is not None else []
+            continue
+
+        block.terminator = terminator
+        successors = []
+        if terminator in JUMP_OPCODES or terminator in CALL_OPCODES:
+            name = last["args"][0] if last.get("args") else None
+            block.target = labels.get(name)
+            if block.target is None:
+                unresolved.add(name)
+            else:
+                successors.append(block.target)
+                if terminator in CALL_OPCODES:
+                    subroutines.add(block.target)
+        if terminator in CONDITIONAL_OPCODES or terminator in CALL_OPCODES:
+            if fallthrough is not None:
+                successors.append(fallthrough)
+        block.successors = list(dict.fromkeys(successors))
+
+    if blocks:
+        stack = [0]
+        while stack:
+            block = blocks[stack.pop()]
+            if block.reachable:
+                continue
+            block.reachable = True
+            stack.extend(block.successors)
+
+    return ControlFlowGraph(instructions, blocks, labels, subroutines, unresolved)
+
+
+def eliminate_unreachable(ir_data):
+    """
+    Returns the IR with instructions in unreachable blocks removed.
+
+    The input is returned unchanged when every block is reachable.
+    """
+    instructions = ir_data.get("instructions", [])
+    cfg = build_cfg(instructions)
+    if all(block.reachable for block in cfg.blocks):
+        return ir_data
+    pruned = dict(ir_data)
+    pruned["instructions"] = [instr for _, instr in cfg.live_instructions()]
+    if len(ir_data.get("scan_cycle", [])) == len(instructions):
+        live = {index for index, _ in cfg.live_instructions()}
+        pruned["scan_cycle"] = [t for index, t in enumerate(ir_data["scan_cycle"]) if index in live]
+    return pruned
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python src/ir_cfg.py program.ir")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        print(json.dumps(build_cfg(json.load(f).get("instructions", [])).summary(), indent=2))
@@ -0,0 +1,313 @@
+"""
+Compact IR Model
+A typed, memory-efficient in-memory form of LadderCore IR.
+
+Overview:
+- Opcodes are interned as a small IntEnum; unknown opcodes get stable ids past the enum.
+- Tag names and other strings are interned once into a per-program symbol table.
+- The instruction stream is stored in three `array` columns (opcode, argument
+  offset, argument symbol ids) instead of one dict and list per instruction.
+- Named sections (timers, counters, ...) use `__slots__` entry classes.
+- Conversion to and from the JSON IR dict is lossless: `IRProgram.from_dict(ir).to_dict() == ir`.
+"""
+
+import sys
+from array import array
+from enum import IntEnum
+
+OPCODE_NAMES = (
+    "INPUT", "OUTPUT", "AND", "OR", "NOT", "XOR",
+    "LD", "LDN", "ST", "STN", "S", "R", "ANDN", "ORN", "XORN",
+    "ADD", "SUB", "MUL", "DIV", "MOD", "MOV",
+    "GT", "GE", "EQ", "NE", "LE", "LT",
+    "JMP", "JMPC", "JMPCN", "CALL", "CAL", "CALC", "CALCN", "RET", "RETC", "RETCN", "LBL",
+    "TON", "TOF", "TP", "CTU", "CTD",
+)
+
+Opcode = IntEnum("Opcode", OPCODE_NAMES, start=0)
+
+# Opcodes outside the enum are interned process-wide so ids stay stable
+# between programs.
+_opcode_names = list(OPCODE_NAMES)
+_opcode_ids = {name: code for code, name in enumerate(OPCODE_NAMES)}
+_opcode_lower = [name.lower() for name in OPCODE_NAMES]
+
+
+def opcode_for(name):
+    """
+    Returns the integer opcode for an instruction name, interning unknown names.
+    """
+    code = _opcode_ids.get(name)
+    if code is None:
+        code = _opcode_ids[name] = len(_opcode_names)
+        _opcode_names.append(name)
+        _opcode_lower.append(name.lower())
+    return code
+
+
+def opcode_name(code):
+    """
+    Returns the instruction name for an integer opcode.
+    """
+    return _opcode_names[code]
+
+
+def opcode_lower(code):
+    """
+    Returns the lower-cased instruction name, as used in generated trace messages.
+    """
+    return _opcode_lower[code]
+
+
+class SymbolTable:
+    """
+    Interns strings to dense integer ids.
+    """
+    __slots__ = ("names", "ids")
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def intern(self, name):
+        symbol = self.ids.get(name)
+        if symbol is None:
+            symbol = self.ids[name] = len(self.names)
+            self.names.append(sys.intern(name) if isinstance(name, str) else name)
+        return symbol
+
+    def __getitem__(self, symbol):
+        return self.names[symbol]
+
+    def __len__(self):
+        return len(self.names)
+
+
+_MISSING = object()
+
+
+class SectionEntry:
+    """
+    Base class for named IR section entries.
+
+    Subclasses list their attributes in `FIELDS` as (attribute, IR key) pairs;
+    keys not covered by `FIELDS` are preserved in `extra`.
+    """
+    __slots__ = ("name", "extra")
+    FIELDS = ()
+
+    def __init__(self, name, extra=None, **values):
+        self.name = name
+        self.extra = extra
+        for attribute, _ in self.FIELDS:
+            setattr(self, attribute, values.get(attribute, _MISSING))
+
+    @classmethod
+    def from_dict(cls, name, data):
+        known = {key for _, key in cls.FIELDS}
+        values = {attribute: data[key] for attribute, key in cls.FIELDS if key in data}
+        extra = {key: value for key, value in data.items() if key not in known} or None
+        if extra is not None or list(data) != [key for _, key in cls.FIELDS if key in data]:
+            # Keep the original key order when it differs from FIELDS.
+            extra = dict(extra or {})
+            extra["__order__"] = list(data)
+        return cls(name, extra=extra, **values)
+
+    def to_dict(self):
+        data = {}
+        for attribute, key in self.FIELDS:
+            value = getattr(self, attribute)
+            if value is not _MISSING:
+                data[key] = value
+        if self.extra:
+            order = self.extra.get("__order__")
+            data.update((key, value) for key, value in self.extra.items() if key != "__order__")
+            if order is not None:
+                data = {key: data[key] for key in order}
+        return data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.name == other.name and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.to_dict()!r})"
+
+
+class Timer(SectionEntry):
+    __slots__ = ("kind", "duration")
+    FIELDS = (("kind", "type"), ("duration", "duration"))
+
+
+class Counter(SectionEntry):
+    __slots__ = ("kind", "preset")
+    FIELDS = (("kind", "type"), ("preset", "preset"))
+
+
+class MathOperation(SectionEntry):
+    __slots__ = ("operation", "args")
+    FIELDS = (("operation", "operation"), ("args", "args"))
+
+
+class Comparator(SectionEntry):
+    __slots__ = ("comparison", "args")
+    FIELDS = (("comparison", "comparison"), ("args", "args"))
+
+
+class Latch(SectionEntry):
+    __slots__ = ("latch_type",)
+    FIELDS = (("latch_type", "latch_type"),)
+
+
+class Jump(SectionEntry):
+    __slots__ = ("jump_type",)
+    FIELDS = (("jump_type", "jump_type"),)
+
+
+class FunctionBlock(SectionEntry):
+    __slots__ = ("args",)
+    FIELDS = (("args", "args"),)
+
+
+class Variable(SectionEntry):
+    __slots__ = ("var_type", "initial")
+    FIELDS = (("var_type", "type"), ("initial", "initial"))
+
+
+SECTION_TYPES = {
+    "timers": Timer,
+    "counters": Counter,
+    "math_operations": MathOperation,
+    "comparators": Comparator,
+    "set_reset_latches": Latch,
+    "jump_instructions": Jump,
+    "function_blocks": FunctionBlock,
+    "variables": Variable,
+}
+
+
+class IRProgram:
+    """
+    Array-backed LadderCore IR program.
+
+    Instruction `i` has opcode `opcodes[i]` and argument symbol ids
+    `args[arg_offsets[i]:arg_offsets[i + 1]]`.
+    """
+    __slots__ = ("symbols", "opcodes", "arg_offsets", "args", "instruction_extra",
+                 "sections", "scan_cycle", "meta", "key_order")
+
+    def __init__(self):
+        self.symbols = SymbolTable()
+        self.opcodes = array("H")
+        self.arg_offsets = array("I", [0])
+        self.args = array("I")
+        self.instruction_extra = {}
+        self.sections = {}
+        self.scan_cycle = None
+        self.meta = {}
+        self.key_order = ()
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def append_instruction(self, opcode, arg_names, extra=None):
+        """
+        Appends an instruction given its opcode name (or id) and argument names.
+        """
+        if isinstance(opcode, str):
+            opcode = opcode_for(opcode)
+        intern = self.symbols.intern
+        self.opcodes.append(opcode)
+        self.args.extend(intern(name) for name in arg_names)
+        self.arg_offsets.append(len(self.args))
+        if extra:
+            self.instruction_extra[len(self.opcodes) - 1] = extra
+
+    def arg_ids(self, index):
+        """
+        Returns the argument symbol ids of instruction `index`.
+        """
+        return self.args[self.arg_offsets[index]:self.arg_offsets[index + 1]]
+
+    def arg_names(self, index):
+        """
+        Returns the argument names of instruction `index`.
+        """
+        names = self.symbols.names
+        return [names[symbol] for symbol in self.arg_ids(index)]
+
+    def iter_instructions(self):
+        """
+        Yields (opcode, argument symbol ids) for every instruction.
+        """
+        opcodes, offsets, args = self.opcodes, self.arg_offsets, self.args
+        for index in range(len(opcodes)):
+            yield opcodes[index], args[offsets[index]:offsets[index + 1]]
+
+    @classmethod
+    def from_dict(cls, ir_data):
+        """
+        Builds a compact program from a LadderCore IR dict.
+        """
+        program = cls()
+        program.key_order = tuple(ir_data)
+        for key, value in ir_data.items():
+            if key == "instructions":
+                for instr in value:
+                    extra = {k: v for k, v in instr.items() if k not in ("type", "args")} or None
+                    if list(instr)[:2] != ["type", "args"]:
+                        extra = dict(extra or {}, __order__=list(instr))
+                    program.append_instruction(instr["type"], instr.get("args", ()), extra)
+                    if "args" not in instr:
+                        program.instruction_extra.setdefault(len(program) - 1, {})["__no_args__"] = True
+            elif key == "scan_cycle" and isinstance(value, list):
+                program.scan_cycle = array("H", (opcode_for(name) for name in value))
+            elif key in SECTION_TYPES and isinstance(value, dict) and all(
+                    isinstance(entry, dict) for entry in value.values()):
+                entry_type = SECTION_TYPES[key]
+                program.sections[key] = {
+                    sys.intern(name): entry_type.from_dict(name, entry) for name, entry in value.items()
+                }
+            else:
+                program.meta[key] = value
+        return program
+
+    def instruction_dict(self, index):
+        """
+        Returns instruction `index` in IR dict form.
+        """
+        instr = {"type": _opcode_names[self.opcodes[index]], "args": self.arg_names(index)}
+        extra = self.instruction_extra.get(index)
+        if extra:
+            if extra.get("__no_args__"):
+                del instr["args"]
+            order = extra.get("__order__")
+            instr.update((k, v) for k, v in extra.items() if k not in ("__order__", "__no_args__"))
+            if order is not None:
+                instr = {k: instr[k] for k in order}
+        return instr
+
+    def to_dict(self):
+        """
+        Converts back to the LadderCore IR dict accepted by the validator and compiler.
+        """
+        ir_data = {}
+        for key in self.key_order:
+            if key == "instructions":
+                ir_data[key] = [self.instruction_dict(index) for index in range(len(self))]
+            elif key == "scan_cycle" and self.scan_cycle is not None:
+                ir_data[key] = [_opcode_names[code] for code in self.scan_cycle]
+            elif key in self.sections:
+                ir_data[key] = {name: entry.to_dict() for name, entry in self.sections[key].items()}
+            else:
+                ir_data[key] = self.meta[key]
+        return ir_data
+
+    def nbytes(self):
+        """
+        Approximate size of the instruction columns in bytes.
+        """
+        columns = (self.opcodes, self.arg_offsets, self.args)
+        total = sum(column.itemsize * len(column) for column in columns)
+        if self.scan_cycle is not None:
+            total += self.scan_cycle.itemsize * len(self.scan_cycle)
+        return total
@@ -1,15 +1,88 @@
 """
 LL-Parser: Converts Ladder Logic into full LadderCore IR format.
 Ensures support for all OpenPLC components.
+
+The parser is streaming and single-pass: it accepts a string, an open file or
+any iterable of lines, tokenizes each line once against a table-driven lexer
+and builds the IR dict incrementally. Besides the legacy one-line forms
+(``INPUT X1``, ``TON Timer1 5000``) it understands the IEC 61131-3
+Instruction List forms used in ``examples/basic_example.ll``: ``VAR ... END_VAR``
+declaration blocks, ``(* ... *)`` comments (including multi-line ones),
+``LD``/``ST`` and their negated/modified variants, labels and FB calls.
+Labels and jumps stay in the instruction stream (``LBL``, ``JMPC``, ...) so
+the control-flow stage in ``ir_cfg`` can place them. Symbolic comparators
+(``>``, ``==``, ...) are stored under their IL names and a ``CAL`` without
+``PT``/``PV`` gets a zero preset, so parser output always validates.
 """
 
 import json
+import re
+import sys
 
-def parse_ladder_logic(ladder_code):
+try:
+    from src.instrumentation import count, stage
+except ImportError:  # Run as a script from inside src/
+    from instrumentation import count, stage
+
+# Lexer table: opcode -> token class. Each source line is looked up once.
+INSTRUCTION = 0
+TIMER = 1
+COUNTER = 2
+MATH = 3
+COMPARATOR = 4
+LATCH = 5
+JUMP = 6
+FUNCTION_BLOCK = 7
+CALL = 8
+
+OPCODE_TABLE = {
+    # Legacy LadderCore forms
+    "INPUT": INSTRUCTION, "OUTPUT": INSTRUCTION,
+    "AND": INSTRUCTION, "OR": INSTRUCTION, "NOT": INSTRUCTION, "XOR": INSTRUCTION,
+    # IEC Instruction List accumulator forms
+    "LD": INSTRUCTION, "LDN": INSTRUCTION, "ST": INSTRUCTION, "STN": INSTRUCTION,
+    "S": INSTRUCTION, "R": INSTRUCTION,
+    "ANDN": INSTRUCTION, "ORN": INSTRUCTION, "XORN": INSTRUCTION,
+    "TON": TIMER, "TOF": TIMER, "TP": TIMER,
+    "CTU": COUNTER, "CTD": COUNTER,
+    "ADD": MATH, "SUB": MATH, "MUL": MATH, "DIV": MATH, "MOD": MATH, "MOV": MATH,
+    ">": COMPARATOR, "<": COMPARATOR, "==": COMPARATOR, "!=": COMPARATOR,
+    "GT": COMPARATOR, "GE": COMPARATOR, "EQ": COMPARATOR,
+    "NE": COMPARATOR, "LE": COMPARATOR, "LT": COMPARATOR,
+    "SR": LATCH, "RS": LATCH,
+    "JMP": JUMP, "JMPC": JUMP, "JMPCN": JUMP,
+    "CALL": JUMP, "RET": JUMP, "RETC": JUMP, "RETCN": JUMP,
+    "FB": FUNCTION_BLOCK,
+    "CAL": CALL, "CALC": CALL, "CALCN": CALL,
+}
+
+# Instructions that load a fresh value into the accumulator and therefore
+# open a new rung once the previous one has been stored.
+LOAD_OPCODES = frozenset(["INPUT", "LD", "LDN"])
+STORE_OPCODES = frozenset(["OUTPUT", "ST", "STN", "S", "R"])
+# Labels open a rung and control transfers close one, like loads and stores.
+RUNG_OPENERS = LOAD_OPCODES | {"LBL"}
+RUNG_CLOSERS = STORE_OPCODES | frozenset(op for op, kind in OPCODE_TABLE.items() if kind == JUMP)
+
+TIMER_TYPES = frozenset(["TON", "TOF", "TP"])
+# Keywords that open a declaration block (matched exactly, so labels such as `VARIANT_B:` are not blocks)
+VAR_KEYWORDS = frozenset(["VAR", "VAR_INPUT", "VAR_OUTPUT", "VAR_IN_OUT", "VAR_TEMP", "VAR_GLOBAL", "VAR_EXTERNAL"])
+COUNTER_TYPES = frozenset(["CTU", "CTD"])
+# Symbolic comparators are stored under their IL names so every later stage sees one spelling.
+COMPARATOR_NAMES = {">": "GT", "<": "LT", "==": "EQ", "!=": "NE"}
+# Presets used when a CAL omits PT/PV
+DEFAULT_DURATION = "T#0S"
+DEFAULT_PRESET = "0"
+
+PARAM_PATTERN = re.compile(r"(\w+)\s*:=\s*([^,)]+)")
+DECLARATION_PATTERN = re.compile(r"^([\w\s,]+?)\s*:\s*([\w#.]+)\s*(?::=\s*([^;]+?))?\s*;?$")
+
+
+def new_ir():
     """
-    Parses Ladder Logic and converts it into LadderCore IR.
+    Returns an empty LadderCore IR dict.
     """
-    ir_representation = {
+    return {
         "type": "LadderCore IR",
         "instructions": [],
         "timers": {},
@@ -19,46 +92,304 @@ def parse_ladder_logic(ladder_code):
         "set_reset_latches": {},
         "jump_instructions": {},
         "function_blocks": {},
+        "variables": {},
         "scan_cycle": []
     }
 
-    for line in ladder_code.split("\n"):
-        tokens = line.split()
 
+def rung_starts(instruction_types):
+    """
+    Returns the index of the first instruction of every rung, using the same
+    rule as the parser: a load or label that follows a store or jump opens a new rung.
+    """
+    starts = []
+    stored = False
+    for index, instruction in enumerate(instruction_types):
+        if not starts:
+            starts.append(index)
+        elif instruction in RUNG_OPENERS and stored:
+            starts.append(index)
+            stored = False
+        if instruction in RUNG_CLOSERS:
+            stored = True
+    return starts
+
+
+def record_jump(jump_instructions, target, jump_type):
+    """
+    Records a jump or label in ``jump_instructions``; a label never replaces a jump to it.
+    """
+    if jump_type == "LBL":
+        jump_instructions.setdefault(target, {"jump_type": jump_type})
+    else:
+        jump_instructions[target] = {"jump_type": jump_type}
+
+
+def _iter_lines(source):
+    """
+    Yields lines from a string, a file object or any iterable of lines.
+    """
+    if isinstance(source, str):
+        return iter(source.splitlines())
+    return iter(source)
+
+
+class LadderLogicParser:
+    """
+    Incremental Instruction List parser.
+
+    Feed it one line at a time; completed rungs are returned by ``feed`` and
+    the IR dict under construction is available as ``ir``.
+    """
+
+    def __init__(self):
+        self.ir = new_ir()
+        self._in_comment = False
+        self._in_var_block = False
+        self._rung = None
+        self._rung_stored = False
+        self._rung_index = 0
+
+    def _strip_comments(self, line):
+        """
+        Removes ``(* ... *)`` and ``//`` comments, tracking multi-line blocks.
+        """
+        if self._in_comment:
+            end = line.find("*)")
+            if end < 0:
+                return ""
+            self._in_comment = False
+            line = line[end + 2:]
+
+        if "(*" in line:
+            parts = []
+            while True:
+                start = line.find("(*")
+                if start < 0:
+                    parts.append(line)
+                    break
+                parts.append(line[:start])
+                end = line.find("*)", start + 2)
+                if end < 0:
+                    self._in_comment = True
+                    break
+                line = line[end + 2:]
+            line = " ".join(parts)
+
+        slash = line.find("//")
+        if slash >= 0:
+            line = line[:slash]
+        return line
+
+    def _declare(self, line):
+        """
+        Records a ``NAME[, NAME] : TYPE [:= INITIAL];`` declaration.
+        """
+        match = DECLARATION_PATTERN.match(line.strip())
+        if not match:
+            return
+        names, var_type, initial = match.groups()
+        for name in names.split(","):
+            name = name.strip()
+            if name:
+                entry = {"type": var_type.upper()}
+                if initial is not None:
+                    entry["initial"] = initial.strip()
+                self.ir["variables"][name] = entry
+
+    def _close_rung(self):
+        rung = self._rung
+        self._rung = None
+        self._rung_stored = False
+        if rung is not None:
+            self._rung_index += 1
+        return rung
+
+    def _emit_instruction(self, instruction, args):
+        finished = None
+        if instruction in RUNG_OPENERS and self._rung_stored:
+            finished = self._close_rung()
+        if self._rung is None:
+            self._rung = {
+                "index": self._rung_index,
+                "start": len(self.ir["instructions"]),
+                "instructions": []
+            }
+        entry = {"type": instruction, "args": args}
+        self.ir["instructions"].append(entry)
+        self._rung["instructions"].append(entry)
+        if instruction in RUNG_CLOSERS:
+            self._rung_stored = True
+        return finished
+
+    def _call(self, instance, params):
+        """
+        Maps ``CAL Timer1(IN := X, PT := T#5S)`` onto timers/counters by declared type.
+        """
+        declared = self.ir["variables"].get(instance, {}).get("type")
+        if declared in TIMER_TYPES:
+            timer = {"type": declared, "duration": params.get("PT", DEFAULT_DURATION)}
+            if "IN" in params:
+                timer["input"] = params["IN"]
+            self.ir["timers"][instance] = timer
+        elif declared in COUNTER_TYPES:
+            counter = {"type": declared, "preset": params.get("PV", DEFAULT_PRESET)}
+            for key in ("CU", "CD", "R", "LD"):
+                if key in params:
+                    counter[key.lower()] = params[key]
+            self.ir["counters"][instance] = counter
+        else:
+            self.ir["function_blocks"][instance] = {"args": [f"{k}:={v}" for k, v in params.items()]}
+
+    def feed(self, line):
+        """
+        Tokenizes a single line. Returns a finished rung dict or None.
+        """
+        line = self._strip_comments(line)
+        tokens = line.split()
         if not tokens:
-            continue
+            return None
+
+        head = tokens[0].upper()
+
+        if self._in_var_block:
+            if head == "END_VAR":
+                self._in_var_block = False
+            else:
+                self._declare(line)
+            return None
+        if head in VAR_KEYWORDS:
+            self._in_var_block = True
+            return None
 
-        instruction = tokens[0].upper()
+        labelled = None
+        if head.endswith(":") and head != ":":
+            label = tokens[0][:-1]
+            record_jump(self.ir["jump_instructions"], label, "LBL")
+            labelled = self._emit_instruction("LBL", [label])
+            self.ir["scan_cycle"].append("LBL")
+            tokens = tokens[1:]
+            if not tokens:
+                return labelled
+            head = tokens[0].upper()
+            line = line.split(":", 1)[1]
+
+        kind = OPCODE_TABLE.get(head)
+        if kind is None:
+            return labelled
+        head = COMPARATOR_NAMES.get(head, head)
+
+        ir = self.ir
         args = tokens[1:]
+        finished = None
+
+        if kind == INSTRUCTION:
+            finished = self._emit_instruction(head, args)
 
-        if instruction in ["INPUT", "OUTPUT", "AND", "OR", "NOT", "XOR"]:
-            ir_representation["instructions"].append({"type": instruction, "args": args})
+        elif kind == TIMER or kind == COUNTER:
+            if "(" in line:
+                name = tokens[1].split("(")[0] if len(tokens) > 1 else ""
+                params = dict((k.upper(), v.strip().rstrip(";")) for k, v in PARAM_PATTERN.findall(line))
+                if name:
+                    self.ir["variables"].setdefault(name, {"type": head})
+                    self._call(name, params)
+            elif len(args) > 1:
+                if kind == TIMER:
+                    ir["timers"][args[0]] = {"type": head, "duration": args[1]}
+                else:
+                    ir["counters"][args[0]] = {"type": head, "preset": args[1]}
 
-        elif instruction in ["TON", "TOF", "TP"] and len(args) > 1:
-            ir_representation["timers"][args[0]] = {"type": instruction, "duration": args[1]}
+        elif kind == MATH:
+            if len(args) > 1:
+                ir["math_operations"][args[0]] = {"operation": head, "args": args[1:]}
+            elif args:
+                finished = self._emit_instruction(head, args)
 
-        elif instruction in ["CTU", "CTD"] and len(args) > 1:
-            ir_representation["counters"][args[0]] = {"type": instruction, "preset": args[1]}
+        elif kind == COMPARATOR:
+            if len(args) > 1:
+                ir["comparators"][args[0]] = {"comparison": head, "args": args[1:]}
+            elif args:
+                finished = self._emit_instruction(head, args)
 
-        elif instruction in ["ADD", "SUB", "MUL", "DIV", "MOD", "MOV"] and len(args) > 1:
-            ir_representation["math_operations"][args[0]] = {"operation": instruction, "args": args[1:]}
+        elif kind == LATCH:
+            if args:
+                ir["set_reset_latches"][args[0]] = {"latch_type": head}
 
-        elif instruction in [">", "<", "==", "!="] and len(args) > 1:
-            ir_representation["comparators"][args[0]] = {"comparison": instruction, "args": args[1:]}
+        elif kind == JUMP:
+            # Jumps stay in the instruction stream so ir_cfg can place them;
+            # jump_instructions keeps the per-target summary.
+            if args:
+                record_jump(ir["jump_instructions"], args[0], head)
+            finished = self._emit_instruction(head, args)
 
-        elif instruction in ["SR", "RS"] and args:
-            ir_representation["set_reset_latches"][args[0]] = {"latch_type": instruction}
+        elif kind == FUNCTION_BLOCK:
+            if args:
+                ir["function_blocks"][args[0]] = {"args": args[1:]}
 
-        elif instruction in ["JMP", "CALL", "RET"] and args:
-            ir_representation["jump_instructions"][args[0]] = {"jump_type": instruction}
+        elif kind == CALL:
+            if args:
+                rest = " ".join(args)
+                name = rest.split("(")[0].strip()
+                params = dict((k.upper(), v.strip()) for k, v in PARAM_PATTERN.findall(rest))
+                self._call(name, params)
 
-        elif instruction == "FB" and args:
-            ir_representation["function_blocks"][args[0]] = {"args": args[1:]}
+        ir["scan_cycle"].append(head)
+        return finished or labelled
 
-        ir_representation["scan_cycle"].append(instruction)
+    def close(self):
+        """
+        Flushes the trailing rung at end of input. Returns it or None.
+        """
+        return self._close_rung()
 
-    return json.dumps(ir_representation, indent=2)
+
+def iter_ladder_rungs(source, parser=None):
+    """
+    Generator mode: yields each rung as soon as it is complete.
+
+    Pass your own ``LadderLogicParser`` to inspect the full IR (timers,
+    counters, variables, ...) once the generator is exhausted.
+    """
+    parser = parser or LadderLogicParser()
+    feed = parser.feed
+    for line in _iter_lines(source):
+        rung = feed(line)
+        if rung is not None:
+            yield rung
+    rung = parser.close()
+    if rung is not None:
+        yield rung
+
+
+def parse_ladder_ir(source):
+    """
+    Parses Ladder Logic from a string, file object or iterable of lines and
+    returns the LadderCore IR dict.
+    """
+    parser = LadderLogicParser()
+    feed = parser.feed
+    lines = 0
+    with stage("ll_parser.parse"):
+        for lines, line in enumerate(_iter_lines(source), 1):
+            feed(line)
+        parser.close()
+    count("ll_parser.lines", lines)
+    count("ll_parser.rungs", parser._rung_index)
+    count("ll_parser.instructions", len(parser.ir["instructions"]))
+    return parser.ir
+
+
+def parse_ladder_logic(ladder_code):
+    """
+    Parses Ladder Logic and converts it into LadderCore IR, serialized as JSON.
+    In-process callers should use `parse_ladder_ir` (or `pipeline.Pipeline`) and keep the IR dict.
+    """
+    return json.dumps(parse_ladder_ir(ladder_code), indent=2)
 
 if __name__ == "__main__":
-    example_ladder = "INPUT X1\nAND X2\nOUTPUT Y1"
-    print(parse_ladder_logic(example_ladder))
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            print(json.dumps(parse_ladder_ir(f), indent=2))
+    else:
+        example_ladder = "INPUT X1\nAND X2\nOUTPUT Y1"
+        print(parse_ladder_logic(example_ladder))
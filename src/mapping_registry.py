@@ -0,0 +1,174 @@
+"""
+Mapping Registry
+Lazily loads the instruction mappings in `mappings/` and indexes them for O(1) lookup.
+
+Overview:
+- Nothing is read until the first lookup; the result is cached per process.
+- The cache is invalidated when any mapping file's mtime or size changes.
+- Forward index: (source, symbol) -> IR code, e.g. ("ladder_logic", "XIC") -> "LL_XIC".
+- Reverse index: IR code -> (source, category, symbol).
+- Indexes can be frozen into a marshal artifact for fast cold starts.
+"""
+
+import json
+import marshal
+import os
+import sys
+
+MAPPINGS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "mappings"))
+MAPPING_SOURCES = ("instruction_set", "ladder_logic", "structured_text")
+FROZEN_FILENAME = "mappings.index"
+FROZEN_FORMAT_VERSION = 1
+
+
+def _fingerprint(paths):
+    """
+    Returns (mtime_ns, size) for each mapping file, used for cache invalidation.
+    """
+    stamps = []
+    for path in paths:
+        stat = os.stat(path)
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def _entry_symbol(key, entry):
+    """
+    ladder_logic.json keys entries by description and stores the mnemonic in
+    "symbol"; the other mapping files key entries by the mnemonic itself.
+    """
+    return entry.get("symbol", key)
+
+
+def build_indexes(raw_mappings):
+    """
+    Builds the forward and reverse lookup tables from the raw mapping dicts.
+    """
+    forward = {}
+    reverse = {}
+    categories = {}
+    for source in MAPPING_SOURCES:
+        source_forward = {}
+        for category, entries in raw_mappings[source].items():
+            for key, entry in entries.items():
+                symbol = _entry_symbol(key, entry)
+                ir_code = entry.get("ir_representation")
+                if ir_code is None:
+                    continue
+                source_forward[symbol] = ir_code
+                reverse[ir_code] = (source, category, symbol)
+                categories.setdefault(symbol, []).append((source, category))
+        forward[source] = source_forward
+    return {
+        "forward": forward,
+        "reverse": reverse,
+        "categories": {symbol: tuple(found) for symbol, found in categories.items()}
+    }
+
+
+class MappingRegistry:
+    """
+    Process-wide cache of the mapping files and their lookup indexes.
+    """
+
+    def __init__(self, mappings_dir=MAPPINGS_DIR, frozen_path=None):
+        self.mappings_dir = mappings_dir
+        self.frozen_path = frozen_path or os.path.join(mappings_dir, FROZEN_FILENAME)
+        self.paths = tuple(os.path.join(mappings_dir, f"{source}.json") for source in MAPPING_SOURCES)
+        self._fingerprint = None
+        self._raw = None
+        self._indexes = None
+
+    def _ensure_fresh(self):
+        fingerprint = _fingerprint(self.paths)
+        if fingerprint != self._fingerprint:
+            self._raw = None
+            self._indexes = None
+            self._fingerprint = fingerprint
+
+    @property
+    def raw(self):
+        """
+        The parsed mapping files, keyed by source name.
+        """
+        self._ensure_fresh()
+        if self._raw is None:
+            raw = {}
+            for source, path in zip(MAPPING_SOURCES, self.paths):
+                with open(path, "r", encoding="utf-8") as f:
+                    raw[source] = json.load(f)
+            self._raw = raw
+        return self._raw
+
+    @property
+    def indexes(self):
+        """
+        The forward/reverse lookup tables, loaded from the frozen artifact when it is current.
+        """
+        self._ensure_fresh()
+        if self._indexes is None:
+            self._indexes = self._load_frozen() or build_indexes(self.raw)
+        return self._indexes
+
+    def _load_frozen(self):
+        try:
+            with open(self.frozen_path, "rb") as f:
+                frozen = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if frozen.get("version") != FROZEN_FORMAT_VERSION or frozen.get("fingerprint") != self._fingerprint:
+            return None
+        return frozen["indexes"]
+
+    def freeze(self, path=None):
+        """
+        Writes the current indexes to a marshal artifact and returns its path.
+        """
+        path = path or self.frozen_path
+        indexes = build_indexes(self.raw)
+        with open(path, "wb") as f:
+            marshal.dump({
+                "version": FROZEN_FORMAT_VERSION,
+                "fingerprint": self._fingerprint,
+                "indexes": indexes
+            }, f)
+        return path
+
+    def ir_code(self, symbol, source="ladder_logic"):
+        """
+        Returns the IR code for a symbol in the given mapping source, or None.
+        """
+        return self.indexes["forward"][source].get(symbol)
+
+    def lookup_ir(self, ir_code):
+        """
+        Returns (source, category, symbol) for an IR code, or None.
+        """
+        return self.indexes["reverse"].get(ir_code)
+
+    def categories(self, symbol):
+        """
+        Returns every (source, category) pair a symbol appears in.
+        """
+        return self.indexes["categories"].get(symbol, ())
+
+
+_registry = None
+
+
+def get_registry():
+    """
+    Returns the shared process-wide MappingRegistry.
+    """
+    global _registry
+    if _registry is None:
+        _registry = MappingRegistry()
+    return _registry
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--freeze":
+        print(f"Frozen mapping index written to {get_registry().freeze()}")
+    else:
+        registry = get_registry()
+        print(f"Indexed {len(registry.indexes['reverse'])} IR codes from {registry.mappings_dir}")
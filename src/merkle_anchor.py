@@ -0,0 +1,356 @@
+"""
+Batched Merkle Anchoring
+Anchors many IR programs, timestamps or scan-result snapshots under one blake2b Merkle root.
+
+Overview:
+- Each item is hashed as a leaf over a canonical encoding prefixed with its
+  kind, so equal bytes of different kinds never collide:
+  - IR programs (dicts with "instructions"): the `compile_cache.ir_digest`
+    encoding, without the `merkle_anchor` key the program may already carry;
+  - timestamps (int or str): their decimal text, as verifiable anchoring hashes them;
+  - snapshots (any other mapping of tag → value): JSON `[tag, value]` pairs sorted by tag;
+    NumPy values (e.g. `batch_simulator` traces) are converted with `tolist()`;
+  - bytes, file paths (`os.PathLike`) and binary file objects: their raw contents.
+- Encodings are streamed into the hash in `CHUNK_SIZE` pieces, so large
+  programs and files are never materialized as one string. Leaves are hashed
+  in a process pool for large batches.
+- Leaf and node hashes are domain-separated (0x00 / 0x01 prefixes). An
+  unpaired node is promoted to the next level unchanged, so a proof is at
+  most ceil(log2(n)) sibling hashes.
+- `InclusionProof.encode()` gives the compact one-line form
+  `<root> <index>/<leaves> <leaf> <sibling,...>` stored under the IR key
+  `merkle_anchor`; the emitter writes it as `-- Merkle Root` / `-- Merkle Proof`
+  comments in place of the per-script verifiable hash, and the reverse
+  compiler reads them back.
+- `python src/merkle_anchor.py a.ir b.ir snapshot.json --jobs 4 -o anchor.json`
+  writes the root and every item's proof.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from src.compile_cache import canonical_ir
+except ImportError:  # Run as a script from inside src/
+    from compile_cache import canonical_ir
+
+DIGEST_SIZE = 32
+# Bytes fed to the hash per update when streaming an encoding
+CHUNK_SIZE = 64 * 1024
+# List items passed to the JSON encoder at a time when streaming an encoding
+LIST_SLICE = 1024
+# Batches smaller than this are hashed in the calling process
+PARALLEL_THRESHOLD = 256
+# IR key holding a program's encoded inclusion proof
+ANCHOR_KEY = "merkle_anchor"
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+KIND_IR = b"ir\x00"
+KIND_TIMESTAMP = b"timestamp\x00"
+KIND_SNAPSHOT = b"snapshot\x00"
+KIND_RAW = b"raw\x00"
+
+HEX_DIGEST = "[0-9a-f]{%d}" % (2 * DIGEST_SIZE)
+PROOF_BODY = r"(\d+)/(\d+) ({0}) ((?:{0}(?:,{0})*)|-)".format(HEX_DIGEST)
+ENCODED_PATTERN = re.compile(f"({HEX_DIGEST}) {PROOF_BODY}")
+# Match both the emitted Plutus comments and the reverse-compiled Ladder Logic ones
+ROOT_PATTERN = re.compile(f"(?:--|//) Merkle Root: ({HEX_DIGEST})")
+PROOF_PATTERN = re.compile(f"(?:--|//) Merkle Proof: {PROOF_BODY}")
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+class _ChunkedHash:
+    """
+    Buffers small writes so the hash is updated in `CHUNK_SIZE` pieces.
+    """
+    __slots__ = ("hash", "buffer", "size")
+
+    def __init__(self, prefix):
+        self.hash = hashlib.blake2b(LEAF_PREFIX + prefix, digest_size=DIGEST_SIZE)
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.hash.update("".join(self.buffer).encode("utf-8"))
+            self.buffer.clear()
+            self.size = 0
+
+    def digest(self):
+        self.flush()
+        return self.hash.digest()
+
+
+def _plain(value):
+    return value.tolist() if hasattr(value, "tolist") else value
+
+
+def _iter_json(value):
+    """
+    Yields the compact JSON of `value`, encoding long lists `LIST_SLICE` items at a time.
+    """
+    if not isinstance(value, list) or len(value) <= LIST_SLICE:
+        yield _ENCODER.encode(value)
+        return
+    yield "["
+    for start in range(0, len(value), LIST_SLICE):
+        if start:
+            yield ","
+        yield _ENCODER.encode(value[start:start + LIST_SLICE])[1:-1]
+    yield "]"
+
+
+def _iter_pairs(pairs):
+    """
+    Yields the compact JSON of a list of `[key, value]` pairs, streaming each value.
+    """
+    yield "["
+    for position, (key, value) in enumerate(pairs):
+        yield f"{',' if position else ''}[{_ENCODER.encode(key)},"
+        yield from _iter_json(value)
+        yield "]"
+    yield "]"
+
+
+def _stream(prefix, chunks):
+    hasher = _ChunkedHash(prefix)
+    for chunk in chunks:
+        hasher.write(chunk)
+    return hasher.digest()
+
+
+def _hash_file(f):
+    hasher = hashlib.blake2b(LEAF_PREFIX + KIND_RAW, digest_size=DIGEST_SIZE)
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        hasher.update(chunk)
+    return hasher.digest()
+
+
+def leaf_hash(item):
+    """
+    Returns the 32-byte leaf hash of one item. Raises TypeError for unsupported items.
+    """
+    if isinstance(item, dict) and "instructions" in item:
+        program = {key: value for key, value in item.items() if key != ANCHOR_KEY}
+        return _stream(KIND_IR, _iter_pairs(canonical_ir(program)))
+    if isinstance(item, dict):
+        snapshot = sorted((str(tag), _plain(value)) for tag, value in item.items())
+        return _stream(KIND_SNAPSHOT, _iter_pairs(snapshot))
+    if isinstance(item, (int, str)) and not isinstance(item, bool):
+        return hashlib.blake2b(LEAF_PREFIX + KIND_TIMESTAMP + str(item).encode("utf-8"),
+                               digest_size=DIGEST_SIZE).digest()
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        hasher = hashlib.blake2b(LEAF_PREFIX + KIND_RAW, digest_size=DIGEST_SIZE)
+        view = memoryview(item)
+        for start in range(0, len(view), CHUNK_SIZE):
+            hasher.update(view[start:start + CHUNK_SIZE])
+        return hasher.digest()
+    if isinstance(item, os.PathLike):
+        with open(item, "rb") as f:
+            return _hash_file(f)
+    if hasattr(item, "read"):
+        return _hash_file(item)
+    raise TypeError(f"Cannot anchor item of type {type(item).__name__}")
+
+
+def node_hash(left, right):
+    return hashlib.blake2b(NODE_PREFIX + left + right, digest_size=DIGEST_SIZE).digest()
+
+
+def hash_leaves(items, jobs=None):
+    """
+    Returns the leaf hashes of `items` in order, in a process pool when the batch is large.
+    File objects are always hashed in the calling process.
+    """
+    items = list(items)
+    if (jobs or os.cpu_count() or 1) == 1 or len(items) < PARALLEL_THRESHOLD:
+        return [leaf_hash(item) for item in items]
+    local = {index: leaf_hash(item) for index, item in enumerate(items) if hasattr(item, "read")}
+    remote = [(index, item) for index, item in enumerate(items) if index not in local]
+    chunksize = max(1, len(remote) // ((jobs or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        hashes = executor.map(leaf_hash, [item for _, item in remote], chunksize=chunksize)
+        local.update(zip((index for index, _ in remote), hashes))
+    return [local[index] for index in range(len(items))]
+
+
+class InclusionProof:
+    """
+    Proves that the leaf at `index` of a `leaves`-leaf tree hashes up to `root`.
+
+    `path` holds the sibling hashes from the leaf level upwards; levels where
+    the node was unpaired contribute none.
+    """
+    __slots__ = ("root", "index", "leaves", "leaf", "path")
+
+    def __init__(self, root, index, leaves, leaf, path):
+        self.root = root
+        self.index = index
+        self.leaves = leaves
+        self.leaf = leaf
+        self.path = path
+
+    def encode(self):
+        """
+        Returns the compact one-line form `<root> <index>/<leaves> <leaf> <sibling,...>`.
+        """
+        path = ",".join(sibling.hex() for sibling in self.path) or "-"
+        return f"{self.root.hex()} {self.index}/{self.leaves} {self.leaf.hex()} {path}"
+
+    @classmethod
+    def decode(cls, text):
+        """
+        Parses `encode()` output. Raises ValueError when malformed.
+        """
+        match = ENCODED_PATTERN.fullmatch(text) if isinstance(text, str) else None
+        if not match:
+            raise ValueError(f"Invalid Merkle proof: {text!r}")
+        return cls._from_groups(*match.groups())
+
+    @classmethod
+    def _from_groups(cls, root, index, leaves, leaf, path):
+        index, leaves = int(index), int(leaves)
+        if index >= leaves:
+            raise ValueError(f"Invalid Merkle proof: leaf {index} of {leaves}")
+        siblings = [] if path == "-" else [bytes.fromhex(sibling) for sibling in path.split(",")]
+        return cls(bytes.fromhex(root), index, leaves, bytes.fromhex(leaf), siblings)
+
+    def comments(self):
+        """
+        Returns the Plutus comment lines carrying the root and this proof.
+        """
+        root, _, proof = self.encode().partition(" ")
+        return f"-- Merkle Root: {root}\n-- Merkle Proof: {proof}\n"
+
+    def verify(self, item=None):
+        """
+        Returns True when the path hashes the leaf (and `item`, when given) up to the root.
+        """
+        if item is not None and leaf_hash(item) != self.leaf:
+            return False
+        current, index, width = self.leaf, self.index, self.leaves
+        siblings = iter(self.path)
+        while width > 1:
+            if index ^ 1 < width:
+                sibling = next(siblings, None)
+                if sibling is None:
+                    return False
+                current = node_hash(sibling, current) if index & 1 else node_hash(current, sibling)
+            index //= 2
+            width = (width + 1) // 2
+        return next(siblings, None) is None and current == self.root
+
+
+class MerkleTree:
+    """
+    A blake2b Merkle tree over leaf hashes, keeping every level for proof extraction.
+    """
+    __slots__ = ("levels",)
+
+    def __init__(self, leaves):
+        if not leaves:
+            raise ValueError("Cannot build a Merkle tree without leaves")
+        level = list(leaves)
+        self.levels = [level]
+        while len(level) > 1:
+            paired = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) & 1:
+                paired.append(level[-1])
+            level = paired
+            self.levels.append(level)
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    def proof(self, index):
+        """
+        Returns the `InclusionProof` of leaf `index`.
+        """
+        leaf = self.levels[0][index]
+        path = []
+        position = index
+        for level in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                path.append(level[sibling])
+            position //= 2
+        return InclusionProof(self.root, index, len(self), leaf, path)
+
+    def proofs(self):
+        return [self.proof(index) for index in range(len(self))]
+
+
+def anchor_batch(items, jobs=None):
+    """
+    Hashes `items` and returns their `MerkleTree`; `tree.root` is the one value to anchor.
+    """
+    return MerkleTree(hash_leaves(items, jobs))
+
+
+def anchor_programs(programs, jobs=None):
+    """
+    Anchors IR programs and returns `(root, programs)`, where each returned
+    program is a copy carrying its encoded proof under `ANCHOR_KEY`.
+    """
+    programs = list(programs)
+    tree = anchor_batch(programs, jobs)
+    anchored = [dict(program, **{ANCHOR_KEY: tree.proof(index).encode()}) for index, program in enumerate(programs)]
+    return tree.root, anchored
+
+
+def read_anchor(text):
+    """
+    Returns the `InclusionProof` written into a Plutus script or reverse-compiled
+    Ladder Logic, or None when the text carries no Merkle anchor.
+    """
+    root = ROOT_PATTERN.search(text)
+    proof = PROOF_PATTERN.search(text)
+    if not root or not proof:
+        return None
+    return InclusionProof._from_groups(root.group(1), *proof.groups())
+
+
+def _load_item(path):
+    if path.endswith((".ir", ".json")):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return Path(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Anchor many IR programs, snapshots or files under one Merkle root.")
+    parser.add_argument("inputs", nargs="+", help=".ir/.json files are anchored as IR or snapshots, others as raw bytes")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    tree = anchor_batch([_load_item(path) for path in args.inputs], args.jobs)
+    report = {
+        "root": tree.root.hex(),
+        "leaves": len(tree),
+        "proofs": {path: proof.encode() for path, proof in zip(args.inputs, tree.proofs())},
+    }
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
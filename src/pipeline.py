@@ -0,0 +1,273 @@
+"""
+Compilation Pipeline
+Runs parse → validate → optimize → compile → reverse in one process, passing the IR between stages in memory.
+
+Overview:
+- Each source becomes an `Artifact` that every stage reads and extends: the
+  IR dict, its validation issues, the optimizer result, the Plutus script,
+  the UPLC script and the structured reverse compilation. Nothing is
+  serialized between stages; JSON is only read for `.ir` inputs and written
+  by `Artifact.outputs()`.
+- Stages are named: `parse`, `validate`, `optimize`, `compile`, `uplc` and
+  `reverse` are built in, and any `(name, function)` pair plugs in a custom
+  stage. A stage is called as `function(artifact, pipeline)` and skips
+  itself when its input is missing (a `.plutus` source has no IR to compile).
+- The first stage that raises stops that artifact: its `status` becomes
+  `invalid` (validation issues) or `error`, and `failed_stage` names the stage.
+- `run_many` processes a list of sources with shared warm state: one
+  `CompileCache` (identical programs compile once), the compiled IR schema
+  and the loaded instruction mappings.
+- `python src/pipeline.py src/*.ll --stages parse,validate,compile,reverse -o build`
+  writes each artifact's outputs and prints a status line per source.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+try:
+    from src.compile_cache import CompileCache
+    from src.condition_optimizer import optimize_ir
+    from src.instrumentation import count, stage
+    from src.ll_parser import parse_ladder_ir
+    from src.plutus_emitter import emit_plutus_haskell
+    from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+    from src.reverse_compiler.reverse_compiler import reverse_compile
+    from src.st_parser import parse_structured_text
+    from src.uplc_emitter import lower_ir_to_uplc
+    from src.validator_ir_transform import InvalidIRError, validate_ir
+except ImportError:  # Run as a script from inside src/
+    from compile_cache import CompileCache
+    from condition_optimizer import optimize_ir
+    from instrumentation import count, stage
+    from ll_parser import parse_ladder_ir
+    from plutus_emitter import emit_plutus_haskell
+    from plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+    from reverse_compiler.reverse_compiler import reverse_compile
+    from st_parser import parse_structured_text
+    from uplc_emitter import lower_ir_to_uplc
+    from validator_ir_transform import InvalidIRError, validate_ir
+
+DEFAULT_STAGES = ("parse", "validate", "compile")
+# Source languages by file extension
+LANGUAGES = {".ll": "ll", ".st": "st", ".ir": "ir", ".json": "ir", ".plutus": "plutus"}
+
+
+class Artifact:
+    """
+    One source and everything the pipeline has derived from it so far.
+    """
+    __slots__ = ("name", "language", "source", "ir", "issues", "optimized", "script", "uplc", "reverse",
+                 "timings", "error", "failed_stage")
+
+    def __init__(self, name, language, source):
+        self.name = name
+        self.language = language
+        self.source = source
+        self.ir = None
+        self.issues = []
+        self.optimized = None
+        self.script = None
+        self.uplc = None
+        self.reverse = None
+        self.timings = {}
+        self.error = None
+        self.failed_stage = None
+
+    @property
+    def status(self):
+        if self.error is None:
+            return "ok"
+        return "invalid" if isinstance(self.error, InvalidIRError) else "error"
+
+    def check(self):
+        """
+        Re-raises the error that stopped this artifact, if any. Returns the artifact otherwise.
+        """
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def outputs(self):
+        """
+        Returns the serialized results by file extension: `.ir` (JSON), `.plutus`, `.uplc` and `.reversed.ll`.
+        """
+        outputs = {}
+        if self.ir is not None and self.language != "ir":
+            outputs[".ir"] = json.dumps(self.ir, indent=2)
+        if self.script is not None and self.language != "plutus":
+            outputs[".plutus"] = self.script
+        if self.uplc is not None:
+            outputs[".uplc"] = self.uplc.pretty()
+        if self.reverse is not None:
+            outputs[".reversed.ll"] = self.reverse.ladder_logic
+        return outputs
+
+
+def _read(source):
+    return source if isinstance(source, str) else source.read()
+
+
+def parse_stage(artifact, pipeline):
+    if artifact.ir is not None or artifact.language == "plutus":
+        return
+    if artifact.language == "ll":
+        artifact.ir = parse_ladder_ir(artifact.source)
+    elif artifact.language == "st":
+        artifact.ir = parse_structured_text(artifact.source)
+    elif artifact.language == "ir":
+        artifact.ir = json.loads(_read(artifact.source))
+    else:
+        raise ValueError(f"Unknown source language: {artifact.language!r}")
+
+
+def validate_stage(artifact, pipeline):
+    if artifact.ir is None:
+        return
+    artifact.issues = validate_ir(artifact.ir)
+    if artifact.issues:
+        raise InvalidIRError(artifact.issues)
+
+
+def optimize_stage(artifact, pipeline):
+    if artifact.ir is not None:
+        artifact.optimized = optimize_ir(artifact.ir)
+
+
+def compile_stage(artifact, pipeline):
+    if artifact.ir is None:
+        return
+    if artifact.optimized is None:
+        artifact.script = compile_ir_to_plutus_haskell_enhanced(artifact.ir, cache=pipeline.cache)
+        return
+    # The optimize stage already minimized the conditions; emit with them instead of compiling again
+    stream = io.StringIO()
+    emit_plutus_haskell(artifact.ir, stream, optimized=artifact.optimized)
+    artifact.script = stream.getvalue()
+
+
+def uplc_stage(artifact, pipeline):
+    if artifact.ir is not None:
+        artifact.uplc = lower_ir_to_uplc(artifact.ir, pipeline.slots, pipeline.slot_zero_ms)
+
+
+def reverse_stage(artifact, pipeline):
+    if artifact.language == "plutus" and artifact.script is None:
+        artifact.script = _read(artifact.source)
+    if artifact.script is not None:
+        artifact.reverse = reverse_compile(artifact.script)
+
+
+STAGES = {
+    "parse": parse_stage,
+    "validate": validate_stage,
+    "optimize": optimize_stage,
+    "compile": compile_stage,
+    "uplc": uplc_stage,
+    "reverse": reverse_stage,
+}
+
+
+class Pipeline:
+    """
+    An ordered list of stages plus the state they share across sources.
+
+    `stages` holds built-in stage names and `(name, function)` pairs. `cache`
+    defaults to a fresh in-memory `CompileCache`; `slots` and `slot_zero_ms`
+    are passed to the `uplc` stage.
+    """
+    __slots__ = ("stages", "cache", "slots", "slot_zero_ms")
+
+    def __init__(self, stages=DEFAULT_STAGES, cache=None, slots=None, slot_zero_ms=0):
+        self.stages = []
+        for entry in stages:
+            name, function = (entry, STAGES.get(entry)) if isinstance(entry, str) else entry
+            if function is None:
+                raise ValueError(f"Unknown pipeline stage {name!r}; built-in stages: {', '.join(STAGES)}")
+            if name in self.stage_names():
+                raise ValueError(f"Pipeline stage {name!r} appears twice")
+            self.stages.append((name, function))
+        self.cache = CompileCache() if cache is None else cache
+        self.slots = slots
+        self.slot_zero_ms = slot_zero_ms
+
+    def stage_names(self):
+        return [name for name, _ in self.stages]
+
+    def run(self, source, name=None, language="ll"):
+        """
+        Runs every stage over one source and returns its `Artifact`.
+
+        `source` is Ladder Logic or Structured Text (a string, file object or
+        iterable of lines), an IR dict or JSON text, or a Plutus script, as
+        `language` says (`ll`, `st`, `ir`, `plutus`; dicts are always IR).
+        """
+        if isinstance(source, dict):
+            language = "ir"
+        artifact = Artifact(name, language, source)
+        if isinstance(source, dict):
+            artifact.ir = source
+        for stage_name, function in self.stages:
+            start = time.perf_counter()
+            try:
+                with stage(f"pipeline.{stage_name}"):
+                    function(artifact, self)
+            except Exception as e:  # Any stage failure stops this artifact only
+                artifact.error = e
+                artifact.failed_stage = stage_name
+                break
+            finally:
+                artifact.timings[stage_name] = time.perf_counter() - start
+        count(f"pipeline.{artifact.status}")
+        return artifact
+
+    def run_many(self, sources, language="ll"):
+        """
+        Runs the pipeline over many sources with shared warm state. `sources`
+        is a dict of name → source, or a list (named by position). Returns
+        the artifacts in input order.
+        """
+        if not isinstance(sources, dict):
+            sources = {f"source{index}": source for index, source in enumerate(sources)}
+        return [self.run(source, name, language) for name, source in sources.items()]
+
+    def run_files(self, paths):
+        """
+        Runs the pipeline over files, choosing each language by extension. Artifacts are named by file path.
+        """
+        artifacts = []
+        for path in paths:
+            language = LANGUAGES.get(os.path.splitext(path)[1])
+            if language is None:
+                raise ValueError(f"{path}: unsupported file type; expected one of {', '.join(LANGUAGES)}")
+            with open(path, "r", encoding="utf-8") as f:
+                artifacts.append(self.run(f, path, language))
+        return artifacts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the compilation pipeline over source files in one process.")
+    parser.add_argument("inputs", nargs="+", help=".ll, .st, .ir or .plutus files")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES),
+                        help=f"comma-separated stages (default: {','.join(DEFAULT_STAGES)}; also: optimize, uplc, reverse)")
+    parser.add_argument("-o", "--out-dir", help="write each artifact's outputs here")
+    args = parser.parse_args()
+
+    try:
+        artifacts = Pipeline(args.stages.split(",")).run_files(args.inputs)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    for artifact in artifacts:
+        if args.out_dir:
+            base = os.path.join(args.out_dir, os.path.splitext(os.path.basename(artifact.name))[0])
+            os.makedirs(args.out_dir, exist_ok=True)
+            for extension, text in artifact.outputs().items():
+                with open(base + extension, "w", encoding="utf-8") as f:
+                    f.write(text)
+        detail = f" ({artifact.failed_stage}: {artifact.error})" if artifact.error is not None else ""
+        print(f"{artifact.status:8} {artifact.name}{detail}")
+    sys.exit(0 if all(artifact.error is None for artifact in artifacts) else 1)
@@ -0,0 +1,271 @@
+"""
+Streaming Plutus Emitter
+Writes the Plutus Haskell validator for a LadderCore IR program directly to a text stream.
+
+Overview:
+- The IR is walked once. Each live instruction produces its trace line
+  (written to the stream) and its validator condition (spooled to a
+  temporary buffer that rolls over to disk), a chunk at a time, so memory
+  stays bounded however large the program is.
+- Output is assembled from precompiled templates; no script text is built
+  by concatenation. `compile_ir_to_plutus_haskell_enhanced` returns
+  exactly what this module writes, collected in a string buffer.
+- Slot, anchoring and timer constraints are intersected by `time_constraints`
+  into a single `mustValidateIn` range; unsatisfiable combinations raise
+  before anything is written. A batch inclusion proof (the `merkle_anchor`
+  key, see the module of that name) is written as root and proof comments in place of
+  the per-script verifiable hash. Log records are only formatted when INFO
+  logging is enabled.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import shutil
+import sys
+import tempfile
+
+try:
+    from src.condition_optimizer import optimize_conditions
+    from src.instrumentation import count, stage
+    from src.ir_cfg import build_cfg, is_control
+    from src.merkle_anchor import ANCHOR_KEY, InclusionProof
+    from src.time_constraints import analyze_time_constraints
+except ImportError:  # Run as a script from inside src/
+    from condition_optimizer import optimize_conditions
+    from instrumentation import count, stage
+    from ir_cfg import build_cfg, is_control
+    from merkle_anchor import ANCHOR_KEY, InclusionProof
+    from time_constraints import analyze_time_constraints
+
+logger = logging.getLogger(__name__)
+
+# Conditions held in memory before the spool moves to a temporary file
+SPOOL_SIZE = 4 * 1024 * 1024
+# Instructions formatted per write to the stream and the spool
+CHUNK_SIZE = 4096
+
+TRACE_LINE = 'traceIfFalse "Condition {0} failed: {1}" ({2})\n'.format
+CONDITION = 'traceIfFalse "Condition {0} failed: {1}" ({2})'.format
+VALIDITY = "mustValidateIn ({0})\n".format
+FINALITY = "-- Timestamp {0} stored for finality anchoring\n".format
+VERIFIABLE_HASH = "-- Verifiable Hash: {0}\n".format
+TIMER_TOF = 'traceIfFalse "Timer {0} off delay expired" ({0} <= {1})\n'.format
+COUNTER_CTU = 'traceIfFalse "Counter {0} exceeded" ({0} >= {1})\n'.format
+COUNTER_CTD = 'traceIfFalse "Counter {0} decreased below preset" ({0} <= {1})\n'.format
+BINDING = "\n        {0} = {1}".format
+
+VALIDATOR_HEADER = """{-# INLINABLE validate #-}
+validate :: BuiltinData -> BuiltinData -> ScriptContext -> Bool
+validate _ _ ctx =
+    let txInfo = scriptContextTxInfo ctx"""
+VALIDATOR_BODY = "\n    in "
+CONDITION_INDENT = "    "
+CONDITION_SEPARATOR = " &&\n    "
+VALIDATOR_FOOTER = """
+
+script :: PlutusScript
+script = mkValidatorScript $$(PlutusTx.compile [|| validate ||])
+"""
+EMPTY_BODY = "    True  -- Default to always valid if no conditions\n"
+
+
+def emit_plutus_haskell(ir_data, stream, optimize=False, optimized=None):
+    """
+    Writes the Plutus Haskell script for `ir_data` to the text stream `stream`.
+    With `optimize=True` rung conditions come from `condition_optimizer`;
+    pass its `optimize_ir(ir_data)` result as `optimized` to reuse it.
+    Optimized rungs use real OR where the unoptimized conditions require every
+    operand (`&&`), so the two scripts accept different transactions.
+    Raises ValueError (before anything is written) when the IR yields no logic
+    or its time constraints or Merkle anchor are malformed or unsatisfiable.
+    """
+    with stage("emitter.emit"):
+        condition_count = _emit_plutus_haskell(ir_data, stream, optimize or optimized is not None, optimized)
+    count("emitter.conditions", condition_count)
+
+
+def _emit_plutus_haskell(ir_data, stream, optimize, optimized=None):
+    if not isinstance(ir_data, dict) or "instructions" not in ir_data:
+        raise ValueError("Invalid IR input: Missing 'instructions' key")
+    with stage("emitter.time_constraints"):
+        analysis = analyze_time_constraints(ir_data)
+    anchor = _merkle_anchor(ir_data)
+
+    write = stream.write
+    lines_written = 0
+
+    # Only instructions in reachable basic blocks become conditions; labels and
+    # jumps carry no logic of their own. Conditions keep their original index.
+    live_instructions = (
+        (i, instr) for i, instr in build_cfg(ir_data["instructions"]).live_instructions()
+        if not (isinstance(instr, dict) and is_control(instr["type"]))
+    )
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, mode="w+", newline="") as conditions:
+        if optimize:
+            # The optimizer needs whole rungs, so its input is materialized
+            live_instructions = list(live_instructions)
+            condition_count = 0
+        else:
+            condition_count = _emit_instructions(live_instructions, write, conditions.write)
+            lines_written += condition_count
+
+        lines_written += emit_checks(ir_data, write, analysis, anchor)
+
+        # Ensure the script is not empty
+        if not lines_written and not (optimize and live_instructions):
+            raise ValueError("Invalid IR format: No valid logic generated")
+        if not lines_written:
+            write("\n")
+
+        write(VALIDATOR_HEADER)
+        if optimize:
+            if optimized is None:
+                with stage("optimizer.optimize"):
+                    optimized = optimize_conditions(live_instructions)
+            for name, expression in optimized.bindings:
+                write(BINDING(name, expression))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Condition optimizer: %s", json.dumps(optimized.report))
+            conditions.write(CONDITION_SEPARATOR.join(optimized.conditions))
+            condition_count = len(optimized.conditions)
+        write(VALIDATOR_BODY)
+
+        if condition_count:
+            write(CONDITION_INDENT)
+            conditions.seek(0)
+            shutil.copyfileobj(conditions, stream)
+            write(VALIDATOR_FOOTER)
+        else:
+            write(EMPTY_BODY)
+    return condition_count
+
+
+def _emit_instructions(live_instructions, write, write_condition):
+    """
+    Writes each instruction's trace line and spools its validator condition,
+    both in chunks of `CHUNK_SIZE` instructions. Returns the number emitted.
+    """
+    count = 0
+    lines = []
+    conditions = []
+    for i, instr in live_instructions:
+        op_type = instr["type"].lower()
+        args = instr["args"]
+        conjunction = " && ".join(args)
+        lines.append(TRACE_LINE(i, op_type, conjunction if op_type == "and" else " || ".join(args)))
+        conditions.append(CONDITION(i, op_type, conjunction))
+        if len(lines) == CHUNK_SIZE:
+            count = _flush_chunk(lines, conditions, count, write, write_condition)
+    return _flush_chunk(lines, conditions, count, write, write_condition)
+
+
+def _flush_chunk(lines, conditions, count, write, write_condition):
+    if lines:
+        write("".join(lines))
+        if count:
+            write_condition(CONDITION_SEPARATOR)
+        write_condition(CONDITION_SEPARATOR.join(conditions))
+        count += len(lines)
+        lines.clear()
+        conditions.clear()
+    return count
+
+
+def emit_checks(ir_data, write, analysis=None, anchor=None):
+    """
+    Writes the time-constraint, timer and counter lines that follow the
+    instruction trace lines. `analysis` is the program's `TimeAnalysis` and
+    `anchor` its `InclusionProof`, computed here when not given. Returns the
+    number of lines written.
+    """
+    if analysis is None:
+        analysis = analyze_time_constraints(ir_data)
+    if anchor is None:
+        anchor = _merkle_anchor(ir_data)
+    return _emit_time_constraints(analysis, anchor, write) + _emit_timers_and_counters(ir_data, analysis, write)
+
+
+def _merkle_anchor(ir_data):
+    """
+    Returns the program's batch `InclusionProof`, or None. Raises ValueError when it is malformed.
+    """
+    encoded = ir_data.get(ANCHOR_KEY)
+    return None if encoded is None else InclusionProof.decode(encoded)
+
+
+def _emit_time_constraints(analysis, anchor, write):
+    """
+    Writes the merged validity range and the anchoring comments. Returns the number of lines written.
+    """
+    count = 0
+    validity = analysis.range()
+    if validity is not None:
+        write(VALIDITY(validity))
+        count += 1
+        logger.info("Validity interval: mustValidateIn (%s) from %d constraints", validity, analysis.constraints)
+
+    if analysis.finality is not None:
+        write(FINALITY(analysis.finality))
+        count += 1
+        logger.info("Finality Anchoring Deferred: Timestamp %s recorded for later submission", analysis.finality)
+
+    # A batch anchor replaces the per-script hash: one root covers every program in the batch
+    if anchor is not None:
+        write(anchor.comments())
+        count += 2
+        logger.info("Merkle Anchoring Applied: leaf %d of %d under root %s", anchor.index, anchor.leaves, anchor.root.hex())
+    # The verifiable timestamp's slot is part of the validity range; its hash is recorded alongside
+    elif analysis.verifiable is not None:
+        blake2b_hash = hashlib.blake2b(str(analysis.verifiable).encode("utf-8"), digest_size=32).hexdigest()
+        write(VERIFIABLE_HASH(blake2b_hash))
+        count += 1
+        logger.info("Verifiable Hash Anchoring Applied: slot%s with Hash: %s", analysis.verifiable, blake2b_hash)
+    return count
+
+
+def _emit_timers_and_counters(ir_data, analysis, write):
+    """
+    Writes TOF and counter checks; TON timers are covered by the validity range. Returns the number of lines written.
+    """
+    count = 0
+    for timer_name, timer_data in ir_data.get("timers", {}).items():
+        if timer_data["type"] == "TOF":
+            write(TIMER_TOF(timer_name, analysis.durations_ms[timer_name]))
+            count += 1
+
+    for counter_name, counter_data in ir_data.get("counters", {}).items():
+        if counter_data["type"] == "CTU":
+            write(COUNTER_CTU(counter_name, counter_data["preset"]))
+            count += 1
+        elif counter_data["type"] == "CTD":
+            write(COUNTER_CTD(counter_name, counter_data["preset"]))
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Emit the Plutus Haskell validator for a LadderCore IR file.")
+    parser.add_argument("input", help="IR file (JSON)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--optimize", action="store_true", help="minimize rung conditions first")
+    args = parser.parse_args(argv)
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        ir_data = json.load(f)
+    try:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as out:
+                emit_plutus_haskell(ir_data, out, optimize=args.optimize)
+        else:
+            emit_plutus_haskell(ir_data, sys.stdout, optimize=args.optimize)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
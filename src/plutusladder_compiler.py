@@ -3,122 +3,57 @@ PlutusLadder Compiler (PLC) - Enhanced
 Transforms LadderCore IR into valid Plutus Haskell and Plutus Core (PLC) with structured validation logic.
 """
 
-import json
-import logging
-
-logger = logging.getLogger(__name__)
-
-def compile_ir_to_plutus_haskell_enhanced(ir_data):
+import io
+
+try:
+    from src.instrumentation import count, stage
+    from src.plutus_emitter import emit_plutus_haskell
+    from src.uplc_emitter import lower_ir_to_uplc
+except ImportError:  # Run as a script from inside src/
+    from instrumentation import count, stage
+    from plutus_emitter import emit_plutus_haskell
+    from uplc_emitter import lower_ir_to_uplc
+
+def compile_ir_to_plutus_haskell_enhanced(ir_data, cache=None, optimize=False):
     """
     Converts LadderCore IR into a structured Plutus Haskell script with improved validation logic.
+    Pass a `compile_cache.CompileCache` as `cache` to memoize results by IR content.
+    With `optimize=True` rung conditions are minimized by `condition_optimizer`
+    (one condition per distinct rung, shared subterms bound once in `let`).
+    The optimized script evaluates OR contacts as real disjunctions while the
+    default one requires every operand (`&&`), so the two accept different
+    transactions; pick one and keep it for a deployed validator.
+    The script is produced by `plutus_emitter`; use `emit_plutus_haskell`
+    directly to write large programs to a file without building the string.
     """
-    if not isinstance(ir_data, dict) or "instructions" not in ir_data:
-        raise ValueError("Invalid IR input: Missing 'instructions' key")
-
-    script_lines = []
-
-    # Handle logical operations
-    if "instructions" in ir_data:
-        for i, instr in enumerate(ir_data["instructions"]):
-            op_type = instr["type"].lower()
-            args = " && ".join(instr["args"]) if op_type == "and" else " || ".join(instr["args"])
-            script_lines.append(f'traceIfFalse "Condition {i} failed: {op_type}" ({args})')
-
-    # Handle Slot-Based Time Logic (L1 Validation)
-    if "format" in ir_data and ir_data["format"] == "slot-based":
-       if "timestamp" in ir_data:
-           slot_constraint = f"slot{ir_data['timestamp']}"
-           if f'mustValidateIn (from {slot_constraint})' not in script_lines:
-              script_lines.append(f'mustValidateIn (from {slot_constraint})')
-              logger.info(
-                  f"Slot-Based Time Constraint Applied: mustValidateIn (from {slot_constraint})"
-              )
-
-
-    # Handle Anchoring Mechanism (Connecting L2 to L1)
-    if "anchoring" in ir_data:
-       if ir_data["anchoring"] == "immediate":
-          slot_constraint = f"slot{ir_data['timestamp']}"
-          if f'mustValidateIn (from {slot_constraint})' not in script_lines:
-             script_lines.append(f'mustValidateIn (from {slot_constraint})')
-             logger.info(
-                 f"Immediate Anchoring Applied: mustValidateIn (from {slot_constraint})"
-             )
-    
-       elif ir_data["anchoring"] == "finality":
-            script_lines.append(f'-- Timestamp {ir_data["timestamp"]} stored for finality anchoring')
-            logger.info(
-                f"Finality Anchoring Deferred: Timestamp {ir_data['timestamp']} recorded for later submission"
-            )
-    
-    import hashlib  # Required for Blake2b hash generation
-
-    # Handle Verifiable Hash Anchoring in Plutus
-    if "format" in ir_data and ir_data["format"] == "verifiable":
-        if "timestamp" in ir_data:
-           # Generate Blake2b hash for the timestamp
-           timestamp_value = str(ir_data["timestamp"]).encode('utf-8')
-           blake2b_hash = hashlib.blake2b(timestamp_value, digest_size=32).hexdigest()
-
-        # Store the hash in the Plutus script
-        script_lines.append(f'mustValidateIn (from slot{ir_data["timestamp"]})')
-        script_lines.append(f'-- Verifiable Hash: {blake2b_hash}')
-        logger.info(
-            f"Verifiable Hash Anchoring Applied: mustValidateIn (from slot{ir_data['timestamp']}) with Hash: {blake2b_hash}"
-        )
+    compile_fn = _compile_ir_to_plutus_haskell_optimized if optimize else _compile_ir_to_plutus_haskell
+    with stage("compiler.compile"):
+        if cache is None:
+            return compile_fn(ir_data)
+        hits = cache.hits + cache.disk_hits
+        script = cache.get_or_compile(ir_data, compile_fn)
+    count("compiler.cache_hits" if cache.hits + cache.disk_hits > hits else "compiler.cache_misses")
+    return script
 
-    # Handle Timers
-    if "timers" in ir_data:
-        for timer_name, timer_data in ir_data["timers"].items():
-            logger.info(
-                f"Compiling Timer: {timer_name}, Duration: {timer_data['duration']}ms → mustValidateIn (from slotX)"
-            )
 
-            if timer_data["type"] == "TON":
-                # Dynamically use `slotX` from IR if available
-                slot_constraint = timer_data.get("slot", "slotX")
-                script_lines.append(f'mustValidateIn (from {slot_constraint}) -- Timer {timer_name} enforced')
-
-            elif timer_data["type"] == "TOF":
-                script_lines.append(f'traceIfFalse "Timer {timer_name} off delay expired" ({timer_name} <= {timer_data["duration"]})')
-
-    # Handle Counters
-    if "counters" in ir_data:
-        for counter_name, counter_data in ir_data["counters"].items():
-            if counter_data["type"] == "CTU":
-                script_lines.append(f'traceIfFalse "Counter {counter_name} exceeded" ({counter_name} >= {counter_data["preset"]})')
-            elif counter_data["type"] == "CTD":
-                script_lines.append(f'traceIfFalse "Counter {counter_name} decreased below preset" ({counter_name} <= {counter_data["preset"]})')
-
-    # Ensure the script is not empty
-    if not script_lines:
-        raise ValueError("Invalid IR format: No valid logic generated")
-
-    haskell_script = """{-# INLINABLE validate #-}
-validate :: BuiltinData -> BuiltinData -> ScriptContext -> Bool
-validate _ _ ctx =
-    let txInfo = scriptContextTxInfo ctx
-    in """
-
-    grouped_conditions = []
+def compile_ir_to_uplc(ir_data, slots=None, slot_zero_ms=0):
+    """
+    Converts LadderCore IR directly into an Untyped Plutus Core validator (a `uplc_emitter.UPLCScript`).
+    Its flat bytes, text envelope and script hash need no Haskell toolchain;
+    `slots` gives values to symbolic slots and `slot_zero_ms` anchors slots to POSIX time.
+    """
+    with stage("compiler.compile_uplc"):
+        return lower_ir_to_uplc(ir_data, slots, slot_zero_ms)
 
-    for i, instruction in enumerate(ir_data.get("instructions", [])):
-        if isinstance(instruction, dict):
-            inst_type = instruction["type"].lower()
-            args = " && ".join(instruction["args"])  # Ensure valid format
-            grouped_conditions.append(f'traceIfFalse "Condition {i} failed: {inst_type}" ({args})')
 
-    if grouped_conditions:
-        haskell_script += "    " + " &&\n    ".join(grouped_conditions) + """
+def _compile_ir_to_plutus_haskell_optimized(ir_data):
+    return _compile_ir_to_plutus_haskell(ir_data, optimize=True)
 
-script :: PlutusScript
-script = mkValidatorScript $$(PlutusTx.compile [|| validate ||])
-"""
-    else:
-        haskell_script += "    True  -- Default to always valid if no conditions\n"
 
-    # Combine logic
-    return "\n".join(script_lines) + "\n" + haskell_script
+def _compile_ir_to_plutus_haskell(ir_data, optimize=False):
+    stream = io.StringIO()
+    emit_plutus_haskell(ir_data, stream, optimize=optimize)
+    return stream.getvalue()
 
 
 if __name__ == "__main__":
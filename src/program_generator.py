@@ -0,0 +1,221 @@
+"""
+Synthetic Program Generator
+Builds seeded, arbitrarily large Ladder Logic (Instruction List) programs and their LadderCore IR.
+
+Overview:
+- `generate_ladder(instructions, seed)` returns .ll source whose IR has exactly
+  `instructions` entries in its instruction stream; the same seed always
+  gives the same program.
+- Rungs are drawn from `RUNG_MIX`: plain contacts, nested AND/OR/XOR chains
+  with set/reset coils, TON/TOF/TP timers and CTU/CTD counters (declared in a
+  VAR block and called with `CAL`), accumulator math, comparators (both the
+  accumulator and the three-operand form) and conditional jumps over rungs.
+- Inputs (X contacts, V analog values, L latches) come from pools that grow
+  with the program, so larger programs reuse them the way real ones do. Every
+  coil and register is written by one rung only and later rungs read earlier
+  markers and registers, so the rung graph is feed-forward apart from S/R
+  latches. Every generated program validates without issues.
+- `generate_ir` parses the source with `ll_parser`; `python src/program_generator.py
+  --instructions 100000 --seed 7 --format ir -o program.ir` writes either form.
+"""
+
+import argparse
+import json
+import random
+import sys
+
+try:
+    from src.ll_parser import parse_ladder_ir
+except ImportError:  # Run as a script from inside src/
+    from ll_parser import parse_ladder_ir
+
+# Rung kind -> relative weight
+RUNG_MIX = (
+    ("contacts", 30),
+    ("nested", 20),
+    ("timer", 10),
+    ("counter", 8),
+    ("math", 10),
+    ("comparator", 12),
+    ("jump", 10),
+)
+
+LOGIC_OPS = ("AND", "OR", "ANDN", "ORN", "XOR", "XORN")
+TIMER_TYPES = ("TON", "TON", "TOF", "TP")
+MATH_OPS = ("ADD", "SUB", "MUL", "DIV", "MOD")
+COMPARATOR_OPS = ("GT", "GE", "LT", "LE", "EQ", "NE")
+
+
+class _ProgramBuilder:
+    """
+    Accumulates declarations and body lines while counting IR instructions.
+    """
+    __slots__ = ("rng", "tags", "declarations", "lines", "instructions", "serial", "markers", "registers")
+
+    def __init__(self, seed, instructions):
+        self.rng = random.Random(seed)
+        self.tags = max(16, instructions // 8)
+        self.declarations = []
+        self.lines = []
+        self.instructions = 0
+        self.serial = 0
+        self.markers = []
+        self.registers = []
+
+    def tag(self, prefix):
+        return f"{prefix}{self.rng.randrange(self.tags)}"
+
+    def coil(self, prefix, produced=None):
+        """
+        Returns a fresh output tag, remembering it in `produced` for later rungs to read.
+        """
+        name = f"{prefix}{self.next_serial()}"
+        if produced is not None:
+            produced.append(name)
+        return name
+
+    def earlier(self, produced, prefix):
+        """
+        Reads an output of an earlier rung half of the time, else a pool input.
+        """
+        if produced and self.rng.random() < 0.5:
+            return self.rng.choice(produced)
+        return self.tag(prefix)
+
+    def emit(self, *lines):
+        self.lines.extend(lines)
+        self.instructions += len(lines)
+
+    def next_serial(self):
+        self.serial += 1
+        return self.serial
+
+    def contacts(self):
+        rng = self.rng
+        self.emit(f"{rng.choice(('LD', 'LDN'))} {self.tag('X')}")
+        for _ in range(rng.randint(1, 3)):
+            self.emit(f"{rng.choice(('AND', 'ANDN'))} {self.tag('X')}")
+        self.emit(f"ST {self.coil('Y')}")
+
+    def nested(self):
+        rng = self.rng
+        self.emit(f"LD {self.tag('X')}")
+        for _ in range(rng.randint(3, 8)):
+            self.emit(f"{rng.choice(LOGIC_OPS)} {self.earlier(self.markers, 'X')}")
+        self.emit(f"ST {self.coil('M', self.markers)}")
+        if rng.random() < 0.5:
+            self.emit(f"{rng.choice(('S', 'R'))} {self.tag('L')}")
+
+    def timer(self):
+        rng = self.rng
+        name = f"T{self.next_serial()}"
+        self.declarations.append(f"    {name} : {rng.choice(TIMER_TYPES)};")
+        self.lines.append(f"CAL {name}(IN := {self.tag('X')}, PT := T#{rng.randrange(10, 60000, 10)}MS)")
+        self.emit(f"LD {name}.Q", f"ST {self.coil('Y')}")
+
+    def counter(self):
+        rng = self.rng
+        name = f"C{self.next_serial()}"
+        counter_type = rng.choice(("CTU", "CTD"))
+        pin = "CU" if counter_type == "CTU" else "CD"
+        self.declarations.append(f"    {name} : {counter_type};")
+        self.lines.append(f"CAL {name}({pin} := {self.tag('X')}, PV := {rng.randint(1, 1000)})")
+        self.emit(f"LD {name}.Q", f"ANDN {self.tag('X')}", f"ST {self.coil('Y')}")
+
+    def math(self):
+        rng = self.rng
+        serial = self.next_serial()
+        self.lines.append(f"{rng.choice(MATH_OPS)} R{serial} {self.tag('V')} {self.tag('V')}")
+        self.emit(f"LD {self.earlier(self.registers, 'V')}")
+        for _ in range(rng.randint(1, 3)):
+            self.emit(f"{rng.choice(MATH_OPS)} {rng.randint(1, 100)}")
+        self.emit(f"ST {self.coil('W', self.registers)}")
+
+    def comparator(self):
+        rng = self.rng
+        serial = self.next_serial()
+        self.lines.append(f"{rng.choice(COMPARATOR_OPS)} K{serial} {self.tag('V')} {rng.randint(0, 1000)}")
+        self.emit(
+            f"LD {self.earlier(self.registers, 'V')}",
+            f"{rng.choice(COMPARATOR_OPS)} {rng.randint(0, 1000)}",
+            f"AND {self.tag('X')}",
+            f"ST {self.coil('Y')}",
+        )
+
+    def jump(self):
+        label = f"SKIP{self.next_serial()}"
+        self.emit(f"LD {self.tag('X')}", f"{self.rng.choice(('JMPC', 'JMPCN'))} {label}")
+        self.contacts()
+        # The label line is both an LBL and the load that opens the next rung
+        self.lines.append(f"{label}: LD {self.tag('X')}")
+        self.instructions += 2
+        self.emit(f"ST {self.coil('Y')}")
+
+    def fill(self, remaining):
+        """
+        Pads with a rung of exactly `remaining` instructions.
+        """
+        if remaining == 1:
+            self.emit(f"ST {self.coil('Y')}")
+            return
+        self.emit(f"LD {self.tag('X')}")
+        for _ in range(remaining - 2):
+            self.emit(f"AND {self.tag('X')}")
+        self.emit(f"ST {self.coil('Y')}")
+
+
+# Upper bound on instructions a single rung of any kind can add
+_LARGEST_RUNG = 11
+
+
+def generate_ladder_lines(instructions, seed=0):
+    """
+    Returns the source lines of a generated program with exactly `instructions` IR instructions.
+    """
+    builder = _ProgramBuilder(seed, instructions)
+    kinds = [getattr(builder, kind) for kind, _ in RUNG_MIX]
+    weights = [weight for _, weight in RUNG_MIX]
+    choices = builder.rng.choices
+    while instructions - builder.instructions > _LARGEST_RUNG:
+        for kind in choices(kinds, weights, k=64):
+            kind()
+            if instructions - builder.instructions <= _LARGEST_RUNG:
+                break
+    if builder.instructions < instructions:
+        builder.fill(instructions - builder.instructions)
+
+    header = ["VAR"] + builder.declarations + ["END_VAR"] if builder.declarations else []
+    return header + builder.lines
+
+
+def generate_ladder(instructions, seed=0):
+    """
+    Returns the .ll source of a generated program with exactly `instructions` IR instructions.
+    """
+    return "\n".join(generate_ladder_lines(instructions, seed)) + "\n"
+
+
+def generate_ir(instructions, seed=0):
+    """
+    Returns the LadderCore IR of `generate_ladder(instructions, seed)`.
+    """
+    return parse_ladder_ir(generate_ladder_lines(instructions, seed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Ladder Logic program or its IR.")
+    parser.add_argument("--instructions", type=int, default=1000, help="IR instructions to generate (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=("ll", "ir"), default="ll")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.format == "ll":
+        text = generate_ladder(args.instructions, args.seed)
+    else:
+        text = json.dumps(generate_ir(args.instructions, args.seed), indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
@@ -1,2 +1,2 @@
-from .reverse_compiler import reverse_compile_plutus_to_ll
+from .reverse_compiler import ReverseResult, reverse_compile, reverse_compile_plutus_to_ll
 from .utils import save_to_file, load_plutus_script
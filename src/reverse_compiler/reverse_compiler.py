@@ -10,161 +10,269 @@ Overview:
 - Supports all Ladder Logic constructs encountered in real-world PLC programming.
 """
 
+import logging
 import os
-import json
 import re
+import sys
 
-def load_instruction_mappings():
-    # Get the absolute path of the Morley-IR root directory
-    base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-    print(f"Resolved base_path: {base_path}")
-
-    # Define full paths for the mappings
-    instruction_set_path = os.path.join(base_path, "mappings", "instruction_set.json")
-    ladder_logic_path = os.path.join(base_path, "mappings", "ladder_logic.json")
-    structured_text_path = os.path.join(base_path, "mappings", "structured_text.json")
-
-    # Debugging: Print paths to check correctness
-    print(f"Loading instruction set from: {instruction_set_path}")
-    print(f"Loading ladder logic from: {ladder_logic_path}")
-    print(f"Loading structured text from: {structured_text_path}")
+try:
+    from src.instrumentation import count, stage
+    from src.mapping_registry import get_registry
+    from src.merkle_anchor import PROOF_PATTERN as MERKLE_PROOF_PATTERN, ROOT_PATTERN as MERKLE_ROOT_PATTERN
+except ImportError:  # Run as a script: python src/reverse_compiler/reverse_compiler.py
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from instrumentation import count, stage
+    from mapping_registry import get_registry
+    from merkle_anchor import PROOF_PATTERN as MERKLE_PROOF_PATTERN, ROOT_PATTERN as MERKLE_ROOT_PATTERN
 
-    # Load the JSON files
-    with open(instruction_set_path, "r", encoding="utf-8") as f:
-        instruction_set = json.load(f)
-    with open(ladder_logic_path, "r", encoding="utf-8") as f:
-        ladder_logic = json.load(f)
-    with open(structured_text_path, "r", encoding="utf-8") as f:
-        structured_text = json.load(f)
+logger = logging.getLogger(__name__)
 
-    return instruction_set, ladder_logic, structured_text
-
-instruction_set, ladder_logic, structured_text = load_instruction_mappings()
+def load_instruction_mappings():
+    """ Return the (instruction_set, ladder_logic, structured_text) mappings from the shared registry. """
+    raw = get_registry().raw
+    return raw["instruction_set"], raw["ladder_logic"], raw["structured_text"]
+
+
+def __getattr__(name):
+    # The mappings used to be loaded eagerly at import; keep the module
+    # attributes available without paying for file I/O until they are used.
+    if name in ("instruction_set", "ladder_logic", "structured_text"):
+        return get_registry().raw[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Patterns are compiled once at import; each is guarded by a cheap substring
+# test so most lines only pay for a handful of `in` checks.
+SLOT_ANCHOR_PATTERN = re.compile(r"mustValidateIn \((?:from|interval) (?:\(max )?slot(\d+)\b")
+VERIFIABLE_HASH_PATTERN = re.compile(r"-- Verifiable Hash: (\w+)")
+TIMESTAMP_PATTERN = re.compile(r'{"timestamp":\s*(\d+)}')
+TRACE_PATTERN = re.compile(r'traceIfFalse "(.*?)" \(')
+COMPARISON_PATTERN = re.compile(r"if (\w+) ([=!<>]=?) ([\d.]+|\w+)")
+TIMER_PATTERN = re.compile(r"timer (\w+) (\d+)ms", re.IGNORECASE)
+TIMER_DONE_PATTERN = re.compile(r"if (\w+)\.DN then output = (\d+)")
+LET_PATTERN = re.compile(r"let (\w+) = (\w+) (?:([+\-*/])|(SHL|SHR|ROR|ROL)) (\w+)")
+CONTROL_PATTERN = re.compile(r"(JMP|LBL|JSR|RET|MCR) (\w+)")
+STRING_LITERAL_PATTERN = re.compile(r'"[^"]*"')
+
+
+def _matching_paren(text, open_index):
+    """ Return the index of the parenthesis closing the one at open_index, or -1. """
+    close = text.find(")", open_index + 1)
+    if close < 0 or text.find("(", open_index + 1, close) < 0:
+        return close
+    depth = 0
+    for index in range(open_index, len(text)):
+        char = text[index]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    return -1
+
+
+def _paren_balance(line):
+    """ Net parenthesis depth of a line, ignoring text inside string literals. """
+    if '"' in line:
+        line = STRING_LITERAL_PATTERN.sub("", line)
+    return line.count("(") - line.count(")")
+
+
+def _logical_lines(plutus_code):
+    """
+    Yield stripped, non-empty lines, joining continuation lines while a
+    traceIfFalse condition is still inside an open parenthesis.
+    """
+    pending = None
+    depth = 0
+    for line in plutus_code.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if pending is not None:
+            pending = pending + " " + line
+            depth += _paren_balance(line)
+            if depth <= 0:
+                yield pending
+                pending = None
+            continue
+        depth = _paren_balance(line) if "traceIfFalse" in line else 0
+        if depth > 0:
+            pending = line
+        else:
+            yield line
+    if pending is not None:
+        yield pending
+
+
+def _trace_conditions(line):
+    """ Extract every `traceIfFalse "desc" (cond)` on a line, with balanced parentheses. """
+    found = []
+    position = 0
+    while True:
+        match = TRACE_PATTERN.search(line, position)
+        if not match:
+            return found
+        open_index = match.end() - 1
+        close_index = _matching_paren(line, open_index)
+        if close_index < 0:
+            return found
+        found.append((match.group(1), line[open_index + 1:close_index]))
+        position = close_index + 1
 
 
 def parse_plutus_script(plutus_code):
     """ Extract conditions, state updates, and logic from a Morley-specific Plutus script. """
+    with stage("reverse.parse"):
+        return _parse_plutus_script(plutus_code)
+
+
+def _parse_plutus_script(plutus_code):
+    debug = logger.isEnabledFor(logging.DEBUG)
+    lines = anchor_hits = hash_hits = merkle_hits = timestamp_hits = trace_hits = comparison_hits = 0
+    timer_hits = timer_done_hits = let_hits = control_hits = 0
     conditions = []
     state_changes = []
     arithmetic_operations = []
     bitwise_operations = []
     control_flow = []  
-    ladder_logic_lines = []
 
-    lines = plutus_code.split("\n")
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
+    # Document-level anchors: only the first occurrence is reverse-compiled.
+    anchor_line = None
+    hash_line = None
+    merkle_root_line = None
+    merkle_proof_line = None
 
-        # Handle Anchored Timestamps in Plutus Scripts
-        if "mustValidateIn" in plutus_code:
-            slot_match = re.search(r"mustValidateIn \(from slot(\d+)\)", plutus_code)
+    for line in _logical_lines(plutus_code):
+        lines += 1
+        if "mustValidateIn" in line and anchor_line is None:
+            slot_match = SLOT_ANCHOR_PATTERN.search(line)
             if slot_match:
-               slot_value = slot_match.group(1)
-               
-               # Only add the timer if it's not already in ladder_logic_lines
-               if f"TON TimerX, {slot_value}ms" not in ladder_logic_lines:
-                  ladder_logic_lines.append(f"TON TimerX, {slot_value}ms")
-                  print(f"Reverse Compiled Immediate Anchoring: TON TimerX, {slot_value}ms")
-               
-        # Detect and Handle Verifiable Hash Anchoring
-        if "Verifiable Hash" in plutus_code:
-            hash_match = re.search(r'-- Verifiable Hash: (\w+)', plutus_code)
+                anchor_line = f"TON TimerX, {slot_match.group(1)}ms"
+                anchor_hits += 1
+                if debug:
+                    logger.debug("Reverse Compiled Immediate Anchoring: %s", anchor_line)
+
+        if "Verifiable Hash" in line and hash_line is None:
+            hash_match = VERIFIABLE_HASH_PATTERN.search(line)
             if hash_match:
-               hash_value = hash_match.group(1)
-               # Preserve Verifiable Hash as a comment in Ladder Logic
-               if f"// Verifiable Hash: {hash_value}" not in ladder_logic_lines:  # Check to avoid duplicates
-                   ladder_logic_lines.append(f"// Verifiable Hash: {hash_value}")
-                   print(f"Reverse Compiled Verifiable Hash: {hash_value}")
-     
-        # Detect mustValidateIn (Plutus time constraint)
-        # Prevent redundant processing if immediate anchoring has already detected mustValidateIn
-        if "mustValidateIn" in plutus_code and any("TON TimerX" in line for line in ladder_logic_lines):
-            print(f"Skipping duplicate mustValidateIn detection: {line}")
-        else:
-            validate_match = re.search(r'mustValidateIn \(from (slot\d+)\)', line)
-            if validate_match:
-               slot = validate_match.group(1)
-               timer_name = f"Timer{len(conditions) + 1}"  # Assign a generic timer name
-               conditions.append((f"TON {timer_name}", f"TON {timer_name}, 5000ms"))
-               print(f"Detected mustValidateIn: {line} → TON {timer_name}, 5000ms")  # Debugging
+                hash_line = f"// Verifiable Hash: {hash_match.group(1)}"
+                hash_hits += 1
+                if debug:
+                    logger.debug("Reverse Compiled Verifiable Hash: %s", hash_match.group(1))
+
+        if "Merkle " in line:
+            root_match = MERKLE_ROOT_PATTERN.search(line) if merkle_root_line is None else None
+            if root_match:
+                merkle_root_line = f"// Merkle Root: {root_match.group(1)}"
+                merkle_hits += 1
+            proof_match = MERKLE_PROOF_PATTERN.search(line) if merkle_proof_line is None else None
+            if proof_match:
+                merkle_proof_line = "// Merkle Proof: {0}/{1} {2} {3}".format(*proof_match.groups())
+                merkle_hits += 1
+            if debug and (root_match or proof_match):
+                logger.debug("Reverse Compiled Merkle Anchor: %s", line)
 
         # Detect and extract timestamp from Plutus datums
-        timestamp_match = re.search(r'{"timestamp":\s*(\d+)}', line)
-        if timestamp_match:
-           timestamp_value = timestamp_match.group(1)
-           conditions.append((f"MOV timestamp", f"MOV timestamp = {timestamp_value}"))
-           print(f"Detected Timestamp Datum: {line} → MOV timestamp = {timestamp_value}")  # Debugging
-           continue
-
-        print(f"Processing line: {repr(line)}")  # Debugging
-
-        # Extract traceIfFalse conditions
-        match = re.search(r'traceIfFalse \"(.*?)\" \((.*?)\)', line)
-        if match:
-            description, condition = match.groups()
-            conditions.append((description, condition))
-            print(f"Detected Condition: {description} -> {condition}")  # Debugging
-            continue
-
-        # Extract comparison conditions (e.g., if balance >= 100)
-        comparison_match = re.search(r'if (\w+) ([=!<>]=?) ([\d.]+|\w+)', line)
-        if comparison_match:
-            var, op, val = comparison_match.groups()
-            conditions.append((f"Check {var} {op} {val}", f"{var} {op} {val}"))
-            continue  
+        if '"timestamp"' in line:
+            timestamp_match = TIMESTAMP_PATTERN.search(line)
+            if timestamp_match:
+                timestamp_value = timestamp_match.group(1)
+                conditions.append((f"MOV timestamp", f"MOV timestamp = {timestamp_value}"))
+                timestamp_hits += 1
+                if debug:
+                    logger.debug("Detected Timestamp Datum: %s → MOV timestamp = %s", line, timestamp_value)
+                continue
+
+        if debug:
+            logger.debug("Processing line: %r", line)
+
+        # Extract traceIfFalse conditions, including `&&`-joined ones on one line
+        if "traceIfFalse" in line:
+            traced = _trace_conditions(line)
+            if traced:
+                trace_hits += len(traced)
+                for description, condition in traced:
+                    conditions.append((description, condition))
+                    if debug:
+                        logger.debug("Detected Condition: %s -> %s", description, condition)
+                continue
+
+        if "if " in line:
+            # Extract comparison conditions (e.g., if balance >= 100)
+            comparison_match = COMPARISON_PATTERN.search(line)
+            if comparison_match:
+                var, op, val = comparison_match.groups()
+                comparison_hits += 1
+                conditions.append((f"Check {var} {op} {val}", f"{var} {op} {val}"))
+                continue
 
         # Extract timer operations (TON, TOF)
-        timer_match = re.search(r'timer (\w+) (\d+)ms', line, re.IGNORECASE)
+        timer_match = TIMER_PATTERN.search(line)
         if timer_match:
             timer_name, duration = timer_match.groups()
             conditions.append((f"TON {timer_name}", f"TON {timer_name}, {duration}ms"))
-            print(f"Detected Timer: {timer_name}, Duration: {duration}ms")  # Debugging
+            timer_hits += 1
+            if debug:
+                logger.debug("Detected Timer: %s, Duration: %sms", timer_name, duration)
             continue
 
         # Detect if a timer is being checked for "done" state
-        timer_done_match = re.search(r'if (\w+)\.DN then output = (\d+)', line)
-        if timer_done_match:
-            timer_name, output = timer_done_match.groups()
-            conditions.append((f"XIC {timer_name}.DN", f"OTE Output{output}"))
-            print(f"Detected Timer Done: {timer_name}.DN -> Output{output}")  # Debugging
-            continue
-
-        # Extract state updates
-        state_match = re.search(r'let (\w+) = (\w+) ([+\-*/]) (\w+)', line)
-        if state_match:
-            var, left, operator, right = state_match.groups()
-            state_changes.append(f"{var} = {left} {operator} {right}")
-            print(f"Detected State Change: {var} = {left} {operator} {right}")  # Debugging
-            continue
-
-        # Extract arithmetic operations
-        arithmetic_match = re.search(r'let (\w+) = (\w+) ([+\-*/]) (\w+)', line)
-        if arithmetic_match:
-            var, operand1, operation, operand2 = arithmetic_match.groups()
-            arithmetic_operations.append(f"MOV {var} = {operand1} {operation} {operand2}")
-            continue
-
-        # Extract bitwise operations
-        bitwise_match = re.search(r'let (\w+) = (\w+) (SHL|SHR|ROR|ROL) (\d+)', line)
-        if bitwise_match:
-            var, operand, operation, shift_value = bitwise_match.groups()
-            bitwise_operations.append(f"{operation} {var}, {operand}, {shift_value}")
-            continue
+        if ".DN" in line:
+            timer_done_match = TIMER_DONE_PATTERN.search(line)
+            if timer_done_match:
+                timer_name, output = timer_done_match.groups()
+                conditions.append((f"XIC {timer_name}.DN", f"OTE Output{output}"))
+                timer_done_hits += 1
+                if debug:
+                    logger.debug("Detected Timer Done: %s.DN -> Output%s", timer_name, output)
+                continue
+
+        # Extract state updates and bitwise shifts with a single `let` match
+        if "let " in line:
+            let_match = LET_PATTERN.search(line)
+            if let_match:
+                var, left, operator, shift, right = let_match.groups()
+                let_hits += 1
+                if operator:
+                    state_changes.append(f"{var} = {left} {operator} {right}")
+                    if debug:
+                        logger.debug("Detected State Change: %s = %s %s %s", var, left, operator, right)
+                    continue
+                if right.isdigit():
+                    bitwise_operations.append(f"{shift} {var}, {left}, {right}")
+                    continue
 
         # Extract control flow operations
-        control_match = re.search(r'(JMP|LBL|JSR|RET|MCR) (\w+)', line)
+        control_match = CONTROL_PATTERN.search(line)
         if control_match:
             operation, label = control_match.groups()
+            control_hits += 1
             control_flow.append(f"{operation} {label}")
 
-    print(f"Parsed Conditions: {conditions}")
-    print(f"Parsed State Changes: {state_changes}")
-    print(f"Parsed Arithmetic: {arithmetic_operations}")
-    print(f"Parsed Bitwise: {bitwise_operations}")
-    print(f"Parsed Control Flow: {control_flow}")
+    ladder_logic_lines = [
+        entry for entry in (anchor_line, hash_line, merkle_root_line, merkle_proof_line) if entry is not None
+    ]
+
+    if debug:
+        logger.debug("Parsed Conditions: %s", conditions)
+        logger.debug("Parsed State Changes: %s", state_changes)
+        logger.debug("Parsed Arithmetic: %s", arithmetic_operations)
+        logger.debug("Parsed Bitwise: %s", bitwise_operations)
+        logger.debug("Parsed Control Flow: %s", control_flow)
+
+    count("reverse.lines", lines)
+    count("reverse.hits.anchor", anchor_hits)
+    count("reverse.hits.hash", hash_hits)
+    count("reverse.hits.merkle", merkle_hits)
+    count("reverse.hits.timestamp", timestamp_hits)
+    count("reverse.hits.trace", trace_hits)
+    count("reverse.hits.comparison", comparison_hits)
+    count("reverse.hits.timer", timer_hits)
+    count("reverse.hits.timer_done", timer_done_hits)
+    count("reverse.hits.let", let_hits)
+    count("reverse.hits.control", control_hits)
 
     return (
     "\n".join(ladder_logic_lines) if ladder_logic_lines else "No Ladder Logic Generated",
@@ -177,13 +285,14 @@ def parse_plutus_script(plutus_code):
 
 def convert_to_ladder_logic(conditions, state_changes, arithmetic_operations, bitwise_operations, control_flow):
     """ Convert extracted Plutus conditions, state updates, arithmetic, bitwise, and control flow operations to Ladder Logic. """
+    debug = logger.isEnabledFor(logging.DEBUG)
     ladder_logic_code = []
 
     # Process conditions (XIC, XIO, TON, TOF)
     for condition in conditions:
         description, logic = condition
-        if "timer" in description.lower():
-            print(f"Timer detected before regex: {repr(condition)}")  # Debugging
+        if debug and "timer" in description.lower():
+            logger.debug("Timer detected before regex: %r", condition)
         ladder_logic_code.append(f"{description}: {logic}")
 
     # Convert state updates to MOV instructions
@@ -201,26 +310,52 @@ def convert_to_ladder_logic(conditions, state_changes, arithmetic_operations, bi
     # Convert control flow operations
     for operation in control_flow:
         ladder_logic_code.append(operation)
-        print(f"Ladder Logic Output (Before Return):\n{ladder_logic_code}")
+    if debug and control_flow:
+        logger.debug("Ladder Logic Output (Before Return):\n%s", ladder_logic_code)
 
     return "\n".join(ladder_logic_code) if ladder_logic_code else "No Ladder Logic Generated"
 
 
-def reverse_compile_plutus_to_ll(plutus_code):
-    """ Full pipeline: Parse Plutus -> Convert to Ladder Logic. """
-    ladder_logic_output, conditions, state_updates, arithmetic_operations, bitwise_operations, control_flow = parse_plutus_script(plutus_code)
+class ReverseResult:
+    """
+    A reverse compilation: `ladder_logic` is the generated Ladder Logic text
+    and the lists hold the extracted conditions, state changes, arithmetic,
+    bitwise and control-flow operations.
+    """
+    __slots__ = ("ladder_logic", "conditions", "state_changes", "arithmetic_operations", "bitwise_operations",
+                 "control_flow")
+
+    def __init__(self, ladder_logic, conditions, state_changes, arithmetic_operations, bitwise_operations,
+                 control_flow):
+        self.ladder_logic = ladder_logic
+        self.conditions = conditions
+        self.state_changes = state_changes
+        self.arithmetic_operations = arithmetic_operations
+        self.bitwise_operations = bitwise_operations
+        self.control_flow = control_flow
+
 
+def reverse_compile(plutus_code):
+    """ Full pipeline: Parse Plutus -> Convert to Ladder Logic. Returns a `ReverseResult`. """
+    ladder_logic_output, conditions, state_updates, arithmetic_operations, bitwise_operations, control_flow = parse_plutus_script(plutus_code)
 
-    print(f"Conditions Sent to Ladder Logic: {conditions}")
-    print(f"State Changes Sent to Ladder Logic: {state_updates}")
-    print(f"Arithmetic Operations Sent to Ladder Logic: {arithmetic_operations}")
-    print(f"Bitwise Operations Sent to Ladder Logic: {bitwise_operations}")
-    print(f"Control Flow Sent to Ladder Logic: {control_flow}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Conditions Sent to Ladder Logic: %s", conditions)
+        logger.debug("State Changes Sent to Ladder Logic: %s", state_updates)
+        logger.debug("Arithmetic Operations Sent to Ladder Logic: %s", arithmetic_operations)
+        logger.debug("Bitwise Operations Sent to Ladder Logic: %s", bitwise_operations)
+        logger.debug("Control Flow Sent to Ladder Logic: %s", control_flow)
 
     flattened_output = "".join(ladder_logic_output) if isinstance(ladder_logic_output, list) else ladder_logic_output
-    ladder_logic_code = flattened_output + "\n" + convert_to_ladder_logic(conditions, state_updates, arithmetic_operations, bitwise_operations, control_flow)
+    with stage("reverse.convert"):
+        ladder_logic_code = flattened_output + "\n" + convert_to_ladder_logic(conditions, state_updates, arithmetic_operations, bitwise_operations, control_flow)
+
+    return ReverseResult(ladder_logic_code, conditions, state_updates, arithmetic_operations, bitwise_operations, control_flow)
 
-    return ladder_logic_code
+
+def reverse_compile_plutus_to_ll(plutus_code):
+    """ Full pipeline: Parse Plutus -> Convert to Ladder Logic. Returns the Ladder Logic text. """
+    return reverse_compile(plutus_code).ladder_logic
 
 if __name__ == "__main__":
     example_plutus = ''' 
@@ -0,0 +1,259 @@
+"""
+Scan-Cycle Semantics
+Lowers LadderCore IR into a flat, slot-resolved program shared by the simulators and interpreters.
+
+Execution model (one scan):
+1. External inputs are written into their tag slots.
+2. Instructions run in order against a single accumulator:
+   - INPUT/LD load their operand (several operands are ANDed, as contacts in
+     series), LDN loads the negation; AND/OR/XOR (and their N forms)
+     combine the accumulator's truth value with every operand; NOT without
+     operands inverts the accumulator, NOT with operands acts like ANDN.
+   - OUTPUT/ST store the accumulator into every operand, STN stores its
+     negation, S/R write 1/0 to their operands while the accumulator is true.
+   - ADD/SUB/MUL/DIV/MOD and GT/GE/EQ/NE/LE/LT apply to the accumulator as in
+     IEC Instruction List (DIV truncates toward zero, division by zero gives 0).
+   - Control flow follows `ir_cfg` basic blocks: labels are no-ops, JMP
+     jumps, JMPC/JMPCN jump while the accumulator is true/false, CALL runs
+     a labelled subroutine until RET (RETC/RETCN conditionally) and RET
+     outside a call ends the scan. Unreachable blocks are dropped.
+3. Timers and counters update from their input tags, exposing `<name>.Q`
+   (alias `<name>.DN`), `<name>.ET` and `<name>.CV`.
+
+Timer and counter inputs default to the `<name>.IN`, `<name>.CU`, `<name>.CD`,
+`<name>.R` and `<name>.LD` tags unless the IR names them explicitly.
+Booleans are stored as 0/1 integers.
+"""
+
+try:
+    from src.iec_time import parse_duration_ms
+    from src.ir_cfg import build_cfg
+    from src.ll_parser import rung_starts
+except ImportError:  # Run as a script from inside src/
+    from iec_time import parse_duration_ms
+    from ir_cfg import build_cfg
+    from ll_parser import rung_starts
+
+# Lowered accumulator operations
+LOAD = 0
+LOAD_NOT = 1
+AND = 2
+AND_NOT = 3
+OR = 4
+OR_NOT = 5
+XOR = 6
+XOR_NOT = 7
+NOT = 8
+STORE = 9
+STORE_NOT = 10
+SET = 11
+RESET = 12
+ADD = 13
+SUB = 14
+MUL = 15
+DIV = 16
+MOD = 17
+GT = 18
+GE = 19
+EQ = 20
+NE = 21
+LE = 22
+LT = 23
+
+OPERATIONS = {
+    "INPUT": LOAD, "LD": LOAD, "LDN": LOAD_NOT,
+    "AND": AND, "ANDN": AND_NOT, "OR": OR, "ORN": OR_NOT, "XOR": XOR, "XORN": XOR_NOT,
+    "NOT": NOT,
+    "OUTPUT": STORE, "ST": STORE, "STN": STORE_NOT, "S": SET, "R": RESET,
+    "ADD": ADD, "SUB": SUB, "MUL": MUL, "DIV": DIV, "MOD": MOD,
+    "GT": GT, "GE": GE, "EQ": EQ, "NE": NE, "LE": LE, "LT": LT,
+}
+
+WRITE_OPERATIONS = frozenset([STORE, STORE_NOT, SET, RESET])
+
+BOOLEAN_LITERALS = {"TRUE": 1, "FALSE": 0}
+
+
+def parse_literal(token):
+    """
+    Returns the integer value of a literal operand, or None if it names a tag.
+    """
+    if not isinstance(token, str):
+        return int(token)
+    upper = token.upper()
+    if upper in BOOLEAN_LITERALS:
+        return BOOLEAN_LITERALS[upper]
+    text = token[1:] if token[:1] in "+-" else token
+    if text.isdigit():
+        return int(token)
+    return None
+
+
+class LoweredOp:
+    """
+    One lowered instruction. Operands are (is_literal, slot_or_value) pairs.
+    """
+    __slots__ = ("op", "operands", "index")
+
+    def __init__(self, op, operands, index):
+        self.op = op
+        self.operands = operands
+        self.index = index
+
+    def reads(self):
+        return [value for is_literal, value in self.operands if not is_literal] if self.op not in WRITE_OPERATIONS else []
+
+    def writes(self):
+        return [value for is_literal, value in self.operands if not is_literal] if self.op in WRITE_OPERATIONS else []
+
+
+class LoweredTimer:
+    __slots__ = ("name", "kind", "preset_ms", "in_slot", "q_slot", "et_slot")
+
+    def __init__(self, name, kind, preset_ms, in_slot, q_slot, et_slot):
+        self.name = name
+        self.kind = kind
+        self.preset_ms = preset_ms
+        self.in_slot = in_slot
+        self.q_slot = q_slot
+        self.et_slot = et_slot
+
+
+class LoweredCounter:
+    __slots__ = ("name", "kind", "preset", "count_slot", "reset_slot", "q_slot", "cv_slot")
+
+    def __init__(self, name, kind, preset, count_slot, reset_slot, q_slot, cv_slot):
+        self.name = name
+        self.kind = kind
+        self.preset = preset
+        self.count_slot = count_slot
+        self.reset_slot = reset_slot
+        self.q_slot = q_slot
+        self.cv_slot = cv_slot
+
+
+class LoweredBlock:
+    """
+    The ops of one basic block plus its terminator (None, "JMP", "CALL", "RETC", ...).
+
+    `target` and `fallthrough` are block indexes or None; unreachable blocks have no ops.
+    """
+    __slots__ = ("index", "ops", "terminator", "target", "fallthrough", "reachable")
+
+    def __init__(self, index, ops, terminator, target, fallthrough, reachable):
+        self.index = index
+        self.ops = ops
+        self.terminator = terminator
+        self.target = target
+        self.fallthrough = fallthrough
+        self.reachable = reachable
+
+
+class LoweredProgram:
+    """
+    Slot-resolved form of an IR program.
+
+    `tags` lists slot names in slot order; `slots` maps every name (including
+    aliases such as `T1.DN`) to its slot. `blocks` is None for straight-line
+    programs, otherwise the `LoweredBlock`s in program order.
+    """
+    __slots__ = ("tags", "slots", "ops", "timers", "counters", "initial", "rung_starts", "blocks")
+
+    def __init__(self):
+        self.tags = []
+        self.slots = {}
+        self.ops = []
+        self.timers = []
+        self.counters = []
+        self.initial = {}
+        self.rung_starts = []
+        self.blocks = None
+
+    def slot(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.tags)
+            self.tags.append(name)
+        return slot
+
+    def alias(self, name, slot):
+        self.slots.setdefault(name, slot)
+
+
+def lower_program(ir_data):
+    """
+    Lowers an IR dict into a `LoweredProgram`.
+
+    Raises ValueError for malformed timer durations or counter presets.
+    """
+    program = LoweredProgram()
+    slot = program.slot
+
+    for name, variable in ir_data.get("variables", {}).items():
+        slot(name)
+        initial = variable.get("initial")
+        if initial is not None:
+            value = parse_literal(initial)
+            if value is not None:
+                program.initial[program.slots[name]] = value
+
+    instructions = ir_data.get("instructions", [])
+    cfg = build_cfg(instructions)
+    live = {index for index, _ in cfg.live_instructions()} if cfg.has_control_flow else None
+
+    types = []
+    for index, instr in enumerate(instructions):
+        types.append(instr["type"])
+        op = OPERATIONS.get(instr["type"])
+        if op is None or (live is not None and index not in live):
+            continue
+        operands = []
+        for arg in instr.get("args", []):
+            value = parse_literal(arg)
+            operands.append((True, value) if value is not None else (False, slot(arg)))
+        if op == NOT and operands:
+            op = AND_NOT
+        program.ops.append(LoweredOp(op, tuple(operands), index))
+    program.rung_starts = rung_starts(types)
+
+    if live is not None:
+        program.blocks = []
+        ops = iter(program.ops)
+        lowered = next(ops, None)
+        for block in cfg.blocks:
+            block_ops = []
+            while lowered is not None and lowered.index < block.end:
+                block_ops.append(lowered)
+                lowered = next(ops, None)
+            program.blocks.append(LoweredBlock(
+                block.index, block_ops, block.terminator, block.target, block.fallthrough, block.reachable
+            ))
+
+    for name, timer in ir_data.get("timers", {}).items():
+        try:
+            preset_ms = parse_duration_ms(timer.get("duration", 0))
+        except ValueError:
+            raise ValueError(f"Timer {name}: invalid duration {timer.get('duration')!r}")
+        q_slot = slot(f"{name}.Q")
+        program.alias(f"{name}.DN", q_slot)
+        program.timers.append(LoweredTimer(
+            name, timer.get("type", "TON"), preset_ms,
+            slot(timer.get("input") or f"{name}.IN"), q_slot, slot(f"{name}.ET")
+        ))
+
+    for name, counter in ir_data.get("counters", {}).items():
+        kind = counter.get("type", "CTU")
+        preset = parse_literal(counter.get("preset", 0))
+        if preset is None:
+            raise ValueError(f"Counter {name}: invalid preset {counter.get('preset')!r}")
+        if kind == "CTD":
+            count_input, reset_input = counter.get("cd") or f"{name}.CD", counter.get("ld") or f"{name}.LD"
+        else:
+            count_input, reset_input = counter.get("cu") or f"{name}.CU", counter.get("r") or f"{name}.R"
+        q_slot = slot(f"{name}.Q")
+        program.alias(f"{name}.DN", q_slot)
+        program.counters.append(LoweredCounter(
+            name, kind, preset, slot(count_input), slot(reset_input), q_slot, slot(f"{name}.CV")
+        ))
+
+    return program
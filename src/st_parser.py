@@ -0,0 +1,585 @@
+"""
+ST-Parser: Converts Structured Text into LadderCore IR.
+Gives IEC 61131-3 Structured Text programs the same path into the pipeline as Instruction List.
+
+Overview:
+- A single master-regex lexer is generated from the operator and function
+  tables in `mappings/structured_text.json` (plus the arithmetic and `<>`
+  operators the tables do not list), so the whole source is tokenized in one pass.
+- Expressions are parsed by precedence climbing (IEC precedence: unary `-`/`NOT`,
+  `**`, `* / MOD`, `+ -`, comparisons, `= <>`, `AND`/`&`, `XOR`, `OR`) and
+  lowered to Instruction List accumulator code; complex right operands are
+  spilled to `__tmpN` tags.
+- `IF`/`ELSIF`/`ELSE` are lowered without jumps: each branch computes a 0/1
+  guard tag and its assignments become guarded updates
+  (`X := X + (value - X) * guard`, or `S`/`R` for boolean literals), so the IR
+  runs unchanged in the simulators and the compiler.
+- Calls of declared TON/TOF/TP and CTU/CTD instances fill `timers`/`counters`
+  exactly like the IL parser's `CAL`; other instances land in `function_blocks`.
+- `x ** n` and `EXPT(x, n)` with a constant `n` are unrolled into `MUL`s and
+  `MOVE(x)` is a plain load; functions with no IL operation the simulators run
+  (`MAX`, `ABS`, `SQRT`, ...) are rejected, like `CASE`, `FOR`, `WHILE` and
+  `REPEAT`, with an `STSyntaxError`.
+"""
+
+import json
+import re
+import sys
+
+try:
+    from src.ll_parser import DEFAULT_DURATION, DEFAULT_PRESET, VAR_KEYWORDS, new_ir
+    from src.mapping_registry import get_registry
+    from src.scan_semantics import OPERATIONS, parse_literal
+except ImportError:  # Run as a script from inside src/
+    from ll_parser import DEFAULT_DURATION, DEFAULT_PRESET, VAR_KEYWORDS, new_ir
+    from mapping_registry import get_registry
+    from scan_semantics import OPERATIONS, parse_literal
+
+# Operators IEC 61131-3 defines but structured_text.json does not list.
+EXTRA_OPERATORS = ("<>", "&", "+", "-", "*", "/", "**", "MOD")
+PUNCTUATION = (":=", "=>", "(", ")", ",", ";", ":", "[", "]", "..")
+
+# Binary operator -> (precedence, IL instruction). Higher binds tighter.
+BINARY_OPERATORS = {
+    "OR": (1, "OR"), "XOR": (2, "XOR"), "AND": (3, "AND"), "&": (3, "AND"),
+    "=": (4, "EQ"), "<>": (4, "NE"),
+    "<": (5, "LT"), ">": (5, "GT"), "<=": (5, "LE"), ">=": (5, "GE"),
+    "+": (6, "ADD"), "-": (6, "SUB"),
+    "*": (7, "MUL"), "/": (7, "DIV"), "MOD": (7, "MOD"),
+    "**": (8, "EXPT"),
+}
+RIGHT_ASSOCIATIVE = frozenset(["**"])
+NEGATABLE = frozenset(["AND", "OR", "XOR"])
+
+FUNCTION_CATEGORIES = ("math_functions", "selection_functions", "bitwise_operations", "data_manipulation")
+UNSUPPORTED_STATEMENTS = frozenset(["CASE", "FOR", "WHILE", "REPEAT", "EXIT", "RETURN"])
+RESERVED = frozenset([
+    "PROGRAM", "END_PROGRAM", "END_VAR", "IF", "THEN", "ELSIF", "ELSE", "END_IF",
+    "AND", "OR", "XOR", "NOT", "MOD", "TRUE", "FALSE",
+]) | UNSUPPORTED_STATEMENTS
+VAR_QUALIFIERS = frozenset(["CONSTANT", "RETAIN", "NON_RETAIN", "PERSISTENT"])
+# Largest constant exponent `**` is unrolled for (one MUL per power)
+MAX_EXPONENT = 32
+
+_tables = None
+
+
+class STSyntaxError(ValueError):
+    """
+    Raised for Structured Text the front end cannot parse, with its source position.
+    """
+
+    def __init__(self, message, line, column):
+        super().__init__(f"Line {line}, column {column}: {message}")
+        self.line = line
+        self.column = column
+
+
+class _Tables:
+    """
+    Lexer and symbol tables derived from one version of structured_text.json.
+    """
+
+    def __init__(self, mapping):
+        symbols = set(PUNCTUATION)
+        words = set()
+        for category in ("logical_operators", "comparison_operators"):
+            for operator in mapping.get(category, {}):
+                (words if operator.isalpha() else symbols).add(operator.upper())
+        for operator in EXTRA_OPERATORS:
+            (words if operator.isalpha() else symbols).add(operator)
+        self.word_operators = frozenset(words)
+        self.functions = frozenset(
+            name.upper() for category in FUNCTION_CATEGORIES for name in mapping.get(category, {})
+        )
+        self.timer_types = frozenset(name.upper() for name in mapping.get("timers", {}))
+        self.counter_types = frozenset(name.upper() for name in mapping.get("counters", {}))
+        self.lexer = re.compile("|".join([
+            r"(?P<SKIP>\s+|\(\*.*?\*\)|//[^\n]*)",
+            r"(?P<UNTERMINATED>\(\*)",
+            r"(?P<TIME>(?i:LTIME|TIME|LT|T)#[0-9A-Za-z_.]+)",
+            r"(?P<NUMBER>\d+#[0-9A-Fa-f_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)",
+            r"(?P<STRING>'[^']*')",
+            r"(?P<NAME>[A-Za-z_]\w*(?:\.\w+)*)",
+            "(?P<OP>" + "|".join(re.escape(s) for s in sorted(symbols, key=len, reverse=True)) + ")",
+            r"(?P<ERROR>.)",
+        ]), re.DOTALL)
+
+
+def get_tables():
+    """
+    Returns the lexer tables, regenerating them when the mappings change.
+    """
+    global _tables
+    mapping = get_registry().raw["structured_text"]
+    if _tables is None or _tables[0] is not mapping:
+        _tables = (mapping, _Tables(mapping))
+    return _tables[1]
+
+
+def _position(source, offset):
+    line = source.count("\n", 0, offset) + 1
+    return line, offset - source.rfind("\n", 0, offset)
+
+
+def tokenize(source, tables=None):
+    """
+    Yields (kind, text, offset) tokens, dropping whitespace and comments.
+    """
+    tables = tables or get_tables()
+    for match in tables.lexer.finditer(source):
+        kind = match.lastgroup
+        if kind == "SKIP":
+            continue
+        if kind == "UNTERMINATED" or kind == "ERROR":
+            message = "Unterminated comment" if kind == "UNTERMINATED" else f"Unexpected character {match.group()!r}"
+            raise STSyntaxError(message, *_position(source, match.start()))
+        yield (kind, match.group(), match.start())
+
+
+def _literal(kind, text):
+    if kind == "NUMBER":
+        text = text.replace("_", "")
+        if "#" in text:
+            base, digits = text.split("#", 1)
+            return str(int(digits, int(base)))
+    return text
+
+
+def _is_leaf(node):
+    return node[0] == "var" or node[0] == "lit"
+
+
+class StructuredTextParser:
+    """
+    Single-pass Structured Text parser; the IR dict is available as `ir` after `parse`.
+    """
+
+    def __init__(self, source, tables=None):
+        self.source = source
+        self.tables = tables or get_tables()
+        self._tokens = tokenize(source, self.tables)
+        self._current = next(self._tokens, None)
+        self._previous = None
+        self.ir = new_ir()
+        self._temps = 0
+
+    # Token helpers
+
+    def _peek(self):
+        return self._current
+
+    def _advance(self):
+        self._previous = self._current
+        self._current = next(self._tokens, None)
+
+    def _word(self, token):
+        return token[1].upper() if token is not None and token[0] == "NAME" else None
+
+    def _error(self, message, token=None):
+        offset = token[2] if token is not None else len(self.source)
+        raise STSyntaxError(message, *_position(self.source, offset))
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            self._error("Unexpected end of input")
+        self._advance()
+        return token
+
+    def _expect(self, text):
+        token = self._next()
+        if token[1].upper() != text:
+            self._error(f"Expected {text!r}, found {token[1]!r}", token)
+        return token
+
+    def _accept(self, text):
+        token = self._peek()
+        if token is not None and token[1].upper() == text:
+            self._advance()
+            return True
+        return False
+
+    def _name(self):
+        token = self._next()
+        if token[0] != "NAME" or token[1].upper() in RESERVED:
+            self._error(f"Expected an identifier, found {token[1]!r}", token)
+        return token[1]
+
+    def _text_until(self, stops):
+        """
+        Returns the raw source text of the tokens before the next stop token.
+        """
+        first = self._peek()
+        last = None
+        while self._peek() is not None and self._peek()[1].upper() not in stops:
+            last = self._next()
+        if last is None:
+            self._error("Expected a value", first)
+        return self.source[first[2]:last[2] + len(last[1])]
+
+    # IR emission
+
+    def _emit(self, instruction, args):
+        self.ir["instructions"].append({"type": instruction, "args": args})
+        self.ir["scan_cycle"].append(instruction)
+
+    def _allocate(self):
+        name = f"__tmp{self._temps}"
+        self._temps += 1
+        return name
+
+    def _release(self, count=1):
+        self._temps -= count
+
+    def _spill(self, node):
+        self._load(node)
+        temp = self._allocate()
+        self._emit("ST", [temp])
+        return temp
+
+    def _load(self, node):
+        """
+        Emits accumulator code leaving the value of `node` in the accumulator.
+        """
+        kind = node[0]
+        if kind == "var" or kind == "lit":
+            self._emit("LD", [node[1]])
+        elif kind == "not":
+            operand = node[1]
+            if _is_leaf(operand):
+                self._emit("LDN", [operand[1]])
+            else:
+                self._load(operand)
+                self._emit("NOT", [])
+        elif kind == "neg":
+            temp = self._spill(node[1])
+            self._emit("LD", ["0"])
+            self._emit("SUB", [temp])
+            self._release()
+        elif kind == "op":
+            _, instruction, left, right = node
+            if _is_leaf(right):
+                self._load(left)
+                self._emit(instruction, [right[1]])
+            elif instruction in NEGATABLE and right[0] == "not" and _is_leaf(right[1]):
+                self._load(left)
+                self._emit(instruction + "N", [right[1][1]])
+            else:
+                temp = self._spill(right)
+                self._load(left)
+                self._emit(instruction, [temp])
+                self._release()
+        else:
+            _, function, args = node
+            operands = []
+            spilled = 0
+            for arg in args[1:]:
+                if _is_leaf(arg):
+                    operands.append(arg[1])
+                else:
+                    operands.append(self._spill(arg))
+                    spilled += 1
+            if args:
+                self._load(args[0])
+            self._emit(function, operands)
+            self._release(spilled)
+
+    def _assign(self, target, node, guard):
+        if guard is None:
+            self._load(node)
+            self._emit("ST", [target])
+        elif node[0] == "lit" and node[1].upper() in ("TRUE", "FALSE"):
+            self._emit("LD", [guard])
+            self._emit("S" if node[1].upper() == "TRUE" else "R", [target])
+        else:
+            self._load(node)
+            self._emit("SUB", [target])
+            self._emit("MUL", [guard])
+            self._emit("ADD", [target])
+            self._emit("ST", [target])
+
+    # Expressions
+
+    def _binary_operator(self, token):
+        if token is None:
+            return None
+        if token[0] == "OP":
+            operator = token[1]
+        elif token[0] == "NAME" and token[1].upper() in self.tables.word_operators:
+            operator = token[1].upper()
+        else:
+            return None
+        return operator if operator in BINARY_OPERATORS else None
+
+    def expression(self, min_precedence=1):
+        """
+        Parses an expression by precedence climbing and returns its tree.
+        """
+        left = self._unary()
+        while True:
+            operator = self._binary_operator(self._peek())
+            if operator is None:
+                return left
+            precedence, instruction = BINARY_OPERATORS[operator]
+            if precedence < min_precedence:
+                return left
+            token = self._peek()
+            self._advance()
+            right = self.expression(precedence if operator in RIGHT_ASSOCIATIVE else precedence + 1)
+            left = self._power(left, right, token) if instruction == "EXPT" else ("op", instruction, left, right)
+
+    def _power(self, base, exponent, token):
+        """
+        Unrolls `base ** exponent` into multiplications; the simulators have no
+        EXPT, so the exponent must be a constant between 0 and `MAX_EXPONENT`.
+        """
+        power = parse_literal(exponent[1]) if exponent[0] == "lit" else None
+        if power is None or not 0 <= power <= MAX_EXPONENT:
+            self._error(f"Exponent must be an integer constant from 0 to {MAX_EXPONENT}", token)
+        if power == 0:
+            return ("lit", "1")
+        node = base
+        for _ in range(power - 1):
+            node = ("op", "MUL", node, base)
+        return node
+
+    def _unary(self):
+        token = self._peek()
+        if self._word(token) == "NOT":
+            self._advance()
+            return ("not", self._unary())
+        if token is not None and token[0] == "OP" and token[1] in ("-", "+"):
+            self._advance()
+            operand = self._unary()
+            if token[1] == "+":
+                return operand
+            if operand[0] == "lit" and operand[1][:1].isdigit():
+                return ("lit", "-" + operand[1])
+            return ("neg", operand)
+        return self._primary()
+
+    def _primary(self):
+        token = self._next()
+        kind, text = token[0], token[1]
+        if kind in ("NUMBER", "TIME", "STRING"):
+            return ("lit", _literal(kind, text))
+        if kind == "OP" and text == "(":
+            node = self.expression()
+            self._expect(")")
+            return node
+        if kind == "NAME":
+            upper = text.upper()
+            if upper in ("TRUE", "FALSE"):
+                return ("lit", upper)
+            if upper in RESERVED and upper not in self.tables.functions:
+                self._error(f"Unexpected keyword {text!r}", token)
+            if self._accept("("):
+                if upper not in self.tables.functions:
+                    self._error(f"Unknown function {text!r}", token)
+                args = []
+                if not self._accept(")"):
+                    while True:
+                        args.append(self.expression())
+                        if self._accept(")"):
+                            break
+                        self._expect(",")
+                return self._function(upper, args, token)
+            return ("var", text)
+        self._error(f"Unexpected {text!r}", token)
+
+    def _function(self, function, args, token):
+        """
+        Returns the tree of a function call. Only functions the simulators and
+        the compiler can run are accepted: IL operations such as MOD, plus
+        MOVE and EXPT, which are lowered to a load and to multiplications.
+        """
+        if function == "MOVE" and len(args) == 1:
+            return args[0]
+        if function == "EXPT" and len(args) == 2:
+            return self._power(args[0], args[1], token)
+        if function not in OPERATIONS or not args:
+            self._error(f"Function {function} is not supported by the simulators and the compiler", token)
+        return ("call", function, args)
+
+    # Statements
+
+    def _var_block(self):
+        self._next()
+        while self._word(self._peek()) in VAR_QUALIFIERS:
+            self._advance()
+        variables = self.ir["variables"]
+        while not self._accept("END_VAR"):
+            names = [self._name()]
+            while self._accept(","):
+                names.append(self._name())
+            self._expect(":")
+            var_type = self._text_until((":=", ";")).upper()
+            initial = self._text_until((";",)) if self._accept(":=") else None
+            self._expect(";")
+            for name in names:
+                entry = {"type": var_type}
+                if initial is not None:
+                    entry["initial"] = initial
+                variables[name] = entry
+
+    def _call(self, instance, guard):
+        """
+        Lowers `Instance(IN := ..., PT := ..., Q => ...)` after its opening parenthesis.
+        """
+        inputs = []
+        outputs = []
+        if not self._accept(")"):
+            while True:
+                parameter = self._name().upper()
+                if self._accept("=>"):
+                    outputs.append((parameter, self._name()))
+                else:
+                    self._expect(":=")
+                    start = self._peek()
+                    node = self.expression()
+                    end = self._previous
+                    inputs.append((parameter, node, self.source[start[2]:end[2] + len(end[1])]))
+                if self._accept(")"):
+                    break
+                self._expect(",")
+
+        declared = self.ir["variables"].get(instance, {}).get("type")
+        tables = self.tables
+        if declared in tables.timer_types or declared in tables.counter_types:
+            is_timer = declared in tables.timer_types
+            preset_key = "PT" if is_timer else "PV"
+            section = self.ir["timers" if is_timer else "counters"]
+            entry = section.setdefault(
+                instance, {"type": declared, "duration": DEFAULT_DURATION} if is_timer
+                else {"type": declared, "preset": DEFAULT_PRESET}
+            )
+            for parameter, node, text in inputs:
+                if parameter == preset_key:
+                    entry["duration" if is_timer else "preset"] = text
+                    continue
+                key = "input" if parameter == "IN" else parameter.lower()
+                if node[0] == "var" and guard is None:
+                    entry[key] = node[1]
+                else:
+                    entry.pop(key, None)
+                    self._assign(f"{instance}.{parameter}", node, guard)
+        else:
+            self.ir["function_blocks"][instance] = {"args": [f"{p}:={text}" for p, _, text in inputs]}
+        self.ir["scan_cycle"].append("CAL")
+
+        for parameter, target in outputs:
+            self._assign(target, ("var", f"{instance}.{parameter}"), guard)
+
+    def _if(self, guard):
+        """
+        Lowers IF/ELSIF/ELSE into guarded statements after the IF keyword.
+        """
+        done = None
+        branch = None
+        while True:
+            condition = self.expression()
+            self._expect("THEN")
+            self._load(condition)
+            if done is not None:
+                self._emit("ANDN", [done])
+            if guard is not None:
+                self._emit("AND", [guard])
+            if done is None:
+                done = self._allocate()
+                self._emit("ST", [done])
+                current = done
+            else:
+                branch = branch or self._allocate()
+                self._emit("ST", [branch])
+                self._emit("OR", [done])
+                self._emit("ST", [done])
+                current = branch
+            ending = self._statements(current, ("ELSIF", "ELSE", "END_IF"))
+            if ending == "ELSIF":
+                continue
+            if ending == "ELSE":
+                branch = branch or self._allocate()
+                self._emit("LDN", [done])
+                if guard is not None:
+                    self._emit("AND", [guard])
+                self._emit("ST", [branch])
+                self._statements(branch, ("END_IF",))
+            break
+        self._accept(";")
+        self._release(2 if branch else 1)
+
+    def _statements(self, guard, terminators):
+        """
+        Parses statements until one of `terminators`, which is consumed and returned.
+        """
+        while True:
+            token = self._peek()
+            if token is None:
+                self._error(f"Expected {terminators[-1]}")
+            word = self._word(token)
+            if word in terminators:
+                self._advance()
+                return word
+            self._statement(guard)
+
+    def _statement(self, guard):
+        token = self._next()
+        word = self._word(token)
+        if token[1] == ";":
+            return
+        if word == "IF":
+            self._if(guard)
+            return
+        if word in UNSUPPORTED_STATEMENTS:
+            self._error(f"{word} statements are not supported", token)
+        if token[0] != "NAME" or word in RESERVED:
+            self._error(f"Unexpected {token[1]!r}", token)
+        if self._accept(":="):
+            self._assign(token[1], self.expression(), guard)
+        elif self._accept("("):
+            self._call(token[1], guard)
+        else:
+            self._error(f"Expected ':=' or '(' after {token[1]!r}", self._peek())
+        self._expect(";")
+
+    def parse(self):
+        """
+        Parses the whole source and returns the LadderCore IR dict.
+        """
+        while self._peek() is not None:
+            word = self._word(self._peek())
+            if word == "PROGRAM":
+                self._advance()
+                self._name()
+            elif word == "END_PROGRAM":
+                self._advance()
+            elif word in VAR_KEYWORDS:
+                self._var_block()
+            else:
+                self._statement(None)
+        return self.ir
+
+
+def _read_source(source):
+    if isinstance(source, str):
+        return source
+    if hasattr(source, "read"):
+        return source.read()
+    return "\n".join(line.rstrip("\n") for line in source)
+
+
+def parse_structured_text(source):
+    """
+    Parses Structured Text from a string, file object or iterable of lines and
+    returns the LadderCore IR dict.
+    """
+    return StructuredTextParser(_read_source(source)).parse()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python src/st_parser.py program.st")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        print(json.dumps(parse_structured_text(f), indent=2))
@@ -0,0 +1,213 @@
+"""
+Time-Constraint Analysis
+Folds every slot and timer constraint of a LadderCore IR program into one validity interval.
+
+Overview:
+- Slot references (`42`, `"42"`, `"slot42"`) and IEC durations (`"5000"`,
+  `"5S"`, `"T#5S"`) are parsed once; durations become milliseconds and, for
+  slot arithmetic, whole slots of `SLOT_LENGTH_MS`.
+- Constraint sources:
+  - `slot-based` and `verifiable` formats and `immediate` anchoring bound the
+    interval below by the IR timestamp;
+  - a TON timer bounds it below by its start slot plus its duration, since
+    its output only rises once the delay has elapsed;
+  - a TOF timer with a start slot bounds it above by slot plus duration, since
+    its output drops once the off delay has expired.
+  Timers without a `slot` start at the symbolic slot `slotX`.
+- Lower bounds are intersected by taking the maximum, upper bounds by taking
+  the minimum. Symbolic slots are folded per symbol, and different symbols
+  are combined with `max`/`min` in the emitted range.
+- An empty intersection raises `UnsatisfiableTimeConstraints` (a ValueError)
+  naming the conflicting sources, so the program fails to compile instead of
+  producing a validator that no transaction can satisfy.
+- `TimeAnalysis.range()` renders Plutus interval syntax: `from slot105`,
+  `to slot120` or `interval slot105 slot120`.
+"""
+
+import re
+
+try:
+    from src.iec_time import parse_duration_ms
+except ImportError:  # Run as a script from inside src/
+    from iec_time import parse_duration_ms
+
+# Cardano slots last one second
+SLOT_LENGTH_MS = 1000
+# Start slot of timers whose IR entry names none
+DEFAULT_TIMER_SLOT = "slotX"
+
+SLOT_PATTERN = re.compile(r"^(?:slot)?(\d+)$")
+SYMBOL_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_']*$")
+
+
+class UnsatisfiableTimeConstraints(ValueError):
+    """
+    Raised when the lower bound of the validity interval lies past its upper bound.
+    """
+
+    def __init__(self, lower, upper):
+        self.lower = lower
+        self.upper = upper
+        super().__init__(
+            f"Unsatisfiable time constraints: {lower.source} requires from {lower.render()}, "
+            f"but {upper.source} requires to {upper.render()}"
+        )
+
+
+class SlotBound:
+    """
+    A slot `offset` slots after `base` (a symbolic slot name), or the absolute slot `offset` when `base` is None.
+    """
+    __slots__ = ("base", "offset", "source")
+
+    def __init__(self, base, offset, source):
+        self.base = base
+        self.offset = offset
+        self.source = source
+
+    def shifted(self, slots, source):
+        return SlotBound(self.base, self.offset + slots, source)
+
+    def render(self):
+        if self.base is None:
+            return f"slot{self.offset}"
+        if self.offset == 0:
+            return self.base
+        return f"({self.base} + {self.offset})"
+
+    def __eq__(self, other):
+        return isinstance(other, SlotBound) and (self.base, self.offset) == (other.base, other.offset)
+
+    def __repr__(self):
+        return f"SlotBound({self.render()}, {self.source!r})"
+
+
+def parse_slot(value, source):
+    """
+    Parses a slot reference into a `SlotBound`. Raises ValueError for malformed references.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"{source}: invalid slot {value!r}")
+    if isinstance(value, int):
+        if value < 0:
+            raise ValueError(f"{source}: invalid slot {value!r}")
+        return SlotBound(None, value, source)
+    if isinstance(value, str):
+        text = value.strip()
+        match = SLOT_PATTERN.match(text)
+        if match:
+            return SlotBound(None, int(match.group(1)), source)
+        if SYMBOL_PATTERN.match(text):
+            return SlotBound(text, 0, source)
+    raise ValueError(f"{source}: invalid slot {value!r}")
+
+
+def duration_slots(duration_ms, slot_length_ms=SLOT_LENGTH_MS):
+    """
+    Returns the number of whole slots needed for `duration_ms` to elapse.
+    """
+    return -(-duration_ms // slot_length_ms)
+
+
+def _fold(bounds, pick):
+    """
+    Keeps one bound per base: the tightest by `pick` (max for lower, min for upper).
+    """
+    folded = {}
+    for bound in bounds:
+        current = folded.get(bound.base)
+        if current is None or pick(bound.offset, current.offset) != current.offset:
+            folded[bound.base] = bound
+    return [folded[base] for base in sorted(folded, key=lambda base: (base is not None, base or ""))]
+
+
+def _combine(bounds, function):
+    rendered = [bound.render() for bound in bounds]
+    expression = rendered[-1]
+    for term in reversed(rendered[:-1]):
+        expression = f"({function} {term} {expression})"
+    return expression
+
+
+class TimeAnalysis:
+    """
+    The intersected validity interval of one program plus its normalized timer durations.
+
+    `lower`/`upper` hold one `SlotBound` per base slot (empty when unbounded);
+    `durations_ms` maps timer names to milliseconds.
+    """
+    __slots__ = ("lower", "upper", "constraints", "durations_ms", "finality", "verifiable")
+
+    def __init__(self):
+        self.lower = []
+        self.upper = []
+        self.constraints = 0
+        self.durations_ms = {}
+        self.finality = None
+        self.verifiable = None
+
+    def range(self):
+        """
+        Returns the Plutus interval expression, or None when nothing constrains the interval.
+        """
+        if self.lower and self.upper:
+            return f"interval {_combine(self.lower, 'max')} {_combine(self.upper, 'min')}"
+        if self.lower:
+            return f"from {_combine(self.lower, 'max')}"
+        if self.upper:
+            return f"to {_combine(self.upper, 'min')}"
+        return None
+
+
+def analyze_time_constraints(ir_data, slot_length_ms=SLOT_LENGTH_MS):
+    """
+    Returns the `TimeAnalysis` of an IR program.
+
+    Raises ValueError for malformed durations, slots or missing timestamps, and
+    `UnsatisfiableTimeConstraints` when the constraints cannot all hold.
+    """
+    analysis = TimeAnalysis()
+    lower = []
+    upper = []
+    anchor = None
+
+    format_ = ir_data.get("format")
+    anchoring = ir_data.get("anchoring")
+    if format_ in ("slot-based", "verifiable") or anchoring in ("immediate", "finality"):
+        if "timestamp" not in ir_data:
+            raise ValueError(f"Time constraints: format {format_!r} / anchoring {anchoring!r} require a timestamp")
+        anchor = ir_data["timestamp"]
+    if format_ == "slot-based":
+        lower.append(parse_slot(anchor, "slot-based timestamp"))
+    if anchoring == "immediate":
+        lower.append(parse_slot(anchor, "immediate anchoring"))
+    elif anchoring == "finality":
+        analysis.finality = anchor
+    if format_ == "verifiable":
+        lower.append(parse_slot(anchor, "verifiable anchoring"))
+        analysis.verifiable = anchor
+
+    for name, timer in ir_data.get("timers", {}).items():
+        source = f"timer {name}"
+        try:
+            duration_ms = parse_duration_ms(timer.get("duration", 0))
+        except ValueError:
+            raise ValueError(f"Timer {name}: invalid duration {timer.get('duration')!r}")
+        analysis.durations_ms[name] = duration_ms
+        kind = timer.get("type")
+        if kind == "TON":
+            start = parse_slot(timer.get("slot", DEFAULT_TIMER_SLOT), source)
+            lower.append(start.shifted(duration_slots(duration_ms, slot_length_ms), source))
+        elif kind == "TOF" and "slot" in timer:
+            start = parse_slot(timer["slot"], source)
+            upper.append(start.shifted(duration_slots(duration_ms, slot_length_ms), source))
+
+    analysis.constraints = len(lower) + len(upper)
+    analysis.lower = _fold(lower, max)
+    analysis.upper = _fold(upper, min)
+    upper_by_base = {bound.base: bound for bound in analysis.upper}
+    for bound in analysis.lower:
+        limit = upper_by_base.get(bound.base)
+        if limit is not None and bound.offset > limit.offset:
+            raise UnsatisfiableTimeConstraints(bound, limit)
+    return analysis
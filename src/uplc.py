@@ -0,0 +1,769 @@
+"""
+Untyped Plutus Core
+Terms, textual pretty-printing, flat serialization and a reference evaluator for UPLC programs.
+
+Overview:
+- Terms are `Var`, `Lam`, `Apply`, `Force`, `Delay`, `Const`, `Builtin` and
+  `Error`. Variables are built by name; `resolve_names` assigns the
+  de Bruijn indices that flat encoding uses (binder names must be unique).
+- `Program.pretty()` prints the textual syntax
+  (`(program 1.0.0 (lam x [(builtin addInteger) x (con integer 1)]))`).
+- `Program.to_flat()` / `Program.from_flat()` implement the on-chain flat
+  format: 4-bit term tags, 7-bit builtin tags, LEB128-style naturals,
+  zigzag integers and byte-aligned chunked bytestrings, closed by the filler.
+  Constants of type integer, bytestring, string, unit and bool are supported.
+- `evaluate` is a CEK machine for the builtins the emitters use: it runs a
+  program applied to Plutus Data arguments and returns the result, the
+  trace log and the number of machine steps (not ledger execution units).
+- Every walk over a term is iterative, so deeply nested programs (one binder
+  per tag) do not hit the recursion limit.
+- `python src/uplc.py script.plutus` pretty-prints a text-envelope script.
+"""
+
+import json
+import re
+import sys
+
+# Builtin functions in flat tag order
+BUILTINS = (
+    "addInteger", "subtractInteger", "multiplyInteger", "divideInteger", "quotientInteger",
+    "remainderInteger", "modInteger", "equalsInteger", "lessThanInteger", "lessThanEqualsInteger",
+    "appendByteString", "consByteString", "sliceByteString", "lengthOfByteString", "indexByteString",
+    "equalsByteString", "lessThanByteString", "lessThanEqualsByteString", "sha2_256", "sha3_256",
+    "blake2b_256", "verifyEd25519Signature", "appendString", "equalsString", "encodeUtf8", "decodeUtf8",
+    "ifThenElse", "chooseUnit", "trace", "fstPair", "sndPair", "chooseList", "mkCons", "headList",
+    "tailList", "nullList", "chooseData", "constrData", "mapData", "listData", "iData", "bData",
+    "unConstrData", "unMapData", "unListData", "unIData", "unBData", "equalsData", "mkPairData",
+    "mkNilData", "mkNilPairData", "serialiseData",
+)
+BUILTIN_TAGS = {name: tag for tag, name in enumerate(BUILTINS)}
+# Type arguments (forces) polymorphic builtins take before their value arguments
+BUILTIN_FORCES = {
+    "ifThenElse": 1, "chooseUnit": 1, "trace": 1, "fstPair": 2, "sndPair": 2, "chooseList": 2,
+    "mkCons": 1, "headList": 1, "tailList": 1, "nullList": 1, "chooseData": 1,
+}
+
+TERM_VAR, TERM_DELAY, TERM_LAM, TERM_APPLY, TERM_CONST, TERM_FORCE, TERM_ERROR, TERM_BUILTIN = range(8)
+CONSTANT_TYPES = {"integer": 0, "bytestring": 1, "string": 2, "unit": 3, "bool": 4}
+CONSTANT_TYPE_NAMES = {tag: name for name, tag in CONSTANT_TYPES.items()}
+NAME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_']*$")
+
+
+class UPLCError(Exception):
+    """
+    Raised when evaluation fails (an `error` term or an ill-typed builtin call); `logs` holds the trace so far.
+    """
+
+    def __init__(self, message, logs=()):
+        super().__init__(message)
+        self.logs = list(logs)
+
+
+class Var:
+    __slots__ = ("name", "index")
+
+    def __init__(self, name=None, index=None):
+        self.name = name
+        self.index = index
+
+
+class Lam:
+    __slots__ = ("name", "body")
+
+    def __init__(self, name, body):
+        self.name = name
+        self.body = body
+
+
+class Apply:
+    __slots__ = ("function", "argument")
+
+    def __init__(self, function, argument):
+        self.function = function
+        self.argument = argument
+
+
+class Force:
+    __slots__ = ("term",)
+
+    def __init__(self, term):
+        self.term = term
+
+
+class Delay:
+    __slots__ = ("term",)
+
+    def __init__(self, term):
+        self.term = term
+
+
+class Const:
+    __slots__ = ("type", "value")
+
+    def __init__(self, type_, value):
+        if type_ not in CONSTANT_TYPES:
+            raise ValueError(f"Unsupported constant type: {type_}")
+        self.type = type_
+        self.value = value
+
+
+class Builtin:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        if name not in BUILTIN_TAGS:
+            raise ValueError(f"Unknown builtin: {name}")
+        self.name = name
+
+
+class Error:
+    __slots__ = ()
+
+
+class Program:
+    """
+    A versioned UPLC program.
+    """
+    __slots__ = ("version", "term")
+
+    def __init__(self, term, version=(1, 0, 0)):
+        self.version = tuple(version)
+        self.term = term
+
+    def pretty(self):
+        return pretty_print(self)
+
+    def to_flat(self):
+        return encode_flat(self)
+
+    @classmethod
+    def from_flat(cls, data):
+        return decode_flat(data)
+
+
+def apply(function, *arguments):
+    """
+    Returns `[function arg1 arg2 ...]`.
+    """
+    for argument in arguments:
+        function = Apply(function, argument)
+    return function
+
+
+def builtin(name):
+    """
+    Returns the builtin forced once per type argument, ready for value arguments.
+    """
+    term = Builtin(name)
+    for _ in range(BUILTIN_FORCES.get(name, 0)):
+        term = Force(term)
+    return term
+
+
+def resolve_names(term):
+    """
+    Sets the de Bruijn index of every named `Var` in place. Raises ValueError for unbound names.
+    """
+    levels = {}
+    stack = [(term, 0)]
+    while stack:
+        node, depth = stack.pop()
+        kind = type(node)
+        if kind is Var:
+            if node.name is not None:
+                level = levels.get(node.name)
+                if level is None:
+                    raise ValueError(f"Unbound variable: {node.name}")
+                node.index = depth - level + 1
+        elif kind is Lam:
+            if node.name is not None:
+                if node.name in levels:
+                    raise ValueError(f"Binder name used twice: {node.name}")
+                levels[node.name] = depth + 1
+            stack.append((node.body, depth + 1))
+        elif kind is Apply:
+            stack.append((node.argument, depth))
+            stack.append((node.function, depth))
+        elif kind is Force or kind is Delay:
+            stack.append((node.term, depth))
+    return term
+
+
+# Pretty printing
+
+def _constant_text(constant):
+    value = constant.value
+    if constant.type == "integer":
+        return f"(con integer {value})"
+    if constant.type == "bool":
+        return f"(con bool {'True' if value else 'False'})"
+    if constant.type == "unit":
+        return "(con unit ())"
+    if constant.type == "string":
+        return f"(con string {json.dumps(value, ensure_ascii=False)})"
+    return f"(con bytestring #{bytes(value).hex()})"
+
+
+def pretty_print(program):
+    """
+    Returns the textual UPLC syntax of a `Program`.
+    """
+    out = []
+    names = []
+    # Items are terms to print, strings to emit, or None to leave a binder's scope
+    stack = [")", program.term]
+    out.append("(program {0}.{1}.{2} ".format(*program.version))
+    while stack:
+        item = stack.pop()
+        if item is None:
+            names.pop()
+            continue
+        if isinstance(item, str):
+            out.append(item)
+            continue
+        kind = type(item)
+        if kind is Var:
+            index = item.index
+            if index is None or not 0 < index <= len(names):
+                out.append(item.name or f"free{index}")
+            else:
+                out.append(names[-index])
+        elif kind is Lam:
+            name = item.name if item.name and NAME_PATTERN.match(item.name) else f"v{len(names)}"
+            names.append(name)
+            out.append(f"(lam {name} ")
+            stack.extend((None, ")", item.body))
+        elif kind is Apply:
+            spine = []
+            while type(item) is Apply:
+                spine.append(item.argument)
+                item = item.function
+            out.append("[")
+            stack.append("]")
+            for argument in spine:
+                stack.extend((argument, " "))
+            stack.append(item)
+        elif kind is Force:
+            out.append("(force ")
+            stack.extend((")", item.term))
+        elif kind is Delay:
+            out.append("(delay ")
+            stack.extend((")", item.term))
+        elif kind is Const:
+            out.append(_constant_text(item))
+        elif kind is Builtin:
+            out.append(f"(builtin {item.name})")
+        elif kind is Error:
+            out.append("(error)")
+        else:
+            raise TypeError(f"Not a UPLC term: {item!r}")
+    return "".join(out)
+
+
+# Flat encoding
+
+class _BitWriter:
+    __slots__ = ("buffer", "current", "used")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.current = 0
+        self.used = 0
+
+    def bits(self, value, count):
+        for shift in range(count - 1, -1, -1):
+            self.current = (self.current << 1) | ((value >> shift) & 1)
+            self.used += 1
+            if self.used == 8:
+                self.buffer.append(self.current)
+                self.current = 0
+                self.used = 0
+
+    def natural(self, value):
+        while True:
+            group = value & 0x7F
+            value >>= 7
+            if value:
+                self.bits(0x80 | group, 8)
+            else:
+                self.bits(group, 8)
+                return
+
+    def filler(self):
+        self.bits(0, 7 - self.used)
+        self.bits(1, 1)
+
+    def bytestring(self, data):
+        self.filler()
+        for start in range(0, len(data), 255):
+            chunk = data[start:start + 255]
+            self.buffer.append(len(chunk))
+            self.buffer.extend(chunk)
+        self.buffer.append(0)
+
+
+def _encode_constant(writer, constant):
+    writer.bits(1, 1)
+    writer.bits(CONSTANT_TYPES[constant.type], 4)
+    writer.bits(0, 1)
+    value = constant.value
+    if constant.type == "integer":
+        writer.natural(2 * value if value >= 0 else -2 * value - 1)
+    elif constant.type == "bool":
+        writer.bits(1 if value else 0, 1)
+    elif constant.type == "string":
+        writer.bytestring(value.encode("utf-8"))
+    elif constant.type == "bytestring":
+        writer.bytestring(bytes(value))
+
+
+def encode_flat(program):
+    """
+    Serializes a `Program` to flat bytes. Named variables are resolved first.
+    """
+    resolve_names(program.term)
+    writer = _BitWriter()
+    for part in program.version:
+        writer.natural(part)
+    stack = [program.term]
+    while stack:
+        term = stack.pop()
+        kind = type(term)
+        if kind is Var:
+            writer.bits(TERM_VAR, 4)
+            writer.natural(term.index)
+        elif kind is Lam:
+            writer.bits(TERM_LAM, 4)
+            stack.append(term.body)
+        elif kind is Apply:
+            writer.bits(TERM_APPLY, 4)
+            stack.append(term.argument)
+            stack.append(term.function)
+        elif kind is Force:
+            writer.bits(TERM_FORCE, 4)
+            stack.append(term.term)
+        elif kind is Delay:
+            writer.bits(TERM_DELAY, 4)
+            stack.append(term.term)
+        elif kind is Const:
+            writer.bits(TERM_CONST, 4)
+            _encode_constant(writer, term)
+        elif kind is Builtin:
+            writer.bits(TERM_BUILTIN, 4)
+            writer.bits(BUILTIN_TAGS[term.name], 7)
+        elif kind is Error:
+            writer.bits(TERM_ERROR, 4)
+        else:
+            raise TypeError(f"Not a UPLC term: {term!r}")
+    writer.filler()
+    return bytes(writer.buffer)
+
+
+class _BitReader:
+    __slots__ = ("data", "position")
+
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+
+    def bits(self, count):
+        value = 0
+        for _ in range(count):
+            byte_index, bit = divmod(self.position, 8)
+            if byte_index >= len(self.data):
+                raise ValueError("Truncated flat input")
+            value = (value << 1) | ((self.data[byte_index] >> (7 - bit)) & 1)
+            self.position += 1
+        return value
+
+    def natural(self):
+        value = 0
+        shift = 0
+        while True:
+            group = self.bits(8)
+            value |= (group & 0x7F) << shift
+            shift += 7
+            if not group & 0x80:
+                return value
+
+    def filler(self):
+        while not self.bits(1):
+            pass
+        if self.position % 8:
+            raise ValueError("Misaligned filler in flat input")
+
+    def bytestring(self):
+        self.filler()
+        data = bytearray()
+        while True:
+            length = self.bits(8)
+            if not length:
+                return bytes(data)
+            start = self.position // 8
+            data += self.data[start:start + length]
+            self.position += 8 * length
+
+
+def _decode_constant(reader):
+    types = []
+    while reader.bits(1):
+        types.append(reader.bits(4))
+    if len(types) != 1 or types[0] not in CONSTANT_TYPE_NAMES:
+        raise ValueError(f"Unsupported constant type tags: {types}")
+    type_ = CONSTANT_TYPE_NAMES[types[0]]
+    if type_ == "integer":
+        zigzag = reader.natural()
+        value = zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+    elif type_ == "bool":
+        value = bool(reader.bits(1))
+    elif type_ == "unit":
+        value = None
+    elif type_ == "string":
+        value = reader.bytestring().decode("utf-8")
+    else:
+        value = reader.bytestring()
+    return Const(type_, value)
+
+
+def decode_flat(data):
+    """
+    Parses flat bytes into a `Program` whose variables carry de Bruijn indices only.
+    Raises ValueError for malformed or unsupported input.
+    """
+    reader = _BitReader(bytes(data))
+    version = tuple(reader.natural() for _ in range(3))
+    # Frames are [kind, children]; a term completes its parent frame when delivered
+    frames = []
+    result = None
+    while result is None:
+        tag = reader.bits(4)
+        if tag == TERM_VAR:
+            term = Var(index=reader.natural())
+        elif tag == TERM_CONST:
+            term = _decode_constant(reader)
+        elif tag == TERM_BUILTIN:
+            builtin_tag = reader.bits(7)
+            if builtin_tag >= len(BUILTINS):
+                raise ValueError(f"Unsupported builtin tag: {builtin_tag}")
+            term = Builtin(BUILTINS[builtin_tag])
+        elif tag == TERM_ERROR:
+            term = Error()
+        elif tag in (TERM_LAM, TERM_FORCE, TERM_DELAY, TERM_APPLY):
+            frames.append([tag, []])
+            continue
+        else:
+            raise ValueError(f"Unsupported term tag: {tag}")
+        while True:
+            if not frames:
+                result = term
+                break
+            frame = frames[-1]
+            frame[1].append(term)
+            needed = 2 if frame[0] == TERM_APPLY else 1
+            if len(frame[1]) < needed:
+                break
+            frames.pop()
+            children = frame[1]
+            if frame[0] == TERM_LAM:
+                term = Lam(None, children[0])
+            elif frame[0] == TERM_FORCE:
+                term = Force(children[0])
+            elif frame[0] == TERM_DELAY:
+                term = Delay(children[0])
+            else:
+                term = Apply(children[0], children[1])
+    reader.filler()
+    if reader.position // 8 != len(reader.data):
+        raise ValueError("Trailing bytes after flat program")
+    return Program(result, version)
+
+
+# Plutus Data and CBOR
+
+class Constr:
+    """
+    Plutus Data constructor application. Other Data values are Python ints
+    (I), bytes (B), lists (List) and `DataMap` (Map).
+    """
+    __slots__ = ("tag", "fields")
+
+    def __init__(self, tag, fields):
+        self.tag = tag
+        self.fields = list(fields)
+
+
+class DataMap:
+    __slots__ = ("pairs",)
+
+    def __init__(self, pairs):
+        self.pairs = list(pairs)
+
+
+def cbor_bytes(data):
+    """
+    Returns `data` wrapped as a definite-length CBOR byte string.
+    """
+    length = len(data)
+    if length < 24:
+        header = bytes([0x40 | length])
+    elif length < 0x100:
+        header = bytes([0x58, length])
+    elif length < 0x10000:
+        header = bytes([0x59]) + length.to_bytes(2, "big")
+    else:
+        header = bytes([0x5A]) + length.to_bytes(4, "big")
+    return header + bytes(data)
+
+
+def cbor_unwrap(data):
+    """
+    Returns the payload of a definite-length CBOR byte string. Raises ValueError otherwise.
+    """
+    if not data or data[0] >> 5 != 2:
+        raise ValueError("Not a CBOR byte string")
+    info = data[0] & 0x1F
+    if info < 24:
+        start, length = 1, info
+    elif info in (24, 25, 26):
+        size = 1 << (info - 24)
+        start, length = 1 + size, int.from_bytes(data[1:1 + size], "big")
+    else:
+        raise ValueError("Unsupported CBOR byte string length")
+    if start + length != len(data):
+        raise ValueError("CBOR byte string length mismatch")
+    return bytes(data[start:start + length])
+
+
+# Evaluation
+
+class _Closure:
+    __slots__ = ("body", "env")
+
+    def __init__(self, body, env):
+        self.body = body
+        self.env = env
+
+
+class _Lambda(_Closure):
+    __slots__ = ()
+
+
+class _Delayed(_Closure):
+    __slots__ = ()
+
+
+class _Partial:
+    __slots__ = ("name", "forces", "arguments")
+
+    def __init__(self, name, forces, arguments):
+        self.name = name
+        self.forces = forces
+        self.arguments = arguments
+
+
+def _int(value):
+    if type(value) is not int:
+        raise UPLCError(f"Expected an integer, got {type(value).__name__}")
+    return value
+
+
+def _list(value):
+    if type(value) is not list:
+        raise UPLCError(f"Expected a list, got {type(value).__name__}")
+    return value
+
+
+def _quotient(left, right):
+    if right == 0:
+        raise UPLCError("Division by zero")
+    quotient = abs(left) // abs(right)
+    return quotient if (left >= 0) == (right >= 0) else -quotient
+
+
+def _head(values):
+    if not _list(values):
+        raise UPLCError("headList of an empty list")
+    return values[0]
+
+
+def _tail(values):
+    if not _list(values):
+        raise UPLCError("tailList of an empty list")
+    return values[1:]
+
+
+def _un_data(kind, value):
+    if kind is Constr and type(value) is Constr:
+        return (value.tag, value.fields)
+    if kind is DataMap and type(value) is DataMap:
+        return list(value.pairs)
+    if type(value) is kind and kind is not Constr and kind is not DataMap:
+        return value
+    raise UPLCError(f"Data is not a {kind.__name__}")
+
+
+def _if_then_else(condition, then, otherwise):
+    if type(condition) is not bool:
+        raise UPLCError("ifThenElse expects a bool")
+    return then if condition else otherwise
+
+
+# name -> (arity, implementation)
+_BUILTIN_IMPLEMENTATIONS = {
+    "addInteger": (2, lambda a, b: _int(a) + _int(b)),
+    "subtractInteger": (2, lambda a, b: _int(a) - _int(b)),
+    "multiplyInteger": (2, lambda a, b: _int(a) * _int(b)),
+    "divideInteger": (2, lambda a, b: _int(a) // _int(b) if b else _quotient(a, b)),
+    "quotientInteger": (2, lambda a, b: _quotient(_int(a), _int(b))),
+    "remainderInteger": (2, lambda a, b: _int(a) - _quotient(a, _int(b)) * b),
+    "modInteger": (2, lambda a, b: _int(a) % _int(b) if b else _quotient(a, b)),
+    "equalsInteger": (2, lambda a, b: _int(a) == _int(b)),
+    "lessThanInteger": (2, lambda a, b: _int(a) < _int(b)),
+    "lessThanEqualsInteger": (2, lambda a, b: _int(a) <= _int(b)),
+    "appendString": (2, lambda a, b: a + b),
+    "equalsString": (2, lambda a, b: a == b),
+    "equalsByteString": (2, lambda a, b: a == b),
+    "ifThenElse": (3, _if_then_else),
+    "chooseUnit": (2, lambda unit, value: value),
+    "fstPair": (1, lambda pair: pair[0]),
+    "sndPair": (1, lambda pair: pair[1]),
+    "chooseList": (3, lambda values, empty, other: empty if not _list(values) else other),
+    "mkCons": (2, lambda value, values: [value] + _list(values)),
+    "headList": (1, _head),
+    "tailList": (1, _tail),
+    "nullList": (1, lambda values: not _list(values)),
+    "constrData": (2, lambda tag, fields: Constr(_int(tag), _list(fields))),
+    "iData": (1, lambda value: _int(value)),
+    "listData": (1, lambda values: _list(values)),
+    "unConstrData": (1, lambda value: _un_data(Constr, value)),
+    "unMapData": (1, lambda value: _un_data(DataMap, value)),
+    "unListData": (1, lambda value: _un_data(list, value)),
+    "unIData": (1, lambda value: _un_data(int, value)),
+    "unBData": (1, lambda value: _un_data(bytes, value)),
+}
+
+
+def evaluate(program, *arguments):
+    """
+    Applies `program` to Plutus Data `arguments` and evaluates it.
+
+    Returns `(value, logs, steps)`; raises `UPLCError` (with the trace so far)
+    when evaluation fails.
+    """
+    term = program.term if isinstance(program, Program) else program
+    logs = []
+    # Continuation frames: ("arg", term, env), ("call", function), ("force",)
+    frames = [("call_value", argument) for argument in reversed(arguments)]
+    env = None
+    steps = 0
+    computing = True
+    value = None
+    while True:
+        steps += 1
+        if computing:
+            kind = type(term)
+            if kind is Apply:
+                frames.append(("arg", term.argument, env))
+                term = term.function
+                continue
+            if kind is Var:
+                if term.index is None:
+                    raise UPLCError(f"Unresolved variable {term.name}", logs)
+                node = env
+                for _ in range(term.index - 1):
+                    node = node[1] if node is not None else None
+                if node is None:
+                    raise UPLCError(f"Free variable {term.index}", logs)
+                value = node[0]
+            elif kind is Lam:
+                value = _Lambda(term.body, env)
+            elif kind is Delay:
+                value = _Delayed(term.term, env)
+            elif kind is Force:
+                frames.append(("force",))
+                term = term.term
+                continue
+            elif kind is Const:
+                value = term.value
+            elif kind is Builtin:
+                value = _Partial(term.name, 0, ())
+            elif kind is Error:
+                raise UPLCError("Evaluation reached (error)", logs)
+            else:
+                raise UPLCError(f"Not a UPLC term: {term!r}", logs)
+            computing = False
+
+        if not frames:
+            return value, logs, steps
+        frame = frames.pop()
+        action = frame[0]
+        if action == "arg":
+            frames.append(("call", value))
+            term, env = frame[1], frame[2]
+            computing = True
+            continue
+        if action == "call_value":
+            function, argument = value, frame[1]
+        elif action == "call":
+            function, argument = frame[1], value
+        else:
+            if type(value) is _Delayed:
+                term, env = value.body, value.env
+                computing = True
+                continue
+            if type(value) is _Partial and value.forces < BUILTIN_FORCES.get(value.name, 0) and not value.arguments:
+                value = _Partial(value.name, value.forces + 1, ())
+                continue
+            raise UPLCError("Forced a term that is not delayed", logs)
+
+        if type(function) is _Lambda:
+            term, env = function.body, (argument, function.env)
+            computing = True
+            continue
+        if type(function) is not _Partial:
+            raise UPLCError("Applied a term that is not a function", logs)
+        if function.forces != BUILTIN_FORCES.get(function.name, 0):
+            raise UPLCError(f"Builtin {function.name} applied before being forced", logs)
+        arguments_so_far = function.arguments + (argument,)
+        if function.name == "trace":
+            if len(arguments_so_far) < 2:
+                value = _Partial("trace", function.forces, arguments_so_far)
+                continue
+            logs.append(arguments_so_far[0])
+            value = arguments_so_far[1]
+            continue
+        implementation = _BUILTIN_IMPLEMENTATIONS.get(function.name)
+        if implementation is None:
+            raise UPLCError(f"Builtin {function.name} is not supported by this evaluator", logs)
+        arity, call = implementation
+        if len(arguments_so_far) < arity:
+            value = _Partial(function.name, function.forces, arguments_so_far)
+            continue
+        try:
+            value = call(*arguments_so_far)
+        except UPLCError as e:
+            raise UPLCError(str(e), logs)
+        except (IndexError, TypeError, ZeroDivisionError) as e:
+            raise UPLCError(f"Builtin {function.name} failed: {e}", logs)
+
+
+def load_script(text):
+    """
+    Returns the `Program` of a text envelope (JSON with `cborHex`) or a bare hex string.
+    """
+    text = text.strip()
+    if text.startswith("{"):
+        text = json.loads(text)["cborHex"]
+    data = bytes.fromhex(text)
+    # Text envelopes wrap the flat bytes in CBOR twice, on-chain scripts once
+    while data and data[0] >> 5 == 2:
+        data = cbor_unwrap(data)
+    return decode_flat(data)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python src/uplc.py script.plutus")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        print(load_script(f.read()).pretty())
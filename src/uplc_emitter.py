@@ -0,0 +1,348 @@
+"""
+UPLC Emitter
+Lowers a LadderCore IR program straight to an Untyped Plutus Core validator and its on-chain script bytes.
+
+Overview:
+- The validator has the same checks as the Plutus Haskell backend's default
+  output, with no Haskell toolchain involved: one condition per live
+  instruction (the conjunction of its operands), TOF timer and counter
+  checks, and the merged validity interval from `time_constraints`.
+- It is a PlutusV2 spending validator `\\datum redeemer ctx`. Tag values are
+  read from the redeemer, a Data list of integers in `script.tags` order
+  (`script.redeemer(values)` builds it); a tag is true when it is non-zero.
+- Conditions are combined in a balanced tree of short-circuiting `ifThenElse`
+  terms, so the first failing condition (in program order) traces the same
+  message as the Haskell validator and the term stays shallow.
+- Validity bounds are checked against `txInfoValidRange`. Slots become POSIX
+  milliseconds as `slot_zero_ms + slot * SLOT_LENGTH_MS`; symbolic slots
+  (`slotX`) must be given values in `slots`.
+- Anchoring comments (finality timestamps, verifiable hashes, Merkle proofs)
+  have no on-chain form and are not part of the script.
+- `UPLCScript` gives the flat bytes, the text envelope (`cborHex`), the
+  script hash and the textual UPLC.
+- `python src/uplc_emitter.py program.ir -o program.plutus` writes the text
+  envelope; `--pretty` prints the textual UPLC instead.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+
+try:
+    from src.instrumentation import count, stage
+    from src.ir_cfg import build_cfg, is_control
+    from src.scan_semantics import parse_literal
+    from src.time_constraints import SLOT_LENGTH_MS, analyze_time_constraints
+    from src.uplc import (Apply, Const, Delay, Error, Force, Lam, Program, Var, apply, builtin, cbor_bytes,
+                          resolve_names)
+except ImportError:  # Run as a script from inside src/
+    from instrumentation import count, stage
+    from ir_cfg import build_cfg, is_control
+    from scan_semantics import parse_literal
+    from time_constraints import SLOT_LENGTH_MS, analyze_time_constraints
+    from uplc import (Apply, Const, Delay, Error, Force, Lam, Program, Var, apply, builtin, cbor_bytes,
+                      resolve_names)
+
+# Ledger language tag prefixed to the script bytes before hashing
+PLUTUS_V2_TAG = b"\x02"
+# Index of txInfoValidRange among the PlutusV2 TxInfo fields
+VALID_RANGE_FIELD = 7
+
+CONDITION_MESSAGE = "Condition {0} failed: {1}".format
+TIMER_TOF_MESSAGE = "Timer {0} off delay expired".format
+COUNTER_CTU_MESSAGE = "Counter {0} exceeded".format
+COUNTER_CTD_MESSAGE = "Counter {0} decreased below preset".format
+VALIDITY_MESSAGE = "Validity interval failed"
+
+NAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_]")
+TRUE = Const("bool", True)
+FALSE = Const("bool", False)
+
+
+class UPLCScript:
+    """
+    A compiled validator: `program` is the UPLC term and `tags` lists the
+    tags whose values the redeemer carries, in order.
+    """
+    __slots__ = ("program", "tags", "flat")
+
+    def __init__(self, program, tags):
+        self.program = program
+        self.tags = tags
+        self.flat = program.to_flat()
+
+    def cbor(self):
+        """
+        Returns the script bytes as they appear on chain (the flat bytes wrapped in CBOR).
+        """
+        return cbor_bytes(self.flat)
+
+    def cbor_hex(self):
+        """
+        Returns the `cborHex` of the text envelope, which wraps the on-chain bytes in CBOR again.
+        """
+        return cbor_bytes(self.cbor()).hex()
+
+    def envelope(self):
+        return {"type": "PlutusScriptV2", "description": "", "cborHex": self.cbor_hex()}
+
+    def script_hash(self):
+        return hashlib.blake2b(PLUTUS_V2_TAG + self.cbor(), digest_size=28).hexdigest()
+
+    def pretty(self):
+        return self.program.pretty()
+
+    def redeemer(self, values):
+        """
+        Returns the redeemer Data (a list of integers) for a mapping of tag values; missing tags are 0.
+        """
+        return [int(values.get(tag, 0)) for tag in self.tags]
+
+    def redeemer_json(self, values):
+        """
+        Returns the redeemer in the detailed JSON schema that `cardano-cli` reads.
+        """
+        return {"list": [{"int": value} for value in self.redeemer(values)]}
+
+
+class _Scope:
+    """
+    Names the integer and Boolean binding of every tag in first-use order.
+    """
+    __slots__ = ("tags", "booleans")
+
+    def __init__(self):
+        self.tags = {}
+        self.booleans = set()
+
+    def integer(self, tag):
+        index = self.tags.setdefault(tag, len(self.tags))
+        return Var(f"t{index}_{NAME_CHARACTERS.sub('_', tag)}")
+
+    def boolean(self, tag):
+        name = self.integer(tag).name
+        self.booleans.add(name)
+        return Var("b" + name[1:])
+
+
+def _conjunction(terms):
+    """
+    Returns the strict conjunction of cheap Bool terms (variables and constants).
+    """
+    if not terms:
+        return TRUE
+    if any(term is FALSE for term in terms):
+        return FALSE
+    terms = [term for term in terms if term is not TRUE] or [TRUE]
+    result = terms[-1]
+    for term in reversed(terms[:-1]):
+        result = apply(builtin("ifThenElse"), term, result, FALSE)
+    return result
+
+
+def _if(condition, then, otherwise):
+    """
+    Returns `if condition then then else otherwise`, evaluating only the chosen branch.
+    """
+    return Force(apply(builtin("ifThenElse"), condition, Delay(then), Delay(otherwise)))
+
+
+def _check(message, condition):
+    """
+    Returns a Bool term that traces `message` when `condition` is False.
+    """
+    return _if(condition, TRUE, apply(builtin("trace"), Const("string", message), FALSE))
+
+
+def _all(checks, start, end):
+    """
+    Returns the short-circuiting conjunction of `checks[start:end]` as a balanced tree.
+    """
+    if end - start == 1:
+        return checks[start]
+    middle = (start + end) // 2
+    return _if(_all(checks, start, middle), _all(checks, middle, end), FALSE)
+
+
+def _field(data, index):
+    """
+    Returns field `index` of a Constr Data term.
+    """
+    fields = apply(builtin("sndPair"), apply(builtin("unConstrData"), data))
+    for _ in range(index):
+        fields = apply(builtin("tailList"), fields)
+    return apply(builtin("headList"), fields)
+
+
+def _finite_bound(bound, name, compare):
+    """
+    Returns a Bool term that holds when the interval `bound` is finite and its
+    time `t` satisfies `compare(t)`.
+    """
+    extended = Var(name)
+    is_finite = apply(builtin("equalsInteger"), apply(builtin("fstPair"), extended), Const("integer", 1))
+    time = apply(builtin("unIData"), apply(builtin("headList"), apply(builtin("sndPair"), Var(name))))
+    body = _if(is_finite, compare(time), FALSE)
+    return Apply(Lam(name, body), apply(builtin("unConstrData"), _field(bound, 0)))
+
+
+def _resolve_bound(bounds, slots, pick, slot_zero_ms):
+    """
+    Returns the POSIX time in milliseconds of the tightest of `bounds`, or None.
+    """
+    resolved = []
+    for bound in bounds:
+        if bound.base is None:
+            base = 0
+        elif bound.base in slots:
+            base = int(slots[bound.base])
+        else:
+            raise ValueError(f"Symbolic slot {bound.base} ({bound.source}) needs a value in `slots`")
+        resolved.append(base + bound.offset)
+    if not resolved:
+        return None
+    return slot_zero_ms + pick(resolved) * SLOT_LENGTH_MS
+
+
+def _validity_checks(analysis, slots, slot_zero_ms):
+    """
+    Returns the checks on the transaction's valid range (bound to `validRange`) and the term that reads it, or None.
+    """
+    lower = _resolve_bound(analysis.lower, slots, max, slot_zero_ms)
+    upper = _resolve_bound(analysis.upper, slots, min, slot_zero_ms)
+    if lower is not None and upper is not None and lower > upper:
+        raise ValueError(f"Unsatisfiable time constraints: from {lower} ms to {upper} ms")
+    checks = []
+    if lower is not None:
+        at_least = lambda time: apply(builtin("lessThanEqualsInteger"), Const("integer", lower), time)
+        checks.append(_check(VALIDITY_MESSAGE, _finite_bound(_field(Var("validRange"), 0), "lowerBound", at_least)))
+    if upper is not None:
+        at_most = lambda time: apply(builtin("lessThanEqualsInteger"), time, Const("integer", upper))
+        checks.append(_check(VALIDITY_MESSAGE, _finite_bound(_field(Var("validRange"), 1), "upperBound", at_most)))
+    if not checks:
+        return checks, None
+    return checks, _field(_field(Var("ctx"), 0), VALID_RANGE_FIELD)
+
+
+def _operand(scope, token):
+    literal = parse_literal(token)
+    if literal is not None:
+        return TRUE if literal else FALSE
+    return scope.boolean(str(token))
+
+
+def _preset(name, counter):
+    try:
+        return Const("integer", int(counter["preset"]))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Counter {name}: invalid preset {counter.get('preset')!r}")
+
+
+def _instruction_checks(ir_data, scope):
+    checks = []
+    for i, instr in build_cfg(ir_data["instructions"]).live_instructions():
+        if isinstance(instr, dict) and is_control(instr["type"]):
+            continue
+        condition = _conjunction([_operand(scope, token) for token in instr["args"]])
+        checks.append(_check(CONDITION_MESSAGE(i, instr["type"].lower()), condition))
+    return checks
+
+
+def _timer_and_counter_checks(ir_data, analysis, scope):
+    le = builtin("lessThanEqualsInteger")
+    checks = []
+    for name, timer in ir_data.get("timers", {}).items():
+        if timer["type"] == "TOF":
+            limit = Const("integer", analysis.durations_ms[name])
+            checks.append(_check(TIMER_TOF_MESSAGE(name), apply(le, scope.integer(name), limit)))
+    for name, counter in ir_data.get("counters", {}).items():
+        if counter["type"] == "CTU":
+            checks.append(_check(COUNTER_CTU_MESSAGE(name), apply(le, _preset(name, counter), scope.integer(name))))
+        elif counter["type"] == "CTD":
+            checks.append(_check(COUNTER_CTD_MESSAGE(name), apply(le, scope.integer(name), _preset(name, counter))))
+    return checks
+
+
+def _bind_tags(scope, body):
+    """
+    Wraps `body` in the bindings that read each tag from the redeemer list.
+    """
+    items = list(scope.tags.items())
+    for tag, index in reversed(items):
+        name = scope.integer(tag).name
+        if name in scope.booleans:
+            is_zero = apply(builtin("equalsInteger"), Var(name), Const("integer", 0))
+            body = Apply(Lam("b" + name[1:], body), apply(builtin("ifThenElse"), is_zero, FALSE, TRUE))
+        if index + 1 < len(items):
+            body = Apply(Lam(f"rest{index + 1}", body), apply(builtin("tailList"), Var(f"rest{index}")))
+        body = Apply(Lam(name, body), apply(builtin("unIData"), apply(builtin("headList"), Var(f"rest{index}"))))
+    if items:
+        body = Apply(Lam("rest0", body), apply(builtin("unListData"), Var("redeemer")))
+    return body
+
+
+def lower_ir_to_uplc(ir_data, slots=None, slot_zero_ms=0):
+    """
+    Returns the `UPLCScript` of an IR program. `slots` maps symbolic slot
+    names to slot numbers and `slot_zero_ms` is the POSIX time of slot 0.
+
+    Raises ValueError when the IR yields no logic, its time constraints are
+    malformed or unsatisfiable, a symbolic slot has no value or a counter
+    preset is not an integer.
+    """
+    if not isinstance(ir_data, dict) or "instructions" not in ir_data:
+        raise ValueError("Invalid IR input: Missing 'instructions' key")
+    with stage("uplc.lower"):
+        analysis = analyze_time_constraints(ir_data)
+        scope = _Scope()
+        checks = _instruction_checks(ir_data, scope)
+        checks += _timer_and_counter_checks(ir_data, analysis, scope)
+        validity, valid_range = _validity_checks(analysis, slots or {}, slot_zero_ms)
+        checks += validity
+        if not checks:
+            raise ValueError("Invalid IR format: No valid logic generated")
+        body = _if(_all(checks, 0, len(checks)), Const("unit", None), Error())
+        if valid_range is not None:
+            body = Apply(Lam("validRange", body), valid_range)
+        term = Lam("datum", Lam("redeemer", Lam("ctx", _bind_tags(scope, body))))
+        program = Program(resolve_names(term))
+    with stage("uplc.encode"):
+        script = UPLCScript(program, list(scope.tags))
+    count("uplc.conditions", len(checks))
+    count("uplc.bytes", len(script.flat))
+    return script
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a LadderCore IR file to a UPLC validator script.")
+    parser.add_argument("input", help="IR file (JSON)")
+    parser.add_argument("-o", "--output", help="text envelope file (default: stdout)")
+    parser.add_argument("--pretty", action="store_true", help="print textual UPLC instead of the text envelope")
+    parser.add_argument("--slot", action="append", default=[], metavar="NAME=SLOT",
+                        help="value of a symbolic slot such as slotX (repeatable)")
+    parser.add_argument("--slot-zero-ms", type=int, default=0, help="POSIX time of slot 0 in milliseconds")
+    args = parser.parse_args(argv)
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        ir_data = json.load(f)
+    try:
+        slots = {name: int(value) for name, _, value in (item.partition("=") for item in args.slot)}
+        script = lower_ir_to_uplc(ir_data, slots, args.slot_zero_ms)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    text = script.pretty() + "\n" if args.pretty else json.dumps(script.envelope(), indent=4) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Redeemer tags: {', '.join(script.tags)}")
+        print(f"Script hash: {script.script_hash()}")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Validator Bundling
+Compiles a set of LadderCore IR programs into one Plutus validator dispatched by a redeemer tag.
+
+Overview:
+- Program `i` of the bundle is selected by redeemer tag `i`; a `case` on the
+  redeemer picks its conjunction, and unknown tags fail with `traceError`.
+  Programs with identical conjunctions share one definition.
+- Rung conditions come from `condition_optimizer.optimize_programs`, which
+  evaluates every program over one BDD: rungs and subterms that are
+  structurally identical across programs are the same node, and every node
+  used by more than one rung is bound once in the validator's `where` block.
+- Whole conditions and timer/counter checks that several programs use are
+  bound once too, when naming them is shorter than repeating them. Validity
+  ranges become `contains` checks on the transaction's valid range; anchoring
+  comments are listed under the program's tag in the header.
+- `bundle.report` compares the bundle's size against compiling every program
+  separately (with `optimize=True`).
+- `python src/validator_bundle.py line_a.ir line_b.ir -o fleet.plutus`
+  writes a bundle and prints its report.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+try:
+    from src.compile_cache import ir_digest
+    from src.condition_optimizer import optimize_programs
+    from src.instrumentation import stage
+    from src.ir_cfg import build_cfg, is_control
+    from src.plutus_emitter import VALIDATOR_FOOTER, emit_checks
+    from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+except ImportError:  # Run as a script from inside src/
+    from compile_cache import ir_digest
+    from condition_optimizer import optimize_programs
+    from instrumentation import stage
+    from ir_cfg import build_cfg, is_control
+    from plutus_emitter import VALIDATOR_FOOTER, emit_checks
+    from plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+BUNDLE_HEADER = "-- Validator bundle: {0} programs dispatched by redeemer tag\n".format
+TAG_COMMENT = "-- Tag {0}: {1}\n".format
+TAG_NOTE = "--   {0}\n".format
+VALIDATOR_HEADER = """{-# INLINABLE validate #-}
+validate :: BuiltinData -> BuiltinData -> ScriptContext -> Bool
+validate _ redeemer ctx =
+    case PlutusTx.unsafeFromBuiltinData redeemer :: Integer of"""
+DISPATCH = "\n        {0} -> program{1}".format
+DISPATCH_DEFAULT = '\n        _ -> traceError "Unknown program tag"\n  where\n    txInfo = scriptContextTxInfo ctx'
+BINDING = "\n    {0} = {1}".format
+PROGRAM = "\n    program{0} =\n        ".format
+TERM_SEPARATOR = " &&\n        "
+VALIDITY_CHECK = 'traceIfFalse "Validity interval failed" (({0}) `contains` txInfoValidRange txInfo)'.format
+VALIDITY_PREFIX = "mustValidateIn ("
+
+
+class ValidatorBundle:
+    """
+    A compiled bundle: `script` is the Haskell source, `tags` maps program
+    names to their redeemer tags and `report` compares sizes.
+    """
+    __slots__ = ("script", "tags", "report")
+
+    def __init__(self, script, tags, report):
+        self.script = script
+        self.tags = tags
+        self.report = report
+
+
+def _live_instructions(name, ir_data):
+    if not isinstance(ir_data, dict) or "instructions" not in ir_data:
+        raise ValueError(f"Program {name}: Invalid IR input: Missing 'instructions' key")
+    return [
+        (index, instr) for index, instr in build_cfg(ir_data["instructions"]).live_instructions()
+        if not is_control(instr["type"])
+    ]
+
+
+def _checks(ir_data):
+    """
+    Splits a program's timer, counter and time-constraint lines into Bool terms and header notes.
+    """
+    lines = []
+    emit_checks(ir_data, lines.append)
+    terms = []
+    notes = []
+    for line in "".join(lines).splitlines():
+        if line.startswith("--"):
+            notes.append(line[3:])
+        elif line.startswith(VALIDITY_PREFIX):
+            terms.append(VALIDITY_CHECK(line[len(VALIDITY_PREFIX):-1]))
+        else:
+            terms.append(line)
+    return terms, notes
+
+
+def _worth_binding(term, uses, name):
+    """
+    Returns True when binding `term` once under `name` is shorter than repeating it.
+    """
+    return uses * len(term) > len(BINDING(name, term)) + uses * len(name)
+
+
+def bundle_validators(programs):
+    """
+    Compiles `programs` (a dict of name → IR, or a list of IR) into one `ValidatorBundle`.
+    Raises ValueError for invalid programs, naming the program.
+    """
+    if not isinstance(programs, dict):
+        programs = {f"program{tag}": ir_data for tag, ir_data in enumerate(programs)}
+    if not programs:
+        raise ValueError("Cannot bundle an empty set of programs")
+
+    with stage("bundle.compile"):
+        names = list(programs)
+        live = [_live_instructions(name, programs[name]) for name in names]
+        checks = []
+        for name, instructions in zip(names, live):
+            try:
+                terms, notes = _checks(programs[name])
+            except ValueError as e:
+                raise ValueError(f"Program {name}: {e}") from e
+            if not instructions and not terms and not notes:
+                raise ValueError(f"Program {name}: Invalid IR format: No valid logic generated")
+            checks.append((terms, notes))
+        # Identical programs are optimized once, so duplicates add no shared bindings
+        digests = [ir_digest(programs[name]) for name in names]
+        first = {}
+        for tag, digest in enumerate(digests):
+            first.setdefault(digest, tag)
+        conditions, bindings = optimize_programs([live[tag] for tag in first.values()])
+        rungs = dict(zip(first, conditions))
+        program_terms = [rungs[digest] + terms for digest, (terms, _) in zip(digests, checks)]
+
+        # Programs with identical conjunctions dispatch to one definition
+        bodies = {}
+        targets = [bodies.setdefault(tuple(terms), tag) for tag, terms in enumerate(program_terms)]
+        uses = Counter(term for terms in bodies for term in terms)
+        shared = {}
+        for term in uses:
+            name = f"condition{len(shared)}"
+            if uses[term] > 1 and _worth_binding(term, uses[term], name):
+                shared[term] = name
+
+        parts = [BUNDLE_HEADER(len(names))]
+        for tag, name in enumerate(names):
+            parts.append(TAG_COMMENT(tag, name))
+            parts.extend(TAG_NOTE(note) for note in checks[tag][1])
+        parts.append(VALIDATOR_HEADER)
+        parts.extend(DISPATCH(tag, target) for tag, target in enumerate(targets))
+        parts.append(DISPATCH_DEFAULT)
+        parts.extend(BINDING(name, expression) for name, expression in bindings)
+        parts.extend(BINDING(name, term) for term, name in shared.items())
+        for terms, tag in bodies.items():
+            parts.append(PROGRAM(tag))
+            parts.append(TERM_SEPARATOR.join(shared.get(term, term) for term in terms) or "True")
+        parts.append(VALIDATOR_FOOTER)
+        script = "".join(parts)
+
+    separate = sum(
+        len(compile_ir_to_plutus_haskell_enhanced(programs[name], optimize=True).encode("utf-8")) for name in names
+    )
+    size = len(script.encode("utf-8"))
+    report = {
+        "programs": len(names),
+        "separate_bytes": separate,
+        "bundle_bytes": size,
+        "saved_bytes": separate - size,
+        "saved_percent": round(100.0 * (separate - size) / separate, 1) if separate else 0.0,
+        "shared_subterms": len(bindings),
+        "shared_conditions": len(shared),
+        "distinct_programs": len(bodies),
+        "condition_references": sum(len(terms) for terms in program_terms),
+    }
+    return ValidatorBundle(script, {name: tag for tag, name in enumerate(names)}, report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bundle several IR programs into one validator dispatched by redeemer tag.")
+    parser.add_argument("inputs", nargs="+", help="IR files; each file's name (without extension) names its program")
+    parser.add_argument("-o", "--output", help="output file (default: stdout, with the report on stderr)")
+    args = parser.parse_args()
+
+    programs = {}
+    for path in args.inputs:
+        with open(path, "r", encoding="utf-8") as f:
+            programs[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+    try:
+        bundle = bundle_validators(programs)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    report = json.dumps(bundle.report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(bundle.script)
+        print(report)
+    else:
+        sys.stdout.write(bundle.script)
+        print(report, file=sys.stderr)
@@ -1,30 +1,422 @@
 """
 Validator-Based IR Transformation - Enhanced
 Ensures IR is structured correctly before being passed to the PlutusLadder Compiler.
+
+Overview:
+- `IR_SCHEMA` describes the LadderCore IR: required sections, the fields of
+  each section entry and the value kind of every field. Known opcodes come
+  from the IR format (`ir_model.OPCODE_NAMES`) plus the mnemonics in `mappings/`.
+- `compile_schema` turns the schema into one specialized check function per
+  section, once; `get_validator` caches the result until a mapping file changes.
+- Validation is exhaustive: every error is reported with its JSON path
+  (`$.timers.T1.duration`). Cross-references are checked too: timer and
+  counter members used by instructions (`T1.Q`, `C1.CV`), jump and call
+  targets, and the timestamp required by anchoring.
+- `validate_ir_files` validates many IR files across a process pool.
 """
 
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from src.iec_time import parse_duration_ms
+    from src.instrumentation import count, stage
+    from src.ir_model import OPCODE_NAMES
+    from src.ll_parser import COMPARATOR_NAMES, COUNTER_TYPES, TIMER_TYPES
+    from src.mapping_registry import get_registry
+    from src.merkle_anchor import InclusionProof
+    from src.scan_semantics import parse_literal
+except ImportError:  # Run as a script from inside src/
+    from iec_time import parse_duration_ms
+    from instrumentation import count, stage
+    from ir_model import OPCODE_NAMES
+    from ll_parser import COMPARATOR_NAMES, COUNTER_TYPES, TIMER_TYPES
+    from mapping_registry import get_registry
+    from merkle_anchor import InclusionProof
+    from scan_semantics import parse_literal
+
+REQUIRED_SECTIONS = (
+    "instructions", "timers", "counters", "math_operations", "comparators",
+    "set_reset_latches", "jump_instructions", "function_blocks",
+)
+
+# Value kinds: "string", "args" (list of strings), "duration", "preset",
+# "timestamp", "merkle_proof", "timer_type", "counter_type", "latch_type", "jump_type".
+# Each section maps to its entry fields as (key, required, kind).
+IR_SCHEMA = {
+    "required": REQUIRED_SECTIONS,
+    "sections": {
+        "timers": (("type", True, "timer_type"), ("duration", True, "duration"), ("input", False, "string")),
+        "counters": (
+            ("type", True, "counter_type"), ("preset", True, "preset"),
+            ("cu", False, "string"), ("cd", False, "string"), ("r", False, "string"), ("ld", False, "string"),
+        ),
+        "math_operations": (("operation", True, "string"), ("args", True, "args")),
+        "comparators": (("comparison", True, "string"), ("args", True, "args")),
+        "set_reset_latches": (("latch_type", True, "latch_type"),),
+        "jump_instructions": (("jump_type", True, "jump_type"),),
+        "function_blocks": (("args", True, "args"),),
+        "variables": (("type", True, "string"),),
+    },
+    "optional": {"type": "string", "variables": "section", "scan_cycle": "args", "timestamp": "timestamp",
+                 "merkle_anchor": "merkle_proof"},
+    "anchoring": ("immediate", "finality"),
+}
+
+LATCH_TYPES = frozenset(["SR", "RS"])
+TARGET_OPCODES = frozenset(["JMP", "JMPC", "JMPCN", "CALL"])
+JUMP_TYPES = TARGET_OPCODES | frozenset(["LBL", "RET", "RETC", "RETCN"])
+# Instruction opcodes whose first argument names an instance: (what it is, sections declaring it)
+INSTANCE_OPCODES = dict(
+    [(op, ("timer", ("timers",))) for op in TIMER_TYPES] + [(op, ("counter", ("counters",))) for op in COUNTER_TYPES]
+    + [(op, ("instance", ("timers", "counters", "function_blocks"))) for op in ("CAL", "CALC", "CALCN")]
+)
+# Members of timer/counter instances that instructions may read or write
+INSTANCE_MEMBERS = frozenset(["Q", "DN", "ET", "CV", "IN", "PT", "PV", "CU", "CD", "R", "LD"])
+IDENTIFIER = re.compile(r"^[A-Za-z_]\w*$")
+
+
+class ValidationIssue:
+    """
+    One validation error: the JSON path of the offending value and a message.
+    """
+    __slots__ = ("path", "message")
+
+    def __init__(self, path, message):
+        self.path = path
+        self.message = message
+
+    def to_dict(self):
+        return {"path": self.path, "message": self.message}
+
+    def __eq__(self, other):
+        return isinstance(other, ValidationIssue) and (self.path, self.message) == (other.path, other.message)
+
+    def __repr__(self):
+        return f"ValidationIssue({self.path!r}, {self.message!r})"
+
+    def __str__(self):
+        return f"{self.path}: {self.message}"
+
+
+class InvalidIRError(ValueError):
+    """
+    Raised by `check_ir` when an IR document fails validation; `issues` lists every error.
+    """
+
+    def __init__(self, issues):
+        self.issues = issues
+        details = "; ".join(str(issue) for issue in issues[:5])
+        more = f" (and {len(issues) - 5} more)" if len(issues) > 5 else ""
+        super().__init__(f"Invalid IR: {details}{more}")
+
+
+def json_path(parent, key):
+    """
+    Extends a JSON path with an object key or list index.
+    """
+    if isinstance(key, int):
+        return f"{parent}[{key}]"
+    if IDENTIFIER.match(key):
+        return f"{parent}.{key}"
+    return f"{parent}[{json.dumps(key)}]"
+
+
+def known_opcodes(registry=None):
+    """
+    Returns the instruction types accepted in `instructions`: the IR opcodes
+    and every mnemonic in the mapping files.
+    """
+    registry = registry or get_registry()
+    opcodes = set(OPCODE_NAMES)
+    for symbols in registry.indexes["forward"].values():
+        opcodes.update(symbol for symbol in symbols if IDENTIFIER.match(symbol))
+    return frozenset(opcodes)
+
+
+def _value_checker(kind):
+    """
+    Returns a function (value) -> error message or None for a value kind.
+    """
+    if kind == "string":
+        return lambda value: None if isinstance(value, str) else f"expected a string, got {type(value).__name__}"
+    if kind == "args":
+        def check_args(value):
+            if not isinstance(value, list):
+                return f"expected a list of strings, got {type(value).__name__}"
+            if not all(isinstance(arg, str) for arg in value):
+                return "expected a list of strings"
+            return None
+        return check_args
+    if kind == "duration":
+        def check_duration(value):
+            try:
+                parse_duration_ms(value)
+            except ValueError:
+                return f"malformed duration {value!r}"
+            return None
+        return check_duration
+    if kind == "preset":
+        def check_preset(value):
+            try:
+                preset = parse_literal(value) if not isinstance(value, bool) else None
+            except (TypeError, ValueError):
+                preset = None
+            if preset is None or preset < 0:
+                return f"malformed preset {value!r}"
+            return None
+        return check_preset
+    if kind == "timestamp":
+        def check_timestamp(value):
+            if isinstance(value, bool) or not (isinstance(value, int) or (isinstance(value, str) and value.isdigit())):
+                return f"malformed timestamp {value!r}"
+            return None
+        return check_timestamp
+    if kind == "merkle_proof":
+        def check_merkle_proof(value):
+            try:
+                InclusionProof.decode(value)
+            except ValueError:
+                return f"malformed Merkle proof {value!r}"
+            return None
+        return check_merkle_proof
+    allowed = {
+        "timer_type": TIMER_TYPES, "counter_type": COUNTER_TYPES,
+        "latch_type": LATCH_TYPES, "jump_type": JUMP_TYPES,
+    }[kind]
+    expected = ", ".join(sorted(allowed))
+    return lambda value: None if value in allowed else f"unknown type {value!r} (expected one of {expected})"
+
+
+def _compile_section(name, fields):
+    """
+    Compiles the check function for one named section (a dict of entries).
+    """
+    compiled = tuple((key, required, _value_checker(kind)) for key, required, kind in fields)
+    section_path = json_path("$", name)
+
+    def check_section(section, issues):
+        if not isinstance(section, dict):
+            issues.append(ValidationIssue(section_path, f"expected an object, got {type(section).__name__}"))
+            return
+        for entry_name, entry in section.items():
+            entry_path = json_path(section_path, entry_name)
+            if not isinstance(entry, dict):
+                issues.append(ValidationIssue(entry_path, f"expected an object, got {type(entry).__name__}"))
+                continue
+            for key, required, check in compiled:
+                if key in entry:
+                    message = check(entry[key])
+                    if message:
+                        issues.append(ValidationIssue(json_path(entry_path, key), message))
+                elif required:
+                    issues.append(ValidationIssue(json_path(entry_path, key), "missing required key"))
+
+    return check_section
+
+
+def _compile_instructions(opcodes):
+    """
+    Compiles the check for the instruction stream, including its cross-references.
+    """
+    def check_instructions(instructions, ir_data, issues):
+        if not isinstance(instructions, list):
+            issues.append(ValidationIssue("$.instructions", f"expected a list, got {type(instructions).__name__}"))
+            return
+        declared = {
+            section: set(ir_data[section]) if isinstance(ir_data.get(section), dict) else set()
+            for section in ("timers", "counters", "function_blocks")
+        }
+        instances = set().union(*declared.values())
+        labels = set()
+        targets = []
+        for index, instr in enumerate(instructions):
+            path = f"$.instructions[{index}]"
+            if not isinstance(instr, dict):
+                issues.append(ValidationIssue(path, f"expected an object, got {type(instr).__name__}"))
+                continue
+            op = instr.get("type")
+            if op is None:
+                issues.append(ValidationIssue(path + ".type", "missing required key"))
+            elif op not in opcodes:
+                # IR saved before the parser normalized symbolic comparators
+                hint = f" (use {COMPARATOR_NAMES[op]!r})" if op in COMPARATOR_NAMES else ""
+                issues.append(ValidationIssue(path + ".type", f"unknown opcode {op!r}{hint}"))
+            args = instr.get("args")
+            if not isinstance(args, list):
+                message = "missing required key" if args is None else f"expected a list, got {type(args).__name__}"
+                issues.append(ValidationIssue(path + ".args", message))
+                continue
+            for position, arg in enumerate(args):
+                if not isinstance(arg, str):
+                    issues.append(ValidationIssue(f"{path}.args[{position}]", f"expected a string, got {type(arg).__name__}"))
+                    continue
+                base, dot, member = arg.rpartition(".")
+                if dot and member.upper() in INSTANCE_MEMBERS and base not in instances:
+                    issues.append(ValidationIssue(f"{path}.args[{position}]", f"undefined timer or counter {base!r}"))
+            if op in INSTANCE_OPCODES:
+                kind, sections = INSTANCE_OPCODES[op]
+                if not args:
+                    issues.append(ValidationIssue(path + ".args", f"{op} requires an instance name"))
+                elif isinstance(args[0], str) and not any(args[0] in declared[section] for section in sections):
+                    issues.append(ValidationIssue(path + ".args[0]", f"undefined {kind} {args[0]!r}"))
+            if op == "LBL" and args:
+                labels.add(args[0])
+            elif op in TARGET_OPCODES:
+                if args:
+                    targets.append((index, args[0]))
+                else:
+                    issues.append(ValidationIssue(path + ".args", f"{op} requires a target label"))
+        for index, target in targets:
+            if target not in labels:
+                issues.append(ValidationIssue(f"$.instructions[{index}].args[0]", f"undefined label {target!r}"))
+
+    return check_instructions
+
+
+def compile_schema(schema=IR_SCHEMA, opcodes=None):
+    """
+    Compiles `schema` into an `IRValidator`. `opcodes` defaults to `known_opcodes()`.
+    """
+    opcodes = known_opcodes() if opcodes is None else frozenset(opcodes)
+    sections = {name: _compile_section(name, fields) for name, fields in schema["sections"].items()}
+    optional = {
+        key: _value_checker(kind) for key, kind in schema["optional"].items() if kind != "section"
+    }
+    return IRValidator(schema["required"], sections, optional, schema["anchoring"], _compile_instructions(opcodes))
+
+
+class IRValidator:
+    """
+    A compiled IR schema. Call `validate(ir_data)` for the list of `ValidationIssue`s.
+    """
+
+    def __init__(self, required, sections, optional, anchoring, check_instructions):
+        self.required = required
+        self.sections = sections
+        self.optional = optional
+        self.anchoring = anchoring
+        self.check_instructions = check_instructions
+
+    def validate(self, ir_data):
+        """
+        Returns every validation error in `ir_data` (empty when it is valid).
+        """
+        if not isinstance(ir_data, dict):
+            return [ValidationIssue("$", f"expected an object, got {type(ir_data).__name__}")]
+        issues = []
+        for key in self.required:
+            if key not in ir_data:
+                issues.append(ValidationIssue(json_path("$", key), "missing required key"))
+
+        if "instructions" in ir_data:
+            self.check_instructions(ir_data["instructions"], ir_data, issues)
+        for name, check_section in self.sections.items():
+            if name in ir_data:
+                check_section(ir_data[name], issues)
+        for key, check in self.optional.items():
+            if key in ir_data:
+                message = check(ir_data[key])
+                if message:
+                    issues.append(ValidationIssue(json_path("$", key), message))
+
+        anchoring = ir_data.get("anchoring")
+        if anchoring is not None and anchoring not in self.anchoring:
+            issues.append(ValidationIssue("$.anchoring", f"unknown anchoring {anchoring!r}"))
+        if (anchoring in self.anchoring or ir_data.get("format") == "verifiable") and "timestamp" not in ir_data:
+            issues.append(ValidationIssue("$.timestamp", "missing required key (needed by anchoring)"))
+        return issues
+
+
+_validator = None
+_validator_indexes = None
+
+
+def get_validator():
+    """
+    Returns the shared compiled validator, recompiling it when the mappings change.
+    """
+    global _validator, _validator_indexes
+    indexes = get_registry().indexes
+    if _validator is None or indexes is not _validator_indexes:
+        with stage("validator.compile_schema"):
+            _validator = compile_schema()
+        _validator_indexes = indexes
+    return _validator
+
+
+def validate_ir(ir_data):
+    """
+    Returns the list of `ValidationIssue`s for an IR dict.
+    """
+    with stage("validator.validate"):
+        issues = get_validator().validate(ir_data)
+    count("validator.documents")
+    count("validator.issues", len(issues))
+    return issues
+
+
+def check_ir(ir_data):
+    """
+    Raises `InvalidIRError` unless `ir_data` is valid.
+    """
+    issues = validate_ir(ir_data)
+    if issues:
+        raise InvalidIRError(issues)
+
+
 def validate_ir_structure(ir_data):
     """
     Checks the IR for missing components and structural integrity.
+    Returns (True, "Valid IR Structure") or (False, message listing the errors).
     """
-    required_keys = ["instructions", "timers", "counters", "math_operations", "comparators", "set_reset_latches", "jump_instructions", "function_blocks"]
-    for key in required_keys:
-        if key not in ir_data:
-            return False, f"Missing key: {key}"
-
+    issues = validate_ir(ir_data)
+    if issues:
+        return False, str(InvalidIRError(issues))
     return True, "Valid IR Structure"
 
+
+def validate_ir_file(path):
+    """
+    Validates one IR file. Returns (path, [issue dicts]); unreadable files yield a "$" issue.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            ir_data = json.load(f)
+    except (OSError, ValueError) as e:
+        return path, [ValidationIssue("$", f"{type(e).__name__}: {e}").to_dict()]
+    return path, [issue.to_dict() for issue in validate_ir(ir_data)]
+
+
+def validate_ir_files(paths, jobs=None):
+    """
+    Validates many IR files across a process pool. Returns {path: [issue dicts]} in input order.
+    """
+    paths = list(paths)
+    if jobs == 1 or len(paths) <= 1:
+        results = map(validate_ir_file, paths)
+        return dict(results)
+    chunksize = max(1, len(paths) // ((jobs or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return dict(executor.map(validate_ir_file, paths, chunksize=chunksize))
+
+
 if __name__ == "__main__":
-    example_ir = {
-        "instructions": [{"type": "INPUT", "args": ["X1"]}],
-        "timers": {},
-        "counters": {},
-        "math_operations": {},
-        "comparators": {},
-        "set_reset_latches": {},
-        "jump_instructions": {},
-        "function_blocks": {}
-    }
+    parser = argparse.ArgumentParser(description="Validate LadderCore IR files.")
+    parser.add_argument("inputs", nargs="+", help="IR files (JSON)")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
 
-    valid, message = validate_ir_structure(example_ir)
-    print(f"Validation Result: {message}")
+    results = validate_ir_files(args.inputs, jobs=args.jobs)
+    failed = 0
+    for path, issues in results.items():
+        if issues:
+            failed += 1
+            for issue in issues:
+                print(f"{path}: {issue['path']}: {issue['message']}")
+    print(f"{len(results)} files: {len(results) - failed} valid, {failed} invalid")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,86 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from src.batch_compiler import batch_compile, collect_sources, source_root
+
+class TestBatchCompiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmpdir, "project")
+        self.out = os.path.join(self.tmpdir, "build")
+        os.makedirs(os.path.join(self.src, "line1"))
+        self._write("line1/main.ll", "LD X1\nAND X2\nST Y1\n")
+        self._write("line1/pump.st", "Pump := Start AND NOT Stop;\n")
+        self._write("line1/timers.ir", json.dumps({
+            "instructions": [{"type": "AND", "args": ["A", "B"]}],
+            "timers": {}, "counters": {}, "math_operations": {}, "comparators": {},
+            "set_reset_latches": {}, "jump_instructions": {}, "function_blocks": {}
+        }))
+        self._write("line1/broken.ir", json.dumps({"instructions": []}))
+        self._write("audit.plutus", 'traceIfFalse "Condition 1 failed" (X1 && X2)\n')
+        self._write("notes.txt", "ignored")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, relative, content):
+        with open(os.path.join(self.src, relative), "w") as f:
+            f.write(content)
+
+    def test_collect_sources(self):
+        """Ensure directories and globs expand to supported extensions only."""
+        self.assertEqual(len(collect_sources([self.src])), 5)
+        self.assertEqual(collect_sources([os.path.join(self.src, "**", "*.ir")]),
+                         sorted([os.path.join(self.src, "line1", "broken.ir"), os.path.join(self.src, "line1", "timers.ir")]))
+
+    def test_batch_compile_and_manifest(self):
+        """Ensure every file gets a status, outputs are written and the manifest is saved."""
+        manifest = batch_compile([self.src], out_dir=self.out, jobs=2, root=self.src)
+        files = manifest["files"]
+        self.assertEqual(files["line1/main.ll"]["status"], "ok")
+        self.assertIn("compile", files["line1/main.ll"]["timings"])
+        self.assertEqual(files["line1/broken.ir"]["status"], "invalid")
+        self.assertTrue(os.path.exists(os.path.join(self.out, "line1", "main.plutus")))
+        self.assertEqual(files["line1/pump.st"]["status"], "ok")
+        self.assertTrue(os.path.exists(os.path.join(self.out, "line1", "pump.ir")))
+        with open(os.path.join(self.out, "audit.reversed.ll")) as f:
+            self.assertIn("Condition 1 failed: X1 && X2", f.read())
+        with open(os.path.join(self.out, "manifest.json")) as f:
+            self.assertEqual(json.load(f)["summary"]["failed"], 1)
+
+    def test_unchanged_inputs_are_skipped(self):
+        """Ensure a rebuild only recompiles files whose content changed."""
+        batch_compile([self.src], out_dir=self.out, jobs=1, root=self.src)
+        self._write("line1/main.ll", "LD X1\nOR X3\nST Y1\n")
+        manifest = batch_compile([self.src], out_dir=self.out, jobs=1, root=self.src)
+        self.assertEqual(manifest["files"]["line1/main.ll"]["status"], "ok")
+        self.assertEqual(manifest["files"]["line1/timers.ir"]["status"], "cached")
+        self.assertEqual(manifest["files"]["line1/broken.ir"]["status"], "invalid")
+        self.assertEqual(manifest["summary"]["compiled"], 2)
+        manifest = batch_compile([self.src], out_dir=self.out, jobs=1, root=self.src)
+        self.assertEqual(manifest["files"]["line1/timers.ir"]["status"], "cached")
+
+    def test_outputs_stay_inside_the_output_directory(self):
+        """Ensure sources outside the root are rejected and the default root contains every source."""
+        with self.assertRaises(ValueError):
+            batch_compile([self.src], out_dir=self.out, jobs=1, root=os.path.join(self.src, "line1"))
+        self.assertEqual(source_root([os.path.join(self.src, "line1", "main.ll"), os.path.join(self.src, "audit.plutus")],
+                                     root=self.tmpdir), self.tmpdir)
+        with mock.patch("os.getcwd", return_value=os.path.join(self.tmpdir, "elsewhere")):
+            manifest = batch_compile([self.src], out_dir=self.out, jobs=1)
+        self.assertIn("line1/main.ll", manifest["files"])
+        self.assertFalse(any(key.startswith("..") for key in manifest["files"]))
+
+    def test_unexpected_errors_stay_per_file(self):
+        """Ensure an unexpected exception in one file is recorded without aborting the batch."""
+        with mock.patch("src.batch_compiler.parse_ladder_ir", side_effect=IndexError("boom")):
+            manifest = batch_compile([self.src], out_dir=self.out, jobs=1, root=self.src)
+        self.assertEqual(manifest["files"]["line1/main.ll"]["error"], "IndexError: boom")
+        self.assertEqual(manifest["files"]["line1/timers.ir"]["status"], "ok")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from src.iec_time import parse_duration_ms
+
+try:
+    import numpy as np
+    from src.batch_simulator import BatchSimulator
+except ImportError:
+    np = None
+
+class TestDurationParsing(unittest.TestCase):
+
+    def test_iec_durations(self):
+        """Ensure bare, prefixed and compound durations parse to milliseconds."""
+        self.assertEqual(parse_duration_ms("5000"), 5000)
+        self.assertEqual(parse_duration_ms("5S"), 5000)
+        self.assertEqual(parse_duration_ms("T#5S"), 5000)
+        self.assertEqual(parse_duration_ms("TIME#1m30s"), 90000)
+        self.assertEqual(parse_duration_ms("t#1h_2m_250ms"), 3720250)
+        for bad in ("", "T#", "5 parsecs", "T#5S extra", -1):
+            with self.assertRaises(ValueError):
+                parse_duration_ms(bad)
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestBatchSimulator(unittest.TestCase):
+
+    def test_combinational_truth_table(self):
+        """Ensure every scenario evaluates the rung independently."""
+        ir = {"instructions": [
+            {"type": "LD", "args": ["A"]},
+            {"type": "AND", "args": ["B"]},
+            {"type": "ORN", "args": ["C"]},
+            {"type": "ST", "args": ["Y"]},
+            {"type": "STN", "args": ["Z"]}
+        ]}
+        a, b, c = np.array([0, 0, 1, 1, 1]), np.array([0, 1, 0, 1, 1]), np.array([1, 1, 1, 1, 0])
+        result = BatchSimulator(ir).run({"A": a, "B": b, "C": c})
+        expected = (a & b) | (1 - c)
+        self.assertEqual(result["Y"][:, 0].tolist(), expected.tolist())
+        self.assertEqual(result.final("Z").tolist(), (1 - expected).tolist())
+
+    def test_on_delay_timer(self):
+        """Ensure TON fires after its preset and resets when its input drops."""
+        ir = {
+            "instructions": [{"type": "LD", "args": ["Start"]}, {"type": "ST", "args": ["T1.IN"]},
+                             {"type": "LD", "args": ["T1.Q"]}, {"type": "ST", "args": ["Lamp"]}],
+            "timers": {"T1": {"type": "TON", "duration": "T#30ms"}}
+        }
+        start = np.array([[1, 1, 1, 1, 0, 1], [0, 0, 0, 0, 0, 0]])
+        result = BatchSimulator(ir, scan_time_ms=10).run({"Start": start})
+        self.assertEqual(result["T1.Q"].tolist(), [[0, 0, 1, 1, 0, 0], [0] * 6])
+        self.assertEqual(result["Lamp"][0].tolist(), [0, 0, 0, 1, 1, 0])
+
+    def test_off_delay_and_pulse_timers(self):
+        """Ensure TOF holds its output after the input drops and TP emits a fixed pulse."""
+        ir = {"timers": {
+            "Off": {"type": "TOF", "duration": "20", "input": "X"},
+            "Pulse": {"type": "TP", "duration": "20", "input": "X"}
+        }}
+        x = np.array([[1, 0, 0, 0, 1, 1, 1, 1]])
+        result = BatchSimulator(ir, scan_time_ms=10).run({"X": x})
+        self.assertEqual(result["Off.Q"][0].tolist(), [1, 1, 0, 0, 1, 1, 1, 1])
+        self.assertEqual(result["Pulse.Q"][0].tolist(), [1, 0, 0, 0, 1, 0, 0, 0])
+
+    def test_counters(self):
+        """Ensure CTU counts rising edges and CTD counts down from its preset."""
+        ir = {"counters": {
+            "Up": {"type": "CTU", "preset": "2", "cu": "P"},
+            "Down": {"type": "CTD", "preset": "3", "cd": "P"}
+        }}
+        pulses = np.array([[1, 1, 0, 1, 0, 1]])
+        result = BatchSimulator(ir).run({"P": pulses}, record=["Up.Q", "Up.CV", "Down.CV"])
+        self.assertEqual(result["Up.CV"][0].tolist(), [1, 1, 1, 2, 2, 3])
+        self.assertEqual(result["Up.Q"][0].tolist(), [0, 0, 0, 1, 1, 1])
+        self.assertEqual(result["Down.CV"][0].tolist(), [2, 2, 2, 1, 1, 0])
+
+    def test_accumulator_arithmetic(self):
+        """Ensure IL arithmetic and comparisons run on the accumulator."""
+        ir = {"instructions": [
+            {"type": "LD", "args": ["Level"]},
+            {"type": "DIV", "args": ["2"]},
+            {"type": "GT", "args": ["10"]},
+            {"type": "ST", "args": ["High"]}
+        ]}
+        result = BatchSimulator(ir).run({"Level": np.array([-30, 0, 21, 22, 23])})
+        self.assertEqual(result.final("High").tolist(), [0, 0, 0, 1, 1])
+
+    def test_unknown_input_tag(self):
+        """Ensure unknown input tags are rejected."""
+        with self.assertRaises(KeyError):
+            BatchSimulator({"instructions": [{"type": "LD", "args": ["A"]}]}).run({"B": np.zeros(2)})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import shutil
+import tempfile
+import unittest
+from src.compile_cache import CompileCache, ir_digest
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+def make_ir(*conditions):
+    return {
+        "instructions": [{"type": "AND", "args": list(args)} for args in conditions],
+        "timers": {"T1": {"type": "TON", "duration": "500", "slot": "slot9"}},
+        "counters": {"C1": {"type": "CTU", "preset": "10"}}
+    }
+
+class TestCompileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_digest_ignores_key_order_but_not_section_order(self):
+        """Ensure incidental key order does not change the key, but check order does."""
+        ir = make_ir(["A", "B"])
+        reordered = {"counters": ir["counters"], "timers": {"T1": {"slot": "slot9", "duration": "500", "type": "TON"}},
+                     "instructions": ir["instructions"]}
+        self.assertEqual(ir_digest(ir), ir_digest(reordered))
+        swapped = make_ir(["A", "B"])
+        swapped["timers"] = {"T2": {"type": "TOF", "duration": "5"}, "T1": ir["timers"]["T1"]}
+        ir["timers"]["T2"] = {"type": "TOF", "duration": "5"}
+        self.assertNotEqual(ir_digest(ir), ir_digest(swapped))
+
+    def test_memory_hits_match_uncached_output(self):
+        """Ensure cached output is identical and hits are counted."""
+        cache = CompileCache()
+        ir = make_ir(["A", "B"], ["C"])
+        expected = compile_ir_to_plutus_haskell_enhanced(ir)
+        self.assertEqual(compile_ir_to_plutus_haskell_enhanced(ir, cache=cache), expected)
+        self.assertEqual(compile_ir_to_plutus_haskell_enhanced(dict(ir), cache=cache), expected)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        """Ensure the memory tier stays bounded."""
+        cache = CompileCache(maxsize=2)
+        for name in ("A", "B", "C"):
+            compile_ir_to_plutus_haskell_enhanced(make_ir([name]), cache=cache)
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_disk_tier_survives_new_instance(self):
+        """Ensure a fresh cache reuses entries written by another instance."""
+        ir = make_ir(["A"])
+        compile_ir_to_plutus_haskell_enhanced(ir, cache=CompileCache(disk_dir=self.tmpdir))
+        cache = CompileCache(disk_dir=self.tmpdir)
+        compile_ir_to_plutus_haskell_enhanced(ir, cache=cache)
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_compiler_change_invalidates(self):
+        """Ensure a change to the compiler fingerprint produces a different key."""
+        cache = CompileCache()
+        ir = make_ir(["A"])
+        first = cache.key(ir, compile_ir_to_plutus_haskell_enhanced)
+        cache._fingerprint_stamp = None
+        cache._compiler_fingerprint = lambda compile_fn: b"other compiler"
+        self.assertNotEqual(first, cache.key(ir, compile_ir_to_plutus_haskell_enhanced))
+
+    def test_invalid_ir_is_not_cached(self):
+        """Ensure compile errors propagate and nothing is stored."""
+        cache = CompileCache()
+        with self.assertRaises(ValueError):
+            compile_ir_to_plutus_haskell_enhanced({"timers": {}}, cache=cache)
+        self.assertEqual(cache.stats()["size"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.compile_daemon import CompileDaemon
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROGRAM = "LD X1\nAND X2\nST Y1\n"
+
+class TestCompileDaemon(unittest.TestCase):
+
+    def test_stdio_protocol(self):
+        """Ensure requests on stdin get one JSON response line each, with timings."""
+        requests = [
+            {"id": 1, "op": "parse", "source": PROGRAM},
+            {"id": 2, "op": "compile", "source": PROGRAM},
+            {"id": 3, "op": "reverse", "plutus": 'traceIfFalse "Condition 1 failed" (X1 && X2)'},
+            {"id": 4, "op": "compile", "ir": {"instructions": []}},
+            {"id": 5, "op": "frobnicate"},
+            {"id": 6, "op": "reverse", "plutus": 5},
+            {"id": 7, "op": ["x"]},
+        ]
+        stdin = "\n".join(json.dumps(request) for request in requests) + "\nnot json\n"
+        completed = subprocess.run(
+            [sys.executable, os.path.join("src", "compile_daemon.py"), "--jobs", "2"],
+            input=stdin, capture_output=True, text=True, cwd=ROOT, timeout=120
+        )
+        responses = [json.loads(line) for line in completed.stdout.splitlines()]
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(len(responses), 8)
+        by_id = {response["id"]: response for response in responses}
+        self.assertEqual(by_id[1]["result"]["instructions"][0], {"type": "LD", "args": ["X1"]})
+        self.assertIn("validate :: BuiltinData", by_id[2]["result"]["plutus"])
+        self.assertIn("X1 && X2", by_id[3]["result"]["ll"])
+        self.assertFalse(by_id[4]["ok"])
+        self.assertIn({"path": "$.timers", "message": "missing required key"}, by_id[4]["issues"])
+        self.assertEqual(by_id[5]["error"], "Unknown op: 'frobnicate'")
+        self.assertIn("Invalid JSON", by_id[None]["error"])
+        self.assertFalse(by_id[6]["ok"])
+        self.assertIn("AttributeError", by_id[6]["error"])
+        self.assertEqual(by_id[7]["error"], "Invalid op: ['x']")
+        self.assertGreaterEqual(by_id[2]["timings"]["total"], by_id[2]["timings"]["run"])
+
+    def test_unix_socket_concurrent_clients(self):
+        """Ensure several socket clients are served concurrently with bounded admission."""
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, "daemon.sock")
+
+        async def client(number):
+            reader, writer = await asyncio.open_unix_connection(path)
+            for i in range(5):
+                request = {"id": f"{number}-{i}", "op": "validate", "source": PROGRAM}
+                writer.write((json.dumps(request) + "\n").encode("utf-8"))
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(5)]
+            writer.close()
+            return responses
+
+        async def scenario():
+            daemon = CompileDaemon(jobs=2, max_pending=3)
+            await daemon.start()
+            server = asyncio.ensure_future(daemon.serve_unix(path))
+            try:
+                while not os.path.exists(path):
+                    await asyncio.sleep(0.01)
+                results = await asyncio.gather(*(client(number) for number in range(4)))
+            finally:
+                server.cancel()
+                daemon.close()
+            return daemon, results
+
+        try:
+            daemon, results = asyncio.run(scenario())
+        finally:
+            shutil.rmtree(tmpdir)
+        for number, responses in enumerate(results):
+            self.assertEqual(sorted(response["id"] for response in responses), [f"{number}-{i}" for i in range(5)])
+            self.assertTrue(all(response["result"]["valid"] for response in responses))
+        self.assertEqual(daemon.stats["requests"], 20)
+        self.assertEqual(daemon.stats["clients"], 4)
+
+    def test_oversized_requests(self):
+        """Ensure requests beyond the default stream limit are served and too-long lines get an error, not a reset."""
+        tmpdir = tempfile.mkdtemp()
+        large = "".join(f"LD X{i}\nAND Z{i}\nST Y{i}\n" for i in range(4000))
+
+        async def exchange(path, requests, count):
+            reader, writer = await asyncio.open_unix_connection(path, limit=2 ** 24)
+            for request in requests:
+                writer.write((json.dumps(request) + "\n").encode("utf-8"))
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(count)]
+            writer.close()
+            return responses
+
+        async def serve(daemon, path, requests, count):
+            server = asyncio.ensure_future(daemon.serve_unix(path))
+            try:
+                while not os.path.exists(path):
+                    await asyncio.sleep(0.01)
+                return await exchange(path, requests, count)
+            finally:
+                server.cancel()
+
+        async def scenario():
+            daemon = CompileDaemon(jobs=1)
+            await daemon.start()
+            try:
+                big = await serve(daemon, os.path.join(tmpdir, "a.sock"), [{"id": 1, "op": "compile", "source": large}], 1)
+                daemon.max_request_bytes = 1024
+                small = await serve(daemon, os.path.join(tmpdir, "b.sock"), [
+                    {"id": 2, "op": "parse", "source": large}, {"id": 3, "op": "ping"}
+                ], 2)
+            finally:
+                daemon.close()
+            return big, small
+
+        try:
+            big, small = asyncio.run(scenario())
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertTrue(big[0]["ok"], big[0].get("error"))
+        self.assertIn("Y3999", big[0]["result"]["plutus"])
+        by_id = {response["id"]: response for response in small}
+        self.assertIn("Request too large", by_id[None]["error"])
+        self.assertEqual(by_id[3]["result"], "pong")
+
+
+if __name__ == "__main__":
+    unittest.main()
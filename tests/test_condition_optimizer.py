@@ -0,0 +1,125 @@
+import itertools
+import random
+import unittest
+
+from src.compile_cache import CompileCache
+from src.condition_optimizer import BDD, FALSE, TRUE, optimize_ir
+from src.ll_parser import parse_ladder_ir
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+def evaluate(bdd, node, assignment):
+    while node > TRUE:
+        var, low, high = bdd.nodes[node]
+        node = high if assignment[bdd.names[var]] else low
+    return node == TRUE
+
+class TestConditionOptimizer(unittest.TestCase):
+
+    def test_bdd_matches_truth_table(self):
+        """Ensure random accumulator chains build BDDs with the same truth table."""
+        rng = random.Random(3)
+        names = ["A", "B", "C", "D"]
+        operators = {
+            "AND": lambda a, b: a and b, "ANDN": lambda a, b: a and not b,
+            "OR": lambda a, b: a or b, "ORN": lambda a, b: a or not b,
+            "XOR": lambda a, b: a != b, "XORN": lambda a, b: a == b,
+        }
+        methods = {
+            "AND": lambda bdd, f, g: bdd.conj(f, g), "ANDN": lambda bdd, f, g: bdd.conj(f, bdd.neg(g)),
+            "OR": lambda bdd, f, g: bdd.disj(f, g), "ORN": lambda bdd, f, g: bdd.disj(f, bdd.neg(g)),
+            "XOR": lambda bdd, f, g: bdd.xor(f, g), "XORN": lambda bdd, f, g: bdd.neg(bdd.xor(f, g)),
+        }
+        for _ in range(50):
+            bdd = BDD()
+            chain = [(rng.choice(list(operators)), rng.choice(names)) for _ in range(6)]
+            first = rng.choice(names)
+            node = bdd.var(first)
+            for op, name in chain:
+                node = methods[op](bdd, node, bdd.var(name))
+            for values in itertools.product([False, True], repeat=len(names)):
+                assignment = dict(zip(names, values))
+                expected = assignment[first]
+                for op, name in chain:
+                    expected = operators[op](expected, assignment[name])
+                self.assertEqual(evaluate(bdd, node, assignment), expected)
+
+    def test_hash_consing_and_implication(self):
+        """Ensure equal functions share one node and implication is exact."""
+        bdd = BDD()
+        a, b = bdd.var("A"), bdd.var("B")
+        self.assertEqual(bdd.conj(a, b), bdd.conj(b, a))
+        self.assertEqual(bdd.disj(a, bdd.neg(a)), TRUE)
+        self.assertEqual(bdd.conj(a, bdd.neg(a)), FALSE)
+        self.assertTrue(bdd.implies(bdd.conj(a, b), a))
+        self.assertFalse(bdd.implies(a, bdd.conj(a, b)))
+
+    def test_redundant_rungs_are_dropped(self):
+        """Ensure duplicate, implied and tautological rungs are removed and reported."""
+        ir = parse_ladder_ir(
+            "LD X1\nAND X2\nORN X3\nST Y1\n"
+            "LD X1\nAND X2\nORN X3\nST Y1\n"
+            "LD X1\nAND X2\nST Y1\n"
+            "LD Level\nGT 80\nST Pump\n"
+            "LD A\nORN A\n"
+        )
+        result = optimize_ir(ir)
+        report = result.report
+        self.assertEqual(report["rungs"], 5)
+        self.assertEqual((report["duplicates"], report["implied"], report["tautologies"]), (1, 1, 1))
+        self.assertEqual(result.conditions, [
+            'traceIfFalse "Rung 2 failed" (Y1 && (X1 && X2))',
+            'traceIfFalse "Rung 3 failed" (Pump && (Level > 80))',
+        ])
+        self.assertLess(report["terms_after"], report["terms_before"])
+
+    def test_implied_rungs_in_large_programs(self):
+        """Ensure implied rungs are found among many rungs on one coil without trying every pair."""
+        source = "".join(f"LD A\nOR X{i}\nST Y\n" for i in range(3000)) + "LD A\nAND B\nST Y\nLD C\nST Z\n"
+        report = optimize_ir(parse_ladder_ir(source)).report
+        self.assertEqual((report["rungs"], report["implied"], report["conditions_after"]), (3002, 3000, 2))
+
+    def test_shared_subterms_become_bindings(self):
+        """Ensure nodes used by several conditions are bound once in the validator's let."""
+        ir = parse_ladder_ir(
+            "LD X1\nAND X2\nORN X3\nST Y1\n"
+            "LD X1\nAND X2\nORN X3\nST Y2\n"
+        )
+        result = optimize_ir(ir)
+        self.assertEqual(result.report["shared_subterms"], len(result.bindings))
+        self.assertTrue(result.bindings)
+        script = compile_ir_to_plutus_haskell_enhanced(ir, optimize=True)
+        for name, expression in result.bindings:
+            self.assertIn(f"        {name} = {expression}\n", script)
+        self.assertNotIn("Condition 0 failed", script)
+
+    def test_unsupported_rungs_fall_back(self):
+        """Ensure rungs the optimizer cannot model keep their per-instruction conditions."""
+        ir = {"instructions": [
+            {"type": "LD", "args": ["Start"]},
+            {"type": "TON", "args": ["T1", "500"]},
+            {"type": "ST", "args": ["Run"]},
+            {"type": "LD", "args": ["X1"]},
+            {"type": "ST", "args": ["Y1"]},
+        ]}
+        result = optimize_ir(ir)
+        self.assertEqual(result.report["fallback_rungs"], 1)
+        self.assertEqual(result.conditions, [
+            'traceIfFalse "Condition 0 failed: ld" (Start)',
+            'traceIfFalse "Condition 1 failed: ton" (T1 && 500)',
+            'traceIfFalse "Condition 2 failed: st" (Run)',
+            'traceIfFalse "Rung 1 failed" (Y1 && X1)',
+        ])
+
+    def test_default_output_and_cache_are_unchanged(self):
+        """Ensure optimization is opt-in and cached separately from the default output."""
+        ir = parse_ladder_ir("LD X1\nAND X2\nST Y1\n")
+        default = compile_ir_to_plutus_haskell_enhanced(ir)
+        self.assertIn('traceIfFalse "Condition 1 failed: and" (X2)', default)
+        cache = CompileCache()
+        self.assertEqual(compile_ir_to_plutus_haskell_enhanced(ir, cache=cache), default)
+        optimized = compile_ir_to_plutus_haskell_enhanced(ir, cache=cache, optimize=True)
+        self.assertNotEqual(optimized, default)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.cost_estimator import (
+    DEFAULT_COST_MODEL, BudgetExceededError, check_budget, estimate_ir, estimate_script, load_cost_model,
+)
+from src.ll_parser import parse_ladder_ir
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+PROGRAM = "LD X1\nAND X2\nST Y1\nLD Level\nGT 80\nST Pump\n"
+
+class TestCostEstimator(unittest.TestCase):
+
+    def setUp(self):
+        self.ir = parse_ladder_ir(PROGRAM)
+        self.ir["counters"] = {"C1": {"type": "CTU", "preset": "10"}}
+
+    def test_per_rung_breakdown(self):
+        """Ensure conditions are attributed to their rungs and checks to their own groups."""
+        estimate = estimate_ir(self.ir)
+        self.assertEqual(estimate.groups["rung 0"]["items"], 3)
+        self.assertEqual(estimate.groups["rung 1"]["items"], 3)
+        self.assertEqual(estimate.groups["counters"]["items"], 1)
+        self.assertEqual(estimate.totals["cpu"], sum(item["cpu"] for item in estimate.items))
+
+    def test_condition_pricing(self):
+        """Ensure a condition is charged its base cost, message bytes and every term."""
+        estimate = estimate_script('traceIfFalse "Rung 0 failed" (Pump && (Level > 80))')
+        model = DEFAULT_COST_MODEL
+        item = estimate.items[1]
+        self.assertEqual(item["group"], "rung 0")
+        expected = (model["condition"]["cpu"] + 2 * model["variable"]["cpu"] + model["literal"]["cpu"]
+                    + model["boolean"]["cpu"] + model["comparison"]["cpu"])
+        self.assertEqual(item["cpu"], expected)
+        self.assertEqual(item["bytes"] - model["condition"]["bytes"] - model["variable"]["bytes"] * 2
+                         - model["literal"]["bytes"] - model["boolean"]["bytes"] - model["comparison"]["bytes"],
+                         len("Rung 0 failed"))
+
+    def test_decimal_addresses_and_time_literals(self):
+        """Ensure decimal comparators, direct addresses and time literals are priced instead of failing."""
+        ir = parse_ladder_ir("LD Level\nGT 1.5\nST Pump\nLD %IX0.1\nAND T#5S\nST %QX0.0\n")
+        for optimize in (False, True):
+            self.assertEqual(estimate_ir(ir, optimize=optimize).groups["rung 0"]["items"], 3 if not optimize else 1)
+        model = DEFAULT_COST_MODEL
+        item = estimate_script('traceIfFalse "Rung 0 failed" (Pump && (Level > 1.5))').items[1]
+        integer = estimate_script('traceIfFalse "Rung 0 failed" (Pump && (Level > 15))').items[1]
+        self.assertEqual(item["cpu"], integer["cpu"])
+        self.assertEqual(item["bytes"], integer["bytes"])
+        address = estimate_script('traceIfFalse "Rung 0 failed" (%IX0.1 && T#5S)').items[1]
+        self.assertEqual(address["cpu"], model["condition"]["cpu"] + model["variable"]["cpu"]
+                         + model["literal"]["cpu"] + model["boolean"]["cpu"])
+
+    def test_optimized_script_is_cheaper(self):
+        """Ensure bindings are priced and the optimized validator costs less."""
+        ir = parse_ladder_ir("LD X1\nAND X2\nORN X3\nST Y1\nLD X1\nAND X2\nORN X3\nST Y1\n")
+        plain, optimized = estimate_ir(ir), estimate_ir(ir, optimize=True)
+        self.assertLess(optimized.totals["cpu"], plain.totals["cpu"])
+        self.assertLess(optimized.totals["bytes"], plain.totals["bytes"])
+        script = compile_ir_to_plutus_haskell_enhanced(ir, optimize=True)
+        self.assertEqual(estimate_script(script, ir).totals, optimized.totals)
+
+    def test_cost_model_overrides(self):
+        """Ensure a JSON cost model overrides defaults and rejects unknown entries."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.json")
+            with open(path, "w") as f:
+                json.dump({"variable": {"cpu": 1}}, f)
+            model = load_cost_model(path)
+            self.assertEqual(model["variable"], dict(DEFAULT_COST_MODEL["variable"], cpu=1))
+            self.assertLess(estimate_ir(self.ir, model).totals["cpu"], estimate_ir(self.ir).totals["cpu"])
+            with open(path, "w") as f:
+                json.dump({"loops": {"cpu": 1}}, f)
+            with self.assertRaises(ValueError):
+                load_cost_model(path)
+
+    def test_budget(self):
+        """Ensure exceeding a budget raises with the offending resources."""
+        estimate = estimate_ir(self.ir)
+        self.assertIs(check_budget(estimate), estimate)
+        with self.assertRaises(BudgetExceededError) as raised:
+            check_budget(estimate, {"cpu": 1000, "mem": None, "bytes": 10 ** 6})
+        self.assertEqual(list(raised.exception.violations), ["cpu"])
+
+if __name__ == "__main__":
+    unittest.main()
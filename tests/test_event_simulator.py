@@ -0,0 +1,125 @@
+import random
+import unittest
+from src.event_simulator import EventDrivenSimulator
+from src.fast_interpreter import FastInterpreter
+from src.program_generator import generate_ir
+from tests.test_fast_interpreter import random_program
+
+
+def run_both(test, ir, seed, scans=40, inputs=None):
+    """
+    Steps both interpreters with the same random input changes and compares every tag after each scan.
+    """
+    rng = random.Random(seed)
+    full = FastInterpreter(ir)
+    event = EventDrivenSimulator(ir)
+    tags = full.program.tags
+    inputs = [tag for tag in tags if tag.startswith("X")] + (inputs or [])
+    for cycle in range(scans):
+        if rng.random() < 0.6:
+            for _ in range(rng.randint(1, 3)):
+                tag, value = rng.choice(inputs), rng.choice([0, 1, 1, 5, -2])
+                full[tag] = value
+                event[tag] = value
+        full.scan()
+        event.scan()
+        for tag in tags:
+            test.assertEqual(event[tag], full[tag], f"seed {seed}, cycle {cycle}, {tag}")
+    return event
+
+class TestEventDrivenSimulator(unittest.TestCase):
+
+    def test_matches_fast_interpreter(self):
+        """Ensure random programs produce the same tag values as full-scan execution."""
+        for seed in range(40):
+            run_both(self, random_program(seed, 80), seed, inputs=["T1.IN", "C1.CU", "C1.R"])
+
+    def test_matches_with_jumps(self):
+        """Ensure generated programs with conditional jumps, timers and counters match."""
+        for seed in range(5):
+            event = run_both(self, generate_ir(400, seed), seed, scans=60)
+            self.assertTrue(any(unit.name.startswith("blocks") for unit in event.units))
+
+    def test_sparse_changes_evaluate_few_units(self):
+        """Ensure one input change re-evaluates only its dependent rungs."""
+        ir = {"instructions": [
+            {"type": "LD", "args": ["A"]}, {"type": "AND", "args": ["B"]}, {"type": "ST", "args": ["M1"]},
+            {"type": "LD", "args": ["C"]}, {"type": "ST", "args": ["M2"]},
+            {"type": "LD", "args": ["M1"]}, {"type": "OR", "args": ["M2"]}, {"type": "ST", "args": ["Y1"]},
+            {"type": "LD", "args": ["D"]}, {"type": "ST", "args": ["Y2"]}
+        ]}
+        sim = EventDrivenSimulator(ir)
+        self.assertEqual(sim.dependents("M1"), ["rung 0", "rung 2"])
+        sim.scan()
+        self.assertEqual(sim.evaluations, 4)
+        sim.scan(10)
+        self.assertEqual(sim.evaluations, 4)
+        sim["A"] = 1
+        sim["B"] = 1
+        sim.scan()
+        self.assertEqual(sim["Y1"], 1)
+        self.assertEqual(sim.evaluations, 6)
+        self.assertEqual(sim.full_scan_evaluations, 48)
+
+    def test_timer_wakes_instead_of_polling(self):
+        """Ensure a running timer sleeps until it expires while ET still reads correctly."""
+        ir = {
+            "instructions": [{"type": "LD", "args": ["Run"]}, {"type": "ST", "args": ["T1.IN"]},
+                             {"type": "LD", "args": ["T1.Q"]}, {"type": "ST", "args": ["Done"]}],
+            "timers": {"T1": {"type": "TON", "duration": "T#100ms"}}
+        }
+        sim = EventDrivenSimulator(ir, scan_time_ms=10)
+        sim.scan()
+        sim["Run"] = 1
+        before = sim.evaluations
+        sim.scan(5)
+        self.assertEqual(sim["T1.ET"], 50)
+        self.assertEqual(sim["Done"], 0)
+        sim.scan(5)
+        self.assertEqual(sim["T1.Q"], 1)
+        sim.scan()
+        self.assertEqual(sim["Done"], 1)
+        # Rung and timer when Run rises, the timer at expiry, then the rung reading T1.Q
+        self.assertEqual(sim.evaluations - before, 4)
+
+    def test_observed_elapsed_time_and_tp_timer(self):
+        """Ensure timers whose ET is read, and pulse timers, match full-scan execution."""
+        for kind in ("TON", "TOF", "TP"):
+            ir = {
+                "instructions": [{"type": "LD", "args": ["X0"]}, {"type": "ST", "args": ["T1.IN"]},
+                                 {"type": "LD", "args": ["T1.ET"]}, {"type": "GT", "args": ["40"]},
+                                 {"type": "ST", "args": ["Late"]}, {"type": "LD", "args": ["T2.Q"]},
+                                 {"type": "ST", "args": ["C1.CU"]}, {"type": "LD", "args": ["X1"]},
+                                 {"type": "ST", "args": ["T2.IN"]}],
+                "timers": {"T1": {"type": kind, "duration": "70"}, "T2": {"type": kind, "duration": "30"}},
+                "counters": {"C1": {"type": "CTU", "preset": "2"}}
+            }
+            run_both(self, ir, 7, scans=80)
+
+    def test_pulse_shorter_than_a_scan(self):
+        """Ensure a TP timer whose preset fits in one scan drops Q on the next scan, as in full-scan execution."""
+        for duration in ("10", "T#0S", "5"):
+            ir = {
+                "instructions": [{"type": "LD", "args": ["X0"]}, {"type": "ST", "args": ["T1.IN"]},
+                                 {"type": "LD", "args": ["T1.Q"]}, {"type": "ST", "args": ["Y0"]}],
+                "timers": {"T1": {"type": "TP", "duration": duration}}
+            }
+            full, event = FastInterpreter(ir, scan_time_ms=10), EventDrivenSimulator(ir, scan_time_ms=10)
+            for cycle, value in enumerate((1, 0, 0, 0, 1, 1, 1)):
+                full["X0"] = event["X0"] = value
+                full.scan()
+                event.scan()
+                for tag in ("Y0", "T1.Q", "T1.ET"):
+                    self.assertEqual(event[tag], full[tag], f"{duration}, cycle {cycle}, {tag}")
+            run_both(self, ir, 3, scans=60)
+
+    def test_subroutines_are_rejected(self):
+        """Ensure CALL/RET programs are left to the fast interpreter."""
+        ir = {"instructions": [{"type": "CALL", "args": ["SUB"]}, {"type": "RET", "args": []},
+                               {"type": "LBL", "args": ["SUB"]}, {"type": "LD", "args": ["A"]},
+                               {"type": "ST", "args": ["B"]}, {"type": "RET", "args": []}]}
+        with self.assertRaises(ValueError):
+            EventDrivenSimulator(ir)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import random
+import unittest
+from src.fast_interpreter import FastInterpreter, compile_program
+
+try:
+    import numpy as np
+    from src.batch_simulator import BatchSimulator
+except ImportError:
+    np = None
+
+OPS = ["LD", "LDN", "AND", "ANDN", "OR", "ORN", "XOR", "XORN", "NOT", "ST", "STN", "S", "R",
+       "ADD", "SUB", "MUL", "DIV", "MOD", "GT", "GE", "EQ", "NE", "LE", "LT"]
+
+
+def random_program(seed, length=200):
+    rng = random.Random(seed)
+    tags = [f"X{i}" for i in range(6)] + [f"Y{i}" for i in range(6)] + ["T1.Q", "C1.Q", "C1.CV"]
+    instructions = []
+    for _ in range(length):
+        op = rng.choice(OPS)
+        if op in ("ST", "STN", "S", "R"):
+            args = [rng.choice([f"Y{i}" for i in range(6)] + ["T1.IN", "C1.CU", "C1.R"])]
+        elif op == "NOT" and rng.random() < 0.5:
+            args = []
+        else:
+            args = [rng.choice(tags + ["3", "-2", "0"])]
+        instructions.append({"type": op, "args": args})
+    return {
+        "instructions": instructions,
+        "timers": {"T1": {"type": rng.choice(["TON", "TOF", "TP"]), "duration": "30"}},
+        "counters": {"C1": {"type": "CTU", "preset": "3"}}
+    }
+
+class TestFastInterpreter(unittest.TestCase):
+
+    def test_rung_logic_and_latch(self):
+        """Ensure fused rungs evaluate series/parallel contacts and set/reset coils."""
+        ir = {"instructions": [
+            {"type": "LD", "args": ["Start"]},
+            {"type": "ORN", "args": ["Stop"]},
+            {"type": "S", "args": ["Motor"]},
+            {"type": "LD", "args": ["Stop"]},
+            {"type": "AND", "args": ["Reset"]},
+            {"type": "R", "args": ["Motor"]}
+        ]}
+        plc = FastInterpreter(ir)
+        plc["Stop"] = 1
+        plc.scan()
+        self.assertEqual(plc["Motor"], 0)
+        plc["Start"] = 1
+        plc.scan()
+        plc["Start"] = 0
+        plc.scan()
+        self.assertEqual(plc["Motor"], 1)
+        plc["Reset"] = 1
+        plc.scan()
+        self.assertEqual(plc["Motor"], 0)
+
+    def test_timer_counter_and_arithmetic(self):
+        """Ensure timers, counters and IL arithmetic follow the shared scan semantics."""
+        ir = {
+            "instructions": [
+                {"type": "LD", "args": ["Run"]}, {"type": "ST", "args": ["T1.IN"]},
+                {"type": "LD", "args": ["T1.Q"]}, {"type": "ST", "args": ["C1.CU"]},
+                {"type": "LD", "args": ["Level"]}, {"type": "DIV", "args": ["-4"]},
+                {"type": "ST", "args": ["Scaled"]}, {"type": "GT", "args": ["-3"]},
+                {"type": "ST", "args": ["High"]}
+            ],
+            "timers": {"T1": {"type": "TON", "duration": "T#20ms"}},
+            "counters": {"C1": {"type": "CTU", "preset": "1"}}
+        }
+        plc = FastInterpreter(ir, scan_time_ms=10)
+        plc["Run"] = 1
+        plc["Level"] = 14
+        plc.scan(2)
+        self.assertEqual(plc["T1.DN"], 1)
+        self.assertEqual(plc["Scaled"], -3)
+        self.assertEqual(plc["High"], 0)
+        plc.scan()
+        self.assertEqual(plc["C1.CV"], 1)
+        self.assertEqual(plc["C1.Q"], 1)
+
+    def test_compiled_program_is_cached(self):
+        """Ensure identical IR reuses the compiled scan function."""
+        ir = {"instructions": [{"type": "LD", "args": ["A"]}, {"type": "ST", "args": ["B"]}]}
+        self.assertIs(compile_program(ir)[1], compile_program(dict(ir))[1])
+        self.assertIsNot(compile_program(ir)[1], compile_program(ir, scan_time_ms=5)[1])
+
+    def test_long_rung_compiles(self):
+        """Ensure very long rungs are split instead of overflowing the expression parser."""
+        ir = {"instructions": [{"type": "LD", "args": ["A"]}]
+              + [{"type": "AND", "args": ["A"]}] * 2000 + [{"type": "ST", "args": ["Y"]}]}
+        plc = FastInterpreter(ir)
+        plc["A"] = 1
+        plc.scan()
+        self.assertEqual(plc["Y"], 1)
+        self.assertGreater(plc.benchmark(100), 0)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_matches_batch_simulator(self):
+        """Ensure random programs produce the same traces as the batch simulator."""
+        for seed in range(20):
+            ir = random_program(seed)
+            rng = np.random.default_rng(seed)
+            inputs = {f"X{i}": rng.integers(-1, 3, size=(1, 12)) for i in range(6)}
+            expected = BatchSimulator(ir).run(inputs)
+            plc = FastInterpreter(ir)
+            for cycle in range(12):
+                for tag, values in inputs.items():
+                    plc[tag] = int(values[0, cycle])
+                plc.scan()
+                for tag, trace in expected.traces.items():
+                    self.assertEqual(plc[tag], trace[0, cycle], f"seed {seed}, cycle {cycle}, {tag}")
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_missing_operands_match_batch_simulator(self):
+        """Ensure loads and contacts without operands behave as in the batch simulator."""
+        instructions = []
+        for i, op in enumerate(["LD", "LDN", "INPUT", "AND", "ANDN", "OR", "ORN", "XOR", "XORN"]):
+            load = [] if op in ("LD", "LDN", "INPUT") else [{"type": "LD", "args": ["X0"]}]
+            instructions += load + [{"type": op, "args": []}, {"type": "ST", "args": [f"Y{i}"]}]
+        ir = {"instructions": instructions}
+        expected = BatchSimulator(ir).run({"X0": [2]})
+        plc = FastInterpreter(ir)
+        plc["X0"] = 2
+        plc.scan()
+        self.assertEqual([plc[f"Y{i}"] for i in range(9)], [1, 0, 1, 1, 1, 1, 1, 1, 1])
+        for tag, trace in expected.traces.items():
+            self.assertEqual(plc[tag], trace[0, 0], tag)
+
+if __name__ == "__main__":
+    unittest.main()
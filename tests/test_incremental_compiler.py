@@ -0,0 +1,89 @@
+import unittest
+
+from src.incremental_compiler import IncrementalCompiler
+from src.ll_parser import parse_ladder_ir
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+PROGRAM = """VAR
+    Delay : TON;
+END_VAR
+LD Start
+AND Permit
+ST Motor
+LD Motor
+CAL Delay(IN := Motor, PT := T#5S)
+LD Delay.Q
+ST Alarm
+CTU C1 10
+LD Alarm
+OR Reset
+ST Lamp
+"""
+
+class TestIncrementalCompiler(unittest.TestCase):
+
+    def assertMatchesFullBuild(self, compiler, source):
+        self.assertEqual(compiler.compile(source), compile_ir_to_plutus_haskell_enhanced(parse_ladder_ir(source)))
+        self.assertEqual(compiler.ir, parse_ladder_ir(source))
+
+    def test_single_rung_edit(self):
+        """Ensure editing one rung reparses and re-renders only that rung."""
+        compiler = IncrementalCompiler()
+        self.assertMatchesFullBuild(compiler, PROGRAM)
+        self.assertTrue(compiler.last_update["full"])
+        self.assertMatchesFullBuild(compiler, PROGRAM.replace("OR Reset", "OR Override"))
+        self.assertEqual(compiler.last_update["reparsed"], 1)
+        self.assertEqual(compiler.last_update["rendered"], 1)
+        self.assertFalse(compiler.last_update["full"])
+
+    def test_inserted_instruction_shifts_later_rungs(self):
+        """Ensure later fragments are re-rendered (not reparsed) when condition indexes shift."""
+        compiler = IncrementalCompiler()
+        compiler.compile(PROGRAM)
+        self.assertMatchesFullBuild(compiler, PROGRAM.replace("ST Motor", "ANDN Stop\nST Motor"))
+        self.assertEqual(compiler.last_update["reparsed"], 1)
+        self.assertEqual(compiler.last_update["rendered"], compiler.last_update["segments"])
+
+    def test_declaration_change_reparses_dependents(self):
+        """Ensure changing a declaration reparses the rungs that call the instance."""
+        compiler = IncrementalCompiler()
+        compiler.compile(PROGRAM)
+        self.assertMatchesFullBuild(compiler, PROGRAM.replace("Delay : TON;", "Delay : TOF;"))
+        self.assertEqual(compiler.last_update["dependents"], 1)
+        self.assertEqual(compiler.ir["timers"]["Delay"]["type"], "TOF")
+
+    def test_edits_inside_comments_and_jumps(self):
+        """Ensure edits that open comments or change reachability match a full build."""
+        compiler = IncrementalCompiler()
+        source = "LD X1\nJMPC skip\nST Y1\nLD X2\nST Y2\nskip: LD X3\nST Y3\n"
+        self.assertMatchesFullBuild(compiler, source)
+        self.assertMatchesFullBuild(compiler, source.replace("JMPC skip", "JMP skip"))
+        self.assertMatchesFullBuild(compiler, source.replace("ST Y1", "ST Y1\n(* disabled"))
+        self.assertMatchesFullBuild(compiler, source.replace("ST Y2", "ST Y2 *)"))
+        self.assertMatchesFullBuild(compiler, source.replace("skip", "VARIANT_B"))
+        self.assertEqual(len(compiler.ir["instructions"]), 8)
+
+    def test_removing_the_last_jump(self):
+        """Ensure fragments filtered by reachability are re-rendered once no control flow is left."""
+        compiler = IncrementalCompiler()
+        self.assertMatchesFullBuild(compiler, "LD A\nRET\nLD B\nST Y")
+        self.assertMatchesFullBuild(compiler, "LD A\nST Z\nLD B\nST Y")
+
+    def test_unchanged_source(self):
+        """Ensure recompiling the same source does no work."""
+        compiler = IncrementalCompiler()
+        output = compiler.compile(PROGRAM)
+        self.assertEqual(compiler.compile(PROGRAM), output)
+        self.assertEqual(compiler.last_update["reparsed"], 0)
+
+    def test_optimized_mode(self):
+        """Ensure optimize=True matches the optimizing compiler on the merged IR."""
+        compiler = IncrementalCompiler(optimize=True)
+        source = PROGRAM.replace("OR Reset", "AND Start")
+        compiler.compile(PROGRAM)
+        self.assertEqual(compiler.compile(source),
+                         compile_ir_to_plutus_haskell_enhanced(parse_ladder_ir(source), optimize=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import contextlib
+import io
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+from src import instrumentation
+from src.compile_cache import CompileCache
+from src.ll_parser import parse_ladder_ir
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+from src.reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll
+from src.validator_ir_transform import validate_ir
+
+LADDER = """LD X1
+AND X2
+ST Y1
+
+LD X3
+ST Y2"""
+
+PLUTUS = """traceIfFalse "Condition 1 failed" (X1 && X2)
+timer Timer1 5000ms
+if Timer1.DN then output = 1
+let state = state + 1"""
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+        shutil.rmtree(self.tmpdir)
+
+    def test_disabled_is_a_no_op(self):
+        """Ensure nothing is recorded while instrumentation is off."""
+        self.assertIs(instrumentation.stage("x"), instrumentation.NULL_STAGE)
+        compile_ir_to_plutus_haskell_enhanced(parse_ladder_ir(LADDER))
+        self.assertEqual(instrumentation.snapshot(), {"stages": {}, "counters": {}})
+
+    def test_stages_and_counters(self):
+        """Ensure nested stages are timed and counters accumulate."""
+        instrumentation.enable()
+        for _ in range(2):
+            with instrumentation.stage("outer"):
+                with instrumentation.stage("inner"):
+                    instrumentation.count("items", 3)
+        metrics = instrumentation.snapshot()
+        self.assertEqual(metrics["stages"]["outer"]["calls"], 2)
+        self.assertEqual(metrics["stages"]["inner"]["calls"], 2)
+        self.assertGreaterEqual(metrics["stages"]["outer"]["seconds"], metrics["stages"]["inner"]["seconds"])
+        self.assertEqual(metrics["counters"], {"items": 6})
+
+    def test_pipeline_stages(self):
+        """Ensure parse, validate, compile and emit report their stages and counts."""
+        instrumentation.enable()
+        ir = parse_ladder_ir(LADDER)
+        self.assertEqual(validate_ir(ir), [])
+        compile_ir_to_plutus_haskell_enhanced(ir)
+        metrics = instrumentation.snapshot()
+        for name in ("ll_parser.parse", "validator.validate", "compiler.compile", "emitter.emit"):
+            self.assertEqual(metrics["stages"][name]["calls"], 1, name)
+        counters = metrics["counters"]
+        self.assertEqual(counters["ll_parser.lines"], 6)
+        self.assertEqual(counters["ll_parser.rungs"], 2)
+        self.assertEqual(counters["ll_parser.instructions"], len(ir["instructions"]))
+        self.assertEqual(counters["validator.documents"], 1)
+        self.assertEqual(counters["validator.issues"], 0)
+        self.assertEqual(counters["emitter.conditions"], len(ir["instructions"]))
+
+    def test_cache_counters(self):
+        """Ensure memory and disk cache hits both count as compiler cache hits."""
+        instrumentation.enable()
+        ir = parse_ladder_ir(LADDER)
+        cache = CompileCache(disk_dir=self.tmpdir)
+        compile_ir_to_plutus_haskell_enhanced(ir, cache=cache)
+        compile_ir_to_plutus_haskell_enhanced(ir, cache=cache)
+        compile_ir_to_plutus_haskell_enhanced(ir, cache=CompileCache(disk_dir=self.tmpdir))
+        counters = instrumentation.snapshot()["counters"]
+        self.assertEqual((counters["compiler.cache_hits"], counters["compiler.cache_misses"]), (2, 1))
+
+    def test_reverse_compiler_is_quiet_and_logs_at_debug(self):
+        """Ensure the reverse compiler writes nothing to stdout and traces through logging."""
+        instrumentation.enable()
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            expected = reverse_compile_plutus_to_ll(PLUTUS)
+        self.assertEqual(stdout.getvalue(), "")
+        counters = instrumentation.snapshot()["counters"]
+        self.assertEqual(counters["reverse.lines"], 4)
+        self.assertEqual(counters["reverse.hits.trace"], 1)
+        self.assertEqual(counters["reverse.hits.timer"], 1)
+        self.assertEqual(counters["reverse.hits.timer_done"], 1)
+        self.assertEqual(counters["reverse.hits.let"], 1)
+
+        with self.assertLogs("src.reverse_compiler.reverse_compiler", level="DEBUG") as logs:
+            self.assertEqual(reverse_compile_plutus_to_ll(PLUTUS), expected)
+        self.assertTrue(any("Detected Timer: Timer1" in line for line in logs.output))
+
+    def test_profile_and_metrics_dump(self):
+        """Ensure profile statistics and the metrics JSON are written to disk."""
+        instrumentation.enable(profile=True)
+        compile_ir_to_plutus_haskell_enhanced(parse_ladder_ir(LADDER))
+        profile_path = os.path.join(self.tmpdir, "run-{pid}.prof")
+        self.assertTrue(instrumentation.dump_profile(profile_path))
+        stats = pstats.Stats(profile_path.replace("{pid}", str(os.getpid())))
+        profiled_files = {os.path.basename(func[0]) for func in stats.stats}
+        self.assertIn("ll_parser.py", profiled_files)
+        self.assertIn("plutus_emitter.py", profiled_files)
+
+        metrics_path = os.path.join(self.tmpdir, "metrics.json")
+        instrumentation.dump_metrics(metrics_path)
+        with open(metrics_path, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), instrumentation.snapshot())
+
+    def test_profile_requires_enable(self):
+        """Ensure dump_profile reports that no profile was captured."""
+        instrumentation.enable()
+        self.assertFalse(instrumentation.dump_profile(os.path.join(self.tmpdir, "run.prof")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.ir_binary import IRBinaryReader, IRFormatError, dumps, read_ir, write_ir
+from src.ll_parser import parse_ladder_ir
+
+examples_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../examples"))
+
+class TestIRBinary(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "program.irb")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_round_trip_json_examples(self):
+        """Ensure the binary form reads back identical to the JSON IR."""
+        for name in ("ir_transformation_example.ir",):
+            with open(os.path.join(examples_dir, name)) as f:
+                ir = json.load(f)
+            write_ir(ir, self.path)
+            self.assertEqual(json.dumps(read_ir(self.path)), json.dumps(ir))
+        with open(os.path.join(examples_dir, "reverse_compiled_example.ll")) as f:
+            ir = parse_ladder_ir(f)
+        self.assertEqual(read_ir_bytes(dumps(ir)), ir)
+
+    def test_round_trip_extras(self):
+        """Ensure scalar keys, unknown opcodes and instruction extras survive."""
+        ir = {
+            "format": "verifiable",
+            "timestamp": 1700000000,
+            "instructions": [{"type": "VENDOR_OP", "args": ["A", "B"], "rung": 1}, {"type": "NOT"}],
+            "timers": {},
+            "scan_cycle": ["VENDOR_OP", ">"]
+        }
+        self.assertEqual(json.dumps(read_ir_bytes(dumps(ir))), json.dumps(ir))
+
+    def test_random_access(self):
+        """Ensure rungs and section entries can be read individually from the mmap."""
+        source = "\n".join(f"LD X{i}\nAND X{i + 1}\nST Y{i}\nTON T{i} {i * 100}" for i in range(200))
+        write_ir(parse_ladder_ir(source), self.path)
+        with IRBinaryReader(self.path) as reader:
+            self.assertEqual(len(reader), 600)
+            self.assertEqual(reader.rung_count, 200)
+            self.assertEqual(reader.rung(150), [
+                {"type": "LD", "args": ["X150"]},
+                {"type": "AND", "args": ["X151"]},
+                {"type": "ST", "args": ["Y150"]}
+            ])
+            self.assertEqual(reader.section_entry("timers", "T42"), ("T42", {"type": "TON", "duration": "4200"}))
+            self.assertEqual(reader.section_entry("timers", 7)[0], "T7")
+            self.assertEqual(reader.section_size("counters"), 0)
+
+    def test_rejects_other_files(self):
+        """Ensure non-container input is rejected."""
+        with self.assertRaises(IRFormatError):
+            IRBinaryReader(b"{\"instructions\": []}")
+
+def read_ir_bytes(data):
+    reader = IRBinaryReader(data)
+    try:
+        return reader.to_dict()
+    finally:
+        reader.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import random
+import unittest
+from src.ir_cfg import build_cfg, eliminate_unreachable
+from src.ll_parser import parse_ladder_ir
+from src.fast_interpreter import FastInterpreter
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+try:
+    import numpy as np
+    from src.batch_simulator import BatchSimulator
+except ImportError:
+    np = None
+
+MODE_PROGRAM = """
+LD Auto
+JMPC AUTO
+LD Manual
+ST Pump
+JMP DONE
+AUTO: LD Level
+GT 80
+ST Pump
+DONE: LD Pump
+ST Lamp
+"""
+
+SUBROUTINE_PROGRAM = """
+LD Start
+CALL FILL
+LD Start
+ST Started
+RET
+FILL: LD Level
+ADD 5
+ST Level
+RET
+DEAD: LD X
+ST Y
+"""
+
+
+def random_jump_program(seed, length=120):
+    # Jumps always name the next label still to be placed, so they only go forward.
+    rng = random.Random(seed)
+    instructions = []
+    labels = 0
+    for position in range(length):
+        roll = rng.random()
+        if roll < 0.08:
+            instructions.append({"type": rng.choice(["JMP", "JMPC", "JMPCN"]), "args": [f"L{labels}"]})
+        elif roll < 0.16 and labels < position // 8:
+            instructions.append({"type": "LBL", "args": [f"L{labels}"]})
+            labels += 1
+        else:
+            op = rng.choice(["LD", "AND", "ORN", "XOR", "ADD", "GT", "ST", "S", "R"])
+            if op in ("ST", "S", "R"):
+                instructions.append({"type": op, "args": [f"Y{rng.randrange(4)}"]})
+            else:
+                instructions.append({"type": op, "args": [rng.choice(["X0", "X1", "X2", "Y0", "Y1", "2"])]})
+    instructions.append({"type": "LBL", "args": [f"L{labels}"]})
+    return {"instructions": instructions}
+
+class TestControlFlowGraph(unittest.TestCase):
+
+    def test_blocks_and_successors(self):
+        """Ensure labels start blocks, jumps end them and targets resolve."""
+        cfg = build_cfg(parse_ladder_ir(MODE_PROGRAM)["instructions"])
+        self.assertEqual([(b.start, b.end) for b in cfg.blocks], [(0, 2), (2, 5), (5, 9), (9, 12)])
+        self.assertEqual(cfg.labels, {"AUTO": 2, "DONE": 3})
+        self.assertEqual([b.successors for b in cfg.blocks], [[2, 1], [3], [3], []])
+        self.assertTrue(all(b.reachable for b in cfg.blocks))
+
+    def test_subroutines_and_dead_code(self):
+        """Ensure CALL marks subroutines and code after the final RET is unreachable."""
+        ir = parse_ladder_ir(SUBROUTINE_PROGRAM)
+        cfg = build_cfg(ir["instructions"])
+        self.assertEqual(cfg.subroutines, {cfg.labels["FILL"]})
+        self.assertEqual([b.labels for b in cfg.unreachable_blocks()], [["DEAD"]])
+        pruned = eliminate_unreachable(ir)
+        self.assertNotIn({"type": "ST", "args": ["Y"]}, pruned["instructions"])
+        self.assertEqual(len(pruned["instructions"]), len(pruned["scan_cycle"]))
+        live = parse_ladder_ir(MODE_PROGRAM)
+        self.assertIs(eliminate_unreachable(live), live)
+
+    def test_compiler_skips_dead_and_control_instructions(self):
+        """Ensure dead blocks, labels and jumps emit no conditions."""
+        script = compile_ir_to_plutus_haskell_enhanced(parse_ladder_ir(SUBROUTINE_PROGRAM))
+        self.assertNotIn("(Y)", script)
+        self.assertNotIn(": call", script)
+        self.assertNotIn(": lbl", script)
+        self.assertIn('"Condition 7 failed: add" (5)', script)
+
+    def test_interpreter_follows_jumps_and_calls(self):
+        """Ensure block dispatch takes the right branch and returns from subroutines."""
+        plc = FastInterpreter(parse_ladder_ir(MODE_PROGRAM))
+        plc["Manual"], plc["Level"] = 1, 50
+        plc.scan()
+        self.assertEqual((plc["Pump"], plc["Lamp"]), (1, 1))
+        plc["Auto"] = 1
+        plc.scan()
+        self.assertEqual((plc["Pump"], plc["Lamp"]), (0, 0))
+
+        plc = FastInterpreter(parse_ladder_ir(SUBROUTINE_PROGRAM))
+        plc["Start"] = 1
+        plc.scan(3)
+        self.assertEqual((plc["Level"], plc["Started"]), (15, 1))
+
+    def test_interpreter_watchdog(self):
+        """Ensure an endless backward jump is reported instead of hanging."""
+        plc = FastInterpreter(parse_ladder_ir("LOOP: LD X\nJMP LOOP"))
+        with self.assertRaises(RuntimeError):
+            plc.scan()
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_batch_simulator_masks_forward_jumps(self):
+        """Ensure each scenario follows its own branch and matches the interpreter."""
+        ir = parse_ladder_ir(MODE_PROGRAM)
+        inputs = {"Auto": np.array([0, 0, 1, 1]), "Manual": np.array([0, 1, 0, 1]), "Level": np.array([90, 90, 10, 90])}
+        result = BatchSimulator(ir).run(inputs)
+        self.assertEqual(result.final("Lamp").tolist(), [0, 1, 0, 1])
+        with self.assertRaises(ValueError):
+            BatchSimulator(parse_ladder_ir(SUBROUTINE_PROGRAM))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_random_forward_jumps_match_interpreter(self):
+        """Ensure masked batch execution and block dispatch agree on random forward-jump programs."""
+        for seed in range(20):
+            ir = random_jump_program(seed)
+            rng = np.random.default_rng(seed)
+            inputs = {f"X{i}": rng.integers(0, 3, size=(1, 6)) for i in range(3)}
+            expected = BatchSimulator(ir).run(inputs)
+            plc = FastInterpreter(ir)
+            for cycle in range(6):
+                for tag, values in inputs.items():
+                    plc[tag] = int(values[0, cycle])
+                plc.scan()
+                for tag, trace in expected.traces.items():
+                    self.assertEqual(plc[tag], trace[0, cycle], f"seed {seed}, cycle {cycle}, {tag}")
+
+if __name__ == "__main__":
+    unittest.main()
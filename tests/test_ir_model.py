@@ -0,0 +1,62 @@
+import json
+import os
+import unittest
+from src.ir_model import IRProgram, Opcode, opcode_for, opcode_name, Timer
+from src.ll_parser import parse_ladder_ir
+
+examples_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../examples"))
+
+class TestIRModel(unittest.TestCase):
+
+    def test_round_trip_example_files(self):
+        """Ensure the compact model converts back to an identical IR dict."""
+        with open(os.path.join(examples_dir, "ir_transformation_example.ir")) as f:
+            ir = json.load(f)
+        program = IRProgram.from_dict(ir)
+        self.assertEqual(program.to_dict(), ir)
+        self.assertEqual(json.dumps(program.to_dict()), json.dumps(ir))
+        with open(os.path.join(examples_dir, "reverse_compiled_example.ll")) as f:
+            ir = parse_ladder_ir(f)
+        self.assertEqual(IRProgram.from_dict(ir).to_dict(), ir)
+
+    def test_round_trip_preserves_extra_keys(self):
+        """Ensure unknown keys, missing args and key order survive conversion."""
+        ir = {
+            "format": "slot-based",
+            "timestamp": 42,
+            "instructions": [{"args": ["A"], "type": "AND"}, {"type": "CUSTOM_OP", "rung": 3}],
+            "timers": {"T1": {"duration": "5S", "type": "TON", "slot": "slot9"}},
+            "jump_instructions": {"L1": {"jump_type": "JMP"}}
+        }
+        self.assertEqual(json.dumps(IRProgram.from_dict(ir).to_dict()), json.dumps(ir))
+
+    def test_interned_opcodes_and_symbols(self):
+        """Ensure opcodes are small ints and tag names are shared symbol ids."""
+        program = IRProgram.from_dict({"instructions": [
+            {"type": "LD", "args": ["X1"]},
+            {"type": "AND", "args": ["X2"]},
+            {"type": "ST", "args": ["X1"]}
+        ]})
+        self.assertEqual(list(program.opcodes), [Opcode.LD, Opcode.AND, Opcode.ST])
+        self.assertEqual(program.arg_ids(0), program.arg_ids(2))
+        self.assertEqual(len(program.symbols), 2)
+        self.assertEqual(opcode_name(opcode_for("VENDOR_OP")), "VENDOR_OP")
+        self.assertEqual(opcode_for("VENDOR_OP"), opcode_for("VENDOR_OP"))
+
+    def test_section_entries_are_typed(self):
+        """Ensure timers become slot-based entries."""
+        program = IRProgram.from_dict({"timers": {"T1": {"type": "TOF", "duration": "500"}}})
+        timer = program.sections["timers"]["T1"]
+        self.assertIsInstance(timer, Timer)
+        self.assertEqual((timer.kind, timer.duration), ("TOF", "500"))
+        self.assertFalse(hasattr(timer, "__dict__"))
+
+    def test_compact_footprint(self):
+        """Ensure the instruction columns stay within a few bytes per instruction."""
+        source = "\n".join(f"LD X{i}\nAND X{i + 1}\nST Y{i}" for i in range(1000))
+        program = IRProgram.from_dict(parse_ladder_ir(source))
+        self.assertEqual(len(program), 3000)
+        self.assertLess(program.nbytes() / len(program), 16)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import unittest
+from src.ll_parser import parse_ladder_logic, parse_ladder_ir, iter_ladder_rungs, rung_starts, LadderLogicParser
+
+basic_example_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../examples/basic_example.ll"))
+
+class TestLadderLogicParser(unittest.TestCase):
+
+    def test_legacy_json_output(self):
+        """Ensure parse_ladder_logic still returns the JSON IR string."""
+        ir = json.loads(parse_ladder_logic("INPUT X1\nAND X2\nOUTPUT Y1"))
+        self.assertEqual(ir["instructions"], [
+            {"type": "INPUT", "args": ["X1"]},
+            {"type": "AND", "args": ["X2"]},
+            {"type": "OUTPUT", "args": ["Y1"]}
+        ])
+        self.assertEqual(ir["scan_cycle"], ["INPUT", "AND", "OUTPUT"])
+
+    def test_basic_example_file(self):
+        """Ensure VAR blocks, comments and LD/ST forms are parsed from a file object."""
+        with open(basic_example_path, "r", encoding="utf-8") as f:
+            ir = parse_ladder_ir(f)
+        self.assertEqual([i["type"] for i in ir["instructions"]], ["LD", "AND", "ST"])
+        self.assertEqual(ir["variables"]["Y1"], {"type": "BOOL"})
+        self.assertEqual(ir["scan_cycle"], ["LD", "AND", "ST"])
+
+    def test_multiline_comments(self):
+        """Ensure comments spanning several lines are skipped."""
+        source = ["(* start", "LD IGNORED", "end *) LD X1", "ST Y1 // trailing"]
+        ir = parse_ladder_ir(source)
+        self.assertEqual(ir["instructions"], [
+            {"type": "LD", "args": ["X1"]},
+            {"type": "ST", "args": ["Y1"]}
+        ])
+
+    def test_timer_and_counter_calls(self):
+        """Ensure FB instance calls are mapped onto timers and counters by declared type."""
+        source = io.StringIO(
+            "VAR\n T1 : TON;\n C1 : CTU;\n A, B : BOOL := FALSE;\nEND_VAR\n"
+            "CAL T1(IN := A, PT := T#5S)\n"
+            "CAL C1(CU := B, PV := 10)\n"
+            "TON T2 (IN := B, PT := T#2S);\n"
+            "TOF T3 500\n"
+        )
+        ir = parse_ladder_ir(source)
+        self.assertEqual(ir["timers"]["T1"], {"type": "TON", "duration": "T#5S", "input": "A"})
+        self.assertEqual(ir["timers"]["T2"], {"type": "TON", "duration": "T#2S", "input": "B"})
+        self.assertEqual(ir["timers"]["T3"], {"type": "TOF", "duration": "500"})
+        self.assertEqual(ir["counters"]["C1"], {"type": "CTU", "preset": "10", "cu": "B"})
+        self.assertEqual(ir["variables"]["A"], {"type": "BOOL", "initial": "FALSE"})
+        ir = parse_ladder_ir("VAR\nT1 : TON;\nC1 : CTU;\nEND_VAR\nCAL T1(IN := A)\nCAL C1(CU := B)")
+        self.assertEqual(ir["timers"]["T1"], {"type": "TON", "duration": "T#0S", "input": "A"})
+        self.assertEqual(ir["counters"]["C1"], {"type": "CTU", "preset": "0", "cu": "B"})
+
+    def test_symbolic_comparators(self):
+        """Ensure one-argument symbolic comparators are stored under their IL names."""
+        ir = parse_ladder_ir("LD A\n> 5\nST X\nLD B\n== C\nST Y\nLD B\n!= 1\nST Z\nLD A\n< 2\nST W")
+        self.assertEqual([i["type"] for i in ir["instructions"][1::3]], ["GT", "EQ", "NE", "LT"])
+        self.assertEqual(ir["scan_cycle"][1], "GT")
+
+    def test_generator_mode_yields_rungs(self):
+        """Ensure rungs are yielded as soon as a new load follows a store."""
+        source = "LD X1\nAND X2\nST Y1\nST Y2\nLDN X3\nOR X4\nST Y3\nTON T1 100"
+        parser = LadderLogicParser()
+        rungs = list(iter_ladder_rungs(source, parser))
+        self.assertEqual(len(rungs), 2)
+        self.assertEqual([i["type"] for i in rungs[0]["instructions"]], ["LD", "AND", "ST", "ST"])
+        self.assertEqual(rungs[1]["start"], 4)
+        self.assertIn("T1", parser.ir["timers"])
+        types = [i["type"] for i in parser.ir["instructions"]]
+        self.assertEqual(rung_starts(types), [rung["start"] for rung in rungs])
+
+    def test_labels_and_jumps(self):
+        """Ensure labels and jumps keep their position in the stream and in jump_instructions."""
+        ir = parse_ladder_ir("LD X0\nJMPC SKIP\nLD X1\nST Y1\nSKIP: LD X2\nST Y2")
+        self.assertEqual(ir["jump_instructions"]["SKIP"], {"jump_type": "JMPC"})
+        variant = parse_ladder_ir("LD X1\nJMPC VARIANT_B\nST Y1\nVARIANT_B: LD X2\nST Y2\n")
+        self.assertEqual([i["type"] for i in variant["instructions"]], ["LD", "JMPC", "ST", "LBL", "LD", "ST"])
+        backward = parse_ladder_ir("TOP: LD X0\nJMPCN TOP\nEND: RET")
+        self.assertEqual(backward["jump_instructions"], {"TOP": {"jump_type": "JMPCN"}, "END": {"jump_type": "LBL"}})
+        self.assertEqual([i["type"] for i in ir["instructions"]], ["LD", "JMPC", "LD", "ST", "LBL", "LD", "ST"])
+        self.assertEqual(ir["instructions"][4], {"type": "LBL", "args": ["SKIP"]})
+        self.assertEqual(rung_starts([i["type"] for i in ir["instructions"]]), [0, 2, 4])
+
+if __name__ == "__main__":
+    unittest.main()
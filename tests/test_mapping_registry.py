@@ -0,0 +1,53 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.mapping_registry import MappingRegistry, MAPPINGS_DIR, MAPPING_SOURCES
+
+class TestMappingRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        for source in MAPPING_SOURCES:
+            shutil.copy(os.path.join(MAPPINGS_DIR, f"{source}.json"), self.tmpdir)
+        self.registry = MappingRegistry(self.tmpdir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_lazy_loading(self):
+        """Ensure nothing is read before the first lookup."""
+        self.assertIsNone(self.registry._raw)
+        self.assertIsNone(self.registry._indexes)
+        self.assertEqual(self.registry.ir_code("XIC"), "LL_XIC")
+
+    def test_forward_and_reverse_indexes(self):
+        """Ensure symbols resolve per source and IR codes resolve back to their origin."""
+        self.assertEqual(self.registry.ir_code("AND", "instruction_set"), "IR_AND")
+        self.assertEqual(self.registry.ir_code(">=", "structured_text"), "ST_GEQ")
+        self.assertEqual(self.registry.lookup_ir("LL_EQU"), ("ladder_logic", "comparison_operators", "EQU"))
+        self.assertIn(("structured_text", "timers"), self.registry.categories("TON"))
+        self.assertIsNone(self.registry.lookup_ir("UNKNOWN"))
+
+    def test_mtime_invalidation(self):
+        """Ensure edits to a mapping file are picked up on the next lookup."""
+        self.assertIsNone(self.registry.ir_code("NEW_OP", "instruction_set"))
+        path = os.path.join(self.tmpdir, "instruction_set.json")
+        with open(path, "r") as f:
+            data = json.load(f)
+        data["arithmetic"]["NEW_OP"] = {"ir_representation": "IR_NEW_OP"}
+        with open(path, "w") as f:
+            json.dump(data, f)
+        os.utime(path, ns=(0, 10 ** 9))
+        self.assertEqual(self.registry.ir_code("NEW_OP", "instruction_set"), "IR_NEW_OP")
+
+    def test_frozen_artifact(self):
+        """Ensure a frozen index is used on cold start without parsing the JSON files."""
+        self.registry.freeze()
+        cold = MappingRegistry(self.tmpdir)
+        self.assertEqual(cold.lookup_ir("ST_TON"), ("structured_text", "timers", "TON"))
+        self.assertIsNone(cold._raw)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src import merkle_anchor
+from src.merkle_anchor import ANCHOR_KEY, InclusionProof, anchor_batch, anchor_programs, leaf_hash, read_anchor
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+from src.reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll
+from src.validator_ir_transform import validate_ir_structure
+
+
+def make_ir(tag, **extra):
+    ir = {
+        "instructions": [{"type": "LD", "args": [tag]}, {"type": "ST", "args": ["Y1"]}],
+        "timers": {}, "counters": {}, "math_operations": {}, "comparators": {},
+        "set_reset_latches": {}, "jump_instructions": {}, "function_blocks": {},
+    }
+    ir.update(extra)
+    return ir
+
+
+class TestMerkleAnchor(unittest.TestCase):
+
+    def test_every_proof_verifies(self):
+        """Ensure each leaf's proof verifies for trees of every shape, and only for its own item."""
+        for size in range(1, 18):
+            items = [1700000000 + i for i in range(size)]
+            tree = anchor_batch(items)
+            for index, proof in enumerate(tree.proofs()):
+                self.assertTrue(proof.verify(items[index]))
+                self.assertFalse(proof.verify(items[index] + 1))
+                self.assertLessEqual(len(proof.path), (size - 1).bit_length())
+                decoded = InclusionProof.decode(proof.encode())
+                self.assertTrue(decoded.verify())
+                if proof.path:
+                    forged = InclusionProof(proof.root, index, size, proof.leaf, proof.path[:-1])
+                    self.assertFalse(forged.verify())
+
+    def test_leaf_encodings(self):
+        """Ensure leaves are independent of key order, distinguish kinds, and stream files in chunks."""
+        ir = make_ir("X1")
+        reordered = dict(reversed(list(ir.items())))
+        self.assertEqual(leaf_hash(ir), leaf_hash(reordered))
+        self.assertEqual(leaf_hash(ir), leaf_hash(dict(ir, **{ANCHOR_KEY: "ignored"})))
+        self.assertEqual(leaf_hash({"A": 1, "B": 0}), leaf_hash({"B": 0, "A": 1}))
+        self.assertNotEqual(leaf_hash("42"), leaf_hash(b"42"))
+        self.assertEqual(leaf_hash(42), leaf_hash("42"))
+
+        data = os.urandom(3 * merkle_anchor.CHUNK_SIZE + 17)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "state.bin"
+            path.write_bytes(data)
+            self.assertEqual(leaf_hash(path), leaf_hash(data))
+        self.assertEqual(leaf_hash(io.BytesIO(data)), leaf_hash(data))
+        with self.assertRaises(TypeError):
+            leaf_hash(1.5)
+
+    def test_parallel_hashing_matches_serial(self):
+        """Ensure the process pool returns the same leaves, in order."""
+        items = [make_ir(f"X{i}") for i in range(40)] + [{"Y1": i} for i in range(40)] + [io.BytesIO(b"raw")]
+        serial = merkle_anchor.hash_leaves(items, jobs=1)
+        items[-1].seek(0)
+        with mock.patch.object(merkle_anchor, "PARALLEL_THRESHOLD", 8):
+            self.assertEqual(merkle_anchor.hash_leaves(items, jobs=2), serial)
+
+    def test_compiled_scripts_carry_the_root(self):
+        """Ensure anchored programs compile with the root and proof, which reverse compile and verify."""
+        programs = [make_ir(f"X{i}", format="verifiable", timestamp=100 + i) for i in range(5)]
+        root, anchored = anchor_programs(programs)
+        for program in anchored:
+            self.assertTrue(validate_ir_structure(program)[0])
+            script = compile_ir_to_plutus_haskell_enhanced(program)
+            self.assertIn(f"-- Merkle Root: {root.hex()}", script)
+            self.assertNotIn("Verifiable Hash", script)
+            ladder_logic = reverse_compile_plutus_to_ll(script)
+            proof = read_anchor(ladder_logic)
+            self.assertEqual(proof.root, root)
+            self.assertTrue(proof.verify(program))
+            self.assertFalse(proof.verify(make_ir("X9")))
+        self.assertIsNone(read_anchor(compile_ir_to_plutus_haskell_enhanced(programs[0])))
+
+    def test_malformed_proofs_are_rejected(self):
+        """Ensure a malformed anchor fails validation and compilation."""
+        ir = make_ir("X1", **{ANCHOR_KEY: "not-a-proof"})
+        valid, message = validate_ir_structure(ir)
+        self.assertFalse(valid)
+        self.assertIn("merkle_anchor", message)
+        with self.assertRaises(ValueError):
+            compile_ir_to_plutus_haskell_enhanced(ir)
+        with self.assertRaises(ValueError):
+            InclusionProof.decode("00" * 32 + " 3/3 " + "11" * 32 + " -")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.ll_parser import parse_ladder_ir
+from src.pipeline import Pipeline
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+from src.reverse_compiler import reverse_compile, reverse_compile_plutus_to_ll
+from src.validator_ir_transform import InvalidIRError
+
+ladder_logic = "INPUT X1\nAND X2\nOUTPUT Y1\nLD X3\nOR X1\nST Y2"
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_matches_individual_stages(self):
+        """Ensure every stage produces what the standalone entry points do."""
+        ir = parse_ladder_ir(ladder_logic)
+        for optimize in (False, True):
+            stages = ["parse", "validate"] + (["optimize"] if optimize else []) + ["compile", "reverse"]
+            artifact = Pipeline(stages).run(ladder_logic, "demo").check()
+            self.assertEqual(artifact.status, "ok")
+            self.assertEqual(artifact.ir, ir)
+            self.assertEqual(artifact.script, compile_ir_to_plutus_haskell_enhanced(ir, optimize=optimize))
+            self.assertEqual(artifact.reverse.ladder_logic, reverse_compile_plutus_to_ll(artifact.script))
+            self.assertEqual(set(artifact.timings), set(stages))
+        self.assertIsNotNone(artifact.optimized)
+
+    def test_sources_and_outputs(self):
+        """Ensure IR dicts, JSON, Structured Text and Plutus sources enter at the right stage."""
+        ir = parse_ladder_ir(ladder_logic)
+        pipeline = Pipeline(["parse", "validate", "compile", "uplc", "reverse"])
+        from_dict = pipeline.run(ir)
+        self.assertIs(from_dict.ir, ir)
+        self.assertEqual(set(from_dict.outputs()), {".plutus", ".uplc", ".reversed.ll"})
+        from_json = pipeline.run(io.StringIO(json.dumps(ir)), language="ir")
+        self.assertEqual(from_json.script, from_dict.script)
+        structured = pipeline.run("PROGRAM Main\nVAR A : BOOL; B : BOOL; END_VAR\nB := A;\nEND_PROGRAM", language="st")
+        self.assertEqual(structured.status, "ok")
+        self.assertIn(".ir", structured.outputs())
+        reversed_only = pipeline.run(from_dict.script, language="plutus")
+        self.assertIsNone(reversed_only.ir)
+        self.assertEqual(set(reversed_only.outputs()), {".reversed.ll"})
+
+    def test_failures_stop_the_artifact(self):
+        """Ensure invalid IR and stage errors stop that source only and name the failing stage."""
+        def explode(artifact, pipeline):
+            raise ValueError("boom")
+
+        pipeline = Pipeline(["parse", "validate", ("explode", explode), "compile"])
+        invalid, failed = pipeline.run_many([{"instructions": "not a list"}, ladder_logic])
+        self.assertEqual((invalid.status, invalid.failed_stage), ("invalid", "validate"))
+        self.assertIsInstance(invalid.error, InvalidIRError)
+        self.assertTrue(invalid.issues)
+        self.assertEqual((failed.status, failed.failed_stage, str(failed.error)), ("error", "explode", "boom"))
+        self.assertIsNone(failed.script)
+        with self.assertRaises(ValueError):
+            failed.check()
+        # Unvalidated IR of the wrong shape fails its own stage, not the batch
+        broken, fine = Pipeline(["parse", "compile"]).run_many([{"instructions": [], "timers": []}, ladder_logic])
+        self.assertEqual((broken.status, broken.failed_stage), ("error", "compile"))
+        self.assertIsInstance(broken.error, AttributeError)
+        self.assertEqual(fine.status, "ok")
+        self.assertIsNotNone(fine.script)
+
+    def test_custom_stages_and_configuration(self):
+        """Ensure plug-in stages see the in-memory IR and stage lists are checked."""
+        seen = []
+        pipeline = Pipeline(["parse", ("count", lambda artifact, pipeline: seen.append(len(artifact.ir["instructions"])))])
+        self.assertEqual(pipeline.stage_names(), ["parse", "count"])
+        pipeline.run(ladder_logic)
+        self.assertEqual(seen, [6])
+        with self.assertRaises(ValueError):
+            Pipeline(["parse", "link"])
+        with self.assertRaises(ValueError):
+            Pipeline(["parse", "parse"])
+
+    def test_run_many_shares_the_cache(self):
+        """Ensure identical programs in one batch compile once."""
+        pipeline = Pipeline()
+        artifacts = pipeline.run_many({"a": ladder_logic, "b": ladder_logic, "c": "LD Z\nST W"})
+        self.assertEqual([artifact.name for artifact in artifacts], ["a", "b", "c"])
+        self.assertEqual(artifacts[0].script, artifacts[1].script)
+        self.assertEqual((pipeline.cache.hits, pipeline.cache.misses), (1, 2))
+
+    def test_run_files(self):
+        """Ensure files are read by extension and unknown extensions are rejected."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "line.ll")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(ladder_logic)
+            artifact, = Pipeline().run_files([path])
+            self.assertEqual((artifact.name, artifact.status), (path, "ok"))
+            with self.assertRaises(ValueError):
+                Pipeline().run_files([os.path.join(directory, "line.txt")])
+
+    def test_reverse_result(self):
+        """Ensure the structured reverse compilation carries the extracted lists."""
+        result = reverse_compile('traceIfFalse "Condition 1 failed" (X1 && X2)\nJMP LABEL1')
+        self.assertEqual(result.ladder_logic, reverse_compile_plutus_to_ll('traceIfFalse "Condition 1 failed" (X1 && X2)\nJMP LABEL1'))
+        self.assertTrue(result.conditions)
+        self.assertEqual(result.control_flow, ["JMP LABEL1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import plutus_emitter
+from src.plutus_emitter import emit_plutus_haskell
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+IR = {
+    "instructions": [
+        {"type": "LD", "args": ["X1"]},
+        {"type": "AND", "args": ["X2", "X3"]},
+        {"type": "OR", "args": ["X4", "X5"]},
+    ],
+    "format": "slot-based",
+    "timestamp": 42,
+    "anchoring": "immediate",
+    "timers": {"T1": {"type": "TOF", "duration": "500"}},
+    "counters": {"C1": {"type": "CTD", "preset": "3"}},
+}
+
+# Output of the string-concatenating compiler this emitter replaced
+EXPECTED = (
+    'traceIfFalse "Condition 0 failed: ld" (X1)\n'
+    'traceIfFalse "Condition 1 failed: and" (X2 && X3)\n'
+    'traceIfFalse "Condition 2 failed: or" (X4 || X5)\n'
+    'mustValidateIn (from slot42)\n'
+    'traceIfFalse "Timer T1 off delay expired" (T1 <= 500)\n'
+    'traceIfFalse "Counter C1 decreased below preset" (C1 <= 3)\n'
+    '{-# INLINABLE validate #-}\n'
+    'validate :: BuiltinData -> BuiltinData -> ScriptContext -> Bool\n'
+    'validate _ _ ctx =\n'
+    '    let txInfo = scriptContextTxInfo ctx\n'
+    '    in     traceIfFalse "Condition 0 failed: ld" (X1) &&\n'
+    '    traceIfFalse "Condition 1 failed: and" (X2 && X3) &&\n'
+    '    traceIfFalse "Condition 2 failed: or" (X4 && X5)\n'
+    '\n'
+    'script :: PlutusScript\n'
+    'script = mkValidatorScript $$(PlutusTx.compile [|| validate ||])\n'
+)
+
+class TestPlutusEmitter(unittest.TestCase):
+
+    def emit(self, ir_data, **kwargs):
+        stream = io.StringIO()
+        emit_plutus_haskell(ir_data, stream, **kwargs)
+        return stream.getvalue()
+
+    def test_matches_reference_output(self):
+        """Ensure the emitter reproduces the previous compiler output byte for byte."""
+        self.assertEqual(self.emit(IR), EXPECTED)
+        self.assertEqual(compile_ir_to_plutus_haskell_enhanced(IR), EXPECTED)
+
+    def test_chunked_output_is_identical(self):
+        """Ensure chunk boundaries and spool rollover do not change the output."""
+        ir_data = {"instructions": [{"type": "AND", "args": [f"X{i}", f"Y{i}"]} for i in range(50)]}
+        expected = self.emit(ir_data)
+        with mock.patch.object(plutus_emitter, "CHUNK_SIZE", 7), mock.patch.object(plutus_emitter, "SPOOL_SIZE", 64):
+            self.assertEqual(self.emit(ir_data), expected)
+
+    def test_writes_to_file(self):
+        """Ensure the script can be streamed straight into a file handle."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.plutus")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                emit_plutus_haskell(IR, f)
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                self.assertEqual(f.read(), EXPECTED)
+
+    def test_duplicate_time_constraint(self):
+        """Ensure immediate anchoring on the slot-based timestamp is emitted once."""
+        self.assertEqual(self.emit(IR).count("mustValidateIn (from slot42)"), 1)
+
+    def test_empty_program_writes_nothing(self):
+        """Ensure an IR without logic raises before anything reaches the stream."""
+        stream = io.StringIO()
+        with self.assertRaises(ValueError):
+            emit_plutus_haskell({"instructions": []}, stream)
+        self.assertEqual(stream.getvalue(), "")
+
+    def test_optimized_output(self):
+        """Ensure the optimizing path emits rung conditions instead of per-instruction trace lines."""
+        script = self.emit(IR, optimize=True)
+        self.assertTrue(script.startswith("mustValidateIn (from slot42)\n"))
+        self.assertIn('traceIfFalse "Rung 0 failed"', script)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from src.ll_parser import parse_ladder_ir
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+from src.program_generator import generate_ir, generate_ladder
+from src.validator_ir_transform import validate_ir
+
+class TestProgramGenerator(unittest.TestCase):
+
+    def test_seeded_and_deterministic(self):
+        """Ensure the same seed gives the same program and another seed a different one."""
+        self.assertEqual(generate_ladder(500, seed=3), generate_ladder(500, seed=3))
+        self.assertNotEqual(generate_ladder(500, seed=3), generate_ladder(500, seed=4))
+
+    def test_exact_instruction_count(self):
+        """Ensure the IR has exactly the requested number of instructions."""
+        for size in (1, 2, 7, 12, 13, 100, 2500):
+            for seed in range(3):
+                self.assertEqual(len(generate_ir(size, seed)["instructions"]), size, (size, seed))
+
+    def test_covers_every_construct(self):
+        """Ensure rungs, nested logic, timers, counters, math, comparators and jumps all appear."""
+        ir = generate_ir(2000, seed=1)
+        types = {instr["type"] for instr in ir["instructions"]}
+        self.assertTrue({"LD", "ST", "AND", "OR", "XOR", "LBL"} <= types)
+        self.assertTrue(types & {"JMPC", "JMPCN"})
+        self.assertTrue(types & {"ADD", "SUB", "MUL", "DIV", "MOD"})
+        self.assertTrue(types & {"GT", "GE", "LT", "LE", "EQ", "NE"})
+        self.assertEqual({timer["type"] for timer in ir["timers"].values()}, {"TON", "TOF", "TP"})
+        self.assertEqual({counter["type"] for counter in ir["counters"].values()}, {"CTU", "CTD"})
+        self.assertTrue(ir["math_operations"])
+        self.assertTrue(ir["comparators"])
+
+    def test_programs_validate_and_compile(self):
+        """Ensure generated programs pass validation and compile."""
+        for seed in range(5):
+            source = generate_ladder(1000, seed)
+            ir = parse_ladder_ir(source)
+            self.assertEqual(validate_ir(ir), [])
+            self.assertIn("validate _ _ ctx", compile_ir_to_plutus_haskell_enhanced(ir))
+
+if __name__ == "__main__":
+    unittest.main()
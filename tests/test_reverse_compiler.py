@@ -1,5 +1,5 @@
 import unittest
-from src.reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll
+from src.reverse_compiler.reverse_compiler import reverse_compile_plutus_to_ll, parse_plutus_script
 
 class TestReverseCompiler(unittest.TestCase):
     
@@ -65,5 +65,51 @@ class TestReverseCompiler(unittest.TestCase):
 
         self.assertEqual(reverse_compile_plutus_to_ll(plutus_script), expected_output)
 
+    def test_nested_conditions(self):
+        """
+        Test that nested parentheses are kept intact in extracted conditions.
+        """
+        plutus_script = 'traceIfFalse "Condition 1 failed" ((X1 && X2) || (Y1 && (Z1 || Z2)))'
+
+        expected_output = (
+            "No Ladder Logic Generated\n"
+            "Condition 1 failed: (X1 && X2) || (Y1 && (Z1 || Z2))"
+        )
+
+        self.assertEqual(reverse_compile_plutus_to_ll(plutus_script), expected_output)
+
+    def test_joined_multiline_conditions(self):
+        """
+        Test the `&&`-joined validator body emitted by the forward compiler,
+        including a condition that spans two lines.
+        """
+        plutus_script = '''
+    let txInfo = scriptContextTxInfo ctx
+    in     traceIfFalse "Condition 0 failed: input" (X1) &&
+    traceIfFalse "Condition 1 failed: and" (X1 &&
+        X2) && traceIfFalse "Condition 2 failed: or" (Y1 || Y2)
+        '''
+        _, conditions, _, _, _, _ = parse_plutus_script(plutus_script)
+
+        self.assertEqual(conditions, [
+            ("Condition 0 failed: input", "X1"),
+            ("Condition 1 failed: and", "X1 && X2"),
+            ("Condition 2 failed: or", "Y1 || Y2"),
+        ])
+
+    def test_anchoring_detected_once(self):
+        """
+        Test that only the first slot anchor and hash are reverse compiled.
+        """
+        plutus_script = '''
+        mustValidateIn (from slot55)
+        -- Verifiable Hash: abc123
+        mustValidateIn (from slot12) -- Timer T1 enforced
+        '''
+        ladder_logic, conditions, _, _, _, _ = parse_plutus_script(plutus_script)
+
+        self.assertEqual(ladder_logic, "TON TimerX, 55ms\n// Verifiable Hash: abc123")
+        self.assertEqual(conditions, [])
+
 if __name__ == "__main__":
     unittest.main()
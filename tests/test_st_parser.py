@@ -0,0 +1,99 @@
+import unittest
+from src.st_parser import parse_structured_text, tokenize, STSyntaxError
+from src.fast_interpreter import FastInterpreter
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+
+class TestStructuredTextParser(unittest.TestCase):
+
+    def test_example_program(self):
+        """Ensure the bundled ST example produces the same IR shape as its IL equivalent."""
+        with open("examples/structured_text_example.st", "r", encoding="utf-8") as f:
+            ir = parse_structured_text(f)
+        self.assertEqual(ir["instructions"], [
+            {"type": "LD", "args": ["A"]},
+            {"type": "AND", "args": ["B"]},
+            {"type": "ST", "args": ["C"]}
+        ])
+        self.assertEqual(ir["timers"], {"Timer1": {"type": "TON", "duration": "T#5S", "input": "C"}})
+        self.assertEqual(ir["variables"]["A"], {"type": "BOOL", "initial": "FALSE"})
+        self.assertIn('traceIfFalse "Condition 1 failed: and" (B)', compile_ir_to_plutus_haskell_enhanced(ir))
+
+    def test_lexer_uses_mapping_operators(self):
+        """Ensure multi-character operators, literals and comments tokenize in one pass."""
+        kinds = [(kind, text) for kind, text, _ in tokenize("X:=A<=16#1F(* c *)//d\nOR T#1s;")]
+        self.assertEqual(kinds, [
+            ("NAME", "X"), ("OP", ":="), ("NAME", "A"), ("OP", "<="), ("NUMBER", "16#1F"),
+            ("NAME", "OR"), ("TIME", "T#1s"), ("OP", ";")
+        ])
+
+    def test_precedence(self):
+        """Ensure expressions follow IEC operator precedence."""
+        ir = parse_structured_text("Y := A OR B AND NOT C; Z := 2 + 3 * -Level ** 2 MOD 4 > 1;")
+        plc = FastInterpreter(ir)
+        plc["A"], plc["B"], plc["C"] = 0, 1, 1
+        plc.scan()
+        self.assertEqual(plc["Y"], 0)
+        types = [instr["type"] for instr in ir["instructions"]]
+        self.assertNotIn("EXPT", types)
+        self.assertLess(types.index("MUL"), types.index("MOD"))
+        self.assertLess(types.index("MOD"), types.index("ADD"))
+        self.assertEqual(types[-2:], ["GT", "ST"])
+
+    def test_if_elsif_else(self):
+        """Ensure IF chains run exactly one branch per scan."""
+        ir = parse_structured_text("""
+            VAR Level : INT; Mode : INT; Alarm : BOOL; END_VAR
+            IF Level > 10 THEN
+                Mode := 2; Alarm := TRUE;
+            ELSIF Level > 3 THEN
+                Mode := Level * 2 + 1;
+                IF Level = 5 THEN Alarm := FALSE; END_IF;
+            ELSE
+                Mode := 0;
+            END_IF;
+        """)
+        plc = FastInterpreter(ir)
+        for level, mode, alarm in ((11, 2, 1), (4, 9, 1), (5, 11, 0), (1, 0, 0)):
+            plc["Level"] = level
+            plc.scan()
+            self.assertEqual((plc["Mode"], plc["Alarm"]), (mode, alarm), f"Level {level}")
+
+    def test_function_blocks(self):
+        """Ensure timer and counter calls map inputs, presets and outputs."""
+        ir = parse_structured_text("""
+            VAR T1 : TON; C1 : CTU; T2 : TOF; C2 : CTD; END_VAR
+            T1(IN := Start AND Enable, PT := T#20ms, Q => Done);
+            C1(CU := Done, R := Reset, PV := 3);
+            T2(IN := Done); C2(CD := Done);
+        """)
+        self.assertEqual(ir["timers"]["T1"], {"type": "TON", "duration": "T#20ms"})
+        self.assertEqual(ir["counters"]["C1"], {"type": "CTU", "preset": "3", "cu": "Done", "r": "Reset"})
+        self.assertEqual(ir["timers"]["T2"], {"type": "TOF", "duration": "T#0S", "input": "Done"})
+        self.assertEqual(ir["counters"]["C2"], {"type": "CTD", "preset": "0", "cd": "Done"})
+        plc = FastInterpreter(ir, scan_time_ms=10)
+        plc["Start"], plc["Enable"] = 1, 1
+        plc.scan(3)
+        self.assertEqual(plc["Done"], 1)
+
+    def test_syntax_errors(self):
+        """Ensure malformed or unsupported statements report their position."""
+        for source, line in (("X := 1;\nY := (A AND;", 2), ("X := 1;\n\nFOR i := 1 TO 3 DO", 3),
+                             ("X := FOO(1);", 1), ("(* open", 1), ("X := 1", 1)):
+            with self.assertRaises(STSyntaxError) as raised:
+                parse_structured_text(source)
+            self.assertEqual(raised.exception.line, line, source)
+
+    def test_functions_run_in_the_simulator(self):
+        """Ensure powers and supported functions simulate correctly and unrunnable functions are rejected."""
+        ir = parse_structured_text("VAR Variance : INT; END_VAR\nVariance := 5;\n"
+                                   "P := A ** 3; Q := EXPT(A + 1, 2); R := MOD(A, 2); S := MOVE(A); O := A ** 0;")
+        plc = FastInterpreter(ir)
+        plc["A"] = 3
+        plc.scan()
+        self.assertEqual([plc[tag] for tag in ("Variance", "P", "Q", "R", "S", "O")], [5, 27, 16, 1, 3, 1])
+        for source in ("B := MAX(A, 10);", "B := ABS(A);", "B := A ** N;", "B := A ** -1;"):
+            with self.assertRaises(STSyntaxError):
+                parse_structured_text(source)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import unittest
+from src.plutus_emitter import emit_plutus_haskell
+from src.reverse_compiler.reverse_compiler import parse_plutus_script
+from src.time_constraints import UnsatisfiableTimeConstraints, analyze_time_constraints, parse_slot
+
+
+def program(**sections):
+    ir = {"instructions": [{"type": "LD", "args": ["X1"]}]}
+    ir.update(sections)
+    return ir
+
+
+def validity_lines(ir):
+    stream = io.StringIO()
+    emit_plutus_haskell(ir, stream)
+    return [line for line in stream.getvalue().splitlines() if "mustValidateIn" in line]
+
+
+class TestTimeConstraints(unittest.TestCase):
+
+    def test_parse_slot(self):
+        """Ensure absolute and symbolic slot references parse, and malformed ones are rejected."""
+        for value in (42, "42", "slot42", " slot42 "):
+            bound = parse_slot(value, "test")
+            self.assertEqual((bound.base, bound.offset), (None, 42))
+        self.assertEqual(parse_slot("slotX", "test").render(), "slotX")
+        for value in (-1, "slot-3", "5 slots", None, True):
+            with self.assertRaises(ValueError):
+                parse_slot(value, "test")
+
+    def test_durations_are_normalized(self):
+        """Ensure IEC duration spellings normalize to the same milliseconds and slot offset."""
+        for duration in ("5000", "5S", "T#5S", "T#5000ms"):
+            analysis = analyze_time_constraints(program(timers={"T1": {"type": "TON", "duration": duration, "slot": 100}}))
+            self.assertEqual(analysis.durations_ms, {"T1": 5000})
+            self.assertEqual(analysis.range(), "from slot105")
+        analysis = analyze_time_constraints(program(timers={"T1": {"type": "TON", "duration": "1500", "slot": 100}}))
+        self.assertEqual(analysis.range(), "from slot102")
+        with self.assertRaises(ValueError):
+            analyze_time_constraints(program(timers={"T1": {"type": "TON", "duration": "soon"}}))
+
+    def test_constraints_merge_into_one_range(self):
+        """Ensure anchoring, format and timer constraints emit a single intersected validity range."""
+        ir = program(
+            format="verifiable", timestamp=42, anchoring="immediate",
+            timers={"T1": {"type": "TON", "duration": "T#5S", "slot": "slot40"},
+                    "T2": {"type": "TON", "duration": "60S", "slot": "slot10"},
+                    "T3": {"type": "TOF", "duration": "2M", "slot": "slot30"},
+                    "T4": {"type": "TOF", "duration": "5M", "slot": "slot30"},
+                    "T5": {"type": "TP", "duration": "1S", "slot": "slot900"}},
+        )
+        analysis = analyze_time_constraints(ir)
+        self.assertEqual(analysis.constraints, 6)
+        self.assertEqual(analysis.range(), "interval slot70 slot150")
+        self.assertEqual(validity_lines(ir), ["mustValidateIn (interval slot70 slot150)"])
+
+    def test_symbolic_slots_fold_per_symbol(self):
+        """Ensure timers on the same symbolic slot keep only the tightest bound."""
+        ir = program(format="slot-based", timestamp=640,
+                     timers={"T1": {"type": "TON", "duration": "2S"}, "T2": {"type": "TON", "duration": "9S"},
+                             "T3": {"type": "TON", "duration": "1S", "slot": "start"}})
+        self.assertEqual(validity_lines(ir), ["mustValidateIn (from (max slot640 (max (slotX + 9) (start + 1))))"])
+        plutus = io.StringIO()
+        emit_plutus_haskell(ir, plutus)
+        self.assertIn("TON TimerX, 640ms", parse_plutus_script(plutus.getvalue()))
+
+    def test_unsatisfiable_combinations_are_rejected(self):
+        """Ensure a lower bound past the upper bound fails compilation before anything is written."""
+        cases = [
+            program(format="slot-based", timestamp=500, timers={"T1": {"type": "TOF", "duration": "10S", "slot": 100}}),
+            program(timers={"T1": {"type": "TON", "duration": "30S", "slot": "slotX"},
+                            "T2": {"type": "TOF", "duration": "10S", "slot": "slotX"}}),
+        ]
+        for ir in cases:
+            stream = io.StringIO()
+            with self.assertRaises(UnsatisfiableTimeConstraints) as raised:
+                emit_plutus_haskell(ir, stream)
+            self.assertIn("timer", str(raised.exception))
+            self.assertEqual(stream.getvalue(), "")
+        # Bounds on different symbols cannot be compared at compile time
+        ir = program(timers={"T1": {"type": "TON", "duration": "30S", "slot": "a"},
+                             "T2": {"type": "TOF", "duration": "10S", "slot": "b"}})
+        self.assertEqual(validity_lines(ir), ["mustValidateIn (interval (a + 30) (b + 10))"])
+
+    def test_missing_timestamp_is_reported(self):
+        """Ensure anchoring without a timestamp raises a ValueError."""
+        with self.assertRaises(ValueError):
+            analyze_time_constraints(program(anchoring="immediate"))
+
+
+if __name__ == "__main__":
+    unittest.main()
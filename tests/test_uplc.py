@@ -0,0 +1,90 @@
+import unittest
+from src.uplc import (Apply, Builtin, Const, Constr, Delay, Error, Force, Lam, Program, UPLCError, Var, apply, builtin,
+                      cbor_bytes, cbor_unwrap, decode_flat, evaluate, load_script, resolve_names)
+
+# The widely used always-succeeds PlutusV1 script, double CBOR wrapped
+ALWAYS_SUCCEEDS = "4e4d01000033222220051200120011"
+
+
+class TestUPLC(unittest.TestCase):
+
+    def test_decodes_known_script(self):
+        """Ensure a published script decodes, pretty-prints and re-encodes byte for byte."""
+        program = load_script(ALWAYS_SUCCEEDS)
+        self.assertEqual(program.version, (1, 0, 0))
+        self.assertEqual(
+            program.pretty(),
+            "(program 1.0.0 [(lam v0 (lam v1 (lam v2 (lam v3 (lam v4 v0))))) (delay (lam v0 v0)) (lam v0 v0)])"
+        )
+        self.assertEqual(cbor_bytes(cbor_bytes(program.to_flat())).hex(), ALWAYS_SUCCEEDS)
+
+    def test_constant_encoding(self):
+        """Ensure constants encode with type tags, zigzag integers and chunked, aligned bytestrings."""
+        self.assertEqual(Program(Const("integer", 1)).to_flat().hex(), "010000480081")
+        for constant in (Const("integer", -70000), Const("integer", 2 ** 80), Const("bool", True),
+                         Const("unit", None), Const("string", "Condition 1 failed: and ✓"),
+                         Const("bytestring", bytes(range(256)) * 2)):
+            decoded = decode_flat(Program(constant).to_flat()).term
+            self.assertEqual((decoded.type, decoded.value), (constant.type, constant.value))
+
+    def test_named_variables_resolve_to_indices(self):
+        """Ensure named variables get de Bruijn indices and keep their names when printed."""
+        term = resolve_names(Lam("x", Lam("y", apply(builtin("addInteger"), Var("x"), Var("y")))))
+        self.assertEqual(term.body.body.function.argument.index, 2)
+        self.assertEqual(
+            Program(term).pretty(),
+            "(program 1.0.0 (lam x (lam y [(builtin addInteger) x y])))"
+        )
+        with self.assertRaises(ValueError):
+            resolve_names(Lam("x", Var("z")))
+
+    def test_round_trip_of_deep_terms(self):
+        """Ensure deeply nested terms encode, decode and print without hitting the recursion limit."""
+        body = Var("x0")
+        for depth in range(5000, 0, -1):
+            body = Apply(Lam(f"x{depth}", body), Force(Delay(Const("integer", depth))))
+        program = Program(Lam("x0", body))
+        flat = program.to_flat()
+        self.assertEqual(decode_flat(flat).to_flat(), flat)
+        self.assertTrue(decode_flat(flat).pretty().startswith("(program 1.0.0 (lam v0 [(lam v1"))
+        self.assertEqual(evaluate(program, 7)[0], 7)
+
+    def test_evaluate_builtins_and_trace(self):
+        """Ensure the evaluator applies forced builtins to Data arguments and collects traces."""
+        program = Program(resolve_names(Lam("d", apply(
+            builtin("trace"), Const("string", "reading"),
+            apply(builtin("unIData"), apply(builtin("headList"), apply(builtin("sndPair"),
+                                                                        apply(builtin("unConstrData"), Var("d")))))
+        ))))
+        value, logs, steps = evaluate(program, Constr(0, [42, b"x"]))
+        self.assertEqual((value, logs), (42, ["reading"]))
+        self.assertGreater(steps, 0)
+
+    def test_evaluation_errors(self):
+        """Ensure error terms, missing forces and ill-typed calls fail with the trace so far."""
+        failing = Program(apply(builtin("trace"), Const("string", "before"), Error()))
+        with self.assertRaises(UPLCError) as raised:
+            evaluate(failing)
+        self.assertEqual(raised.exception.logs, [])
+        traced = Program(Force(apply(builtin("trace"), Const("string", "before"), Delay(Error()))))
+        with self.assertRaises(UPLCError) as raised:
+            evaluate(traced)
+        self.assertEqual(raised.exception.logs, ["before"])
+        with self.assertRaises(UPLCError):
+            evaluate(Program(apply(Force(Force(Builtin("headList"))), Const("integer", 1))))
+        with self.assertRaises(UPLCError):
+            evaluate(Program(apply(builtin("addInteger"), Const("integer", 1), Const("bool", True))))
+
+    def test_malformed_input(self):
+        """Ensure truncated flat bytes and non-bytestring CBOR are rejected."""
+        flat = Program(Const("integer", 1)).to_flat()
+        with self.assertRaises(ValueError):
+            decode_flat(flat[:-1])
+        with self.assertRaises(ValueError):
+            decode_flat(flat + b"\x00")
+        with self.assertRaises(ValueError):
+            cbor_unwrap(b"\x01\x02")
+
+
+if __name__ == "__main__":
+    unittest.main()
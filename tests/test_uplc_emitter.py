@@ -0,0 +1,131 @@
+import json
+import random
+import unittest
+from src.ir_cfg import build_cfg, is_control
+from src.plutusladder_compiler import compile_ir_to_uplc
+from src.program_generator import generate_ir
+from src.scan_semantics import parse_literal
+from src.uplc import Constr, DataMap, UPLCError, evaluate, load_script
+from src.uplc_emitter import lower_ir_to_uplc
+
+ir_data = {
+    "instructions": [
+        {"type": "LD", "args": ["X1"]},
+        {"type": "AND", "args": ["X2", "TRUE"]},
+        {"type": "ST", "args": ["Y1"]}
+    ],
+    "timers": {
+        "T1": {"type": "TON", "duration": "5S", "slot": 100},
+        "T2": {"type": "TOF", "duration": "T#2S", "slot": 200}
+    },
+    "counters": {"C1": {"type": "CTU", "preset": "3"}, "C2": {"type": "CTD", "preset": "1"}}
+}
+passing = {"X1": 1, "X2": 1, "Y1": 1, "T2": 2000, "C1": 3, "C2": 0}
+
+
+def context(lower=None, upper=None):
+    """
+    Returns a PlutusV2 ScriptContext whose valid range has the given POSIX bounds (None for infinite).
+    """
+    def bound(time, infinity):
+        extended = Constr(1, [time]) if time is not None else Constr(infinity, [])
+        return Constr(0, [extended, Constr(1, [])])
+    valid_range = Constr(0, [bound(lower, 0), bound(upper, 2)])
+    tx_info = Constr(0, [[], [], [], 0, 0, [], DataMap([]), valid_range, [], DataMap([]), DataMap([]), b"\x00" * 32])
+    return Constr(0, [tx_info, Constr(1, [b"\x00" * 32])])
+
+
+def run(script, values, ctx):
+    """
+    Returns the trace of a failing validation, or None when the script succeeds.
+    """
+    try:
+        evaluate(script.program, 0, script.redeemer(values), ctx)
+    except UPLCError as e:
+        return e.logs
+    return None
+
+
+class TestUPLCEmitter(unittest.TestCase):
+
+    def test_validator_checks(self):
+        """Ensure conditions, timers, counters and the validity interval decide validation with Haskell's messages."""
+        script = lower_ir_to_uplc(ir_data)
+        self.assertEqual(script.tags, ["X1", "X2", "Y1", "T2", "C1", "C2"])
+        ctx = context(105000, 202000)
+        self.assertIsNone(run(script, passing, ctx))
+        self.assertEqual(run(script, dict(passing, X2=0), ctx), ["Condition 1 failed: and"])
+        self.assertEqual(run(script, dict(passing, T2=2001), ctx), ["Timer T2 off delay expired"])
+        self.assertEqual(run(script, dict(passing, C1=2), ctx), ["Counter C1 exceeded"])
+        self.assertEqual(run(script, dict(passing, C2=2), ctx), ["Counter C2 decreased below preset"])
+        for ctx in (context(104999, 202000), context(105000, 202001), context(None, 202000), context(105000)):
+            self.assertEqual(run(script, passing, ctx), ["Validity interval failed"])
+
+    def test_script_envelope(self):
+        """Ensure the text envelope wraps the flat program twice and decodes back to the same script."""
+        script = compile_ir_to_uplc(ir_data)
+        envelope = script.envelope()
+        self.assertEqual(envelope["type"], "PlutusScriptV2")
+        self.assertEqual(load_script(json.dumps(envelope)).to_flat(), script.flat)
+        self.assertTrue(envelope["cborHex"].endswith(script.flat.hex()))
+        self.assertEqual(len(script.script_hash()), 56)
+        self.assertEqual(script.redeemer_json({"X1": 1})["list"][:2], [{"int": 1}, {"int": 0}])
+        self.assertTrue(script.pretty().startswith("(program 1.0.0 (lam datum (lam redeemer (lam ctx"))
+        self.assertEqual(compile_ir_to_uplc(ir_data).flat, script.flat)
+
+    def test_symbolic_slots(self):
+        """Ensure symbolic slots need values and slots are anchored to POSIX time."""
+        ir = {"instructions": [{"type": "LD", "args": ["A"]}], "timers": {"T1": {"type": "TON", "duration": "3000"}}}
+        with self.assertRaises(ValueError):
+            lower_ir_to_uplc(ir)
+        script = lower_ir_to_uplc(ir, slots={"slotX": 10}, slot_zero_ms=1_000_000)
+        self.assertIsNone(run(script, {"A": 1}, context(1_013_000)))
+        self.assertEqual(run(script, {"A": 1}, context(1_012_999)), ["Validity interval failed"])
+
+    def test_invalid_input(self):
+        """Ensure IR without logic, with bad presets or unsatisfiable constraints is rejected."""
+        for ir in ({}, {"instructions": []},
+                   {"instructions": [], "counters": {"C1": {"type": "CTU", "preset": "PV"}}},
+                   {"instructions": [], "timers": {"T1": {"type": "TON", "duration": "9S", "slot": 0},
+                                                   "T2": {"type": "TOF", "duration": "1S", "slot": 0}}}):
+            with self.assertRaises(ValueError):
+                lower_ir_to_uplc(ir)
+
+    def test_matches_condition_semantics(self):
+        """Ensure generated programs validate exactly when every live condition holds, tracing the first failure."""
+        for seed in range(3):
+            ir = generate_ir(300, seed)
+            for timer in ir.get("timers", {}).values():
+                timer.pop("slot", None)
+            ir["timers"] = {name: timer for name, timer in ir.get("timers", {}).items() if timer["type"] != "TON"}
+            script = lower_ir_to_uplc(ir)
+            rng = random.Random(seed)
+            conditions = [
+                (i, instr) for i, instr in build_cfg(ir["instructions"]).live_instructions()
+                if not is_control(instr["type"])
+            ]
+            outcomes = set()
+            for _ in range(20):
+                values = {tag: 1 for tag in script.tags}
+                if rng.random() < 0.8:
+                    values[rng.choice(script.tags)] = 0
+                # Timers and counters are checked after the conditions; keep them passing
+                values.update({name: 0 for name in ir.get("timers", {})})
+                for name, counter in ir.get("counters", {}).items():
+                    values[name] = int(counter["preset"])
+                expected = None
+                for i, instr in conditions:
+                    holds = all(
+                        (parse_literal(arg) if parse_literal(arg) is not None else values[arg]) != 0
+                        for arg in instr["args"]
+                    )
+                    if not holds:
+                        expected = [f"Condition {i} failed: {instr['type'].lower()}"]
+                        break
+                self.assertEqual(run(script, values, context()), expected, f"seed {seed}")
+                outcomes.add(expected is None)
+            self.assertEqual(outcomes, {True, False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import copy
+import random
+import unittest
+from src.plutusladder_compiler import compile_ir_to_plutus_haskell_enhanced
+from src.program_generator import generate_ir
+from src.validator_bundle import bundle_validators
+
+
+def rung(*contacts, coil):
+    return [{"type": "LD", "args": [contacts[0]]}] + \
+        [{"type": "AND", "args": [tag]} for tag in contacts[1:]] + [{"type": "ST", "args": [coil]}]
+
+
+def line_controller(variant):
+    return {
+        "instructions": rung("Start", "Guard", "Ready", coil="Motor") + rung(variant, "Ready", coil="Lamp"),
+        "counters": {"C1": {"type": "CTU", "preset": "100"}},
+        "timers": {"T1": {"type": "TOF", "duration": "T#2S"}},
+        "format": "slot-based", "timestamp": 50,
+    }
+
+
+class TestValidatorBundle(unittest.TestCase):
+
+    def test_dispatch_and_shared_definitions(self):
+        """Ensure each program gets a redeemer tag and common rungs and checks are defined once."""
+        bundle = bundle_validators({"line_a": line_controller("Sensor1"), "line_b": line_controller("Sensor2")})
+        script = bundle.script
+        self.assertEqual(bundle.tags, {"line_a": 0, "line_b": 1})
+        self.assertIn("        0 -> program0\n        1 -> program1\n", script)
+        self.assertIn('_ -> traceError "Unknown program tag"', script)
+        self.assertEqual(script.count("Motor && (Start && (Guard && Ready))"), 1)
+        self.assertEqual(script.count('"Counter C1 exceeded"'), 1)
+        self.assertEqual(script.count('"Timer T1 off delay expired" (T1 <= 2000)'), 1)
+        self.assertEqual(script.count("(from slot50) `contains` txInfoValidRange txInfo"), 1)
+        self.assertIn("Ready && (Lamp && Sensor1)", script)
+        self.assertIn("Ready && (Lamp && Sensor2)", script)
+        self.assertTrue(script.endswith("script = mkValidatorScript $$(PlutusTx.compile [|| validate ||])\n"))
+
+    def test_identical_programs_share_one_definition(self):
+        """Ensure identical programs dispatch to the same definition and bind nothing extra."""
+        bundle = bundle_validators([line_controller("S"), line_controller("S"), line_controller("T")])
+        self.assertIn("        1 -> program0\n", bundle.script)
+        self.assertNotIn("program1 =", bundle.script)
+        self.assertEqual(bundle.report["distinct_programs"], 2)
+
+    def test_fleet_is_smaller_than_separate_compilation(self):
+        """Ensure near-identical variants save most of the separately compiled size, deterministically."""
+        base = generate_ir(300, 4)
+        fleet = {}
+        for variant in range(12):
+            ir = copy.deepcopy(base)
+            rng = random.Random(variant)
+            for instruction in rng.sample(ir["instructions"], 2):
+                if instruction["type"] in ("AND", "OR", "ANDN", "LD") and instruction["args"]:
+                    instruction["args"] = [f"X{rng.randrange(100)}"]
+            fleet[f"line{variant}"] = ir
+        bundle = bundle_validators(fleet)
+        report = bundle.report
+        separate = sum(len(compile_ir_to_plutus_haskell_enhanced(ir, optimize=True)) for ir in fleet.values())
+        self.assertEqual(report["separate_bytes"], separate)
+        self.assertEqual(report["bundle_bytes"], len(bundle.script))
+        self.assertGreater(report["saved_percent"], 50)
+        self.assertEqual(bundle_validators(fleet).script, bundle.script)
+
+    def test_invalid_programs_are_named(self):
+        """Ensure errors identify the offending program."""
+        with self.assertRaisesRegex(ValueError, "line_b"):
+            bundle_validators({"line_a": line_controller("S"), "line_b": {"timers": {}}})
+        with self.assertRaisesRegex(ValueError, "line_b"):
+            bundle_validators({"line_a": line_controller("S"), "line_b": {"instructions": []}})
+        bad_timer = dict(line_controller("T"), timers={"T1": {"type": "TON", "duration": "5 parsecs"}})
+        with self.assertRaisesRegex(ValueError, "^Program line_b: "):
+            bundle_validators({"line_a": line_controller("S"), "line_b": bad_timer})
+        with self.assertRaises(ValueError):
+            bundle_validators({})
+
+
+if __name__ == "__main__":
+    unittest.main()
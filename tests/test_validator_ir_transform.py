@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.ll_parser import new_ir, parse_ladder_ir
+from src.st_parser import parse_structured_text
+from src.validator_ir_transform import (
+    InvalidIRError, ValidationIssue, check_ir, compile_schema, validate_ir, validate_ir_files, validate_ir_structure,
+)
+
+PROGRAM = "LD X1\nAND T1.Q\nST Y1\nLD C1.CV\nGT 5\nJMPC done\nST Y2\ndone: LD X2\nST Y3\n"
+
+class TestIRValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.ir = parse_ladder_ir(PROGRAM)
+        self.ir["timers"] = {"T1": {"type": "TON", "duration": "T#5S"}}
+        self.ir["counters"] = {"C1": {"type": "CTU", "preset": "10"}}
+
+    def paths(self, ir_data):
+        return {issue.path: issue.message for issue in validate_ir(ir_data)}
+
+    def test_valid_ir(self):
+        """Ensure a parsed program with defined timers, counters and labels is valid."""
+        self.assertEqual(validate_ir(self.ir), [])
+        self.assertEqual(validate_ir_structure(self.ir), (True, "Valid IR Structure"))
+
+    def test_parser_output_validates(self):
+        """Ensure symbolic comparators and calls without presets parse into valid IR."""
+        ir = parse_ladder_ir("VAR\nT2 : TOF;\nC2 : CTD;\nEND_VAR\nLD X1\n> 5\nST Y1\nLD X2\n== X3\nST Y2\n"
+                             "LD X1\n!= 0\nST Y3\nLD X2\n< 7\nST Y4\nCAL T2(IN := X1)\nCAL C2(CD := X2)\n")
+        self.assertEqual(validate_ir(ir), [])
+        st = parse_structured_text("VAR T2 : TOF; C2 : CTD; END_VAR T2(IN := X1); C2(CD := X2); Y1 := X1 > 5;")
+        self.assertEqual(validate_ir(st), [])
+        ir["instructions"][1]["type"] = ">"
+        self.assertEqual(self.paths(ir)["$.instructions[1].type"], "unknown opcode '>' (use 'GT')")
+
+    def test_reports_all_errors_with_paths(self):
+        """Ensure every error is reported, not just the first one."""
+        ir_data = {"instructions": [{"type": "FROB", "args": ["X1"]}, {"type": "LD"}], "timers": []}
+        issues = self.paths(ir_data)
+        self.assertEqual(issues["$.counters"], "missing required key")
+        self.assertEqual(issues["$.function_blocks"], "missing required key")
+        self.assertEqual(issues["$.instructions[0].type"], "unknown opcode 'FROB'")
+        self.assertEqual(issues["$.instructions[1].args"], "missing required key")
+        self.assertEqual(issues["$.timers"], "expected an object, got list")
+
+    def test_cross_references(self):
+        """Ensure undefined timers, counters and labels are reported."""
+        del self.ir["timers"]["T1"]
+        self.ir["counters"] = {}
+        self.ir["instructions"][7]["args"] = ["elsewhere"]
+        issues = self.paths(self.ir)
+        self.assertEqual(issues["$.instructions[1].args[0]"], "undefined timer or counter 'T1'")
+        self.assertEqual(issues["$.instructions[3].args[0]"], "undefined timer or counter 'C1'")
+        self.assertEqual(issues["$.instructions[5].args[0]"], "undefined label 'done'")
+
+    def test_undefined_instances(self):
+        """Ensure timer, counter and call instructions must name a declared instance."""
+        self.ir["function_blocks"] = {"FB1": {"args": []}}
+        self.ir["instructions"] += [
+            {"type": "TON", "args": ["T7", "5S"]}, {"type": "CTU", "args": ["C7", "10"]},
+            {"type": "TOF", "args": ["T1", "5S"]}, {"type": "CTD", "args": ["C1", "1"]},
+            {"type": "TON", "args": ["C1", "5S"]}, {"type": "CAL", "args": ["FB1"]},
+            {"type": "CAL", "args": ["FB2"]}, {"type": "TP", "args": []},
+        ]
+        issues = self.paths(self.ir)
+        first = len(self.ir["instructions"]) - 8
+        self.assertEqual(issues[f"$.instructions[{first}].args[0]"], "undefined timer 'T7'")
+        self.assertEqual(issues[f"$.instructions[{first + 1}].args[0]"], "undefined counter 'C7'")
+        self.assertEqual(issues[f"$.instructions[{first + 4}].args[0]"], "undefined timer 'C1'")
+        self.assertEqual(issues[f"$.instructions[{first + 6}].args[0]"], "undefined instance 'FB2'")
+        self.assertEqual(issues[f"$.instructions[{first + 7}].args"], "TP requires an instance name")
+        self.assertEqual(len(issues), 5)
+
+    def test_malformed_durations_and_presets(self):
+        """Ensure timer durations and counter presets are parsed, not just present."""
+        self.ir["timers"]["T1"]["duration"] = "5 parsecs"
+        self.ir["counters"]["C1"] = {"type": "CTX", "preset": "ten"}
+        self.ir["counters"]["C 2"] = {"type": "CTD"}
+        issues = self.paths(self.ir)
+        self.assertEqual(issues["$.timers.T1.duration"], "malformed duration '5 parsecs'")
+        self.assertEqual(issues["$.counters.C1.preset"], "malformed preset 'ten'")
+        self.assertIn("unknown type 'CTX'", issues["$.counters.C1.type"])
+        self.assertEqual(issues['$.counters["C 2"].preset'], "missing required key")
+
+    def test_anchoring_requires_timestamp(self):
+        """Ensure anchoring without a timestamp is caught before the compiler's KeyError."""
+        ir_data = dict(new_ir(), instructions=[{"type": "AND", "args": ["A"]}], anchoring="finality")
+        self.assertEqual(self.paths(ir_data), {"$.timestamp": "missing required key (needed by anchoring)"})
+        with self.assertRaises(InvalidIRError) as raised:
+            check_ir(ir_data)
+        self.assertEqual(raised.exception.issues, [ValidationIssue("$.timestamp", "missing required key (needed by anchoring)")])
+
+    def test_custom_opcodes(self):
+        """Ensure a schema compiled with an explicit opcode set rejects everything else."""
+        validator = compile_schema(opcodes=["LD", "ST"])
+        issues = validator.validate(parse_ladder_ir("LD X1\nAND X2\nST Y1\n"))
+        self.assertEqual(issues, [ValidationIssue("$.instructions[1].type", "unknown opcode 'AND'")])
+
+    def test_batch_validation(self):
+        """Ensure files are validated across workers and unreadable files are reported."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            paths = []
+            for i in range(6):
+                path = os.path.join(tmpdir, f"program{i}.ir")
+                with open(path, "w") as f:
+                    json.dump(self.ir if i % 2 == 0 else {"instructions": []}, f)
+                paths.append(path)
+            broken = os.path.join(tmpdir, "broken.ir")
+            with open(broken, "w") as f:
+                f.write("{")
+            results = validate_ir_files(paths + [broken], jobs=2)
+            self.assertEqual(list(results), paths + [broken])
+            self.assertEqual([bool(results[path]) for path in paths], [False, True] * 3)
+            self.assertEqual(results[broken][0]["path"], "$")
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    unittest.main()